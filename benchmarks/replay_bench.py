@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Message replay benchmark for Discord Server Cloner
+Replays synthetic channel histories against a simulated Discord that enforces
+a per-channel bucket (X-RateLimit-* headers, 429 when exceeded) and a global
+limit, once with Clone's REST replay paced by AimdController and once with the
+hand-tuned pacing it replaced (batches of two channels, 0.7 s delay shrinking
+to 0.5 s, rate-limited messages dropped). Buckets are scaled down from
+Discord's 5 messages / 5 s so a run takes seconds.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.operation_file.models import Channel  # noqa: E402
+from src.operation_file.serverclone import Clone  # noqa: E402
+
+
+class SimResponse:
+    def __init__(self, status, body, headers=None):
+        self.status = status
+        self._body = body
+        self.headers = headers or {}
+
+    async def json(self, content_type=None, loads=json.loads):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class SimDiscord:
+    """Just enough of the REST API: message history reads and rate-limited sends"""
+
+    def __init__(self, messages, bucket_limit, bucket_window, global_limit):
+        self.messages = messages
+        self.bucket_limit = bucket_limit
+        self.bucket_window = bucket_window
+        self.global_limit = global_limit
+        self._buckets = {}  # canale -> (inizio finestra, invii)
+        self._global = (0.0, 0)
+        self.sent = 0
+        self.rate_limited = 0
+
+    def get(self, url, params=None):
+        channel_id = url.rsplit("/", 2)[-2]
+        history = [{"id": str(i), "type": 0, "content": f"message {i} of {channel_id}",
+                    "author": {"username": "bench"}, "timestamp": "2025-01-01T00:00:00+00:00"}
+                   for i in range(self.messages, 0, -1)]
+        return SimResponse(200, history[:params["limit"]])
+
+    def post(self, url, json=None):
+        now = time.monotonic()
+        started, count = self._global
+        if now - started >= 1.0:
+            started, count = now, 0
+        if count >= self.global_limit:
+            self.rate_limited += 1
+            return SimResponse(429, {"retry_after": 1.0 - (now - started), "global": True},
+                               {"X-RateLimit-Global": "true"})
+        channel_id = url.rsplit("/", 2)[-2]
+        window_start, sent = self._buckets.get(channel_id, (now, 0))
+        if now - window_start >= self.bucket_window:
+            window_start, sent = now, 0
+        reset_after = round(self.bucket_window - (now - window_start), 3)
+        if sent >= self.bucket_limit:
+            self.rate_limited += 1
+            return SimResponse(429, {"retry_after": reset_after}, {"X-RateLimit-Scope": "user"})
+        self._buckets[channel_id] = (window_start, sent + 1)
+        self._global = (started, count + 1)
+        self.sent += 1
+        return SimResponse(200, {"id": str(self.sent)}, {
+            "X-RateLimit-Limit": str(self.bucket_limit),
+            "X-RateLimit-Remaining": str(self.bucket_limit - sent - 1),
+            "X-RateLimit-Reset-After": str(reset_after),
+        })
+
+
+async def run_aimd(sim, channels, limit):
+    clone = Clone()
+    clone.channels_map = {str(c): f"9{c}" for c in range(channels)}
+    clone.progress_steps = {}
+    text_channels = [Channel(str(c), 0, f"channel-{c}") for c in range(channels)]
+    await clone._copy_messages_rest("1", "2", text_channels, sim, limit)
+    return clone.messages_copied
+
+
+async def run_fixed(sim, channels, limit):
+    """The replaced pacing: two channels at a time, one fixed delay per channel"""
+    copied = 0
+
+    async def copy(channel):
+        nonlocal copied
+        delay, errors = 0.7, 0
+        async with sim.get(f"/channels/{channel}/messages", params={"limit": limit}) as resp:
+            history = await resp.json()
+        for message in reversed(history):
+            if errors >= 3:
+                delay, errors = min(5.0, delay * 1.5), 0
+            async with sim.post(f"/channels/9{channel}/messages", json={"content": message["content"]}) as resp:
+                if resp.status == 200:
+                    copied += 1
+                    await asyncio.sleep(delay)
+                    delay, errors = max(0.5, delay * 0.95), 0
+                else:
+                    errors += 1
+                    await asyncio.sleep(delay)
+
+    for start in range(0, channels, 2):
+        await asyncio.gather(*(copy(c) for c in range(start, min(start + 2, channels))))
+        await asyncio.sleep(1.0)
+    return copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare AIMD message replay with the fixed pacing it replaced")
+    parser.add_argument("--channels", type=int, default=6)
+    parser.add_argument("-m", "--messages", type=int, default=20, help="messages per channel")
+    parser.add_argument("--bucket-limit", type=int, default=5, help="sends per channel bucket window")
+    parser.add_argument("--bucket-window", type=float, default=1.0, help="seconds (Discord: 5)")
+    parser.add_argument("--global-limit", type=int, default=50, help="sends per second across channels")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    results = {"channels": args.channels, "messages": args.channels * args.messages}
+    for name, runner in (("aimd", run_aimd), ("fixed", run_fixed)):
+        sim = SimDiscord(args.messages, args.bucket_limit, args.bucket_window, args.global_limit)
+        start = time.perf_counter()
+        copied = asyncio.run(runner(sim, args.channels, args.messages))
+        elapsed = time.perf_counter() - start
+        results[name] = {"seconds": round(elapsed, 2), "copied": copied, "rate_limited": sim.rate_limited,
+                         "messages_per_second": round(copied / elapsed, 2)}
+        print(f"{name:<6} {elapsed:7.2f} s  {copied:>5} copied  {sim.rate_limited:>4} x 429  "
+              f"({results[name]['messages_per_second']} messages/s)")
+    results["speedup"] = round(results["fixed"]["seconds"] / max(results["aimd"]["seconds"], 1e-9), 1)
+    print(f"speedup {results['speedup']}x")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
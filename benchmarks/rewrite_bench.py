@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Reference rewrite benchmark for Discord Server Cloner
+Rewrites <#channel>, <@&role> and jump-link references of a million synthetic
+messages with ReferenceRewriter (one regex pass per message) and compares it
+with the naive approach, one str.replace per mapped channel and role, timed
+on a sample and extrapolated.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.operation_file.rewrite import ReferenceRewriter  # noqa: E402
+
+GUILD_FROM = "100000000000000000"
+GUILD_TO = "900000000000000000"
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor".split()
+
+
+def make_maps(channels, roles):
+    channels_map = {str(300000000000000000 + i): str(310000000000000000 + i) for i in range(channels)}
+    roles_map = {str(500000000000000000 + i): str(510000000000000000 + i) for i in range(roles)}
+    return channels_map, roles_map
+
+
+def make_messages(count, channels_map, roles_map, seed=42):
+    """About 1 in 4 messages carries references; some point at channels that were not cloned"""
+    rng = random.Random(seed)
+    channel_ids = list(channels_map) + ["399999999999999999"]
+    role_ids = list(roles_map) + ["599999999999999999"]
+    messages = []
+    for _ in range(count):
+        words = rng.choices(WORDS, k=rng.randint(4, 30))
+        if rng.random() < 0.25:
+            for _ in range(rng.randint(1, 3)):
+                kind = rng.random()
+                if kind < 0.5:
+                    reference = f"<#{rng.choice(channel_ids)}>"
+                elif kind < 0.8:
+                    reference = f"<@&{rng.choice(role_ids)}>"
+                else:
+                    reference = f"https://discord.com/channels/{GUILD_FROM}/{rng.choice(channel_ids)}"
+                words.insert(rng.randrange(len(words) + 1), reference)
+        messages.append(" ".join(words))
+    return messages
+
+
+def naive_rewrite(content, channels_map, roles_map):
+    for source_id, dest_id in channels_map.items():
+        content = content.replace(f"<#{source_id}>", f"<#{dest_id}>")
+        content = content.replace(f"/channels/{GUILD_FROM}/{source_id}", f"/channels/{GUILD_TO}/{dest_id}")
+    for source_id, dest_id in roles_map.items():
+        content = content.replace(f"<@&{source_id}>", f"<@&{dest_id}>")
+    return content
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure single-pass reference rewriting of cloned messages")
+    parser.add_argument("-m", "--messages", type=int, default=1_000_000)
+    parser.add_argument("--channels", type=int, default=500, help="mapped channels")
+    parser.add_argument("--roles", type=int, default=250, help="mapped roles")
+    parser.add_argument("--naive-sample", type=int, default=2000,
+                        help="messages rewritten with str.replace (its time is extrapolated)")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    channels_map, roles_map = make_maps(args.channels, args.roles)
+    messages = make_messages(args.messages, channels_map, roles_map)
+
+    start = time.perf_counter()
+    rewriter = ReferenceRewriter(GUILD_FROM, GUILD_TO, channels_map, roles_map)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    rewritten = [rewriter.rewrite(m) for m in messages]
+    single_pass_s = time.perf_counter() - start
+
+    sample = messages[:args.naive_sample]
+    start = time.perf_counter()
+    expected = [naive_rewrite(m, channels_map, roles_map) for m in sample]
+    naive_per_message = (time.perf_counter() - start) / max(1, len(sample))
+
+    if rewritten[:len(sample)] != expected:
+        print("MISMATCH: single-pass and str.replace results differ")
+        sys.exit(1)
+
+    changed = sum(1 for before, after in zip(messages, rewritten) if before is not after)
+    results = {
+        "messages": args.messages,
+        "channels": args.channels,
+        "roles": args.roles,
+        "rewritten": changed,
+        "compile_ms": round(compile_ms, 2),
+        "single_pass_s": round(single_pass_s, 3),
+        "single_pass_us_per_message": round(single_pass_s / args.messages * 1e6, 3),
+        "naive_us_per_message": round(naive_per_message * 1e6, 3),
+        "naive_extrapolated_s": round(naive_per_message * args.messages, 1),
+    }
+    results["speedup"] = round(results["naive_extrapolated_s"] / max(single_pass_s, 1e-9), 1)
+
+    print(f"{args.messages:,} messages, {args.channels} channels and {args.roles} roles mapped, "
+          f"{changed:,} messages with rewritten references")
+    print(f"single pass   {single_pass_s:8.2f} s  ({results['single_pass_us_per_message']} us/message, "
+          f"tables built in {results['compile_ms']} ms)")
+    print(f"str.replace   {results['naive_extrapolated_s']:8.1f} s  ({results['naive_us_per_message']} us/message, "
+          f"extrapolated from {len(sample):,})")
+    print(f"speedup       {results['speedup']}x")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
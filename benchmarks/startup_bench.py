@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for Discord Server Cloner
+Launches main.py N times with --profile-startup and reports time-to-first-window
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_once(python, timeout):
+    """Avvia l'app una volta e restituisce il profilo JSON"""
+    fd, out_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        subprocess.run(
+            [python, "main.py", "--profile-startup", "--exit-after-first-window",
+             "--profile-output", out_path],
+            cwd=ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=timeout,
+            check=True,
+        )
+        with open(out_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        if os.path.exists(out_path):
+            os.remove(out_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start time-to-first-window")
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=None,
+                        help="fail (exit 1) if the median time-to-first-window exceeds this many ms")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    first_window, imports_done, profiles = [], [], []
+    for i in range(args.runs):
+        profile = run_once(sys.executable, args.timeout)
+        profiles.append(profile)
+        marks = profile.get("marks", {})
+        first_window.append(marks.get("first_window", 0.0) * 1000)
+        imports_done.append(marks.get("imports_done", 0.0) * 1000)
+        print(f"run {i + 1}: first window {first_window[-1]:.1f} ms (imports {imports_done[-1]:.1f} ms)")
+
+    median = statistics.median(first_window)
+    print(f"median time-to-first-window: {median:.1f} ms over {args.runs} runs")
+    print(f"median import time:          {statistics.median(imports_done):.1f} ms")
+
+    print("slowest imports (last run):")
+    for item in profiles[-1].get("slowest_imports", [])[:10]:
+        print(f"  {item['inclusive'] * 1000:8.1f} ms  {item['module']}")
+
+    if args.budget is not None and median > args.budget:
+        print(f"FAIL: {median:.1f} ms exceeds the {args.budget:.1f} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+UI benchmark for Discord Server Cloner
+Builds the heaviest components with synthetic data (200 guilds, 500 channels,
+1,000 messages, 10k members) and reports construction time, filter/scroll
+latency and widget counts. Runs under a virtual X display (Xvfb) when no
+display is available.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import statistics
+import subprocess
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SIZES = {"guilds": 200, "channels": 500, "messages": 1000, "members": 10000}
+SCROLL_STEPS = 20
+
+
+# --- Dati sintetici ---------------------------------------------------------
+
+def make_guilds(count):
+    return [{"id": str(100000000000000000 + i), "name": f"Guild {i}", "icon": None} for i in range(count)]
+
+
+def make_channels(count):
+    """10% categories, then text and voice channels spread across them (about 1 in 10 voice)"""
+    categories = [{"id": str(200000000000000000 + i), "name": f"category-{i}", "type": 4, "position": i}
+                  for i in range(max(1, count // 10))]
+    channels = list(categories)
+    for i in range(count - len(categories)):
+        channels.append({
+            "id": str(300000000000000000 + i),
+            "name": f"channel-{i}",
+            "type": 2 if i % 10 == 9 else 0,
+            "position": i,
+            "parent_id": categories[i % len(categories)]["id"] if i % 25 else None,
+        })
+    return channels
+
+
+def make_messages(count):
+    messages = []
+    for i in range(count):
+        message = {
+            "id": str(400000000000000000 + i),
+            "author": {"username": f"user{i % 50}"},
+            "timestamp": "2024-05-01T12:%02d:00+00:00" % (i % 60),
+            "content": f"Message {i}: " + "lorem ipsum dolor sit amet " * (1 + i % 4),
+            "attachments": [],
+            "embeds": [],
+        }
+        # Niente immagini: le anteprime scaricherebbero dalla rete
+        if i % 20 == 0:
+            message["attachments"].append({"filename": f"file{i}.zip", "url": "", "content_type": "application/zip",
+                                           "size": 1024 * (i + 1)})
+        if i % 15 == 0:
+            message["embeds"].append({"title": f"Embed {i}", "description": "embed description " * 8})
+        messages.append(message)
+    return messages
+
+
+class BenchGuild(dict):
+    """Guild dict that also carries .members, as the explorer's members panel expects"""
+
+
+def make_guild_with_members(count):
+    guild = BenchGuild(id="500000000000000000", name="Members Guild")
+    guild.members = [SimpleNamespace(name=f"member{i}", display_name=f"Member {i}",
+                                     status="online" if i % 3 == 0 else "offline",
+                                     activity="Playing a game" if i % 7 == 0 else None)
+                     for i in range(count)]
+    return guild
+
+
+# --- Misure -----------------------------------------------------------------
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def find_widgets(widget, cls):
+    found = [widget] if isinstance(widget, cls) else []
+    for child in widget.winfo_children():
+        found.extend(find_widgets(child, cls))
+    return found
+
+
+def timed(app, build):
+    """Run build() and wait for the geometry pass; returns (result, ms)"""
+    start = time.perf_counter()
+    result = build()
+    app.update_idletasks()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def scroll_latency(app, scrollable):
+    """Per-step time (ms) to scroll a CTkScrollableFrame from top to bottom"""
+    canvas = scrollable._parent_canvas
+    samples = []
+    for step in range(1, SCROLL_STEPS + 1):
+        start = time.perf_counter()
+        canvas.yview_moveto(step / SCROLL_STEPS)
+        app.update_idletasks()
+        samples.append((time.perf_counter() - start) * 1000)
+    canvas.yview_moveto(0)
+    return samples
+
+
+def wait_until(app, condition, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("UI did not update in time")
+        app.update()
+    return time.perf_counter()
+
+
+# --- Scenari ----------------------------------------------------------------
+
+def bench_guild_selector(app, lang, sizes):
+    from src.interface.components.guild_input import GuildInput
+    import customtkinter as ctk
+
+    guild_input = GuildInput(app)
+    guild_input.pack(fill="both", expand=True)
+    guild_input.update_guilds_dropdowns(make_guilds(sizes["guilds"]))
+    app.update_idletasks()
+
+    before = set(app.winfo_children())
+    _, build_ms = timed(app, lambda: guild_input.open_guild_selector(is_source=True))
+    top = next(w for w in app.winfo_children() if w not in before and isinstance(w, ctk.CTkToplevel))
+    list_frame = find_widgets(top, ctk.CTkScrollableFrame)[0]
+    widgets = count_widgets(top)
+
+    # Filtro: "Guild 1" lascia 111 voci su 200; misuriamo fino al ripopolamento, debounce escluso
+    entry = find_widgets(top, ctk.CTkEntry)[0]
+    initial = len(list_frame.winfo_children())
+    entry.insert(0, "Guild 1")
+    start = time.perf_counter()
+    entry._entry.event_generate("<KeyRelease>")
+    end = wait_until(app, lambda: len(list_frame.winfo_children()) != initial)
+    filter_ms = (end - start) * 1000 - guild_input.SEARCH_DEBOUNCE_MS
+
+    scroll = scroll_latency(app, list_frame)
+    top.destroy()
+    guild_input.destroy()
+    return {"build_ms": build_ms, "filter_ms": max(0.0, filter_ms), "scroll_ms": scroll, "widgets": widgets}
+
+
+def bench_message_viewer(app, lang, sizes):
+    from src.interface.components.message_viewer import MessageViewer
+    import customtkinter as ctk
+
+    container = ctk.CTkScrollableFrame(app)
+    container.pack(fill="both", expand=True)
+    viewer = MessageViewer(container, lang, "", fg_color="transparent")
+    viewer.pack(fill="both", expand=True)
+    messages = make_messages(sizes["messages"])
+
+    _, build_ms = timed(app, lambda: viewer.display_messages(messages))
+    widgets = count_widgets(viewer)
+    scroll = scroll_latency(app, container)
+    container.destroy()
+    return {"build_ms": build_ms, "scroll_ms": scroll, "widgets": widgets}
+
+
+def bench_explorer_channels(app, lang, sizes):
+    from src.interface.components.advanced_explorer import create_advanced_explorer_frame
+    import customtkinter as ctk
+
+    guild = {"id": "600000000000000000", "name": "Channels Guild"}
+    channels = make_channels(sizes["channels"])
+
+    def build():
+        frame = create_advanced_explorer_frame(app, lang, guild, True, lambda _name: None, lambda: None,
+                                               channels=channels)
+        frame.pack(fill="both", expand=True)
+        return frame
+
+    frame, build_ms = timed(app, build)
+    widgets = count_widgets(frame)
+    sidebar = find_widgets(frame, ctk.CTkScrollableFrame)[0]
+    scroll = scroll_latency(app, sidebar)
+    frame.destroy()
+    return {"build_ms": build_ms, "scroll_ms": scroll, "widgets": widgets}
+
+
+def bench_explorer_members(app, lang, sizes):
+    from src.interface.components.advanced_explorer import open_advanced_explorer
+    import customtkinter as ctk
+
+    guild = make_guild_with_members(sizes["members"])
+    before = set(app.winfo_children())
+    _, build_ms = timed(app, lambda: open_advanced_explorer(app, lang, guild, True, lambda _name: None, channels=[]))
+    top = next(w for w in app.winfo_children() if w not in before and isinstance(w, ctk.CTkToplevel))
+    widgets = count_widgets(top)
+    members = find_widgets(top, ctk.CTkScrollableFrame)[-1]
+    scroll = scroll_latency(app, members)
+    top.destroy()
+    return {"build_ms": build_ms, "scroll_ms": scroll, "widgets": widgets}
+
+
+def bench_settings_panel(app, lang, sizes):
+    from src.interface.components.settings_panel import SettingsPanel
+
+    def build():
+        panel = SettingsPanel(app, width=350, height=900)
+        panel.pack(fill="y", side="right")
+        return panel
+
+    panel, build_ms = timed(app, build)
+    widgets = count_widgets(panel)
+    panel.destroy()
+    return {"build_ms": build_ms, "widgets": widgets}
+
+
+SCENARIOS = {
+    "guild_selector": bench_guild_selector,
+    "message_viewer": bench_message_viewer,
+    "explorer_channels": bench_explorer_channels,
+    "explorer_members": bench_explorer_members,
+    "settings_panel": bench_settings_panel,
+}
+
+
+# --- Display virtuale -------------------------------------------------------
+
+def start_xvfb(display=":99"):
+    """Start Xvfb on display and point DISPLAY at it; returns the process"""
+    if not shutil.which("Xvfb"):
+        raise RuntimeError("no X display and Xvfb is not installed (apt install xvfb)")
+    proc = subprocess.Popen(["Xvfb", display, "-screen", "0", "1600x1200x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    if proc.poll() is not None:
+        raise RuntimeError(f"Xvfb exited with code {proc.returncode}")
+    os.environ["DISPLAY"] = display
+    return proc
+
+
+# --- Report -----------------------------------------------------------------
+
+def summarize(runs):
+    """Median of every metric across repeated runs (scroll samples -> median and max per step)"""
+    summary = {}
+    for key in runs[0]:
+        if key == "scroll_ms":
+            samples = [s for run in runs for s in run[key]]
+            summary["scroll_median_ms"] = statistics.median(samples)
+            summary["scroll_max_ms"] = max(samples)
+        else:
+            summary[key] = statistics.median(run[key] for run in runs)
+    return summary
+
+
+def compare(results, baseline, tolerance):
+    """Timing metrics more than tolerance slower than the baseline"""
+    regressions = []
+    for name, metrics in results.items():
+        for key, value in metrics.items():
+            base = baseline.get(name, {}).get(key)
+            if not key.endswith("_ms") or not base:
+                continue
+            if value > base * (1 + tolerance):
+                regressions.append(f"{name}.{key}: {value:.1f} ms vs {base:.1f} ms baseline")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure UI construction, filter and scroll cost with synthetic data")
+    parser.add_argument("-n", "--runs", type=int, default=3)
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), help="run only these scenarios")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every synthetic data size")
+    parser.add_argument("--xvfb", action="store_true", help="always start a private Xvfb display")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results JSON of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="fail (exit 1) if a timing exceeds the baseline by more than this fraction")
+    args = parser.parse_args()
+
+    xvfb = None
+    if args.xvfb or not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+        try:
+            xvfb = start_xvfb()
+        except RuntimeError as e:
+            print(f"Cannot start a virtual display: {e}")
+            return 2
+
+    try:
+        import customtkinter as ctk
+        from src.interface.utils.language_manager import LanguageManager
+        from src.operation_file.async_runtime import AsyncRuntime
+        from src.interface.components.status_bar import StatusBar
+
+        sizes = {key: max(1, int(value * args.scale)) for key, value in SIZES.items()}
+        app = ctk.CTk()
+        app.geometry("1400x1000")
+        AsyncRuntime().attach(app)
+        lang = LanguageManager()
+        # I componenti riportano lo stato sulla status bar della finestra principale
+        app.status_bar = StatusBar(app)
+        app.status_bar.pack(side="bottom", fill="x")
+        app.update()
+
+        results = {}
+        for name in args.only or SCENARIOS:
+            runs = [SCENARIOS[name](app, lang, sizes) for _ in range(args.runs)]
+            results[name] = summarize(runs)
+            metrics = "  ".join(f"{key}={value:.1f}" if isinstance(value, float) else f"{key}={value}"
+                                for key, value in results[name].items())
+            print(f"{name:<18} {metrics}")
+        app.destroy()
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"sizes": sizes, "results": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION: {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
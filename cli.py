@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Headless entry point for Discord Server Cloner
+Runs the REST cloning engine without Tk/customtkinter, for servers and job runners.
+
+Examples:
+    python cli.py --source 123 --dest 456 --no-voice-channels
+    python cli.py --batch jobs.jsonl --format jsonl > run.log
+    python cli.py --export 111 222 --export-dir backups
+
+The token is read from --token-file, or from the DISCORD_TOKEN environment variable.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import contextlib
+import multiprocessing
+
+import aiohttp
+
+from src.operation_file.jobqueue import CloneEngine, GuildAccessError
+from src.operation_file.export import EXPORT_DIR
+from src.operation_file import workers
+
+# Exit codes
+EXIT_OK = 0
+EXIT_CLONE_FAILED = 1
+EXIT_USAGE = 2
+EXIT_ACCESS = 3      # token rejected or guild not reachable
+EXIT_NETWORK = 4
+EXIT_INTERRUPTED = 130
+
+# Option flags understood by Clone.start_clone: (option key, flag name, default)
+CLONE_FLAGS = [
+    ("clone_roles", "roles", True),
+    ("clone_categories", "categories", True),
+    ("clone_text_channels", "text-channels", True),
+    ("clone_voice_channels", "voice-channels", True),
+    ("clone_messages", "messages", False),
+    ("clone_name_icon", "name-icon", False),
+    ("clone_emojis", "emojis", False),
+    ("clone_stickers", "stickers", False),
+]
+
+
+class Reporter:
+    """Writes progress events either as JSON lines or as plain text"""
+
+    def __init__(self, stream, fmt="jsonl"):
+        self.stream = stream
+        self.fmt = fmt
+        self._last_progress = -1.0
+
+    def emit(self, event: str, **fields):
+        if self.fmt == "jsonl":
+            record = {"ts": round(time.time(), 3), "event": event}
+            record.update(fields)
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            details = " ".join(f"{k}={v}" for k, v in fields.items())
+            self.stream.write(f"[{event}] {details}\n")
+        self.stream.flush()
+
+    def progress(self, value: float, job: int):
+        # Evitiamo di inondare l'output con aggiornamenti identici
+        value = round(value, 3)
+        if value != self._last_progress:
+            self._last_progress = value
+            self.emit("progress", job=job, value=value)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Clone a Discord server without the GUI")
+    target = parser.add_argument_group("target")
+    target.add_argument("--source", help="source guild ID")
+    target.add_argument("--dest", nargs="+",
+                        help="destination guild ID; several IDs clone the source into all of them at once")
+    target.add_argument("--batch", metavar="FILE",
+                        help='JSON lines file, one job per line: {"source": "...", "dest": "..." or [...], "options": {...}}')
+    target.add_argument("--export", nargs="+", metavar="CHANNEL",
+                        help="back up the message history of these channels instead of cloning")
+
+    export = parser.add_argument_group("export options")
+    export.add_argument("--export-dir", default=EXPORT_DIR, metavar="DIR",
+                        help=f"archive directory; existing archives are continued (default: {EXPORT_DIR})")
+    export.add_argument("--export-concurrency", type=int, default=4, metavar="N",
+                        help="channels exported at the same time (default: 4)")
+
+    parser.add_argument("--token-file", metavar="PATH", help="file containing the token (default: $DISCORD_TOKEN)")
+    parser.add_argument("--format", choices=["jsonl", "text"], default="jsonl", help="output format (default: jsonl)")
+    parser.add_argument("--messages-limit", type=int, default=0, help="messages to copy per channel when --messages is set")
+    parser.add_argument("--continue-on-error", action="store_true", help="in batch mode, keep going after a failed job")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="only plan: report requests per route and estimated duration, change nothing")
+    parser.add_argument("--gateway", action="store_true",
+                        help="read guild structure from one gateway session instead of several REST calls")
+    parser.add_argument("--gateway-url", metavar="URL", help="gateway endpoint (default: Discord, or $DISCORD_GATEWAY_URL)")
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="processes for image and encoding work (default: one per core, 0: threads only)")
+
+    options = parser.add_argument_group("clone options")
+    for key, flag, default in CLONE_FLAGS:
+        # Mostriamo nell'help solo il flag che cambia il default
+        label = flag.replace("-", " ")
+        options.add_argument(f"--{flag}", dest=key, action="store_true", default=default,
+                             help=argparse.SUPPRESS if default else f"clone {label}")
+        options.add_argument(f"--no-{flag}", dest=key, action="store_false",
+                             help=f"skip {label}" if default else argparse.SUPPRESS)
+
+    args = parser.parse_args(argv)
+    if args.export and (args.batch or args.source or args.dest):
+        parser.error("--export cannot be combined with --batch/--source/--dest")
+    if args.batch and (args.source or args.dest):
+        parser.error("--batch cannot be combined with --source/--dest")
+    if not args.export and not args.batch and not (args.source and args.dest):
+        parser.error("either --source and --dest, --batch or --export is required")
+    return args
+
+
+def load_token(args):
+    if args.token_file:
+        with open(args.token_file, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    return os.environ.get("DISCORD_TOKEN", "").strip()
+
+
+def _dest_ids(dest):
+    """A single destination stays a string, several become a list (fan-out job)"""
+    if isinstance(dest, (list, tuple)):
+        dest = list(dict.fromkeys(str(d) for d in dest))
+        return dest[0] if len(dest) == 1 else dest
+    return str(dest)
+
+
+def build_jobs(args):
+    """Return the list of (source, dest, options) to run; dest is a list for fan-out jobs"""
+    base_options = {key: getattr(args, key) for key, _flag, _default in CLONE_FLAGS}
+    base_options["messages_limit"] = args.messages_limit if base_options["clone_messages"] else 0
+
+    if not args.batch:
+        return [(str(args.source), _dest_ids(args.dest), base_options)]
+
+    jobs = []
+    with open(args.batch, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = json.loads(line)
+            if "source" not in entry or "dest" not in entry:
+                raise ValueError(f"{args.batch}:{line_no}: job needs 'source' and 'dest'")
+            options = dict(base_options)
+            options.update(entry.get("options") or {})
+            jobs.append((str(entry["source"]), _dest_ids(entry["dest"]), options))
+    return jobs
+
+
+async def plan_job(engine, index, source_id, dest_id, options, reporter):
+    """Dry run of a single job: emit its plan and estimate (one per destination)"""
+    def debug_callback(message, level="INFO"):
+        reporter.emit("log", job=index, level=level, message=message)
+
+    try:
+        if isinstance(dest_id, list):
+            result = await engine.fan_out(source_id, dest_id, dict(options, dry_run=True), debug_callback=debug_callback)
+            plans = [r.get("plan") for r in result["destinations"].values()]
+        else:
+            plans = [await engine.plan(source_id, dest_id, options, debug_callback=debug_callback)]
+    except GuildAccessError as e:
+        reporter.emit("error", job=index, message=str(e), status=e.status)
+        return EXIT_ACCESS
+
+    exit_code = EXIT_OK
+    for plan in plans:
+        if plan is None:
+            reporter.emit("error", job=index, message="could not read the guild structure")
+            exit_code = EXIT_ACCESS
+        elif reporter.fmt == "text":
+            reporter.stream.write(plan.format_text(engine.limiter.route_stats) + "\n")
+            reporter.stream.flush()
+        else:
+            reporter.emit("plan", job=index, **plan.to_dict(engine.limiter.route_stats))
+    return exit_code
+
+
+async def run_job(engine, index, source_id, dest_id, options, reporter):
+    """Run a single clone on the shared engine and return its exit code"""
+    if source_id == dest_id or (isinstance(dest_id, list) and source_id in dest_id):
+        reporter.emit("error", job=index, message="source and destination are the same server")
+        return EXIT_USAGE
+
+    def debug_callback(message, level="INFO"):
+        reporter.emit("log", job=index, level=level, message=message)
+
+    reporter.emit("job_start", job=index, source=source_id, dest=dest_id, options=options)
+    fan_out = isinstance(dest_id, list)
+    try:
+        result = await (engine.fan_out if fan_out else engine.run)(
+            source_id, dest_id, options,
+            debug_callback=debug_callback,
+            progress_callback=lambda value: reporter.progress(value, index),
+        )
+    except GuildAccessError as e:
+        reporter.emit("error", job=index, message=str(e), status=e.status)
+        return EXIT_ACCESS
+
+    # Un evento per ogni oggetto eliminato (o non eliminabile) nella destinazione
+    destinations = result["destinations"] if fan_out else {dest_id: result}
+    for dest, dest_result in destinations.items():
+        for item in dest_result.pop("teardown", []):
+            reporter.emit("teardown", job=index, dest=dest, **item)
+    reporter.emit("job_done", job=index, **result)
+    if result["success"]:
+        return EXIT_OK
+    # Destinazione non accessibile (solo fan-out: le altre sono state clonate comunque)
+    if any("status" in r for r in destinations.values()):
+        return EXIT_ACCESS
+    return EXIT_CLONE_FAILED
+
+
+async def run_export(args, token, reporter):
+    """Export the channels given with --export; one event per channel"""
+    def progress_callback(channel_id, exported):
+        reporter.emit("export_progress", channel=channel_id, exported=exported)
+
+    async with CloneEngine(token) as engine:
+        try:
+            result = await engine.export(args.export, args.export_dir, max(1, args.export_concurrency),
+                                         progress_callback=progress_callback)
+        except aiohttp.ClientError as e:
+            reporter.emit("error", message=f"network error: {e}")
+            return EXIT_NETWORK
+    for channel in result.pop("channels"):
+        reporter.emit("export_channel", **channel)
+    reporter.emit("export_done", **result)
+    return EXIT_OK if result["success"] else EXIT_CLONE_FAILED
+
+
+async def run(args, token, jobs, reporter):
+    exit_code = EXIT_OK
+    # Una sola sessione e un solo stato di rate limit per tutti i job del batch
+    async with CloneEngine(token, use_gateway=args.gateway, gateway_url=args.gateway_url) as engine:
+        for index, (source_id, dest_id, options) in enumerate(jobs):
+            try:
+                if args.dry_run:
+                    code = await plan_job(engine, index, source_id, dest_id, options, reporter)
+                else:
+                    code = await run_job(engine, index, source_id, dest_id, options, reporter)
+            except aiohttp.ClientError as e:
+                reporter.emit("error", job=index, message=f"network error: {e}")
+                code = EXIT_NETWORK
+            if code != EXIT_OK:
+                exit_code = code
+                if not args.continue_on_error:
+                    break
+        reporter.emit("rate_limit", **engine.limiter.get_stats())
+    return exit_code
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # stdout è riservato agli eventi: i print del Logger finiscono su stderr
+    reporter = Reporter(sys.stdout, args.format)
+
+    token = load_token(args)
+    if not token:
+        reporter.emit("error", message="no token: use --token-file or set DISCORD_TOKEN")
+        return EXIT_USAGE
+
+    try:
+        jobs = [] if args.export else build_jobs(args)
+    except (OSError, ValueError) as e:
+        reporter.emit("error", message=str(e))
+        return EXIT_USAGE
+
+    if args.workers is not None:
+        workers.configure(max(0, args.workers))
+
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            exit_code = asyncio.run(run_export(args, token, reporter) if args.export else run(args, token, jobs, reporter))
+    except KeyboardInterrupt:
+        reporter.emit("interrupted")
+        return EXIT_INTERRUPTED
+    finally:
+        workers.shutdown()
+
+    reporter.emit("finished", exit_code=exit_code, jobs=len(jobs), elapsed=round(time.perf_counter() - started, 3))
+    return exit_code
+
+
+if __name__ == "__main__":
+    # Necessario per il pool di processi negli eseguibili PyInstaller
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,6 +1,64 @@
-import customtkinter as ctk
-from src.interface.main_window import MainWindow
+import sys
+import time
+import argparse
+import multiprocessing
+
+_START = time.perf_counter()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Discord Server Cloner")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print import times and time-to-first-window on stderr")
+    parser.add_argument("--profile-output", metavar="PATH",
+                        help="also write the startup profile as JSON to PATH")
+    parser.add_argument("--exit-after-first-window", action="store_true",
+                        help="close the app as soon as the first frame is drawn (for benchmarks)")
+    args, _unknown = parser.parse_known_args(argv)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    profiler = None
+    if args.profile_startup:
+        from src.interface.utils.startup_profiler import StartupProfiler
+        profiler = StartupProfiler(_START)
+        profiler.install()
+
+    from src.interface.main_window import MainWindow
+    if profiler:
+        profiler.mark("imports_done")
 
-if __name__ == "__main__":
     app = MainWindow()
-    app.mainloop()
\ No newline at end of file
+    if profiler:
+        profiler.mark("main_window_built")
+
+    if profiler or args.exit_after_first_window:
+        first_frame = {"done": False}
+
+        def on_first_frame():
+            if profiler:
+                profiler.mark("first_window")
+                profiler.uninstall()
+                profiler.report()
+                if args.profile_output:
+                    profiler.save(args.profile_output)
+            if args.exit_after_first_window:
+                app.after(0, app.destroy)
+
+        def on_map(event):
+            if event.widget is app and not first_frame["done"]:
+                first_frame["done"] = True
+                app.after_idle(on_first_frame)
+
+        app.bind("<Map>", on_map, add="+")
+
+    app.mainloop()
+
+
+if __name__ == "__main__":
+    # I worker del pool di processi rilanciano l'eseguibile: con PyInstaller serve freeze_support
+    multiprocessing.freeze_support()
+    sys.exit(main())
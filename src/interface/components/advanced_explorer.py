@@ -1,14 +1,67 @@
 import customtkinter as ctk
-import asyncio
-import aiohttp
-from typing import Callable, Dict, Any
+from typing import Callable, Dict, Any, List, Optional
 import tkinter as tk
 import threading
-from concurrent.futures import ThreadPoolExecutor
+import asyncio
+from datetime import datetime
 
 from src.interface.styles.colors import Colors
 from src.interface.styles.discord_colors import DiscordColors
 from src.interface.components.message_viewer import MessageViewer
+from src.operation_file.async_runtime import AsyncRuntime
+from src.operation_file.localindex import LocalIndex
+
+SEARCH_DEBOUNCE_MS = 150
+SEARCH_LIMIT = 50
+
+
+def format_index_search(gid: str, query: str, no_results: str) -> str:
+    """Channels and messages of the guild matching query, from the local index, as text"""
+    index = LocalIndex()
+    lines = []
+    channels = index.search_channels(query, guild_id=gid, limit=10)
+    if channels:
+        lines.append("  ".join(f"#{c.get('name', '?')}" for c in channels))
+        lines.append("")
+    for hit in index.search_messages(query, guild_id=gid, limit=SEARCH_LIMIT):
+        message = hit["message"]
+        author = (message.get("author") or {}).get("username", "?")
+        when = message.get("timestamp", "")
+        try:
+            when = datetime.fromisoformat(when.replace("Z", "+00:00")).strftime("%d/%m/%Y %H:%M")
+        except ValueError:
+            pass
+        lines.append(f"#{hit['channel_name'] or hit['channel_id']} · {author} · {when}")
+        lines.append(f"    {hit['snippet']}")
+    return "\n".join(lines) if lines else no_results
+
+
+def create_index_search(parent, lang, gid: str, mode: str, show: Callable[[str], None]) -> ctk.CTkEntry:
+    """Search entry over the local index; results are passed to show() as text"""
+    try:
+        placeholder = lang.get_text("advanced_explorer.search_placeholder")
+        no_results = lang.get_text("advanced_explorer.no_results")
+    except Exception:
+        placeholder, no_results = "Cerca messaggi...", "Nessun risultato nell'indice locale"
+    entry = ctk.CTkEntry(parent, placeholder_text=placeholder, height=36,
+                         fg_color=DiscordColors.get_background_color(mode, "tertiary"),
+                         text_color=DiscordColors.get_text_color(mode, "normal"))
+    pending = [None]
+
+    def run_search():
+        pending[0] = None
+        query = entry.get().strip()
+        if query:
+            show(format_index_search(gid, query, no_results))
+
+    def on_key(_event=None):
+        # Cerchiamo solo quando l'utente smette di scrivere
+        if pending[0] is not None:
+            entry.after_cancel(pending[0])
+        pending[0] = entry.after(SEARCH_DEBOUNCE_MS, run_search)
+
+    entry.bind("<KeyRelease>", on_key)
+    return entry
 
 
 def open_advanced_explorer_threaded(parent: ctk.CTkBaseClass,
@@ -35,7 +88,8 @@ def open_advanced_explorer(parent: ctk.CTkBaseClass,
                            lang,
                            guild_obj: Dict[str, Any],
                            is_source: bool,
-                           on_select: Callable[[str], None]) -> None:
+                           on_select: Callable[[str], None],
+                           channels: Optional[List[Dict[str, Any]]] = None) -> None:
     """
     Open the Advanced Explorer modal in a Discord-like layout.
 
@@ -45,6 +99,7 @@ def open_advanced_explorer(parent: ctk.CTkBaseClass,
         guild_obj: Dict with at least 'id' and 'name'.
         is_source: Whether the selection will be used as source or destination.
         on_select: Callback receiving the display string "Name (ID)" when the user confirms selection.
+        channels: Channel list already known for the guild (skips the REST fetch).
     """
     mode = ctk.get_appearance_mode().lower()
     top = ctk.CTkToplevel(parent)
@@ -172,7 +227,9 @@ def open_advanced_explorer(parent: ctk.CTkBaseClass,
         for widget in members_list_container.winfo_children():
             widget.destroy()
         
-        if not guild_obj or not hasattr(guild_obj, 'members'):
+        # Senza membri dal chiamante usiamo quelli salvati nell'indice locale (es. dal gateway)
+        members = getattr(guild_obj, 'members', None) or LocalIndex().get_members(gid, 50)
+        if not members:
             # Show placeholder when no members available
             no_members_label = ctk.CTkLabel(members_list_container, 
                                           text="No members available",
@@ -185,7 +242,7 @@ def open_advanced_explorer(parent: ctk.CTkBaseClass,
         online_members = []
         offline_members = []
         
-        for member in guild_obj.members[:50]:  # Limit to first 50 members for performance
+        for member in members[:50]:  # Limit to first 50 members for performance
             if hasattr(member, 'status') and str(member.status) == 'online':
                 online_members.append(member)
             else:
@@ -295,6 +352,9 @@ def open_advanced_explorer(parent: ctk.CTkBaseClass,
     # Center panel - Discord-style channel details
     center_content = ctk.CTkFrame(center, fg_color="transparent")
     center_content.pack(fill="both", expand=True, padx=24, pady=24)
+
+    search_entry = create_index_search(center_content, lang, gid, mode, lambda text: set_details(text))
+    search_entry.pack(fill="x", pady=(0, 16))
     
     # Welcome message area (Discord-style)
     welcome_frame = ctk.CTkFrame(center_content, fg_color=DiscordColors.get_background_color(mode, "secondary"),
@@ -445,10 +505,10 @@ def open_advanced_explorer(parent: ctk.CTkBaseClass,
                 message_viewer.pack(fill="both", expand=True, padx=5, pady=5)
             
             # Load messages for current channel
-            asyncio.create_task(message_viewer.load_channel_messages(
+            message_viewer.load_channel_messages(
                 current_selected_channel['id'],
                 current_selected_channel['name']
-            ))
+            )
             
             messages_panel_visible = True
             
@@ -523,56 +583,16 @@ def open_advanced_explorer(parent: ctk.CTkBaseClass,
             if messages_panel_visible:
                 toggle_messages_panel()  # Hide if currently visible
         
-        # Update members panel when channel is selected
-            try:
-                # Use asyncio.run in thread to handle async operations
-                async def async_fetch():
-                    async with aiohttp.ClientSession(headers=headers) as session:
-                        async with session.get(url) as resp:
-                            if resp.status != 200:
-                                return None, f"HTTP {resp.status}"
-                            return await resp.json(), None
-                
-                channels, error = asyncio.run(async_fetch())
-                
-                # Update UI in main thread
-                def update_ui():
-                    if error:
-                        status_lbl.configure(text=error)
-                        render_channels([])
-                    else:
-                        render_channels(channels or [])
-                
-                top.after(0, update_ui)
-                
-            except Exception as e:
-                # Update UI in main thread
-                def update_error():
-                    status_lbl.configure(text=str(e))
-                    render_channels([])
-                
-                top.after(0, update_error)
-        
-        # Run fetch in background thread
-        thread = threading.Thread(target=fetch_channels_sync, daemon=True)
-        thread.start()
-    
-    async def fetch_channels():
-        """Legacy async function for compatibility"""
-        main_window = parent.winfo_toplevel()
-        token = getattr(main_window, 'verified_token', None) or getattr(getattr(main_window, 'token_input', None), 'entry', None).get()
-        headers = {"Authorization": token, "Content-Type": "application/json"}
+    async def fetch_channels(headers):
+        """Fetch the guild channels on the shared async runtime"""
         url = f"https://discord.com/api/v10/guilds/{gid}/channels"
-        try:
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.get(url) as resp:
-                    if resp.status != 200:
-                        status_lbl.configure(text=f"HTTP {resp.status}")
-                        return []
-                    return await resp.json()
-        except Exception as e:
-            status_lbl.configure(text=str(e))
-            return []
+        async with AsyncRuntime().session(headers=headers) as session:
+            async with session.get(url) as resp:
+                if resp.status != 200:
+                    return None, f"HTTP {resp.status}"
+                fetched = await resp.json()
+        await asyncio.to_thread(LocalIndex().put_channels, gid, fetched)
+        return fetched, None
 
     def render_channels(channels):
         # Clear sidebar (preserve header and separator)
@@ -668,8 +688,30 @@ def open_advanced_explorer(parent: ctk.CTkBaseClass,
             ready_text = "Pronto"
         status_lbl.configure(text=ready_text)
 
-    # Run fetch in background thread to avoid blocking UI
-    fetch_channels_threaded()
+    def on_channels(result):
+        channels, error = result
+        if error:
+            status_lbl.configure(text=error)
+            if cached_channels:
+                return  # resta la copia locale
+        if channels != cached_channels:
+            render_channels(channels or [])
+
+    if channels is not None:
+        render_channels(channels)
+        return
+
+    # Ultima lista nota subito, poi la risposta della rete la sostituisce se è cambiata
+    cached_channels = LocalIndex().get_channels(gid)
+    if cached_channels:
+        render_channels(cached_channels)
+
+    # Il download avviene sul runtime condiviso, la UI resta reattiva
+    main_window = parent.winfo_toplevel()
+    token = getattr(main_window, 'verified_token', None) or getattr(getattr(main_window, 'token_input', None), 'entry', None).get()
+    headers = {"Authorization": token, "Content-Type": "application/json"}
+    AsyncRuntime().submit(fetch_channels(headers), on_done=on_channels,
+                          on_error=lambda e: on_channels((None, str(e))))
 
 
 def create_advanced_explorer_frame(parent: ctk.CTkBaseClass,
@@ -677,7 +719,8 @@ def create_advanced_explorer_frame(parent: ctk.CTkBaseClass,
                                    guild_obj: Dict[str, Any],
                                    is_source: bool,
                                    on_select: Callable[[str], None],
-                                   on_close: Callable[[], None]) -> ctk.CTkFrame:
+                                   on_close: Callable[[], None],
+                                   channels: Optional[List[Dict[str, Any]]] = None) -> ctk.CTkFrame:
     """Create an embeddable Advanced Explorer UI inside a CTkFrame.
 
     Args:
@@ -687,6 +730,7 @@ def create_advanced_explorer_frame(parent: ctk.CTkBaseClass,
         is_source: Whether the selection is for source or destination (affects label text).
         on_select: Callback invoked with display name "Name (ID)" after confirm.
         on_close: Callback invoked when user clicks the close/back button.
+        channels: Channel list already known for the guild (skips the REST fetch).
 
     Returns:
         The created CTkFrame containing the explorer UI. Caller should grid/pack it.
@@ -761,6 +805,9 @@ def create_advanced_explorer_frame(parent: ctk.CTkBaseClass,
     center_content = ctk.CTkFrame(center, fg_color="transparent")
     center_content.pack(fill="both", expand=True, padx=24, pady=24)
 
+    search_entry = create_index_search(center_content, lang, gid, mode, lambda text: set_details(text))
+    search_entry.pack(fill="x", pady=(0, 16))
+
     welcome_frame = ctk.CTkFrame(center_content, fg_color=DiscordColors.get_background_color(mode, "secondary"), corner_radius=8)
     welcome_frame.pack(fill="x", pady=(0, 20))
     ctk.CTkLabel(welcome_frame, text="#", font=ctk.CTkFont(size=32, weight="bold"),
@@ -862,9 +909,9 @@ def create_advanced_explorer_frame(parent: ctk.CTkBaseClass,
                 token = getattr(main_window, 'verified_token', None) or getattr(getattr(main_window, 'token_input', None), 'entry', None).get()
                 message_viewer = MessageViewer(right, lang, token, fg_color="transparent")
                 message_viewer.pack(fill="both", expand=True, padx=5, pady=5)
-            asyncio.create_task(message_viewer.load_channel_messages(
+            message_viewer.load_channel_messages(
                 current_selected_channel['id'], current_selected_channel.get('name', 'channel')
-            ))
+            )
             messages_panel_visible = True
             try:
                 view_messages_btn.configure(text=f"📄 {lang.get_text('advanced.hide_messages')} da #{current_selected_channel.get('name','channel')}")
@@ -975,36 +1022,49 @@ def create_advanced_explorer_frame(parent: ctk.CTkBaseClass,
             ready_text = "Pronto"
         status_lbl.configure(text=ready_text)
 
-    def fetch_channels_thread():
-        try:
-            main_window = root.winfo_toplevel()
-            token = getattr(main_window, 'verified_token', None) or getattr(getattr(main_window, 'token_input', None), 'entry', None).get()
-            headers = {"Authorization": token, "Content-Type": "application/json"}
-            url = f"https://discord.com/api/v10/guilds/{gid}/channels"
-            async def async_fetch():
-                async with aiohttp.ClientSession(headers=headers) as session:
-                    async with session.get(url) as resp:
-                        if resp.status != 200:
-                            return None, f"HTTP {resp.status}"
-                        return await resp.json(), None
-            channels, error = asyncio.run(async_fetch())
-            def update_ui():
-                if error:
-                    status_lbl.configure(text=error)
+    def start_channels_fetch():
+        nonlocal channels_cache
+        main_window = root.winfo_toplevel()
+        token = getattr(main_window, 'verified_token', None) or getattr(getattr(main_window, 'token_input', None), 'entry', None).get()
+        headers = {"Authorization": token, "Content-Type": "application/json"}
+        url = f"https://discord.com/api/v10/guilds/{gid}/channels"
+        runtime = AsyncRuntime()
+
+        async def async_fetch():
+            async with runtime.session(headers=headers) as session:
+                async with session.get(url) as resp:
+                    if resp.status != 200:
+                        return None, f"HTTP {resp.status}"
+                    fetched = await resp.json()
+            await asyncio.to_thread(LocalIndex().put_channels, gid, fetched)
+            return fetched, None
+
+        def update_ui(result):
+            nonlocal channels_cache
+            channels, error = result
+            if error:
+                status_lbl.configure(text=error)
+                if not channels_cache:
                     render_channels([])
-                else:
-                    nonlocal channels_cache
-                    channels_cache = channels or []
-                    render_channels(channels_cache)
-            root.after(0, update_ui)
-        except Exception as e:
-            root.after(0, lambda: (status_lbl.configure(text=str(e)), render_channels([])))
+            elif channels != channels_cache:
+                channels_cache = channels or []
+                render_channels(channels_cache)
+
+        # Ultima lista nota subito, poi la risposta della rete la sostituisce se è cambiata
+        channels_cache = LocalIndex().get_channels(gid) or []
+        if channels_cache:
+            render_channels(channels_cache)
+        runtime.submit(async_fetch(), on_done=update_ui, on_error=lambda e: update_ui((None, str(e))))
 
     # Wire buttons
     view_messages_btn.configure(command=toggle_messages_panel)
     select_btn.configure(command=finalize_selection)
 
-    # Fetch channels in background
-    threading.Thread(target=fetch_channels_thread, daemon=True).start()
+    if channels is not None:
+        channels_cache = list(channels)
+        render_channels(channels_cache)
+    else:
+        # Fetch channels on the shared async runtime
+        start_channels_fetch()
 
     return root
@@ -3,10 +3,12 @@ import time
 from datetime import datetime
 import os
 from src.interface.styles.colors import Colors
+from src.interface.styles.themes import ThemeRegistry
 from src.interface.utils.language_manager import LanguageManager
 
 class DebugWindow(ctk.CTkToplevel):
     def __init__(self, master):
+        pal = Colors.palette()
         super().__init__(master)
         
         # Get the language manager
@@ -25,7 +27,7 @@ class DebugWindow(ctk.CTkToplevel):
         # Toolbar
         self.toolbar = ctk.CTkFrame(
             self,
-            fg_color=Colors.get_color(Colors.SETTINGS_BG, ctk.get_appearance_mode().lower())
+            fg_color=pal.SETTINGS_BG
         )
         self.toolbar.pack(fill="x", padx=10, pady=5)
         
@@ -35,9 +37,9 @@ class DebugWindow(ctk.CTkToplevel):
             text=self.lang.get_text("debug_window.buttons.clear"),
             command=self.clear_log,
             width=100,
-            fg_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower()),
-            text_color=Colors.get_color(Colors.BACKGROUND, ctk.get_appearance_mode().lower()),
-            hover_color=Colors.get_color(Colors.TEXT_MUTED, ctk.get_appearance_mode().lower())
+            fg_color=pal.TEXT,
+            text_color=pal.BACKGROUND,
+            hover_color=pal.TEXT_MUTED
         )
         self.clear_button.pack(side="left", padx=5)
         
@@ -47,24 +49,24 @@ class DebugWindow(ctk.CTkToplevel):
             text=self.lang.get_text("debug_window.buttons.save"),
             command=self.save_log,
             width=100,
-            fg_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower()),
-            text_color=Colors.get_color(Colors.BACKGROUND, ctk.get_appearance_mode().lower()),
-            hover_color=Colors.get_color(Colors.TEXT_MUTED, ctk.get_appearance_mode().lower())
+            fg_color=pal.TEXT,
+            text_color=pal.BACKGROUND,
+            hover_color=pal.TEXT_MUTED
         )
         self.save_button.pack(side="left", padx=5)
         
         # Log area
         self.log_text = ctk.CTkTextbox(
             self,
-            fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, ctk.get_appearance_mode().lower()),
-            text_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower())
+            fg_color=pal.BACKGROUND_LIGHT,
+            text_color=pal.TEXT
         )
         self.log_text.pack(fill="both", expand=True, padx=10, pady=5)
         
         # Statistics
         self.stats_frame = ctk.CTkFrame(
             self,
-            fg_color=Colors.get_color(Colors.SETTINGS_BG, ctk.get_appearance_mode().lower())
+            fg_color=pal.SETTINGS_BG
         )
         self.stats_frame.pack(fill="x", padx=10, pady=5)
         
@@ -73,27 +75,27 @@ class DebugWindow(ctk.CTkToplevel):
             "start_time": ctk.CTkLabel(
                 self.stats_frame,
                 text=f"{self.lang.get_text('debug_window.stats.start_time')}: -",
-                text_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower())
+                text_color=pal.TEXT
             ),
             "elapsed_time": ctk.CTkLabel(
                 self.stats_frame,
                 text=f"{self.lang.get_text('debug_window.stats.elapsed_time')}: -",
-                text_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower())
+                text_color=pal.TEXT
             ),
             "roles_count": ctk.CTkLabel(
                 self.stats_frame,
                 text=f"{self.lang.get_text('debug_window.stats.roles')}: 0/0",
-                text_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower())
+                text_color=pal.TEXT
             ),
             "channels_count": ctk.CTkLabel(
                 self.stats_frame,
                 text=f"{self.lang.get_text('debug_window.stats.channels')}: 0/0",
-                text_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower())
+                text_color=pal.TEXT
             ),
             "errors_count": ctk.CTkLabel(
                 self.stats_frame,
                 text=f"{self.lang.get_text('debug_window.stats.errors')}: 0",
-                text_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower())
+                text_color=pal.TEXT
             )
         }
         
@@ -103,34 +105,15 @@ class DebugWindow(ctk.CTkToplevel):
         # Add observer for language changes
         self.lang.add_observer(self.update_texts)
         
-        # Binding for theme change
-        self.bind('<Configure>', lambda e: self._update_colors())
-        
-    def _update_colors(self):
-        """Update colors based on the current theme"""
-        mode = ctk.get_appearance_mode().lower()
-        
-        # Update frame colors
-        self.toolbar.configure(fg_color=Colors.get_color(Colors.SETTINGS_BG, mode))
-        self.stats_frame.configure(fg_color=Colors.get_color(Colors.SETTINGS_BG, mode))
-        
-        # Update button colors
-        for button in [self.clear_button, self.save_button]:
-            button.configure(
-                fg_color=Colors.get_color(Colors.TEXT, mode),
-                text_color=Colors.get_color(Colors.BACKGROUND, mode),
-                hover_color=Colors.get_color(Colors.TEXT_MUTED, mode)
-            )
-        
-        # Update log colors
-        self.log_text.configure(
-            fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, mode),
-            text_color=Colors.get_color(Colors.TEXT, mode)
-        )
-        
-        # Update statistics colors
+        # Colori aggiornati in blocco da ThemeRegistry al cambio tema (prima: a ogni <Configure>)
+        theme = ThemeRegistry()
+        theme.register(self.toolbar, fg_color="SETTINGS_BG")
+        theme.register(self.stats_frame, fg_color="SETTINGS_BG")
+        for button in (self.clear_button, self.save_button):
+            theme.register(button, fg_color="TEXT", text_color="BACKGROUND", hover_color="TEXT_MUTED")
+        theme.register(self.log_text, fg_color="BACKGROUND_LIGHT", text_color="TEXT")
         for label in self.stats_labels.values():
-            label.configure(text_color=Colors.get_color(Colors.TEXT, mode))
+            theme.register(label, text_color="TEXT")
             
     def update_texts(self):
         """Update texts when the language changes"""
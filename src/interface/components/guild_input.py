@@ -1,22 +1,22 @@
 import customtkinter as ctk
-import discord
 import asyncio
 import time
 import sys
 import os
-import aiohttp
 import webbrowser
 import tkinter as tk
-import threading
 from tkinter import simpledialog, messagebox
 import re
-from PIL import Image, ImageTk
 
 # Import Colors directly
 from src.interface.styles.colors import Colors
-from src.operation_file.serverclone import Clone
+from src.interface.styles.themes import ThemeRegistry
+from src.operation_file.serverclone import Clone, GuildAccessError
 from src.interface.utils.language_manager import LanguageManager
 from src.interface.utils.settings_manager import SettingsManager
+from src.interface.utils.icon_cache import GuildIconCache
+from src.operation_file.jobqueue import CloneEngine, CloneJobQueue
+from src.operation_file.async_runtime import AsyncRuntime
 
 
 # Define a custom exception for request errors
@@ -25,7 +25,10 @@ class RequestsError(Exception):
     pass
 
 class GuildInput(ctk.CTkFrame):
+    SEARCH_DEBOUNCE_MS = 150  # attesa dopo l'ultimo tasto prima di filtrare il selettore
+
     def __init__(self, master):
+        pal = Colors.palette()
         super().__init__(master, fg_color="transparent")
         
         # Get language manager
@@ -62,9 +65,9 @@ class GuildInput(ctk.CTkFrame):
             text=self.lang.get_text("input.guild.dropdown_placeholder"),
             height=40,
             command=lambda: self.open_guild_selector(is_source=True),
-            fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, ctk.get_appearance_mode().lower()),
-            text_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower()),
-            hover_color=Colors.get_color(Colors.SETTINGS_BG, ctk.get_appearance_mode().lower())
+            fg_color=pal.BACKGROUND_LIGHT,
+            text_color=pal.TEXT,
+            hover_color=pal.SETTINGS_BG
         )
         self.source_select_btn.pack(side="left", fill="x", expand=True)
         
@@ -73,8 +76,8 @@ class GuildInput(ctk.CTkFrame):
             self.source_frame,
             placeholder_text=self.lang.get_text("input.guild.source.placeholder"),
             height=40,
-            text_color=Colors.get_color(Colors.TEXT),
-            fg_color=Colors.get_color(Colors.INPUT_BG)
+            text_color=pal.TEXT,
+            fg_color=pal.INPUT_BG
         )
         # Non pacchettizziamo ancora, sarà mostrato quando necessario
         
@@ -84,9 +87,9 @@ class GuildInput(ctk.CTkFrame):
             text="⌨️",
             width=40,
             command=self.toggle_source_input,
-            fg_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower()),
-            text_color=Colors.get_color(Colors.BACKGROUND, ctk.get_appearance_mode().lower()),
-            hover_color=Colors.get_color(Colors.TEXT_MUTED, ctk.get_appearance_mode().lower())
+            fg_color=pal.TEXT,
+            text_color=pal.BACKGROUND,
+            hover_color=pal.TEXT_MUTED
         )
         self.source_toggle.pack(side="left", padx=(10, 0))
         
@@ -108,9 +111,9 @@ class GuildInput(ctk.CTkFrame):
             text=self.lang.get_text("input.guild.dropdown_placeholder"),
             height=40,
             command=lambda: self.open_guild_selector(is_source=False),
-            fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, ctk.get_appearance_mode().lower()),
-            text_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower()),
-            hover_color=Colors.get_color(Colors.SETTINGS_BG, ctk.get_appearance_mode().lower())
+            fg_color=pal.BACKGROUND_LIGHT,
+            text_color=pal.TEXT,
+            hover_color=pal.SETTINGS_BG
         )
         self.dest_select_btn.pack(side="left", fill="x", expand=True)
         
@@ -119,8 +122,8 @@ class GuildInput(ctk.CTkFrame):
             self.dest_frame,
             placeholder_text=self.lang.get_text("input.guild.destination.placeholder"),
             height=40,
-            text_color=Colors.get_color(Colors.TEXT),
-            fg_color=Colors.get_color(Colors.INPUT_BG)
+            text_color=pal.TEXT,
+            fg_color=pal.INPUT_BG
         )
         # Non pacchettizziamo ancora, sarà mostrato quando necessario
         
@@ -130,9 +133,9 @@ class GuildInput(ctk.CTkFrame):
             text="➕",
             width=40,
             command=self.create_new_server,
-            fg_color=Colors.get_color(Colors.SUCCESS, ctk.get_appearance_mode().lower()),
-            text_color=Colors.get_color(Colors.BACKGROUND, ctk.get_appearance_mode().lower()),
-            hover_color=Colors.get_color(Colors.SUCCESS_DARK, ctk.get_appearance_mode().lower())
+            fg_color=pal.SUCCESS,
+            text_color=pal.BACKGROUND,
+            hover_color=pal.SUCCESS_DARK
         )
         self.create_server_button.pack(side="left", padx=(10, 0))
         
@@ -142,9 +145,9 @@ class GuildInput(ctk.CTkFrame):
             text="⌨️",
             width=40,
             command=self.toggle_dest_input,
-            fg_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower()),
-            text_color=Colors.get_color(Colors.BACKGROUND, ctk.get_appearance_mode().lower()),
-            hover_color=Colors.get_color(Colors.TEXT_MUTED, ctk.get_appearance_mode().lower())
+            fg_color=pal.TEXT,
+            text_color=pal.BACKGROUND,
+            hover_color=pal.TEXT_MUTED
         )
         self.dest_toggle.pack(side="left", padx=(10, 0))
         
@@ -158,7 +161,12 @@ class GuildInput(ctk.CTkFrame):
         # Memorizziamo i server recuperati
         self.guilds_dict = {}  # Dizionario id -> details
         self.guild_display_names = []  # Lista dei nomi visualizzati (name (id))
-        
+
+        # Icone dei server (guild_id -> CTkImage), caricate in background
+        self.icon_cache = GuildIconCache()
+        self._guild_icons = {}
+        self._selector_buttons = {}  # guild_id -> pulsante del selettore aperto
+
         # Controlli avanzati
         self.controls_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
         self.controls_frame.pack(fill="x", pady=(0, 10))
@@ -170,11 +178,11 @@ class GuildInput(ctk.CTkFrame):
             command=self.reset_fields,
             height=30,
             width=100,
-            fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, ctk.get_appearance_mode().lower()),
-            text_color=Colors.get_color(Colors.TEXT_MUTED, ctk.get_appearance_mode().lower()),
-            hover_color=Colors.get_color(Colors.BACKGROUND, ctk.get_appearance_mode().lower()),
+            fg_color=pal.BACKGROUND_LIGHT,
+            text_color=pal.TEXT_MUTED,
+            hover_color=pal.BACKGROUND,
             border_width=1,
-            border_color=Colors.get_color(Colors.TEXT_MUTED)
+            border_color=pal.TEXT_MUTED
         )
         self.reset_button.pack(side="left", padx=(0, 10))
         
@@ -211,6 +219,17 @@ class GuildInput(ctk.CTkFrame):
         )
         self.clone_name_icon_checkbox.grid(row=3, column=0, sticky="w", pady=5)
 
+        # Opzione emoji e sticker
+        self.clone_emojis_var = ctk.BooleanVar(value=False)
+        self.clone_emojis_checkbox = ctk.CTkCheckBox(
+            self.checkboxes_frame,
+            text=self.lang.get_text("input.guild.option_emojis"),
+            variable=self.clone_emojis_var,
+            onvalue=True,
+            offvalue=False
+        )
+        self.clone_emojis_checkbox.grid(row=3, column=1, sticky="w", pady=5)
+
         # Opzione ruoli
         self.clone_roles_var = ctk.BooleanVar(value=True)
         self.clone_roles_checkbox = ctk.CTkCheckBox(
@@ -291,7 +310,8 @@ class GuildInput(ctk.CTkFrame):
         
         # Info panel (inizialmente nascosto)
         self.info_panel = ctk.CTkFrame(self.main_frame)
-        self.info_panel.configure(fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT))
+        self.info_panel.configure(fg_color=pal.BACKGROUND_LIGHT)
+        ThemeRegistry().register(self.info_panel, fg_color="BACKGROUND_LIGHT")
         
         # Creiamo le etichette per le statistiche
         self.stats_title = ctk.CTkLabel(
@@ -380,12 +400,38 @@ class GuildInput(ctk.CTkFrame):
             command=self.start_clone,
             height=40,
             font=ctk.CTkFont(size=14, weight="bold"),
-            fg_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower()),
-            text_color=Colors.get_color(Colors.BACKGROUND, ctk.get_appearance_mode().lower()),
-            hover_color=Colors.get_color(Colors.TEXT_MUTED, ctk.get_appearance_mode().lower())
+            fg_color=pal.TEXT,
+            text_color=pal.BACKGROUND,
+            hover_color=pal.TEXT_MUTED
         )
         self.clone_button.pack(pady=10)
 
+        # Azioni secondarie: accoda la clonazione o stimane il costo (dry run)
+        self.secondary_actions = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        self.secondary_actions.pack(pady=(0, 10))
+
+        self.queue_button = ctk.CTkButton(
+            self.secondary_actions,
+            text=self.lang.get_text("input.guild.queue_button"),
+            command=self.enqueue_clone,
+            height=32,
+            fg_color=pal.BACKGROUND_LIGHT,
+            text_color=pal.TEXT,
+            hover_color=pal.SETTINGS_BG
+        )
+        self.queue_button.pack(side="left", padx=(0, 5))
+
+        self.plan_button = ctk.CTkButton(
+            self.secondary_actions,
+            text=self.lang.get_text("input.guild.plan_button"),
+            command=self.preview_clone,
+            height=32,
+            fg_color=pal.BACKGROUND_LIGHT,
+            text_color=pal.TEXT,
+            hover_color=pal.SETTINGS_BG
+        )
+        self.plan_button.pack(side="left", padx=(5, 0))
+
         # Cancel Button (initially hidden)
         self.cancel_button = ctk.CTkButton(
             self.main_frame,
@@ -393,45 +439,41 @@ class GuildInput(ctk.CTkFrame):
             command=self.cancel_clone,
             height=36,
             font=ctk.CTkFont(size=13, weight="bold"),
-            fg_color=Colors.get_color(Colors.DANGER if hasattr(Colors, 'DANGER') else Colors.TEXT, ctk.get_appearance_mode().lower()),
-            text_color=Colors.get_color(Colors.BACKGROUND, ctk.get_appearance_mode().lower()),
-            hover_color=Colors.get_color(Colors.TEXT_MUTED, ctk.get_appearance_mode().lower())
+            fg_color=pal.get("DANGER", pal.TEXT),
+            text_color=pal.BACKGROUND,
+            hover_color=pal.TEXT_MUTED
         )
         # Do not pack yet; shown when cloning starts
 
         # Discord client
         self.client = None
 
-        # Clone task threading state
-        self._clone_thread = None
-        self._clone_loop = None
-        self._clone_task = None
+        # Runtime asyncio condiviso e clonazione in corso
+        self.runtime = AsyncRuntime()
+        self._clone_future = None
         self._cancel_requested = False
-        
-        # Update colors when theme changes
-        self._update_colors()
-        self.bind('<Configure>', lambda e: self._update_colors())
+
+        # Coda persistente dei job di clonazione
+        self.job_queue = CloneJobQueue()
+        self.job_queue.add_observer(self._on_queue_job)
+        
+        # Colori aggiornati in blocco da ThemeRegistry al cambio tema (prima: a ogni <Configure>)
+        theme = ThemeRegistry()
+        for button in (self.source_toggle, self.dest_toggle, self.clone_button):
+            theme.register(button, fg_color="TEXT", text_color="BACKGROUND", hover_color="TEXT_MUTED")
+        for button in (self.source_select_btn, self.dest_select_btn, self.queue_button, self.plan_button):
+            theme.register(button, fg_color="BACKGROUND_LIGHT", text_color="TEXT", hover_color="SETTINGS_BG")
+        theme.register(self.create_server_button, fg_color="SUCCESS", text_color="BACKGROUND", hover_color="SUCCESS_DARK")
+        theme.register(self.reset_button, fg_color="BACKGROUND_LIGHT", text_color="TEXT_MUTED", hover_color="BACKGROUND",
+                       border_color="TEXT_MUTED")
+        theme.register(self.cancel_button, fg_color="DANGER" if hasattr(Colors, "DANGER") else "TEXT",
+                       text_color="BACKGROUND", hover_color="TEXT_MUTED")
+        for entry in (self.source_entry, self.dest_entry):
+            theme.register(entry, text_color="TEXT", fg_color="INPUT_BG")
         
         # Add observer for language changes
         self.lang.add_observer(self.update_texts)
         
-    def _update_colors(self):
-        mode = ctk.get_appearance_mode().lower()
-        
-        # Update button colors
-        self.clone_button.configure(
-            fg_color=Colors.get_color(Colors.TEXT, mode),
-            text_color=Colors.get_color(Colors.BACKGROUND, mode),
-            hover_color=Colors.get_color(Colors.TEXT_MUTED, mode)
-        )
-        
-        # Update input colors
-        for entry in [self.source_entry, self.dest_entry]:
-            entry.configure(
-                text_color=Colors.get_color(Colors.TEXT, mode),
-                fg_color=Colors.get_color(Colors.INPUT_BG, mode)
-            )
-
     def update_progress(self, value, show=True):
         """Update progress bar value and visibility (thread-safe)."""
         def _apply():
@@ -440,11 +482,8 @@ class GuildInput(ctk.CTkFrame):
             elif not show and self.progress.winfo_ismapped():
                 self.progress.pack_forget()
             self.progress.set(value)
-        try:
-            # Marshal to main thread
-            self.after(0, _apply)
-        except Exception:
-            _apply()
+        # Marshal to main thread
+        self.runtime.post(_apply)
     
     def update_advanced_explorer_visibility(self, enabled):
         """Update the visibility of advanced explorer buttons based on settings"""
@@ -511,6 +550,16 @@ class GuildInput(ctk.CTkFrame):
                 "black"
             )
     
+    def clear_guilds(self):
+        """Dimentica l'elenco dei server (es. token rifiutato) e le scelte fatte su di esso"""
+        placeholder = self.lang.get_text("input.guild.dropdown_placeholder")
+        self.guilds_dict = {}
+        self.guild_display_names = []
+        self.selected_source_display = None
+        self.selected_dest_display = None
+        self.source_select_btn.configure(text=placeholder)
+        self.dest_select_btn.configure(text=placeholder)
+
     def update_guilds_dropdowns(self, guilds_list):
         """Aggiorna i dropdown con l'elenco dei server disponibili"""
         if not guilds_list:
@@ -541,10 +590,28 @@ class GuildInput(ctk.CTkFrame):
         # Aggiorniamo lo stato
         main_window = self.winfo_toplevel()
         main_window.status_bar.update_status(
-            self.lang.get_text("status.guilds_loaded").format(count=len(guilds_list)), 
+            self.lang.get_text("status.guilds_loaded").format(count=len(guilds_list)),
             "green"
         )
 
+        # Prefetch delle icone in background (cache su disco + download concorrente)
+        self.icon_cache.prefetch(guilds_list, self._on_guild_icon)
+
+    def _on_guild_icon(self, guild_id, image):
+        """Receive a decoded icon from the prefetcher (thread-safe)"""
+        def _apply():
+            icon = ctk.CTkImage(light_image=image, dark_image=image, size=(24, 24))
+            self._guild_icons[guild_id] = icon
+            # Fill in the open selector progressively
+            btn = self._selector_buttons.get(guild_id)
+            if btn is not None:
+                try:
+                    if btn.winfo_exists():
+                        btn.configure(image=icon)
+                except Exception:
+                    pass
+        self.runtime.post(_apply)
+
     def open_guild_selector(self, is_source: bool):
         """Apre una finestra con barra di ricerca per selezionare un server."""
         # Costruzione finestra modale
@@ -554,8 +621,10 @@ class GuildInput(ctk.CTkFrame):
         top.after(10, top.grab_set)   # wait a few ms until window is mapped
 
         
-        mode = ctk.get_appearance_mode().lower()
-        top.configure(fg_color=Colors.get_color(Colors.SETTINGS_BG, mode))
+        pal = Colors.palette()
+        theme = ThemeRegistry()
+        top.configure(fg_color=pal.SETTINGS_BG)
+        theme.register(top, fg_color="SETTINGS_BG")
         
         # Header con titolo e pulsante chiudi
         header = ctk.CTkFrame(top, fg_color="transparent")
@@ -572,11 +641,12 @@ class GuildInput(ctk.CTkFrame):
             width=36,
             height=32,
             command=top.destroy,
-            fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, mode),
-            text_color=Colors.get_color(Colors.TEXT, mode),
-            hover_color=Colors.get_color(Colors.SETTINGS_ITEM_BG, mode)
+            fg_color=pal.BACKGROUND_LIGHT,
+            text_color=pal.TEXT,
+            hover_color=pal.SETTINGS_ITEM_BG
         )
         close_btn.pack(side="right")
+        theme.register(close_btn, fg_color="BACKGROUND_LIGHT", text_color="TEXT", hover_color="SETTINGS_ITEM_BG")
 
         # Barra ricerca con pulsante clear
         search_row = ctk.CTkFrame(top, fg_color="transparent")
@@ -595,15 +665,17 @@ class GuildInput(ctk.CTkFrame):
             width=44,
             height=36,
             command=lambda: (search_var.set(""), on_key_release()),
-            fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, mode),
-            text_color=Colors.get_color(Colors.TEXT, mode),
-            hover_color=Colors.get_color(Colors.SETTINGS_ITEM_BG, mode)
+            fg_color=pal.BACKGROUND_LIGHT,
+            text_color=pal.TEXT,
+            hover_color=pal.SETTINGS_ITEM_BG
         )
         clear_btn.pack(side="left", padx=(8, 0))
+        theme.register(clear_btn, fg_color="BACKGROUND_LIGHT", text_color="TEXT", hover_color="SETTINGS_ITEM_BG")
         
         # Contenitore scrollabile per l'elenco
-        list_frame = ctk.CTkScrollableFrame(top, fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, mode))
+        list_frame = ctk.CTkScrollableFrame(top, fg_color=pal.BACKGROUND_LIGHT)
         list_frame.pack(fill="both", expand=True, padx=12, pady=(0, 8))
+        theme.register(list_frame, fg_color="BACKGROUND_LIGHT")
 
         # Footer con conteggio risultati e tasto Explorer avanzato (se abilitato)
         footer = ctk.CTkFrame(top, fg_color="transparent")
@@ -623,11 +695,12 @@ class GuildInput(ctk.CTkFrame):
                 text=self.lang.get_text("input.guild.advanced_explorer_button") if hasattr(self.lang, 'get_text') else "Explorer avanzato",
                 width=180,
                 command=lambda: open_advanced_for_current(),
-                fg_color=Colors.get_color(Colors.BUTTON_BG, mode),
-                text_color=Colors.get_color(Colors.TEXT, mode),
-                hover_color=Colors.get_color(Colors.BUTTON_HOVER, mode)
+                fg_color=pal.BUTTON_BG,
+                text_color=pal.TEXT,
+                hover_color=pal.BUTTON_HOVER
             )
             explorer_btn.pack(side="right")
+            theme.register(explorer_btn, fg_color="BUTTON_BG", text_color="TEXT", hover_color="BUTTON_HOVER")
         
         # Stato per debounce
         self._search_after_id = None
@@ -637,10 +710,11 @@ class GuildInput(ctk.CTkFrame):
 
         def highlight_selection():
             for idx, btn in enumerate(item_buttons):
+                # I ruoli registrati seguono la selezione, così un cambio tema la conserva
                 if idx == selected_index.get():
-                    btn.configure(fg_color=Colors.get_color(Colors.TEXT, mode), text_color=Colors.get_color(Colors.BACKGROUND, mode))
+                    theme.register(btn, apply=True, fg_color="TEXT", text_color="BACKGROUND")
                 else:
-                    btn.configure(fg_color=Colors.get_color(Colors.SETTINGS_ITEM_BG, mode), text_color=Colors.get_color(Colors.TEXT, mode))
+                    theme.register(btn, apply=True, fg_color="SETTINGS_ITEM_BG", text_color="TEXT")
         
         def populate(items):
             # Pulisci
@@ -648,21 +722,28 @@ class GuildInput(ctk.CTkFrame):
                 w.destroy()
             item_buttons.clear()
             current_items.clear()
+            self._selector_buttons.clear()
             # Aggiungi voci
             for name in items:
+                guild_id = str(self.guilds_dict[name]['id']) if name in self.guilds_dict else None
                 btn = ctk.CTkButton(
                     list_frame,
                     text=name,
                     anchor="w",
                     height=36,
-                    fg_color=Colors.get_color(Colors.SETTINGS_ITEM_BG, mode),
-                    text_color=Colors.get_color(Colors.TEXT, mode),
-                    hover_color=Colors.get_color(Colors.SETTINGS_BG, mode),
+                    image=self._guild_icons.get(guild_id),
+                    compound="left",
+                    fg_color=pal.SETTINGS_ITEM_BG,
+                    text_color=pal.TEXT,
+                    hover_color=pal.SETTINGS_BG,
                     command=lambda n=name: select_and_close(n)
                 )
                 btn.pack(fill="x", padx=6, pady=4)
+                theme.register(btn, fg_color="SETTINGS_ITEM_BG", text_color="TEXT", hover_color="SETTINGS_BG")
                 item_buttons.append(btn)
                 current_items.append(name)
+                if guild_id:
+                    self._selector_buttons[guild_id] = btn
             # Aggiorna conteggio e selezione
             count_lbl.configure(text=f"{len(items)}")
             if items:
@@ -720,7 +801,7 @@ class GuildInput(ctk.CTkFrame):
                 else:
                     items = [n for n in self.guild_display_names if q in n.lower()]
                 populate(items)
-            self._search_after_id = search_entry.after(150, do_filter)
+            self._search_after_id = search_entry.after(self.SEARCH_DEBOUNCE_MS, do_filter)
         
         def on_key_nav(event):
             if not current_items:
@@ -742,6 +823,8 @@ class GuildInput(ctk.CTkFrame):
 
         search_entry.bind("<KeyRelease>", on_key_release)
         top.bind("<Key>", on_key_nav)
+        # Smettiamo di aggiornare le icone quando il selettore viene chiuso
+        top.bind("<Destroy>", lambda e: self._selector_buttons.clear() if e.widget is top else None)
         
         # Popola inizialmente
         populate(self.guild_display_names)
@@ -767,6 +850,7 @@ class GuildInput(ctk.CTkFrame):
         self.clone_text_channels_var.set(True)
         self.clone_voice_channels_var.set(True)
         self.clone_messages_var.set(True)
+        self.clone_emojis_var.set(False)
         self.messages_limit_var.set("100")
         self.toggle_messages_options()
         
@@ -798,9 +882,8 @@ class GuildInput(ctk.CTkFrame):
                 return str(self.guilds_dict[selected]['id'])
             return ""
 
-    def start_clone(self):
-        """Start the cloning process"""
-        # Get token from token input
+    def _validate_clone_request(self):
+        """Return (token, source_id, dest_id, error_message) for the current inputs"""
         main_window = self.winfo_toplevel()
         token = main_window.verified_token if hasattr(main_window, 'verified_token') else main_window.token_input.entry.get()
         source_id = self.get_source_guild_id()
@@ -835,6 +918,85 @@ class GuildInput(ctk.CTkFrame):
             except ValueError:
                 error_message = self.lang.get_text("input.guild.error_invalid_limit")
         
+        return token, source_id, dest_id, error_message
+
+    def _get_clone_options(self):
+        """Options dict understood by Clone.start_clone"""
+        return {
+            "clone_roles": self.clone_roles_var.get(),
+            "clone_categories": self.clone_categories_var.get(),
+            "clone_text_channels": self.clone_text_channels_var.get(),
+            "clone_voice_channels": self.clone_voice_channels_var.get(),
+            "clone_messages": self.clone_messages_var.get(),
+            "clone_name_icon": self.clone_name_icon_var.get(),
+            "clone_emojis": self.clone_emojis_var.get(),
+            "clone_stickers": self.clone_emojis_var.get(),
+            "messages_limit": int(self.messages_limit_var.get()) if self.clone_messages_var.get()
+            else 0
+        }
+
+    def enqueue_clone(self):
+        """Add the current source/destination to the persistent clone queue"""
+        main_window = self.winfo_toplevel()
+        token, source_id, dest_id, error_message = self._validate_clone_request()
+        if error_message:
+            main_window.status_bar.update_status(error_message, "red")
+            return
+        self.job_queue.add(source_id, dest_id, self._get_clone_options())
+        self.job_queue.start(token, self._debug_log)
+        pending = sum(1 for job in self.job_queue.list_jobs() if job.status in ("queued", "running"))
+        main_window.status_bar.update_status(
+            self.lang.get_text("input.guild.queue_added", pending=pending),
+            "blue"
+        )
+
+    def preview_clone(self):
+        """Dry run: show requests and estimated duration without changing anything"""
+        main_window = self.winfo_toplevel()
+        token, source_id, dest_id, error_message = self._validate_clone_request()
+        if error_message:
+            main_window.status_bar.update_status(error_message, "red")
+            return
+        options = self._get_clone_options()
+        self.plan_button.configure(state="disabled")
+        main_window.status_bar.update_status(self.lang.get_text("input.guild.plan_running"), "blue")
+
+        async def _plan():
+            async with CloneEngine(token, self.runtime.limiter, connector=self.runtime.connector) as engine:
+                plan = await engine.plan(source_id, dest_id, options, debug_callback=self._debug_log)
+                return plan.format_text(engine.limiter.route_stats) if plan else None
+
+        self.runtime.submit(
+            _plan(),
+            on_done=lambda plan_text: self._show_plan(plan_text, None),
+            on_error=lambda e: self._show_plan(None, str(e))
+        )
+
+    def _show_plan(self, plan_text, error):
+        self.plan_button.configure(state="normal")
+        main_window = self.winfo_toplevel()
+        if not plan_text:
+            message = self.lang.get_text("input.guild.plan_error", error=error or "")
+            main_window.status_bar.update_status(message, "red")
+            return
+        main_window.status_bar.update_status(self.lang.get_text("status.ready"), "green")
+        messagebox.showinfo(self.lang.get_text("input.guild.plan_title"), plan_text, parent=self)
+
+    def _on_queue_job(self, job):
+        """Job status changes (runtime thread) -> status bar / debug log via the runtime queue"""
+        level = "ERROR" if job.status == "failed" else "SUCCESS" if job.status == "done" else "INFO"
+        message = self.lang.get_text(
+            "input.guild.queue_job_status", source=job.source_id, dest=job.dest_id, status=job.status
+        )
+        if job.error:
+            message = f"{message} ({job.error})"
+        self._debug_log(message, level)
+
+    def start_clone(self):
+        """Start the cloning process"""
+        main_window = self.winfo_toplevel()
+        token, source_id, dest_id, error_message = self._validate_clone_request()
+        
         # Mostra errore se presente
         if error_message:
             main_window.status_bar.update_status(error_message, "red")
@@ -856,41 +1018,19 @@ class GuildInput(ctk.CTkFrame):
             self.cancel_button.pack(pady=(0, 10))
             self.cancel_button.configure(state="normal")
         
-        # Run cloning in background thread with its own event loop
-        def worker():
-            try:
-                loop = asyncio.new_event_loop()
-                self._clone_loop = loop
-                asyncio.set_event_loop(loop)
-                self._clone_task = loop.create_task(self._clone_guild(token, source_id, dest_id))
-                try:
-                    loop.run_until_complete(self._clone_task)
-                except asyncio.CancelledError:
-                    # Task was cancelled
-                    pass
-            finally:
-                try:
-                    loop.close()
-                except Exception:
-                    pass
-                self._clone_loop = None
-                self._clone_task = None
-                self._clone_thread = None
-        
-        self._clone_thread = threading.Thread(target=worker, daemon=True)
-        self._clone_thread.start()
+        # La clonazione gira sul runtime asyncio condiviso; il Future serve per annullarla.
+        # Le opzioni si leggono qui: le variabili Tk non si toccano dal thread del loop
+        options = self._get_clone_options()
+        self._clone_future = self.runtime.submit(self._clone_guild(token, source_id, dest_id, options))
+        self._clone_future.add_done_callback(lambda _f: setattr(self, "_clone_future", None))
 
     def cancel_clone(self):
         """Request cancellation of the running clone task."""
-        if self._clone_loop and self._clone_task:
+        future = self._clone_future
+        if future is not None and not future.done():
             self._cancel_requested = True
-            def _cancel():
-                if not self._clone_task.done():
-                    self._clone_task.cancel()
-            try:
-                self._clone_loop.call_soon_threadsafe(_cancel)
-            except Exception:
-                pass
+            # Annullare il Future annulla il task sul loop del runtime
+            future.cancel()
             # Update UI indication
             self._debug_log(self.lang.get_text("status.cancelling") if hasattr(self.lang, 'get_text') else "Cancelling...", "INFO")
             try:
@@ -898,14 +1038,9 @@ class GuildInput(ctk.CTkFrame):
             except Exception:
                 pass
     
-    async def _clone_guild(self, token, source_id, dest_id):
-        """Execute server cloning process using REST API"""
-        main_window = self.winfo_toplevel()
-        connector = None
+    async def _clone_guild(self, token, source_id, dest_id, options):
+        """Execute server cloning process using REST API (runtime loop thread: widgets only via post)"""
         try:
-            # Creiamo un connector sicuro per evitare memory leak
-            connector = aiohttp.TCPConnector(force_close=True)
-            
             # Prepariamo l'header per le richieste API - assicuriamoci che il token sia nel formato corretto
             if not token.startswith("Bot ") and not token.startswith("Bearer "):
                 # Se non è specificato il tipo di token, assumiamo che sia un user token
@@ -940,32 +1075,22 @@ class GuildInput(ctk.CTkFrame):
             cloner.set_progress_callback(progress_callback)
             
             # Verifichiamo l'accesso ai server source e destination
-            async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
-                # Verifichiamo il server source
-                self._debug_log(f"Verifico accesso al server source (ID: {source_id})")
-                source_url = f"https://discord.com/api/v10/guilds/{source_id}"
-                async with session.get(source_url) as source_response:
-                    if source_response.status != 200:
-                        self._debug_log(f"Errore nell'accesso al server source: {source_response.status}", "ERROR")
-                        self.update_progress(0, show=False)  # Nascondiamo la barra di progresso
-                        return
-                    
-                    source_data = await source_response.json()
-                    source_name = source_data.get("name", "Unknown")
-                    self._debug_log(f"Accesso al server source verificato: {source_name}")
+            # Il teardown lancia più DELETE insieme: il RateLimiter condiviso del runtime li regola
+            async with self.runtime.session(headers=headers) as session:
+                # Leggiamo in parallelo guild e canali di source e destination
+                self._debug_log(f"Verifico accesso ai server source (ID: {source_id}) e destination (ID: {dest_id})")
+                try:
+                    source_snapshot, dest_snapshot, _requests = await cloner.prefetch(session, source_id, dest_id)
+                except GuildAccessError as e:
+                    self._debug_log(f"Errore nell'accesso al server {e.guild_id}: {e.status}", "ERROR")
+                    self.update_progress(0, show=False)  # Nascondiamo la barra di progresso
+                    return
                 
-                # Verifichiamo il server destination
-                self._debug_log(f"Verifico accesso al server destination (ID: {dest_id})")
-                dest_url = f"https://discord.com/api/v10/guilds/{dest_id}"
-                async with session.get(dest_url) as dest_response:
-                    if dest_response.status != 200:
-                        self._debug_log(f"Errore nell'accesso al server destination: {dest_response.status}", "ERROR")
-                        self.update_progress(0, show=False)  # Nascondiamo la barra di progresso
-                        return
-                    
-                    dest_data = await dest_response.json()
-                    dest_name = dest_data.get("name", "Unknown")
-                    self._debug_log(f"Accesso al server destination verificato: {dest_name}")
+                source_data = source_snapshot["guild"]
+                dest_data = dest_snapshot["guild"]
+                source_name = source_data.get("name", "Unknown")
+                dest_name = dest_data.get("name", "Unknown")
+                self._debug_log(f"Accesso verificato: {source_name} -> {dest_name}")
                 
                 # Aggiorniamo la barra di progresso al 10%
                 self.update_progress(0.1)
@@ -990,16 +1115,9 @@ class GuildInput(ctk.CTkFrame):
                         guild_from=source_data,
                         guild_to=dest_data,
                         session=session,
-                        options={
-                            "clone_roles": self.clone_roles_var.get(),
-                            "clone_categories": self.clone_categories_var.get(),
-                            "clone_text_channels": self.clone_text_channels_var.get(),
-                            "clone_voice_channels": self.clone_voice_channels_var.get(),
-                            "clone_messages": self.clone_messages_var.get(),
-                            "clone_name_icon": self.clone_name_icon_var.get(),
-                            "messages_limit": int(self.messages_limit_var.get()) if self.clone_messages_var.get()
-                            else 0
-                        }
+                        options=options,
+                        source_snapshot=source_snapshot,
+                        dest_snapshot=dest_snapshot
                     )
                     
                     if self._cancel_requested:
@@ -1037,17 +1155,7 @@ class GuildInput(ctk.CTkFrame):
                 self.clone_button.configure(state="normal")
                 if self.cancel_button.winfo_ismapped():
                     self.cancel_button.pack_forget()
-            try:
-                self.after(0, _restore_ui)
-            except Exception:
-                _restore_ui()
-            
-            # Chiudiamo il connector anche in caso di errore
-            if connector:
-                try:
-                    await connector.close()
-                except Exception as connector_error:
-                    print(f"Error closing connector: {connector_error}")
+            self.runtime.post(_restore_ui)
     
 
     def _debug_log(self, message, level="INFO"):
@@ -1065,10 +1173,7 @@ class GuildInput(ctk.CTkFrame):
             # Always update status bar
             color = "red" if level == "ERROR" else "blue" if level == "INFO" else "green"
             main_window.status_bar.update_status(message, color)
-        try:
-            self.after(0, _apply)
-        except Exception:
-            _apply()
+        self.runtime.post(_apply)
     
 
     def update_texts(self):
@@ -1078,6 +1183,8 @@ class GuildInput(ctk.CTkFrame):
         self.dest_label.configure(text=self.lang.get_text("input.guild.destination.title"))
         self.dest_entry.configure(placeholder_text=self.lang.get_text("input.guild.destination.placeholder"))
         self.clone_button.configure(text=self.lang.get_text("input.guild.clone_button"))
+        self.queue_button.configure(text=self.lang.get_text("input.guild.queue_button"))
+        self.plan_button.configure(text=self.lang.get_text("input.guild.plan_button"))
         self.reset_button.configure(text=self.lang.get_text("input.guild.reset_button"))
         
         # Aggiorniamo i dropdown
@@ -1093,6 +1200,7 @@ class GuildInput(ctk.CTkFrame):
         self.clone_categories_checkbox.configure(text=self.lang.get_text("input.guild.option_categories"))
         self.clone_text_channels_checkbox.configure(text=self.lang.get_text("input.guild.option_text_channels"))
         self.clone_voice_channels_checkbox.configure(text=self.lang.get_text("input.guild.option_voice_channels"))
+        self.clone_emojis_checkbox.configure(text=self.lang.get_text("input.guild.option_emojis"))
         self.clone_messages_checkbox.configure(text=self.lang.get_text("input.guild.option_messages"))
         self.messages_limit_label.configure(text=self.lang.get_text("input.guild.option_messages_limit"))
         
@@ -1122,30 +1230,24 @@ class GuildInput(ctk.CTkFrame):
             minutes = int(elapsed_time // 60)
             seconds = int(elapsed_time % 60)
             self.time_value.configure(text=f"{minutes:02d}:{seconds:02d}")
-        try:
-            self.after(0, _apply)
-        except Exception:
-            _apply()
+        self.runtime.post(_apply)
         
     def hide_stats(self):
         """Nasconde il pannello delle statistiche (thread-safe)"""
         def _apply():
             if self.info_panel.winfo_ismapped():
                 self.info_panel.pack_forget()
-        try:
-            self.after(0, _apply)
-        except Exception:
-            _apply()
+        self.runtime.post(_apply)
     
 
     def toggle_messages_options(self):
         """Abilita/disabilita le opzioni relative ai messaggi"""
         if self.clone_messages_var.get():
             self.messages_limit_entry.configure(state="normal")
-            self.messages_limit_label.configure(text_color=Colors.get_color(Colors.TEXT))
+            ThemeRegistry().register(self.messages_limit_label, apply=True, text_color="TEXT")
         else:
             self.messages_limit_entry.configure(state="disabled")
-            self.messages_limit_label.configure(text_color=Colors.get_color(Colors.TEXT_MUTED))
+            ThemeRegistry().register(self.messages_limit_label, apply=True, text_color="TEXT_MUTED")
 
     def _setup_context_menu(self, widget, is_source=True):
         """Configura il menu contestuale (tasto destro) per i dropdown dei server"""
@@ -1202,9 +1304,6 @@ class GuildInput(ctk.CTkFrame):
         self._debug_log(f"Creazione nuovo server: {guild_name}", "INFO")
         
         try:
-            connector = aiohttp.TCPConnector(force_close=True)
-            
-
             api_url = "https://discord.com/api/v9/guilds"
             
             if not token.startswith("Bot ") and not token.startswith("Bearer "):
@@ -1227,7 +1326,7 @@ class GuildInput(ctk.CTkFrame):
             
             max_retries = 3
             attempt = 0
-            async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+            async with self.runtime.session(headers=headers) as session:
                 while attempt <= max_retries:
                     if attempt > 0:
                         self._debug_log(f"Retry creazione server, tentativo {attempt}/{max_retries}", "WARN")
@@ -1303,33 +1402,18 @@ class GuildInput(ctk.CTkFrame):
             "blue"
         )
         
-        # Esegui la richiesta in un thread separato
-        threading.Thread(target=self._create_server_thread, args=(token, server_name), daemon=True).start()
+        # Richiesta sul runtime asyncio condiviso, il risultato torna nel thread Tk
+        self.runtime.submit(
+            self.create_guild_request(token, server_name),
+            on_done=self._on_server_created,
+            on_error=lambda e: self._handle_server_creation_error(str(e))
+        )
     
-    def _create_server_thread(self, token, server_name):
-        """Thread per la creazione di un nuovo server"""
-        main_window = self.winfo_toplevel()
-        
-        try:
-            # Creiamo un loop asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            # Eseguiamo la richiesta API
-            result = loop.run_until_complete(self.create_guild_request(token, server_name))
-            
-            # Gestiamo il risultato nel thread principale
-            if result["success"]:
-                self.after(0, lambda: self._handle_server_creation_success(result))
-            else:
-                self.after(0, lambda: self._handle_server_creation_error(result["error"]))
-            
-        except Exception as e:
-            # Gestiamo eventuali errori
-            self.after(0, lambda: self._handle_server_creation_error(str(e)))
-        finally:
-            # Chiudiamo l'event loop
-            loop.close()
+    def _on_server_created(self, result):
+        if result["success"]:
+            self._handle_server_creation_success(result)
+        else:
+            self._handle_server_creation_error(result["error"])
     
     def _handle_server_creation_success(self, result):
         """Gestisce la creazione riuscita di un server"""
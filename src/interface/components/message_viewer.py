@@ -1,18 +1,15 @@
 import customtkinter as ctk
-import asyncio
-import aiohttp
 import tkinter as tk
 from tkinter import messagebox
 from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime
 import webbrowser
+import asyncio
 import os
-import tempfile
-from PIL import Image, ImageTk
-import io
-import requests
 
 from src.interface.styles.colors import Colors
+from src.operation_file.async_runtime import AsyncRuntime
+from src.operation_file.localindex import LocalIndex
 
 
 class MessageViewer(ctk.CTkScrollableFrame):
@@ -26,6 +23,8 @@ class MessageViewer(ctk.CTkScrollableFrame):
         self.messages = []
         self.current_channel = None
         self.media_cache = {}
+        self.runtime = AsyncRuntime()
+        self.index = LocalIndex()
         
         # Configure colors
         self.configure(fg_color=Colors.get_color(Colors.BACKGROUND, self.mode))
@@ -76,30 +75,49 @@ class MessageViewer(ctk.CTkScrollableFrame):
         )
         self.load_more_btn.pack(side="right", padx=5)
         
-    async def load_channel_messages(self, channel_id: str, channel_name: str, limit: int = 50):
-        """Load messages from a Discord channel."""
-        self.current_channel = {"id": channel_id, "name": channel_name}
-        self.channel_label.configure(text=f"# {channel_name}")
-        
-        # Clear existing messages
+    def clear_messages(self):
+        self.messages = []
         for widget in self.message_container.winfo_children():
             widget.destroy()
-        
-        # Show loading
-        loading_label = ctk.CTkLabel(
-            self.message_container,
-            text=self.lang.get_text("status.loading") if hasattr(self.lang, 'get_text') else "Caricamento messaggi...",
-            text_color=Colors.get_color(Colors.TEXT_MUTED, self.mode)
-        )
-        loading_label.pack(pady=20)
-        
-        try:
-            messages = await self.fetch_messages(channel_id, limit)
-            loading_label.destroy()
+
+    def load_channel_messages(self, channel_id: str, channel_name: str, limit: int = 50):
+        """Load messages from a Discord channel.
+
+        The copy in the local index is shown straight away; the fetch on the
+        shared async runtime then replaces it only if something changed.
+        """
+        self.current_channel = {"id": channel_id, "name": channel_name}
+        self.channel_label.configure(text=f"# {channel_name}")
+        self.clear_messages()
+
+        cached = self.index.get_messages(channel_id, limit)
+        loading_label = None
+        if cached:
+            self.display_messages(cached)
+        else:
+            loading_label = ctk.CTkLabel(
+                self.message_container,
+                text=self.lang.get_text("status.loading") if hasattr(self.lang, 'get_text') else "Caricamento messaggi...",
+                text_color=Colors.get_color(Colors.TEXT_MUTED, self.mode)
+            )
+            loading_label.pack(pady=20)
+
+        def on_done(messages):
+            # Nel frattempo l'utente può aver aperto un altro canale
+            if not self.current_channel or self.current_channel["id"] != channel_id or messages == cached:
+                return
+            self.clear_messages()
             self.display_messages(messages)
-        except Exception as e:
-            loading_label.configure(text=f"Errore: {str(e)}")
-            
+
+        def on_error(e):
+            if loading_label is not None:
+                loading_label.configure(text=f"Errore: {str(e)}")
+            else:
+                print(f"Error refreshing messages, showing cached copy: {e}")
+
+        self.runtime.submit(self.fetch_messages(channel_id, limit), on_done=on_done, on_error=on_error)
+
+
     async def fetch_messages(self, channel_id: str, limit: int = 50, before: str = None) -> List[Dict[str, Any]]:
         """Fetch messages from Discord API."""
         headers = {
@@ -112,11 +130,13 @@ class MessageViewer(ctk.CTkScrollableFrame):
         if before:
             params["before"] = before
             
-        async with aiohttp.ClientSession(headers=headers) as session:
+        async with self.runtime.session(headers=headers) as session:
             async with session.get(url, params=params) as resp:
                 if resp.status != 200:
                     raise Exception(f"HTTP {resp.status}: {await resp.text()}")
-                return await resp.json()
+                messages = await resp.json()
+        await asyncio.to_thread(self.index.put_messages, channel_id, messages)
+        return messages
                 
     def display_messages(self, messages: List[Dict[str, Any]]):
         """Display messages in the viewer."""
@@ -400,6 +420,7 @@ class MessageViewer(ctk.CTkScrollableFrame):
     def download_file(self, url: str, filename: str):
         """Download file to user's system."""
         try:
+            import requests  # deferred until the first download
             response = requests.get(url, stream=True)
             response.raise_for_status()
             
@@ -423,26 +444,32 @@ class MessageViewer(ctk.CTkScrollableFrame):
     def refresh_messages(self):
         """Refresh current channel messages."""
         if self.current_channel:
-            asyncio.create_task(self.load_channel_messages(
+            self.load_channel_messages(
                 self.current_channel["id"],
                 self.current_channel["name"]
-            ))
+            )
             
     def load_more_messages(self):
         """Load more messages from current channel."""
         if self.current_channel and self.messages:
             oldest_message_id = self.messages[-1].get("id")
-            asyncio.create_task(self.load_more_messages_async(oldest_message_id))
-            
-    async def load_more_messages_async(self, before_id: str):
-        """Load more messages asynchronously."""
-        try:
-            more_messages = await self.fetch_messages(
-                self.current_channel["id"],
-                limit=25,
-                before=before_id
-            )
-            if more_messages:
-                self.display_messages(more_messages)
-        except Exception as e:
-            messagebox.showerror("Errore", f"Impossibile caricare altri messaggi: {str(e)}")
\ No newline at end of file
+
+            channel_id = self.current_channel["id"]
+
+            def on_done(more_messages):
+                if more_messages:
+                    self.display_messages(more_messages)
+
+            def on_error(e):
+                # Offline: quello che l'indice locale ha già visto è meglio di niente
+                cached = self.index.get_messages(channel_id, 25, before=oldest_message_id)
+                if cached:
+                    self.display_messages(cached)
+                else:
+                    messagebox.showerror("Errore", f"Impossibile caricare altri messaggi: {str(e)}")
+
+            self.runtime.submit(
+                self.fetch_messages(channel_id, limit=25, before=oldest_message_id),
+                on_done=on_done,
+                on_error=on_error
+            )
\ No newline at end of file
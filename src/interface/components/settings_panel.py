@@ -1,26 +1,28 @@
 import customtkinter as ctk
-from PIL import Image, ImageTk
 import os
 from src.interface.components.debug_window import DebugWindow
 from src.interface.utils.language_manager import LanguageManager
 from src.interface.utils.settings_manager import SettingsManager
 from src.interface.styles.colors import Colors
-from src.interface.utils.version import CURRENT_VERSION, get_latest_version_sync, is_newer
-import threading
+from src.interface.styles.themes import ThemeRegistry
+from src.interface.utils.version import CURRENT_VERSION, latest_version, is_newer
+from src.operation_file.async_runtime import AsyncRuntime
 from tkinter import messagebox
-import requests
 import io
 import json
+import asyncio
+import aiohttp
 
 class SettingsPanel(ctk.CTkFrame):
     def __init__(self, master, width=400, height=None, on_feature_toggle=None):
+        pal = Colors.palette()
         super().__init__(
             master, 
             width=width, 
             height=height,
-            fg_color=Colors.get_color(Colors.SETTINGS_BG, ctk.get_appearance_mode().lower()),
+            fg_color=pal.SETTINGS_BG,
             border_width=1,
-            border_color=Colors.get_color(Colors.TEXT_MUTED, ctk.get_appearance_mode().lower())
+            border_color=pal.TEXT_MUTED
         )
         
         # Get the managers
@@ -65,8 +67,8 @@ class SettingsPanel(ctk.CTkFrame):
             height=45,
             command=lambda: master.toggle_settings(),
             fg_color="transparent",
-            text_color=Colors.get_color(Colors.TEXT),
-            hover_color=Colors.get_color(Colors.BACKGROUND_LIGHT),
+            text_color=pal.TEXT,
+            hover_color=pal.BACKGROUND_LIGHT,
             corner_radius=10
         )
         self.close_button.pack(side="right", padx=10)
@@ -87,11 +89,8 @@ class SettingsPanel(ctk.CTkFrame):
         # Sections with hover animations
         self._create_sections()
         
-        # Update menu colors
-        self._update_colors()
-        
-        # Add observer for theme change
-        self._appearance_mode_changed()  # Initial call
+        # Colori per ruolo: ThemeRegistry li riapplica tutti insieme al cambio tema
+        self._register_theme()
         
     def _create_sections(self):
         # Theme
@@ -173,9 +172,10 @@ class SettingsPanel(ctk.CTkFrame):
         self._create_contributors_section()
         
     def _create_section(self, title, icon=""):
+        pal = Colors.palette()
         frame = ctk.CTkFrame(
             self.settings_container,
-            fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, ctk.get_appearance_mode().lower()),
+            fg_color=pal.BACKGROUND_LIGHT,
             corner_radius=8
         )
         frame.pack(fill="x", pady=3, padx=3)
@@ -189,17 +189,20 @@ class SettingsPanel(ctk.CTkFrame):
                 header,
                 text=icon,
                 font=ctk.CTkFont(size=16),
-                text_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower())
+                text_color=pal.TEXT
             )
             icon_label.pack(side="left", padx=(0, 6))
+            ThemeRegistry().register(icon_label, text_color="TEXT")
         
         label = ctk.CTkLabel(
             header,
             text=title,
             font=ctk.CTkFont(size=13, weight="bold"),
-            text_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower())
+            text_color=pal.TEXT
         )
         label.pack(side="left")
+        ThemeRegistry().register(frame, fg_color="BACKGROUND_LIGHT")
+        ThemeRegistry().register(label, text_color="TEXT")
         
         content_frame = ctk.CTkFrame(frame, fg_color="transparent")
         content_frame.pack(fill="x", padx=10, pady=(0, 4))
@@ -404,8 +407,8 @@ class SettingsPanel(ctk.CTkFrame):
         actual_theme = theme_map.get(new_appearance_mode, "dark")
         ctk.set_appearance_mode(actual_theme)
         
-        # Update colors immediately
-        self._update_colors(actual_theme.lower())
+        # Restyle every registered widget in one pass
+        ThemeRegistry().restyle()
         
         # Save the setting
         self.settings.set_setting("appearance", "theme", actual_theme)
@@ -542,18 +545,21 @@ class SettingsPanel(ctk.CTkFrame):
         # top.grab_set() <--- doesn't work for linux
         top.after(10, top.grab_set)   # wait a few ms until window is mapped
 
-        mode = ctk.get_appearance_mode().lower()
-        top.configure(fg_color=Colors.get_color(Colors.SETTINGS_BG, mode))
+        pal = Colors.palette()
+        theme = ThemeRegistry()
+        top.configure(fg_color=pal.SETTINGS_BG)
+        theme.register(top, fg_color="SETTINGS_BG")
 
         header = ctk.CTkFrame(top, fg_color="transparent")
         header.pack(fill="x", padx=12, pady=(12, 6))
         title_lbl = ctk.CTkLabel(header, text="Contributors", font=ctk.CTkFont(size=16, weight="bold"))
         title_lbl.pack(side="left")
         close_btn = ctk.CTkButton(header, text="✖", width=36, height=32, command=top.destroy,
-                                  fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, mode),
-                                  text_color=Colors.get_color(Colors.TEXT, mode),
-                                  hover_color=Colors.get_color(Colors.SETTINGS_ITEM_BG, mode))
+                                  fg_color=pal.BACKGROUND_LIGHT,
+                                  text_color=pal.TEXT,
+                                  hover_color=pal.SETTINGS_ITEM_BG)
         close_btn.pack(side="right")
+        theme.register(close_btn, fg_color="BACKGROUND_LIGHT", text_color="TEXT", hover_color="SETTINGS_ITEM_BG")
 
         body = ctk.CTkFrame(top, fg_color="transparent")
         body.pack(fill="both", expand=True, padx=12, pady=6)
@@ -574,37 +580,56 @@ class SettingsPanel(ctk.CTkFrame):
                     child.destroy()
                 self._render_contributors_list(cached)
                 # Show a subtle note
-                note = ctk.CTkLabel(self._contributors_container, text="Refreshing list…", text_color=Colors.get_color(Colors.TEXT_MUTED, mode))
+                note = ctk.CTkLabel(self._contributors_container, text="Refreshing list…", text_color=pal.TEXT_MUTED)
                 note.pack(pady=(6, 0))
+                theme.register(note, text_color="TEXT_MUTED")
             except Exception:
                 pass
 
         # Start background fetch (will refresh UI and cache if newer)
-        threading.Thread(target=self._load_contributors_thread, daemon=True).start()
+        AsyncRuntime().submit(self._load_contributors_async(), on_done=self._on_contributors_loaded)
 
-    def _load_contributors_thread(self):
+    async def _load_contributors_async(self):
+        """Contributors list plus avatar bytes, fetched on the shared runtime"""
         url = "https://api.github.com/repos/seregonwar/DiscordServerCloner/contributors?per_page=100&anon=false"
         contributors = []
+        avatars = {}
         error = None
         try:
-            resp = requests.get(url, timeout=8)
-            if resp.status_code == 200:
-                data = resp.json()
-                # Filter and sort by contributions desc
-                contributors = [
-                    {
-                        "login": c.get("login"),
-                        "html_url": c.get("html_url"),
-                        "avatar_url": c.get("avatar_url"),
-                        "contributions": int(c.get("contributions", 0))
-                    }
-                    for c in data if c.get("type") == "User"
-                ]
-                contributors.sort(key=lambda x: x["contributions"], reverse=True)
-            else:
-                error = f"GitHub API returned {resp.status_code}"
+            async with AsyncRuntime().session(timeout=aiohttp.ClientTimeout(total=8)) as session:
+                async with session.get(url) as resp:
+                    if resp.status == 200:
+                        data = await resp.json()
+                        # Filter and sort by contributions desc
+                        contributors = [
+                            {
+                                "login": c.get("login"),
+                                "html_url": c.get("html_url"),
+                                "avatar_url": c.get("avatar_url"),
+                                "contributions": int(c.get("contributions", 0))
+                            }
+                            for c in data if c.get("type") == "User"
+                        ]
+                        contributors.sort(key=lambda x: x["contributions"], reverse=True)
+                    else:
+                        error = f"GitHub API returned {resp.status}"
+
+                async def fetch_avatar(avatar_url):
+                    try:
+                        async with session.get(avatar_url) as img_resp:
+                            if img_resp.status == 200:
+                                avatars[avatar_url] = await img_resp.read()
+                    except aiohttp.ClientError:
+                        pass
+
+                # Avatar scaricati insieme qui, non uno alla volta nel thread Tk
+                await asyncio.gather(*(fetch_avatar(c["avatar_url"]) for c in contributors if c.get("avatar_url")))
         except Exception as e:
             error = str(e)
+        return contributors, avatars, error
+
+    def _on_contributors_loaded(self, result):
+        contributors, avatars, error = result
 
         def finish():
             # Modal might have been closed
@@ -625,14 +650,19 @@ class SettingsPanel(ctk.CTkFrame):
             # Clear then render updated list
             for child in list(self._contributors_container.winfo_children()):
                 child.destroy()
-            self._render_contributors_list(contributors)
+            self._render_contributors_list(contributors, avatars)
 
-        self.after(0, finish)
+        finish()
 
-    def _render_contributors_list(self, contributors):
-        mode = ctk.get_appearance_mode().lower()
-        list_frame = ctk.CTkScrollableFrame(self._contributors_container, fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, mode))
+    def _render_contributors_list(self, contributors, avatars=None):
+        """avatars: {avatar_url: bytes}; without it (cached list) placeholders are shown until the refresh"""
+        from PIL import Image
+        avatars = avatars or {}
+        pal = Colors.palette()
+        theme = ThemeRegistry()
+        list_frame = ctk.CTkScrollableFrame(self._contributors_container, fg_color=pal.BACKGROUND_LIGHT)
         list_frame.pack(fill="both", expand=True)
+        theme.register(list_frame, fg_color="BACKGROUND_LIGHT")
         for c in contributors:
             row = ctk.CTkFrame(list_frame, fg_color="transparent")
             row.pack(fill="x", padx=6, pady=4)
@@ -640,13 +670,11 @@ class SettingsPanel(ctk.CTkFrame):
             # Avatar
             photo = None
             try:
-                if c.get("avatar_url"):
-                    img_resp = requests.get(c["avatar_url"], timeout=6)
-                    if img_resp.status_code == 200:
-                        image = Image.open(io.BytesIO(img_resp.content)).convert("RGBA")
-                        # Use CTkImage for proper HighDPI scaling
-                        photo = ctk.CTkImage(light_image=image, dark_image=image, size=(32, 32))
-                        self._contributors_photo_refs.append(photo)
+                if avatars.get(c.get("avatar_url")):
+                    image = Image.open(io.BytesIO(avatars[c["avatar_url"]])).convert("RGBA")
+                    # Use CTkImage for proper HighDPI scaling
+                    photo = ctk.CTkImage(light_image=image, dark_image=image, size=(32, 32))
+                    self._contributors_photo_refs.append(photo)
             except Exception:
                 photo = None
 
@@ -664,11 +692,12 @@ class SettingsPanel(ctk.CTkFrame):
                 command=lambda url=c.get("html_url"): __import__("webbrowser").open(url),
                 height=30,
                 width=320,
-                fg_color=Colors.get_color(Colors.BUTTON_BG, mode),
-                hover_color=Colors.get_color(Colors.BUTTON_HOVER, mode),
-                text_color=Colors.get_color(Colors.TEXT, mode)
+                fg_color=pal.BUTTON_BG,
+                hover_color=pal.BUTTON_HOVER,
+                text_color=pal.TEXT
             )
             btn.pack(side="left", padx=4)
+            theme.register(btn, fg_color="BUTTON_BG", hover_color="BUTTON_HOVER", text_color="TEXT")
 
     def _cache_file_path(self):
         # Place cache under project logs directory
@@ -717,15 +746,10 @@ class SettingsPanel(ctk.CTkFrame):
                 self.check_updates_button.configure(state="disabled", text="Checking…")
             except Exception:
                 pass
-        threading.Thread(target=self._check_updates_thread, daemon=True).start()
-
-    def _check_updates_thread(self):
-        """Worker to check the latest GitHub release without blocking UI."""
-        try:
-            latest = get_latest_version_sync(timeout=6.0)
-        except Exception:
-            latest = None
+        AsyncRuntime().submit(latest_version(timeout=6.0), on_done=self._on_latest_version)
 
+    def _on_latest_version(self, latest):
+        """Result of the release check, delivered on the Tk thread."""
         def finish():
             # Restore button
             if hasattr(self, 'check_updates_button'):
@@ -749,8 +773,7 @@ class SettingsPanel(ctk.CTkFrame):
             else:
                 messagebox.showinfo("Up to date", f"You are on the latest version ({CURRENT_VERSION}).")
 
-        # Switch back to UI thread
-        self.after(0, finish)
+        finish()
         
     def toggle_advanced_explorer(self):
         """Toggle advanced explorer feature"""
@@ -773,67 +796,20 @@ class SettingsPanel(ctk.CTkFrame):
         }
         return self.lang.get_text(theme_keys.get(theme, "settings.appearance.themes.dark"))
         
-    def _appearance_mode_changed(self, *args):
-        """Handle theme change"""
-        mode = ctk.get_appearance_mode().lower()
-        self._update_colors(mode)
-        
-    def _update_colors(self, mode="dark"):
-        """Update colors based on the current theme"""
-        # Update the main frame colors
-        self.configure(
-            fg_color=Colors.get_color(Colors.SETTINGS_BG, mode),
-            border_color=Colors.get_color(Colors.TEXT_MUTED, mode)
-        )
-        
-        # Update the section colors
-        for section in ["appearance_frame", "language_frame", "debug_frame", "info_frame"]:
-            if hasattr(self, section):
-                frame = getattr(self, section)
-                frame.configure(fg_color=Colors.get_color(Colors.SETTINGS_ITEM_BG, mode))
-                
-                # Update the text colors in the sections
-                for widget in frame.winfo_children():
-                    if isinstance(widget, ctk.CTkLabel):
-                        widget.configure(text_color=Colors.get_color(Colors.TEXT, mode))
-        # Features frame colors
-        if hasattr(self, 'features_frame'):
-            self.features_frame.configure(fg_color=Colors.get_color(Colors.SETTINGS_ITEM_BG, mode))
-            for widget in self.features_frame.winfo_children():
-                if isinstance(widget, ctk.CTkLabel):
-                    widget.configure(text_color=Colors.get_color(Colors.TEXT, mode))
-        
-        # Update the menu colors
-        for menu in ['appearance_mode_menu', 'language_menu']:
-            if hasattr(self, menu):
-                getattr(self, menu).configure(
-                    text_color=Colors.get_color(Colors.TEXT, mode),
-                    fg_color=Colors.get_color(Colors.SETTINGS_ITEM_BG, mode),
-                    button_color=Colors.get_color(Colors.BUTTON_BG, mode),
-                    button_hover_color=Colors.get_color(Colors.BUTTON_HOVER, mode),
-                    dropdown_fg_color=Colors.get_color(Colors.SETTINGS_ITEM_BG, mode),
-                    dropdown_hover_color=Colors.get_color(Colors.SETTINGS_BG, mode),
-                    dropdown_text_color=Colors.get_color(Colors.TEXT, mode)
-                )
-        
-        # Update the switch colors
-        for switch in ['debug_switch', 'log_file_switch', 'timing_switch', 'api_switch', 'advanced_explorer_switch']:
-            if hasattr(self, switch):
-                getattr(self, switch).configure(
-                    text_color=Colors.get_color(Colors.TEXT, mode),
-                    button_color=Colors.get_color(Colors.BUTTON_BG, mode),
-                    button_hover_color=Colors.get_color(Colors.BUTTON_HOVER, mode),
-                    progress_color=Colors.get_color(Colors.TEXT_MUTED, mode)
-                )
-                
-        # Update the debug description text color
-        if hasattr(self, 'debug_description'):
-            self.debug_description.configure(
-                text_color=Colors.get_color(Colors.TEXT, mode)
-            )
-        # Notify main window about the change
-        try:
-            if self.on_feature_toggle:
-                self.on_feature_toggle("advanced_explorer", state)
-        except Exception:
-            pass
\ No newline at end of file
+    def _register_theme(self):
+        """Register the panel widgets with their palette roles and style them for the current mode"""
+        theme = ThemeRegistry()
+        theme.register(self, fg_color="SETTINGS_BG", border_color="TEXT_MUTED")
+        for section in (self.appearance_frame, self.language_frame, self.debug_frame, self.info_frame, self.features_frame):
+            theme.register(section, apply=True, fg_color="SETTINGS_ITEM_BG")
+        for menu in (self.appearance_mode_menu, self.language_menu):
+            theme.register(menu, apply=True, text_color="TEXT", fg_color="SETTINGS_ITEM_BG",
+                           button_color="BUTTON_BG", button_hover_color="BUTTON_HOVER",
+                           dropdown_fg_color="SETTINGS_ITEM_BG", dropdown_hover_color="SETTINGS_BG",
+                           dropdown_text_color="TEXT")
+        for switch in (self.debug_switch, self.log_file_switch, self.timing_switch, self.api_switch,
+                       self.advanced_explorer_switch):
+            theme.register(switch, apply=True, text_color="TEXT", button_color="BUTTON_BG",
+                           button_hover_color="BUTTON_HOVER", progress_color="TEXT_MUTED")
+        theme.register(self.debug_description, apply=True, text_color="TEXT")
+        theme.register(self.close_button, text_color="TEXT", hover_color="BACKGROUND_LIGHT")
@@ -1,23 +1,29 @@
 import customtkinter as ctk
-from PIL import Image
 import os
-import threading
 import asyncio
 import aiohttp
 from src.interface.utils.language_manager import LanguageManager
 from src.interface.styles.colors import Colors
+from src.interface.styles.themes import ThemeRegistry
 from src.interface.utils.validators import is_token_valid
+from src.interface.utils.session_cache import SessionCache
+from src.operation_file.async_runtime import AsyncRuntime
 
 class TokenInput(ctk.CTkFrame):
     def __init__(self, master):
-        mode = ctk.get_appearance_mode().lower()
-        super().__init__(master, fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, mode))
+        pal = Colors.palette()
+        super().__init__(master, fg_color=pal.BACKGROUND_LIGHT)
         
         # Get the language manager
         self.lang = LanguageManager()
         
+        # Ultimo utente/elenco server noto per token (stale-while-revalidate)
+        self.session_cache = SessionCache()
+        self.runtime = AsyncRuntime()
+        self._showing_cached = False
+        
         # Main frame (use solid color to avoid transparency cost)
-        self.main_frame = ctk.CTkFrame(self, fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, mode))
+        self.main_frame = ctk.CTkFrame(self, fg_color=pal.BACKGROUND_LIGHT)
         self.main_frame.pack(fill="x", padx=20)
 
         # Label
@@ -29,7 +35,7 @@ class TokenInput(ctk.CTkFrame):
         self.label.pack(anchor="w", pady=(10, 5))
         
         # Input frame
-        self.input_frame = ctk.CTkFrame(self.main_frame, fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, mode))
+        self.input_frame = ctk.CTkFrame(self.main_frame, fg_color=pal.BACKGROUND_LIGHT)
         self.input_frame.pack(fill="x")
         
         # Entry
@@ -47,9 +53,9 @@ class TokenInput(ctk.CTkFrame):
             text="👁",
             width=40,
             command=self.toggle_show_hide,
-            fg_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower()),
-            text_color=Colors.get_color(Colors.BACKGROUND, ctk.get_appearance_mode().lower()),
-            hover_color=Colors.get_color(Colors.TEXT_MUTED, ctk.get_appearance_mode().lower())
+            fg_color=pal.TEXT,
+            text_color=pal.BACKGROUND,
+            hover_color=pal.TEXT_MUTED
         )
         self.show_button.pack(side="left", padx=(10, 0))
         # Delete button (clear token)
@@ -58,9 +64,9 @@ class TokenInput(ctk.CTkFrame):
             text="❌",
             width=30,
             command=self.clear_token,
-            fg_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower()),
-            text_color=Colors.get_color(Colors.BACKGROUND, ctk.get_appearance_mode().lower()),
-            hover_color=Colors.get_color(Colors.TEXT_MUTED, ctk.get_appearance_mode().lower())
+            fg_color=pal.TEXT,
+            text_color=pal.BACKGROUND,
+            hover_color=pal.TEXT_MUTED
         )
         self.delete_token_button.pack(side="right", padx=(10, 0))
 
@@ -71,11 +77,18 @@ class TokenInput(ctk.CTkFrame):
             text=self.lang.get_text("input.token.verify_button"),
             width=100,
             command=self.verify_token,
-            fg_color=Colors.get_color(Colors.TEXT, ctk.get_appearance_mode().lower()),
-            text_color=Colors.get_color(Colors.BACKGROUND, ctk.get_appearance_mode().lower()),
-            hover_color=Colors.get_color(Colors.TEXT_MUTED, ctk.get_appearance_mode().lower())
+            fg_color=pal.TEXT,
+            text_color=pal.BACKGROUND,
+            hover_color=pal.TEXT_MUTED
         )
         self.verify_button.pack(side="left", padx=(10, 0))
+
+        # Colori aggiornati in blocco da ThemeRegistry al cambio tema
+        theme = ThemeRegistry()
+        for frame in (self, self.main_frame, self.input_frame):
+            theme.register(frame, fg_color="BACKGROUND_LIGHT")
+        for button in (self.show_button, self.delete_token_button, self.verify_button):
+            theme.register(button, fg_color="TEXT", text_color="BACKGROUND", hover_color="TEXT_MUTED")
         
         # Help text with tooltip
         self.help_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
@@ -139,7 +152,8 @@ class TokenInput(ctk.CTkFrame):
         self.tooltip.overrideredirect(True)  # Remove window decoration
         
         # Configure the tooltip style
-        self.tooltip.configure(fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT))
+        pal = Colors.palette()
+        self.tooltip.configure(fg_color=pal.BACKGROUND_LIGHT)
         
         # Create the tooltip content
         help_text = ctk.CTkLabel(
@@ -149,7 +163,7 @@ class TokenInput(ctk.CTkFrame):
             wraplength=400,
             padx=20,
             pady=20,
-            text_color=Colors.get_color(Colors.TEXT)
+            text_color=pal.TEXT
         )
         help_text.pack()
         
@@ -183,20 +197,6 @@ class TokenInput(ctk.CTkFrame):
             self.entry.configure(show="•")
             self.show_button.configure(text="👁")
             
-    def _update_colors(self):
-        mode = ctk.get_appearance_mode().lower()
-        self.show_button.configure(
-            fg_color=Colors.get_color(Colors.TEXT, mode),
-            text_color=Colors.get_color(Colors.BACKGROUND, mode),
-            hover_color=Colors.get_color(Colors.TEXT_MUTED, mode)
-        )
-        
-        if self.tooltip:
-            self.tooltip.configure(fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, mode))
-            for child in self.tooltip.winfo_children():
-                if isinstance(child, ctk.CTkLabel):
-                    child.configure(text_color=Colors.get_color(Colors.TEXT, mode))
-
     def verify_token(self):
         """Verifica il token e recupera l'elenco dei server disponibili"""
         token = self.entry.get()
@@ -221,35 +221,28 @@ class TokenInput(ctk.CTkFrame):
             "blue"
         )
         
-        # Esegui la verifica in un thread separato
-        threading.Thread(target=self._verify_token_thread, args=(token,), daemon=True).start()
-    
-    def _verify_token_thread(self, token):
-        """Thread per verificare il token e recuperare i server"""
-        try:
-            # Creiamo un evento asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            # Eseguiamo la verifica
-            result = loop.run_until_complete(self._verify_token_async(token))
-            
-            # Aggiorniamo l'UI nel thread principale
-            self.after(0, lambda: self._handle_verification_result(result, token))
-            
-        except Exception as e:
-            # Gestiamo eventuali errori
-            self.after(0, lambda: self._handle_verification_error(str(e)))
-        finally:
-            # Chiudiamo l'event loop
-            loop.close()
+        # Se conosciamo già questo token mostriamo subito i server in cache,
+        # la verifica in background poi li conferma o li aggiorna
+        cached = self.session_cache.get(token)
+        self._showing_cached = cached is not None
+        if cached:
+            self.guilds_list = cached["guilds"]
+            main_window.guild_input.update_guilds_dropdowns(self.guilds_list)
+            main_window.status_bar.update_status(
+                self.lang.get_text("status.connected").format(user=cached["username"]), 
+                "blue"
+            )
+        
+        # Verifica sul runtime asyncio condiviso, il risultato torna nel thread Tk
+        self.runtime.submit(
+            self._verify_token_async(token),
+            on_done=lambda result: self._handle_verification_result(result, token),
+            on_error=lambda e: self._handle_verification_error(str(e))
+        )
     
     async def _verify_token_async(self, token):
         """Verifica il token in modo asincrono usando solo HTTP"""
         try:
-            # Creiamo un connector sicuro per evitare memory leak
-            connector = aiohttp.TCPConnector(force_close=True)
-            
             # URL delle API Discord per ottenere i server dell'utente
             api_url = "https://discord.com/api/v10/users/@me/guilds"
             user_url = "https://discord.com/api/v10/users/@me"
@@ -259,43 +252,43 @@ class TokenInput(ctk.CTkFrame):
                 "Content-Type": "application/json"
             }
             
-            async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
-                # Prima verifichiamo le informazioni utente
-                async with session.get(user_url) as user_response:
-                    if user_response.status == 401:
-                        # Token non valido
-                        return {"success": False, "error": "Token Discord non valido o scaduto"}
-                    elif user_response.status != 200:
-                        # Altri errori
-                        error_data = await user_response.text()
-                        return {"success": False, "error": f"Errore API ({user_response.status}): {error_data}"}
-                    
-                    # Otteniamo i dati utente
-                    user_data = await user_response.json()
-                    username = user_data.get("username", "Utente")
-                    
-                    # Ora recuperiamo i server
-                    async with session.get(api_url) as guilds_response:
-                        if guilds_response.status != 200:
-                            error_data = await guilds_response.text()
-                            return {"success": False, "error": f"Errore API ({guilds_response.status}): {error_data}"}
-                        
-                        guilds_data = await guilds_response.json()
-                        
-                        # Convertiamo i dati nel formato atteso
-                        guilds = []
-                        for guild in guilds_data:
-                            guilds.append({
-                                'id': guild.get('id'),
-                                'name': guild.get('name'),
-                                'icon': guild.get('icon')
-                            })
-                        
-                        return {
-                            "success": True, 
-                            "guilds": guilds, 
-                            "username": username
-                        }
+            async with self.runtime.session(headers=headers) as session:
+                async def fetch(url):
+                    async with session.get(url) as response:
+                        if response.status != 200:
+                            return response.status, await response.text()
+                        return response.status, await response.json()
+
+                # Utente e server in parallelo: una sola attesa di rete invece di due
+                (user_status, user_data), (guilds_status, guilds_data) = await asyncio.gather(
+                    fetch(user_url), fetch(api_url)
+                )
+
+                if user_status == 401:
+                    # Token non valido
+                    return {"success": False, "status": 401, "error": "Token Discord non valido o scaduto"}
+                elif user_status != 200:
+                    # Altri errori
+                    return {"success": False, "status": user_status, "error": f"Errore API ({user_status}): {user_data}"}
+                if guilds_status != 200:
+                    return {"success": False, "status": guilds_status, "error": f"Errore API ({guilds_status}): {guilds_data}"}
+
+                username = user_data.get("username", "Utente")
+                
+                # Convertiamo i dati nel formato atteso
+                guilds = []
+                for guild in guilds_data:
+                    guilds.append({
+                        'id': guild.get('id'),
+                        'name': guild.get('name'),
+                        'icon': guild.get('icon')
+                    })
+                
+                return {
+                    "success": True, 
+                    "guilds": guilds, 
+                    "username": username
+                }
                 
         except aiohttp.ClientError as e:
             return {"success": False, "error": f"Errore di connessione: {str(e)}"}
@@ -311,10 +304,12 @@ class TokenInput(ctk.CTkFrame):
         if result["success"]:
             # Salviamo l'elenco dei server
             self.guilds_list = result["guilds"]
+            changed = self.session_cache.put(token, result["username"], result["guilds"])
             
-            # Aggiorniamo l'interfaccia
-            guild_input = main_window.guild_input
-            guild_input.update_guilds_dropdowns(self.guilds_list)
+            # Aggiorniamo l'interfaccia solo se la cache mostrata era diversa
+            if changed or not self._showing_cached:
+                guild_input = main_window.guild_input
+                guild_input.update_guilds_dropdowns(self.guilds_list)
             
             # Aggiorniamo lo stato
             main_window.status_bar.update_status(
@@ -326,11 +321,20 @@ class TokenInput(ctk.CTkFrame):
             main_window.verified_token = token
             
         else:
+            # Un token rifiutato non deve più servire dati dalla cache
+            if result.get("status") == 401:
+                self.session_cache.invalidate(token)
+                # ...né lasciare nei selettori i server mostrati dalla cache
+                self.guilds_list = []
+                main_window.guild_input.clear_guilds()
+                if main_window.verified_token == token:
+                    main_window.verified_token = None
             # Mostriamo l'errore
             main_window.status_bar.update_status(
                 self.lang.get_text("status.connection_error").format(error=result["error"]), 
                 "red"
             )
+        self._showing_cached = False
         
         # Ripristiniamo il pulsante
         self.verify_button.configure(
@@ -341,6 +345,7 @@ class TokenInput(ctk.CTkFrame):
     def _handle_verification_error(self, error_message):
         """Gestisce gli errori durante la verifica"""
         main_window = self.winfo_toplevel()
+        self._showing_cached = False
         
         # Mostriamo l'errore
         main_window.status_bar.update_status(
@@ -1,25 +1,33 @@
 import customtkinter as ctk
-from PIL import Image
 import os
-import threading
 import webbrowser
-import requests
 import io
+import aiohttp
 
 from src.interface.components.header import Header
 from src.interface.components.token_input import TokenInput
 from src.interface.components.guild_input import GuildInput
 from src.interface.components.status_bar import StatusBar
-from src.interface.components.advanced_explorer import create_advanced_explorer_frame
-from src.interface.components.settings_panel import SettingsPanel
 from src.interface.utils.language_manager import LanguageManager
 from src.interface.utils.settings_manager import SettingsManager
 from src.interface.styles.colors import Colors
-from src.interface.utils.version import CURRENT_VERSION, get_latest_version_sync, is_newer
+from src.interface.styles.themes import apply_ctk_defaults, ThemeRegistry
+from src.interface.styles.hover import HoverDispatcher
+from src.interface.utils.version import CURRENT_VERSION, latest_version, is_newer
+from src.operation_file.async_runtime import AsyncRuntime
+from src.interface.utils.animations import FrameClock, AnimationManager
 
 class MainWindow(ctk.CTk):
     def __init__(self):
         super().__init__()
+
+        # Un solo loop asyncio in background per tutta la rete della GUI
+        self.runtime = AsyncRuntime()
+        self.runtime.start()
+        self.runtime.attach(self)
+        # Un solo timer per tutte le animazioni, fermo quando la finestra è minimizzata
+        self.clock = FrameClock()
+        self.clock.attach(self)
         
         # Initialize the settings manager
         self.settings = SettingsManager()
@@ -56,6 +64,9 @@ class MainWindow(ctk.CTk):
         # Performance/animation flag (default: disabled for faster startup)
         anim_flag = self.settings.get_setting("features", "ui_animations")
         self.enable_animations = bool(anim_flag) if anim_flag is not None else False
+        if self.enable_animations:
+            # Stili "moderni" come default di classe: valgono per ogni widget creato da qui in poi
+            apply_ctk_defaults()
         
         # Configurazione finestra con design moderno
         self.title(self.lang.get_text("app.title"))
@@ -77,8 +88,9 @@ class MainWindow(ctk.CTk):
        
             pass
         
-        # Colori personalizzati
-        self.bg_color = Colors.get_color(Colors.BACKGROUND)
+        # Colori personalizzati (palette della modalità corrente)
+        pal = Colors.palette()
+        self.bg_color = pal.BACKGROUND
         self.accent_color = Colors.PRIMARY
         self.configure(fg_color=self.bg_color)
         
@@ -89,11 +101,11 @@ class MainWindow(ctk.CTk):
         # Sidebar con design moderno
         self.sidebar = ctk.CTkFrame(
             self, 
-            fg_color=Colors.get_color(Colors.SURFACE), 
+            fg_color=pal.SURFACE, 
             width=280, 
             corner_radius=0,
             border_width=1,
-            border_color=Colors.get_color(Colors.BORDER)
+            border_color=pal.BORDER
         )
         self.sidebar.grid(row=0, column=0, sticky="nsew")
         self.sidebar.grid_propagate(False)  # Mantiene la larghezza fissa
@@ -102,7 +114,7 @@ class MainWindow(ctk.CTk):
         shadow_frame = ctk.CTkFrame(
             self.sidebar,
             width=2,
-            fg_color=Colors.get_color(Colors.BORDER)
+            fg_color=pal.BORDER
         )
         shadow_frame.pack(side="right", fill="y")
         
@@ -122,16 +134,17 @@ class MainWindow(ctk.CTk):
         self.profile_texts.pack(side="left", padx=10)
         self.profile_name_label = ctk.CTkLabel(self.profile_texts, text="Not signed in", font=ctk.CTkFont(size=13, weight="bold"))
         self.profile_name_label.pack(anchor="w")
-        self.profile_sub_label = ctk.CTkLabel(self.profile_texts, text="", font=ctk.CTkFont(size=11), text_color=Colors.get_color(Colors.TEXT_MUTED))
+        self.profile_sub_label = ctk.CTkLabel(self.profile_texts, text="", font=ctk.CTkFont(size=11), text_color=pal.TEXT_MUTED)
         self.profile_sub_label.pack(anchor="w")
 
         self._profile_image_ref = None  # keep CTkImage ref
         self._profile_loaded = False
+        self._profile_loading = False
         
         # Rimozione completa del contenitore dell'icona per massimizzare lo spazio
             
         # Main container con design moderno
-        self.main_container = ctk.CTkFrame(self, fg_color=Colors.get_color(Colors.BACKGROUND))
+        self.main_container = ctk.CTkFrame(self, fg_color=pal.BACKGROUND)
         self.main_container.grid(row=0, column=1, sticky="nsew", padx=20, pady=20)
         self.main_container.grid_columnconfigure(0, weight=1)
         self.main_container.grid_rowconfigure(1, weight=1)
@@ -155,16 +168,16 @@ class MainWindow(ctk.CTk):
             self.header.configure(
                 corner_radius=16,
                 border_width=1,
-                border_color=Colors.get_color(Colors.BORDER)
+                border_color=pal.BORDER
             )
         
         # Central frame moderno con effetti visivi migliorati
         self.main_frame = ctk.CTkFrame(
             self.content_wrapper,
-            fg_color=Colors.get_color(Colors.SURFACE),
+            fg_color=pal.SURFACE,
             corner_radius=20,
             border_width=1,
-            border_color=Colors.get_color(Colors.BORDER)
+            border_color=pal.BORDER
         )
         self.main_frame.grid(row=1, column=0, sticky="nsew")
         self.main_frame.grid_columnconfigure(0, weight=1)
@@ -183,7 +196,7 @@ class MainWindow(ctk.CTk):
         if self.enable_animations:
             self.shadow_frame = ctk.CTkFrame(
                 self.main_container,
-                fg_color=Colors.get_color(Colors.BACKGROUND),
+                fg_color=pal.BACKGROUND,
                 corner_radius=15
             )
             self.shadow_frame.grid(row=1, column=0, sticky="nsew", padx=8, pady=8)
@@ -193,9 +206,9 @@ class MainWindow(ctk.CTk):
         config_section = ctk.CTkFrame(
             self.inner_content_frame,
             corner_radius=10,
-            fg_color=Colors.get_color(Colors.SURFACE_ELEVATED),
+            fg_color=pal.SURFACE_ELEVATED,
             border_width=1,
-            border_color=Colors.get_color(Colors.BORDER_LIGHT)
+            border_color=pal.BORDER_LIGHT
         )
         config_section.grid(row=0, column=0, sticky="ew", pady=(0, 12))
         
@@ -208,7 +221,7 @@ class MainWindow(ctk.CTk):
             header_frame,
             text="🔧 Configurazione",
             font=ctk.CTkFont(size=13, weight="bold"),
-            text_color=Colors.get_color(Colors.TEXT)
+            text_color=pal.TEXT
         )
         section_title.pack(side="left", pady=6)
         
@@ -224,13 +237,8 @@ class MainWindow(ctk.CTk):
         self.guild_input = GuildInput(input_container)
         self.guild_input.grid(row=1, column=0, sticky="ew", pady=(0, 0))
         
-        # Settings Panel (initially hidden)
-        self.settings_panel = SettingsPanel(
-            self,
-            width=350,
-            height=self.winfo_height() - 40,
-            on_feature_toggle=self.on_feature_toggle
-        )
+        # Settings Panel (creato alla prima apertura, vedi _get_settings_panel)
+        self.settings_panel = None
         self.settings_visible = False
         
         # Settings Button with emoji icon for better visibility
@@ -240,19 +248,16 @@ class MainWindow(ctk.CTk):
             height=45,
             command=self.toggle_settings,
             fg_color="transparent",
-            text_color=Colors.get_color(Colors.TEXT),
-            hover_color=Colors.get_color(Colors.PRIMARY),
+            text_color=pal.TEXT,
+            hover_color=pal.PRIMARY,
             anchor="w",
             corner_radius=8,
             border_width=1,
-            border_color=Colors.get_color(Colors.BORDER),
+            border_color=pal.BORDER,
             font=ctk.CTkFont(size=14, weight="normal")
         )
         self.settings_button.pack(fill="x", padx=10, pady=(10, 5), side="bottom")
         
-        # Add hover effects
-        self.add_button_hover_effects(self.settings_button)
-        
         # About button in sidebar
         self.about_button = ctk.CTkButton(
             self.sidebar,
@@ -260,18 +265,15 @@ class MainWindow(ctk.CTk):
             height=45,
             command=self.show_about,
             fg_color="transparent",
-            text_color=Colors.get_color(Colors.TEXT),
-            hover_color=Colors.get_color(Colors.PRIMARY),
+            text_color=pal.TEXT,
+            hover_color=pal.PRIMARY,
             anchor="w",
             corner_radius=8,
             border_width=1,
-            border_color=Colors.get_color(Colors.BORDER)
+            border_color=pal.BORDER
         )
         self.about_button.pack(fill="x", padx=10, pady=5, side="bottom")
         
-        # Add hover effects
-        self.add_button_hover_effects(self.about_button)
-        
         # Status bar with enhanced styling
         self.status_bar = StatusBar(self)
         self.status_bar.grid(row=1, column=0, columnspan=2, sticky="ew")
@@ -280,7 +282,7 @@ class MainWindow(ctk.CTk):
         self.status_separator = ctk.CTkFrame(
             self,
             height=1,
-            fg_color=Colors.get_color(Colors.BORDER)
+            fg_color=pal.BORDER
         )
         self.status_separator.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(0, 34))
         
@@ -291,15 +293,32 @@ class MainWindow(ctk.CTk):
             ver_text = f"v{CURRENT_VERSION} • Ready"
         self.status_bar.update_status(ver_text, "green")
         
-        # Applica stili moderni
-        self.apply_modern_styling()
+        # Colori riapplicati in blocco da ThemeRegistry al cambio tema
+        theme = ThemeRegistry()
+        for frame in (self, self.main_container):
+            theme.register(frame, fg_color="BACKGROUND")
+        for frame in (self.sidebar, self.main_frame):
+            theme.register(frame, fg_color="SURFACE", border_color="BORDER")
+        for frame in (shadow_frame, self.status_separator):
+            theme.register(frame, fg_color="BORDER")
+        if hasattr(self.header, 'configure'):
+            theme.register(self.header, border_color="BORDER")
+        if self.enable_animations:
+            theme.register(self.shadow_frame, fg_color="BACKGROUND")
+        theme.register(config_section, fg_color="SURFACE_ELEVATED", border_color="BORDER_LIGHT")
+        theme.register(section_title, text_color="TEXT")
+        theme.register(self.profile_sub_label, text_color="TEXT_MUTED")
+        for button in (self.settings_button, self.about_button):
+            theme.register(button, text_color="TEXT", hover_color="PRIMARY", border_color="BORDER")
+        
+        # Hover delegato: un solo binding per tutta l'app, anche per i widget creati in seguito
+        HoverDispatcher().install(self)
         
         # Binding for window resizing
         self.bind("<Configure>", self._on_resize)
         
         # Apply transitions and startup animation only if enabled
         if self.enable_animations:
-            self.after(50, self.add_smooth_transitions)
             self.after(100, self.startup_animation)
         else:
             # Ensure window is fully opaque and responsive immediately
@@ -346,6 +365,7 @@ class MainWindow(ctk.CTk):
         about_window.geometry('{}x{}+{}+{}'.format(width, height, x, y))
         
         # Content frame
+        pal = Colors.palette()
         about_frame = ctk.CTkFrame(about_window, fg_color="transparent")
         about_frame.pack(fill="both", expand=True, padx=20, pady=20)
         
@@ -363,7 +383,7 @@ class MainWindow(ctk.CTk):
             about_frame, 
             text=self.lang.get_text("settings.info.version").format(version=version),
             font=ctk.CTkFont(size=12),
-            text_color=Colors.get_color(Colors.TEXT_MUTED)
+            text_color=pal.TEXT_MUTED
         )
         version_label.pack(pady=(0, 20))
         
@@ -382,9 +402,11 @@ class MainWindow(ctk.CTk):
             about_frame,
             text=" 2025",
             font=ctk.CTkFont(size=12),
-            text_color=Colors.get_color(Colors.TEXT_MUTED)
+            text_color=pal.TEXT_MUTED
         )
         credits.pack(pady=(20, 0))
+        for label in (version_label, credits):
+            ThemeRegistry().register(label, text_color="TEXT_MUTED")
         
         # Close button
         close_button = ctk.CTkButton(
@@ -396,8 +418,7 @@ class MainWindow(ctk.CTk):
         close_button.pack(pady=20)
     
     def _check_updates_start(self):
-        def worker():
-            latest = get_latest_version_sync()
+        def on_latest(latest):
             if latest and is_newer(latest, CURRENT_VERSION):
                 def notify():
                     try:
@@ -416,8 +437,8 @@ class MainWindow(ctk.CTk):
                             self.status_bar.status_label.configure(cursor="hand2")
                     except Exception:
                         pass
-                self.after(0, notify)
-        threading.Thread(target=worker, daemon=True).start()
+                notify()
+        self.runtime.submit(latest_version(timeout=6.0), on_done=on_latest)
     
     def update_texts(self):
         """Update all interface texts when the language changes"""
@@ -477,12 +498,15 @@ class MainWindow(ctk.CTk):
         self.status_bar.status_label.configure(text=self.lang.get_text("status.ready"))
         
         # Update the settings panel if it exists
-        if hasattr(self, 'settings_panel') and self.settings_panel:
+        if self.settings_panel is not None:
             self.settings_panel.update_texts()
     
     def _on_resize(self, event):
         """Handle window resize"""
-        if hasattr(self, 'settings_panel'):
+        # <Configure> sulla finestra arriva anche per ogni widget figlio: ci interessa solo la finestra
+        if event.widget is not self:
+            return
+        if self.settings_panel is not None:
             new_height = self.winfo_height() - 40
             if self.enable_animations:
                 self.animate_height_change(self.settings_panel, new_height)
@@ -495,39 +519,35 @@ class MainWindow(ctk.CTk):
                 self.settings_panel.grid(row=0, column=2, rowspan=2, sticky="nsew", padx=(0, 20), pady=20)
                 
     def animate_height_change(self, widget, target_height):
-        """Smoothly animate height changes"""
-        try:
-            current_height = widget.winfo_height()
-            if abs(current_height - target_height) > 5:
-                step = (target_height - current_height) / 5
-                new_height = current_height + step
-                widget.configure(height=int(new_height))
-                self.after(10, lambda: self.animate_height_change(widget, target_height))
-            else:
-                widget.configure(height=target_height)
-        except:
-            widget.configure(height=target_height)
+        """Smoothly animate height changes (retargets the running tween while resizing)"""
+        self.clock.animate(widget, "height", target_height, 120,
+                           lambda v: widget.configure(height=int(v)),
+                           start=widget.winfo_height())
     
     def startup_animation(self):
         """Smooth startup animation with fade-in effect"""
         self.attributes('-alpha', 0.0)
-        self.animate_fade_in(0.0, 1.0, 20)
-        
-    def animate_fade_in(self, current_alpha, target_alpha, steps):
-        """Animate fade-in effect"""
-        if current_alpha < target_alpha:
-            current_alpha += (target_alpha / steps)
-            if current_alpha > target_alpha:
-                current_alpha = target_alpha
-            self.attributes('-alpha', current_alpha)
-            self.after(20, lambda: self.animate_fade_in(current_alpha, target_alpha, steps))
+        AnimationManager.smooth_fade(self, 0.0, 1.0, 400)
     
+    def _get_settings_panel(self):
+        """Build the settings panel on first use (keeps it out of the cold start)"""
+        if self.settings_panel is None:
+            from src.interface.components.settings_panel import SettingsPanel
+            self.settings_panel = SettingsPanel(
+                self,
+                width=350,
+                height=self.winfo_height() - 40,
+                on_feature_toggle=self.on_feature_toggle
+            )
+        return self.settings_panel
+
     def toggle_settings(self):
         """Toggle settings panel (animations optional)"""
+        self._get_settings_panel()
         if self.settings_visible:
             if self.enable_animations:
                 # Animate panel hiding
-                self.animate_panel_slide(self.settings_panel, 350, 0, 15, hide_after=True)
+                self.animate_panel_slide(self.settings_panel, 350, 0, hide_after=True)
             else:
                 self.settings_panel.grid_remove()
             self.settings_visible = False
@@ -542,237 +562,97 @@ class MainWindow(ctk.CTk):
             self.grid_columnconfigure(1, weight=1)
             self.grid_columnconfigure(2, weight=0)
             if self.enable_animations:
-                self.animate_panel_slide(self.settings_panel, 0, 350, 15)
-            
-        # Force color update
-        mode = ctk.get_appearance_mode().lower()
-        self.settings_panel._update_colors(mode)
+                self.animate_panel_slide(self.settings_panel, 0, 350)
         
-    def animate_panel_slide(self, panel, start_width, end_width, steps, hide_after=False):
+    def animate_panel_slide(self, panel, start_width, end_width, duration=300, hide_after=False):
         """Animate panel sliding with smooth width transition"""
-        if steps <= 0:
-            panel.configure(width=end_width)
-            if hide_after:
-                panel.grid_remove()
-            return
-            
-        current_width = start_width + (end_width - start_width) * (15 - steps) / 15
-        panel.configure(width=int(current_width))
-        self.after(20, lambda: self.animate_panel_slide(panel, start_width, end_width, steps - 1, hide_after))
-        
-    def add_button_hover_effects(self, button):
-        """Aggiunge effetti hover migliorati ai bottoni"""
-        try:
-            # Ottieni colori originali
-            original_fg = button.cget("fg_color")
-            original_text = button.cget("text_color")
-            original_border_color = button.cget("border_color")
-            
-            # Definisci colori hover moderni
-            hover_fg = Colors.get_color(Colors.PRIMARY_HOVER)
-            hover_text = Colors.get_color(Colors.TEXT_ON_PRIMARY)
-            
-            def on_enter(event):
-                button.configure(
-                    fg_color=hover_fg,
-                    text_color=hover_text,
-                    border_color=Colors.get_color(Colors.PRIMARY)
-                )
-            
-            def on_leave(event):
-                button.configure(
-                    fg_color=original_fg,
-                    text_color=original_text,
-                    border_color=original_border_color
-                )
-            
-            # Bind eventi
-            button.bind("<Enter>", on_enter)
-            button.bind("<Leave>", on_leave)
-            
-        except Exception as e:
-            print(f"Errore nell'aggiunta degli effetti hover: {e}")
+        on_complete = panel.grid_remove if hide_after else None
+        self.clock.animate(panel, "width", end_width, duration,
+                           lambda v: panel.configure(width=int(v)),
+                           start=start_width, on_complete=on_complete)
         
     def animate_status_change(self, new_text, color=None):
-        """Animate status bar text changes with fade effect"""
-        if hasattr(self, 'status_bar'):
-            # Fade out current text
-            self.fade_status_text(0.0, new_text, color, fade_out=True)
-            
-    def fade_status_text(self, alpha, new_text, color, fade_out=True, steps=10):
-        """Create fade effect for status text"""
+        """Swap the status bar text after a short delay driven by the frame clock"""
         if not hasattr(self, 'status_bar'):
             return
-            
-        if fade_out:
-            if steps > 0:
-                # Fade out current text
-                alpha = steps / 10.0
-                self.after(20, lambda: self.fade_status_text(alpha, new_text, color, True, steps - 1))
-            else:
-                # Switch to new text and fade in
-                if hasattr(self.status_bar, 'configure'):
-                    self.status_bar.configure(text=new_text)
-                    if color:
-                        self.status_bar.configure(text_color=color)
-                self.fade_status_text(0.0, new_text, color, False, 0)
-        else:
-            if steps < 10:
-                # Fade in new text
-                alpha = steps / 10.0
-                self.after(20, lambda: self.fade_status_text(alpha, new_text, color, False, steps + 1))
-                
-    def apply_modern_styling(self):
-        """Applica stili moderni all'interfaccia"""
-        try:
-            # Configura stili globali
-            current_mode = ctk.get_appearance_mode().lower()
-            
-            # Applica effetti hover moderni
-            self.add_modern_hover_effects()
-            
-            # Configura animazioni se abilitate
-            if self.enable_animations:
-                self.add_smooth_transitions()
-                
-        except Exception as e:
-            print(f"Errore nell'applicazione degli stili moderni: {e}")
-    
-    def add_modern_hover_effects(self):
-        """Aggiunge effetti hover moderni agli elementi"""
-        def apply_hover_recursive(widget):
-            try:
-                if hasattr(widget, 'configure'):
-                    # Effetti hover per frame
-                    if isinstance(widget, ctk.CTkFrame) and widget.cget("border_width") > 0:
-                        original_border = widget.cget("border_color")
-                        hover_border = Colors.get_color(Colors.PRIMARY)
-                        
-                        def on_enter(event):
-                            widget.configure(border_color=hover_border)
-                        
-                        def on_leave(event):
-                            widget.configure(border_color=original_border)
-                        
-                        widget.bind("<Enter>", on_enter)
-                        widget.bind("<Leave>", on_leave)
-                    
-                    # Effetti hover per bottoni
-                    elif isinstance(widget, ctk.CTkButton):
-                        self.add_button_hover_effects(widget)
-                
-                # Applica ricorsivamente
-                for child in widget.winfo_children():
-                    apply_hover_recursive(child)
-                    
-            except Exception as e:
-                print(f"Errore negli effetti hover: {e}")
-        
-        apply_hover_recursive(self)
-    
-    def add_smooth_transitions(self):
-        """Aggiunge transizioni fluide a tutti gli elementi interattivi"""
-        def apply_transitions_recursive(widget):
-            try:
-                # Applica transizioni ai widget CTk
-                if hasattr(widget, 'configure'):
-                    # Configura transizioni per i frame
-                    if isinstance(widget, ctk.CTkFrame):
-                        # Migliora l'aspetto dei frame con angoli arrotondati
-                        current_radius = widget.cget("corner_radius")
-                        if current_radius < 12:
-                            widget.configure(corner_radius=12)
-                    
-                    # Transizioni per bottoni
-                    elif isinstance(widget, ctk.CTkButton):
-                        widget.configure(
-                            corner_radius=8,
-                            border_width=1,
-                            border_color=Colors.get_color(Colors.BORDER)
-                        )
-                    
-                    # Transizioni per entry/input
-                    elif isinstance(widget, ctk.CTkEntry):
-                        widget.configure(
-                            corner_radius=8,
-                            border_width=1,
-                            border_color=Colors.get_color(Colors.BORDER)
-                        )
-                
-                # Applica ricorsivamente ai widget figli
-                for child in widget.winfo_children():
-                    apply_transitions_recursive(child)
-                    
-            except Exception as e:
-                print(f"Errore nell'applicazione delle transizioni: {e}")
-        
-        apply_transitions_recursive(self)
 
+        def swap():
+            if hasattr(self.status_bar, 'configure'):
+                self.status_bar.configure(text=new_text)
+                if color:
+                    self.status_bar.configure(text_color=color)
+
+        self.clock.animate(self.status_bar, "status", 1.0, 200, lambda v: None,
+                           start=0.0, on_complete=swap, restart=True)
+                
     def _maybe_load_profile(self):
         """Se il token è stato verificato e il profilo non è ancora caricato, avvia il fetch."""
         try:
-            if self.verified_token and not self._profile_loaded:
-                threading.Thread(target=self._load_user_profile_thread, daemon=True).start()
+            if self.verified_token and not self._profile_loaded and not self._profile_loading:
+                self._profile_loading = True
+                self.runtime.submit(
+                    self._load_user_profile_async(self.verified_token),
+                    on_done=self._apply_user_profile,
+                    on_error=lambda _e: setattr(self, "_profile_loading", False)
+                )
         finally:
             # ricontrolla periodicamente, così se l'utente verifica il token dopo
             self.after(1000, self._maybe_load_profile)
 
-    def _load_user_profile_thread(self):
-        """Carica i dati utente Discord e aggiorna la UI (thread secondario)."""
-        token = self.verified_token
-        if not token:
-            return
+    async def _load_user_profile_async(self, token):
+        """Utente Discord e avatar (runtime asyncio); restituisce (user, avatar bytes)"""
         headers = {"Authorization": token, "Content-Type": "application/json"}
-        user_api = "https://discord.com/api/v10/users/@me"
-        user = None
-        try:
-            resp = requests.get(user_api, headers=headers, timeout=8)
-            if resp.status_code == 200:
-                user = resp.json()
-            else:
-                user = None
-        except Exception:
-            user = None
-
-        def finish():
-            if not user:
-                return
-            # Ricava nome visualizzato e avatar URL
-            username = user.get("global_name") or user.get("username") or "User"
-            user_id = user.get("id")
-            avatar = user.get("avatar")
-            avatar_url = None
-            if user_id and avatar:
-                avatar_url = f"https://cdn.discordapp.com/avatars/{user_id}/{avatar}.png?size=64"
-
-            photo = None
-            if avatar_url:
+        timeout = aiohttp.ClientTimeout(total=8)
+        async with self.runtime.session(headers=headers, timeout=timeout) as session:
+            async with session.get("https://discord.com/api/v10/users/@me") as resp:
+                if resp.status != 200:
+                    return None, None
+                user = await resp.json()
+            avatar_bytes = None
+            if user.get("id") and user.get("avatar"):
+                avatar_url = f"https://cdn.discordapp.com/avatars/{user['id']}/{user['avatar']}.png?size=64"
                 try:
-                    img_resp = requests.get(avatar_url, timeout=6)
-                    if img_resp.status_code == 200:
-                        img = Image.open(io.BytesIO(img_resp.content)).convert("RGBA")
-                        # Usa CTkImage per HiDPI
-                        photo = ctk.CTkImage(light_image=img, dark_image=img, size=(40, 40))
-                except Exception:
-                    photo = None
+                    async with session.get(avatar_url) as img_resp:
+                        if img_resp.status == 200:
+                            avatar_bytes = await img_resp.read()
+                except aiohttp.ClientError:
+                    avatar_bytes = None
+        return user, avatar_bytes
 
-            # Aggiorna UI
+    def _apply_user_profile(self, result):
+        """Aggiorna il profilo nell'header (thread Tk)"""
+        self._profile_loading = False
+        user, avatar_bytes = result
+        if not user:
+            return
+        from PIL import Image
+        # Ricava nome visualizzato
+        username = user.get("global_name") or user.get("username") or "User"
+
+        photo = None
+        if avatar_bytes:
             try:
-                self.profile_name_label.configure(text=username)
-                # sotto-etichetta opzionale: @username
-                tag = user.get("username")
-                if tag:
-                    self.profile_sub_label.configure(text=f"@{tag}")
-                if photo:
-                    self._profile_image_ref = photo
-                    self.profile_avatar_label.configure(image=photo, text="")
-                else:
-                    self.profile_avatar_label.configure(text="🙂", image=None)
-                self._profile_loaded = True
+                img = Image.open(io.BytesIO(avatar_bytes)).convert("RGBA")
+                # Usa CTkImage per HiDPI
+                photo = ctk.CTkImage(light_image=img, dark_image=img, size=(40, 40))
             except Exception:
-                pass
+                photo = None
 
-        self.after(0, finish)
+        # Aggiorna UI
+        try:
+            self.profile_name_label.configure(text=username)
+            # sotto-etichetta opzionale: @username
+            tag = user.get("username")
+            if tag:
+                self.profile_sub_label.configure(text=f"@{tag}")
+            if photo:
+                self._profile_image_ref = photo
+                self.profile_avatar_label.configure(image=photo, text="")
+            else:
+                self.profile_avatar_label.configure(text="🙂", image=None)
+            self._profile_loaded = True
+        except Exception:
+            pass
     
     def on_feature_toggle(self, feature_name, enabled):
         """Handle feature toggle changes from settings panel"""
@@ -818,6 +698,7 @@ class MainWindow(ctk.CTk):
                     self.restore_main_view()
 
             # Create embedded explorer
+            from src.interface.components.advanced_explorer import create_advanced_explorer_frame
             self.embedded_explorer = create_advanced_explorer_frame(
                 self.main_container,
                 self.lang,
@@ -1,3 +1,19 @@
+class Palette:
+    """Every Colors entry resolved for one appearance mode, as plain attributes"""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        for name, value in vars(Colors).items():
+            if name.isupper():
+                setattr(self, name, Colors.get_color(value, mode))
+
+    def __getitem__(self, name: str) -> str:
+        return getattr(self, name)
+
+    def get(self, name: str, default=None):
+        return getattr(self, name, default)
+
+
 class Colors:
     """Sistema di colori moderno e migliorato per l'interfaccia"""
     
@@ -201,6 +217,27 @@ class Colors:
     DISCORD_WHITE = "#FFFFFF"
     DISCORD_BLACK = "#000000"
 
+    _palettes = {}
+    _mode = None
+
+    @classmethod
+    def palette(cls, mode: str = None) -> Palette:
+        """Resolved palette for mode (default: the current appearance mode), built once per mode"""
+        if mode is None:
+            if cls._mode is None:
+                import customtkinter as ctk
+                cls._mode = ctk.get_appearance_mode().lower()
+            mode = cls._mode
+        palette = cls._palettes.get(mode)
+        if palette is None:
+            palette = cls._palettes[mode] = Palette(mode)
+        return palette
+
+    @classmethod
+    def set_mode(cls, mode: str):
+        """Record the appearance mode used by palette() (ThemeRegistry keeps it in sync)"""
+        cls._mode = mode
+
     @staticmethod
     def get_color(color_dict, theme="dark"):
         """Ottiene il colore appropriato per il tema specificato"""
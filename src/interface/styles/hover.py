@@ -0,0 +1,105 @@
+import customtkinter as ctk
+
+from src.interface.styles.colors import Colors
+
+
+class HoverDispatcher:
+    """App-wide hover effects through a single pair of bind_all handlers.
+
+    Nothing is bound per widget: on every <Enter>/<Leave> the dispatcher
+    resolves the CustomTkinter widget under the pointer (a button, or a frame
+    with a border) and styles only that one, so widgets created later (selector
+    rows, explorer items) get the same behaviour for free. Original colors are
+    read when the pointer arrives, not at start-up.
+    """
+
+    _instance = None
+    MAX_DEPTH = 12  # levels walked up from the Tk widget that got the event
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._root = None
+            cls._instance._current = None
+            cls._instance._saved = None
+            cls._instance._applied = None
+        return cls._instance
+
+    def install(self, root):
+        """Bind the dispatcher once on root (covers every toplevel of the app)"""
+        if self._root is not None:
+            return
+        self._root = root
+        root.bind_all("<Enter>", self._on_enter, add="+")
+        root.bind_all("<Leave>", self._on_leave, add="+")
+
+    def _target(self, widget):
+        """The hoverable CTk widget that owns widget, if any"""
+        for _ in range(self.MAX_DEPTH):
+            if widget is None or isinstance(widget, str):
+                return None
+            if getattr(widget, "_no_hover", False):
+                return None
+            if isinstance(widget, ctk.CTkButton):
+                return widget if widget.cget("state") != "disabled" else None
+            if isinstance(widget, ctk.CTkFrame) and not isinstance(widget, ctk.CTkScrollableFrame):
+                try:
+                    if widget.cget("border_width") > 0:
+                        return widget
+                except Exception:
+                    pass
+            widget = getattr(widget, "master", None)
+        return None
+
+    def _hover_style(self, widget) -> dict:
+        # Colori della modalità corrente (chiara o scura), risolti una volta per modalità
+        pal = Colors.palette()
+        if isinstance(widget, ctk.CTkButton):
+            return {
+                "fg_color": pal.PRIMARY_HOVER,
+                "text_color": pal.TEXT_ON_PRIMARY,
+                "border_color": pal.PRIMARY,
+            }
+        return {"border_color": pal.PRIMARY}
+
+    def _on_enter(self, event):
+        target = self._target(event.widget)
+        if target is self._current:
+            return
+        self._restore()
+        if target is None:
+            return
+        style = self._hover_style(target)
+        try:
+            self._saved = {key: target.cget(key) for key in style}
+            target.configure(**style)
+        except Exception:
+            return
+        self._current, self._applied = target, style
+
+    def _on_leave(self, event):
+        if self._current is None:
+            return
+        # Un <Leave> arriva anche passando dal canvas al testo dello stesso bottone
+        try:
+            x, y = self._root.winfo_pointerxy()
+            under = self._root.winfo_containing(x, y)
+        except Exception:
+            under = None
+        if self._target(under) is not self._current:
+            self._restore()
+
+    def _restore(self):
+        target, saved, applied = self._current, self._saved, self._applied
+        self._current = self._saved = self._applied = None
+        if target is None:
+            return
+        try:
+            if not target.winfo_exists():
+                return
+            # Se qualcuno ha cambiato i colori durante l'hover (es. selezione) non li sovrascriviamo
+            restore = {key: value for key, value in saved.items() if target.cget(key) == applied[key]}
+            if restore:
+                target.configure(**restore)
+        except Exception:
+            pass
@@ -1,5 +1,7 @@
 import tkinter as tk
 from tkinter import ttk
+import weakref
+import customtkinter as ctk
 from src.interface.styles.colors import Colors
 
 class ModernTheme:
@@ -63,4 +65,71 @@ def apply_theme(window):
         foreground=Colors.get_color(Colors.TEXT),
         activeBackground=Colors.get_color(Colors.PRIMARY_DARK),
         activeForeground=Colors.get_color(Colors.TEXT)
-    )
\ No newline at end of file
+    )
+
+
+def apply_ctk_defaults():
+    """Rounded corners and thin borders as CustomTkinter class defaults.
+
+    Must run before the widgets are built: every CTkFrame, CTkButton and
+    CTkEntry created afterwards picks them up unless it passes its own values,
+    so nothing has to walk the widget tree to restyle it.
+    """
+    # CustomTkinter vuole i colori come [chiaro, scuro]
+    border = [Colors.palette("light").BORDER, Colors.palette("dark").BORDER]
+    theme = ctk.ThemeManager.theme
+    theme["CTkFrame"]["corner_radius"] = max(theme["CTkFrame"]["corner_radius"], 12)
+    theme["CTkButton"].update(corner_radius=8, border_width=1, border_color=list(border))
+    theme["CTkEntry"].update(corner_radius=8, border_width=1, border_color=list(border))
+
+
+class ThemeRegistry:
+    """Themed widgets and the palette roles of their color options.
+
+    Components register each widget once with option=role pairs (e.g.
+    fg_color="SETTINGS_BG"); when the appearance mode changes, restyle()
+    reconfigures every live widget from the palette of the new mode in a
+    single pass, without walking widget trees.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._widgets = weakref.WeakKeyDictionary()
+            cls._instance._mode = None
+        return cls._instance
+
+    def register(self, widget, apply: bool = False, **roles):
+        """Track widget's color options; apply=True also styles it now"""
+        self._widgets.setdefault(widget, {}).update(roles)
+        if self._mode is None:
+            self._mode = Colors.palette().mode
+            # Segue anche i cambi di tema del sistema operativo (modalità "system")
+            ctk.AppearanceModeTracker.add(self._on_appearance_mode)
+        if apply:
+            self._configure(widget, roles, Colors.palette())
+
+    def restyle(self, mode: str = None):
+        """Reconfigure every registered widget for mode (default: current appearance mode)"""
+        mode = (mode or ctk.get_appearance_mode()).lower()
+        self._mode = mode
+        Colors.set_mode(mode)
+        palette = Colors.palette(mode)
+        for widget, roles in list(self._widgets.items()):
+            self._configure(widget, roles, palette)
+
+    def _configure(self, widget, roles, palette):
+        try:
+            if widget.winfo_exists():
+                widget.configure(**{option: palette[role] for option, role in roles.items()})
+                return
+        except Exception:
+            pass
+        self._widgets.pop(widget, None)
+
+    def _on_appearance_mode(self, mode_string):
+        if mode_string.lower() != self._mode:
+            self.restyle(mode_string)
+
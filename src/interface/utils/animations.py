@@ -1,6 +1,195 @@
 import customtkinter as ctk
-from typing import Callable
+from typing import Callable, Optional
 import math
+import time
+
+
+def ease_out_quad(p: float) -> float:
+    return p * (2 - p)
+
+
+def ease_in_quad(p: float) -> float:
+    return p * p
+
+
+def ease_out_quint(p: float) -> float:
+    return 1 - math.pow(1 - p, 5)
+
+
+def ease_in_out_sine(p: float) -> float:
+    return 0.5 - 0.5 * math.cos(p * math.pi)
+
+
+def linear(p: float) -> float:
+    return p
+
+
+class Tween:
+    """One property of one widget moving from start to end"""
+
+    __slots__ = ("key", "start", "end", "duration", "apply", "easing", "on_complete",
+                 "elapsed", "delay", "value", "applied")
+
+    def __init__(self, key, start: float, end: float, duration: float, apply: Callable[[float], None],
+                 easing: Callable[[float], float], on_complete: Optional[Callable], delay: float):
+        self.key = key
+        self.start = start
+        self.end = end
+        self.duration = max(duration, 1.0)
+        self.apply = apply
+        self.easing = easing
+        self.on_complete = on_complete
+        self.elapsed = 0.0
+        self.delay = delay
+        self.value = start
+        self.applied = None
+
+    def advance(self, dt: float) -> bool:
+        """Move forward dt ms; True once the tween has reached its end"""
+        if self.delay > 0:
+            self.delay -= dt
+            if self.delay > 0:
+                return False
+            dt = -self.delay
+        self.elapsed += dt
+        progress = min(1.0, self.elapsed / self.duration)
+        self.value = self.start + (self.end - self.start) * self.easing(progress)
+        return progress >= 1.0
+
+
+class FrameClock:
+    """The single timer that drives every animation of the GUI.
+
+    All active tweens are advanced and applied in one after() callback per
+    frame; the timer only runs while there is something to animate and stops
+    while the window is minimized or withdrawn. Starting a tween on a
+    (widget, property) pair that is already animating replaces the old tween,
+    continuing from the value it had reached.
+    """
+
+    _instance = None
+    FPS = 60
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._root = None
+            cls._instance._tweens = {}
+            cls._instance._after_id = None
+            cls._instance._last = None
+            cls._instance._paused = False
+            cls._instance.frames = 0
+        return cls._instance
+
+    def attach(self, root):
+        """Use root for scheduling and pause while it is not visible"""
+        self._root = root
+        root.bind("<Unmap>", self._on_unmap, add="+")
+        root.bind("<Map>", self._on_map, add="+")
+
+    @property
+    def active(self) -> int:
+        return len(self._tweens)
+
+    def animate(self, widget, prop: str, end: float, duration: float, apply: Callable[[float], None],
+                start: float, easing: Callable[[float], float] = ease_out_quad,
+                on_complete: Optional[Callable] = None, delay: float = 0, restart: bool = False) -> Tween:
+        """Tween widget's prop from start to end over duration ms, calling apply(value) once per frame.
+
+        If the property is already animating, the new tween continues from the
+        value reached so far instead of start (a running tween towards the same
+        end is kept as it is); restart=True always begins again from start.
+        """
+        key = (id(widget), prop)
+        current = self._tweens.get(key)
+        if current is not None and not restart:
+            if current.end == end:
+                if on_complete is not None:
+                    current.on_complete = on_complete
+                return current
+            start = current.value
+        tween = Tween(key, float(start), float(end), duration, apply, easing, on_complete, delay)
+        self._tweens[key] = tween
+        if self._root is None:
+            self._root = widget
+        self._schedule()
+        return tween
+
+    def cancel(self, widget, prop: Optional[str] = None):
+        """Drop the tweens of widget (one property or all) without completing them"""
+        for key in [k for k in self._tweens if k[0] == id(widget) and (prop is None or k[1] == prop)]:
+            del self._tweens[key]
+
+    def _schedule(self):
+        if self._after_id is not None or self._paused or not self._tweens:
+            return
+        try:
+            self._after_id = self._root.after(int(1000 / self.FPS), self._tick)
+        except Exception:
+            # Il widget di riferimento è stato distrutto
+            self._root = None
+            self._tweens.clear()
+
+    def _tick(self):
+        self._after_id = None
+        now = time.perf_counter()
+        # Il primo frame dopo una pausa vale un frame, non il tempo passato da minimizzati
+        dt = 1000 / self.FPS if self._last is None else min((now - self._last) * 1000, 100.0)
+        self._last = now
+        self.frames += 1
+
+        finished = []
+        for tween in list(self._tweens.values()):
+            if tween.advance(dt):
+                finished.append(tween)
+            if tween.delay <= 0:
+                self._apply(tween)
+        for tween in finished:
+            if self._tweens.get(tween.key) is tween:
+                del self._tweens[tween.key]
+            self._complete(tween)
+
+        if self._tweens:
+            self._schedule()
+        else:
+            self._last = None
+
+    def _apply(self, tween: Tween):
+        # Saltiamo il configure se il valore (arrotondato) non è cambiato dall'ultimo frame
+        value = round(tween.value, 3)
+        if value == tween.applied:
+            return
+        tween.applied = value
+        try:
+            tween.apply(tween.value)
+        except Exception:
+            self._tweens.pop(tween.key, None)
+
+    def _complete(self, tween: Tween):
+        if tween.on_complete:
+            try:
+                tween.on_complete()
+            except Exception as e:
+                print(f"Animation callback error: {e}")
+
+    def _on_unmap(self, event):
+        if event.widget is not self._root or self._paused:
+            return
+        self._paused = True
+        self._last = None
+        if self._after_id is not None:
+            try:
+                self._root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _on_map(self, event):
+        if event.widget is not self._root or not self._paused:
+            return
+        self._paused = False
+        self._schedule()
+
 
 class AnimationManager:
     @staticmethod
@@ -8,167 +197,100 @@ class AnimationManager:
         """
         Executes a smooth opacity transition
         """
-        steps = 120  # Increased FPS for smoother animation
-        step_time = duration / steps
-        
-        def animate(current_step=0):
-            if current_step <= steps:
-                progress = current_step / steps
-                # Cubic easing function for more natural movement
-                eased = progress * (2 - progress)
-                current = start + (end - start) * eased
-                
-                widget.attributes('-alpha', current)
-                widget.after(int(step_time), lambda: animate(current_step + 1))
-            elif on_complete:
-                on_complete()
-                
-        animate()
-    
+        FrameClock().animate(widget, "alpha", end, duration,
+                             lambda v: widget.attributes('-alpha', v),
+                             start=start, easing=ease_out_quad, on_complete=on_complete)
+
     @staticmethod
-    def slide_in(widget: ctk.CTkFrame, direction: str = "right", duration: int = 200, on_complete: Callable = None):
-        """
-        Slides a widget into view with smooth movement
-        """
+    def _slide(widget, direction: str, duration: int, entering: bool, on_complete: Callable = None, delay: int = 0):
         original_pos = widget.winfo_x(), widget.winfo_y()
         screen_width = widget.winfo_screenwidth()
-        
-        steps = 120  # Increased FPS
-        step_time = duration / steps
-        
-        def animate(current_step=0):
-            if current_step <= steps:
-                progress = current_step / steps
-                # Elastic easing function for more natural movement
-                eased = 1 - math.pow(1 - progress, 5)
-                
+        screen_height = widget.winfo_screenheight()
+
+        def apply(eased):
+            if entering:
                 if direction == "right":
-                    current_x = screen_width - (screen_width - original_pos[0]) * eased
-                    widget.place(x=current_x, y=original_pos[1])
+                    widget.place(x=screen_width - (screen_width - original_pos[0]) * eased, y=original_pos[1])
                 elif direction == "left":
-                    current_x = -widget.winfo_width() + (original_pos[0] + widget.winfo_width()) * eased
-                    widget.place(x=current_x, y=original_pos[1])
+                    widget.place(x=-widget.winfo_width() + (original_pos[0] + widget.winfo_width()) * eased, y=original_pos[1])
                 elif direction == "top":
-                    current_y = -widget.winfo_height() + (original_pos[1] + widget.winfo_height()) * eased
-                    widget.place(x=original_pos[0], y=current_y)
+                    widget.place(x=original_pos[0], y=-widget.winfo_height() + (original_pos[1] + widget.winfo_height()) * eased)
                 elif direction == "bottom":
-                    screen_height = widget.winfo_screenheight()
-                    current_y = screen_height - (screen_height - original_pos[1]) * eased
-                    widget.place(x=original_pos[0], y=current_y)
-                
-                widget.after(int(step_time), lambda: animate(current_step + 1))
-            elif on_complete:
-                on_complete()
-                
-        animate()
-    
+                    widget.place(x=original_pos[0], y=screen_height - (screen_height - original_pos[1]) * eased)
+            else:
+                if direction == "right":
+                    widget.place(x=original_pos[0] + (screen_width - original_pos[0]) * eased, y=original_pos[1])
+                elif direction == "left":
+                    widget.place(x=original_pos[0] - (original_pos[0] + widget.winfo_width()) * eased, y=original_pos[1])
+                elif direction == "top":
+                    widget.place(x=original_pos[0], y=original_pos[1] - (original_pos[1] + widget.winfo_height()) * eased)
+                elif direction == "bottom":
+                    widget.place(x=original_pos[0], y=original_pos[1] + (screen_height - original_pos[1]) * eased)
+
+        # Entrata: decelerazione marcata; uscita: accelerazione
+        FrameClock().animate(widget, "place", 1.0, duration, apply, start=0.0,
+                             easing=ease_out_quint if entering else ease_in_quad,
+                             on_complete=on_complete, delay=delay, restart=True)
+
+    @staticmethod
+    def slide_in(widget: ctk.CTkFrame, direction: str = "right", duration: int = 200, on_complete: Callable = None):
+        """
+        Slides a widget into view with smooth movement
+        """
+        AnimationManager._slide(widget, direction, duration, True, on_complete)
+
     @staticmethod
     def slide_out(widget: ctk.CTkFrame, direction: str = "right", duration: int = 200, on_complete: Callable = None):
         """
         Slides a widget out of view with smooth movement
         """
-        original_pos = widget.winfo_x(), widget.winfo_y()
-        screen_width = widget.winfo_screenwidth()
-        
-        steps = 120  # Increased FPS
-        step_time = duration / steps
-        
-        def animate(current_step=0):
-            if current_step <= steps:
-                progress = current_step / steps
-                # Accelerated easing function for more natural exit
-                eased = progress * progress
-                
-                if direction == "right":
-                    current_x = original_pos[0] + (screen_width - original_pos[0]) * eased
-                    widget.place(x=current_x, y=original_pos[1])
-                elif direction == "left":
-                    current_x = original_pos[0] - (original_pos[0] + widget.winfo_width()) * eased
-                    widget.place(x=current_x, y=original_pos[1])
-                elif direction == "top":
-                    current_y = original_pos[1] - (original_pos[1] + widget.winfo_height()) * eased
-                    widget.place(x=original_pos[0], y=current_y)
-                elif direction == "bottom":
-                    screen_height = widget.winfo_screenheight()
-                    current_y = original_pos[1] + (screen_height - original_pos[1]) * eased
-                    widget.place(x=original_pos[0], y=current_y)
-                
-                widget.after(int(step_time), lambda: animate(current_step + 1))
-            elif on_complete:
-                on_complete()
-                
-        animate()
-    
+        AnimationManager._slide(widget, direction, duration, False, on_complete)
+
     @staticmethod
     def pulse(widget, scale_start=1.0, scale_end=1.05, duration=500, repeat=False, on_complete: Callable = None):
         """
         Creates a gentle pulsing animation by scaling a widget
         """
-        steps = 120
-        step_time = duration / steps
-        
-        # Store original size
         original_width = widget.winfo_width()
         original_height = widget.winfo_height()
-        
-        def animate(current_step=0, direction=1):
-            if current_step <= steps:
-                progress = current_step / steps
-                # Smooth sine easing
-                eased = 0.5 - 0.5 * math.cos(progress * math.pi)
-                
-                if direction > 0:  # Scaling up
-                    current_scale = scale_start + (scale_end - scale_start) * eased
-                else:  # Scaling down
-                    current_scale = scale_end - (scale_end - scale_start) * eased
-                
-                # Apply scaling
-                new_width = int(original_width * current_scale)
-                new_height = int(original_height * current_scale)
-                
-                # Calculate position to keep the widget centered
-                x_offset = (new_width - original_width) // 2
-                y_offset = (new_height - original_height) // 2
-                
-                # Configure the widget
-                try:
-                    widget.configure(width=new_width, height=new_height)
-                except:
-                    pass  # Some widgets might not support direct resizing
-                
-                widget.after(int(step_time), lambda: animate(current_step + 1, direction))
-            else:
-                if repeat:
-                    # Reverse the direction and continue
-                    animate(0, -direction)
-                elif on_complete:
-                    on_complete()
-        
-        animate()
-    
+
+        def apply(scale):
+            try:
+                widget.configure(width=int(original_width * scale), height=int(original_height * scale))
+            except Exception:
+                pass  # Some widgets might not support direct resizing
+
+        def run(start, end):
+            # Con repeat si torna indietro all'infinito, finché qualcuno non chiama FrameClock().cancel()
+            done = (lambda: run(end, start)) if repeat else on_complete
+            FrameClock().animate(widget, "size", end, duration, apply, start=start,
+                                 easing=ease_in_out_sine, on_complete=done, restart=True)
+
+        run(scale_start, scale_end)
+
     @staticmethod
     def blink(widget, color1, color2, duration=500, repeats=3, on_complete: Callable = None):
         """
         Creates a blinking animation by alternating colors
         """
-        step_time = duration // 2  # Half for each color
-        
-        def animate(current_step=0):
-            if current_step < repeats * 2:
-                if current_step % 2 == 0:
-                    widget.configure(fg_color=color2)
-                else:
-                    widget.configure(fg_color=color1)
-                
-                widget.after(step_time, lambda: animate(current_step + 1))
-            else:
-                # Return to original color
-                widget.configure(fg_color=color1)
-                if on_complete:
-                    on_complete()
-        
-        animate()
-    
+        phases = repeats * 2
+        shown = [None]
+
+        def apply(value):
+            # Il colore cambia solo al passaggio di fase, non a ogni frame
+            phase = min(int(value), phases - 1)
+            if phase != shown[0]:
+                shown[0] = phase
+                widget.configure(fg_color=color2 if phase % 2 == 0 else color1)
+
+        def done():
+            widget.configure(fg_color=color1)
+            if on_complete:
+                on_complete()
+
+        FrameClock().animate(widget, "blink", float(phases), duration / 2 * phases, apply,
+                             start=0.0, easing=linear, on_complete=done, restart=True)
+
     @staticmethod
     def sequential_reveal(widgets, delay=100, duration=300, direction="right"):
         """
@@ -177,6 +299,4 @@ class AnimationManager:
         for i, widget in enumerate(widgets):
             # Hide initially
             widget.place_forget()
-            
-            # Schedule reveal with increasing delay
-            widget.after(i * delay, lambda w=widget: AnimationManager.slide_in(w, direction, duration))
\ No newline at end of file
+            AnimationManager._slide(widget, direction, duration, True, delay=i * delay)
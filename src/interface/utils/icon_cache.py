@@ -0,0 +1,151 @@
+import os
+import io
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+import aiohttp
+from PIL import Image
+
+from src.operation_file.async_runtime import AsyncRuntime
+
+ICON_CDN_URL = "https://cdn.discordapp.com/icons/{guild_id}/{icon}.png?size=64"
+
+
+# Icone da 64px: decodifica in un thread, il pool di processi resta per i transcode grandi di assets.py
+def decode_and_store(data: bytes, path: str, size: int) -> Optional[Image.Image]:
+    """Decode, downscale and persist an icon (runs in a worker thread)"""
+    try:
+        image = Image.open(io.BytesIO(data)).convert("RGBA")
+        image.thumbnail((size, size), Image.LANCZOS)
+    except Exception:
+        return None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        image.save(tmp_path, format="PNG")
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error caching icon: {e}")
+    return image
+
+
+def read_cached(path: str) -> Optional[Image.Image]:
+    try:
+        with Image.open(path) as image:
+            return image.convert("RGBA")
+    except Exception:
+        return None
+
+
+class GuildIconCache:
+    """Background prefetcher for guild icons backed by a persistent disk cache.
+
+    Icons are downloaded with bounded concurrency, decoded and downscaled in
+    a worker thread (never on the Tk thread) and stored on disk already
+    resized, so later launches only need to read a tiny PNG per guild. At most
+    MAX_IMAGES decoded icons stay in memory, least recently used evicted first.
+    """
+
+    _instance = None
+    _cache_dir = os.path.join("src", "interface", "config", "icon_cache")
+    ICON_SIZE = 48  # stored size, rendered at 24px so HiDPI screens stay sharp
+    MAX_CONCURRENCY = 8
+    MAX_IMAGES = 256
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._images = OrderedDict()
+            cls._instance._inflight = set()
+            cls._instance._lock = threading.Lock()
+        return cls._instance
+
+    def get(self, guild_id: str, icon_hash: str) -> Optional[Image.Image]:
+        """Return the decoded icon if it is already in memory"""
+        key = (str(guild_id), icon_hash)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def _remember(self, key, image: Image.Image):
+        with self._lock:
+            self._images[key] = image
+            self._images.move_to_end(key)
+            while len(self._images) > self.MAX_IMAGES:
+                self._images.popitem(last=False)
+
+    def prefetch(self, guilds: Iterable[dict], on_icon: Callable[[str, Image.Image], None]):
+        """Fetch icons for all guilds on the shared async runtime.
+
+        on_icon(guild_id, image) is called from the runtime thread as each icon
+        becomes available; callers must marshal to the Tk thread themselves.
+        """
+        pending = []
+        for guild in guilds:
+            guild_id = str(guild.get("id"))
+            icon_hash = guild.get("icon")
+            if not icon_hash:
+                continue
+            cached = self.get(guild_id, icon_hash)
+            if cached is not None:
+                on_icon(guild_id, cached)
+                continue
+            with self._lock:
+                if (guild_id, icon_hash) in self._inflight:
+                    continue
+                self._inflight.add((guild_id, icon_hash))
+            pending.append((guild_id, icon_hash))
+
+        if pending:
+            AsyncRuntime().submit(self._prefetch_async(pending, on_icon))
+
+    async def _prefetch_async(self, pending, on_icon):
+        try:
+            semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+            timeout = aiohttp.ClientTimeout(total=15)
+            async with AsyncRuntime().session(timeout=timeout) as session:
+                async def load(guild_id, icon_hash):
+                    async with semaphore:
+                        image = await self._load_one(session, guild_id, icon_hash)
+                    if image is not None:
+                        self._remember((guild_id, icon_hash), image)
+                        try:
+                            on_icon(guild_id, image)
+                        except Exception as e:
+                            print(f"Icon callback error: {e}")
+
+                await asyncio.gather(*(load(gid, ih) for gid, ih in pending), return_exceptions=True)
+        except Exception as e:
+            print(f"Icon prefetch error: {e}")
+        finally:
+            with self._lock:
+                for key in pending:
+                    self._inflight.discard(key)
+
+    async def _load_one(self, session, guild_id, icon_hash) -> Optional[Image.Image]:
+        path = self._cache_path(guild_id, icon_hash)
+
+        # Disk hit: decode off the event loop as well, PNG decoding is not free
+        if os.path.exists(path):
+            image = await asyncio.to_thread(read_cached, path)
+            if image is not None:
+                return image
+
+        try:
+            async with session.get(ICON_CDN_URL.format(guild_id=guild_id, icon=icon_hash)) as resp:
+                if resp.status != 200:
+                    return None
+                data = await resp.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+
+        return await asyncio.to_thread(decode_and_store, data, path, self.ICON_SIZE)
+
+    def _cache_path(self, guild_id: str, icon_hash: str) -> str:
+        # The hash changes whenever the icon does, so stale files are never served
+        return os.path.join(self._cache_dir, f"{guild_id}_{icon_hash}.png")
+
@@ -1,25 +1,31 @@
 import json
 import os
 import sys
+from string import Formatter
 from typing import Dict
 
+_FORMATTER = Formatter()
+
 class LanguageManager:
 
     _instance = None
     _current_language = "en-US"
-    _translations: Dict = {}
+    _translations: Dict[str, Dict[str, str]] = {}  # lang -> flat table "a.b.c" -> text
+    _formatted: Dict[str, frozenset] = {}  # lang -> keys that contain {placeholders}
+    _language_files: Dict[str, str] = {}
     _observers = []
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._load_translations()
-            cls._instance._current_language = "en-US"
         return cls._instance
     
     def _load_translations(self):
-        """Carica le traduzioni dai file JSON"""
+        """Indicizza i file di lingua e carica subito solo en-US (+ la lingua attiva)"""
         self._translations = {}
+        self._formatted = {}
+        self._language_files = {}
         
         # Determina il percorso base dell'applicazione (funziona sia in modalità di sviluppo che compilata)
         if getattr(sys, 'frozen', False):
@@ -38,54 +44,107 @@ class LanguageManager:
         print(f"Looking for language files in: {language_dir}")
         
         if os.path.exists(language_dir):
-            for filename in os.listdir(language_dir):
+            for filename in sorted(os.listdir(language_dir)):
                 if filename.endswith(".json"):
                     lang_code = filename.split(".")[0]
-                    file_path = os.path.join(language_dir, filename)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                            # Basic schema validation: ensure it's a dict and has minimal keys
-                            if isinstance(data, dict):
-                                self._translations[lang_code] = data
-                                print(f"Loaded language file: {filename}")
-                            else:
-                                print(f"Invalid language file (not a dict): {filename}")
-                    except Exception as e:
-                        print(f"Error loading language file {filename}: {e}")
+                    self._language_files[lang_code] = os.path.join(language_dir, filename)
         else:
             print(f"Language directory not found: {language_dir}")
         
+        self._ensure_loaded("en-US")
+        if self._current_language != "en-US":
+            self._ensure_loaded(self._current_language)
+        
         # Fallback to English if no translations loaded
         if not self._translations:
             print("No language files found, using hardcoded English")
-            self._translations["en-US"] = {
+            self._store_table("en-US", {
                 "app": {
                     "title": "Discord Server Cloner",
                     "subtitle": "Clone servers with ease"
                 }
-            }
+            })
+        self._activate(self._current_language if self._current_language in self._translations else "en-US")
+    
+    def _ensure_loaded(self, lang_code: str) -> bool:
+        """Carica e appiattisce una lingua alla prima richiesta"""
+        if lang_code in self._translations:
+            return True
+        file_path = self._language_files.get(lang_code)
+        if not file_path:
+            return False
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Error loading language file {os.path.basename(file_path)}: {e}")
+            return False
+        # Basic schema validation: ensure it's a dict
+        if not isinstance(data, dict):
+            print(f"Invalid language file (not a dict): {os.path.basename(file_path)}")
+            return False
+        self._store_table(lang_code, data)
+        print(f"Loaded language file: {os.path.basename(file_path)}")
+        return True
+    
+    def _store_table(self, lang_code: str, data: dict):
+        """Flatten a language file into "a.b.c" -> text, with en-US already merged in as fallback"""
+        flat = {}
+        self._flatten(data, "", flat)
+        if lang_code != "en-US" and "en-US" in self._translations:
+            table = dict(self._translations["en-US"])
+            table.update(flat)
+        else:
+            table = flat
+        self._translations[lang_code] = table
+        # Solo le stringhe con segnaposto passano da str.format
+        self._formatted[lang_code] = frozenset(k for k, v in table.items() if self._has_placeholders(v))
+    
+    @classmethod
+    def _flatten(cls, node: dict, prefix: str, out: dict):
+        for k, v in node.items():
+            key = f"{prefix}{k}"
+            if isinstance(v, dict):
+                cls._flatten(v, key + ".", out)
+            else:
+                out[key] = v
+    
+    @staticmethod
+    def _has_placeholders(value) -> bool:
+        if not isinstance(value, str) or "{" not in value:
+            return False
+        try:
+            return any(field is not None for _, field, _, _ in _FORMATTER.parse(value))
+        except ValueError:
+            return False
+    
+    def _activate(self, lang_code: str):
+        self._current_language = lang_code
+        self._active_table = self._translations[lang_code]
+        self._active_formatted = self._formatted[lang_code]
     
     def get_text(self, key: str, **kwargs) -> str:
         """
         Get translated text for the specified key
         Example: get_text("settings.title")
         """
-        try:
-            keys = key.split(".")
-            value = self._translations[self._current_language]
-            for k in keys:
-                value = value[k]
-            return value.format(**kwargs) if kwargs else value
-        except (KeyError, AttributeError):
-            # If key doesn't exist, use English as fallback
+        value = self._active_table.get(key)
+        if value is None:
+            return key
+        if kwargs and key in self._active_formatted:
             try:
-                value = self._translations["en-US"]
-                for k in keys:
-                    value = value[k]
-                return value.format(**kwargs) if kwargs else value
-            except (KeyError, AttributeError):
-                return key
+                return value.format(**kwargs)
+            except (KeyError, IndexError, ValueError):
+                return value
+        return value
+    
+    def _display_name(self, lang_code: str) -> str:
+        """Nome della lingua (settings.language.languages.<code>) dalle tabelle già caricate.
+
+        Ogni file elenca i nomi di tutte le lingue: non serve aprire quello di lang_code.
+        """
+        key = f"settings.language.languages.{lang_code}"
+        return self._active_table.get(key) or self._translations.get("en-US", {}).get(key, lang_code)
     
     def set_language(self, lang_identifier: str) -> bool:
         """
@@ -95,36 +154,32 @@ class LanguageManager:
         """
         code = None
         # Direct match by code
-        if lang_identifier in self._translations:
+        if lang_identifier in self._language_files or lang_identifier in self._translations:
             code = lang_identifier
         else:
             # Try resolve by display name
-            for lang_code in self._translations.keys():
-                try:
-                    display_name = self._translations[lang_code]["settings"]["language"]["languages"][lang_code]
-                    if display_name == lang_identifier:
-                        code = lang_code
-                        break
-                except Exception:
-                    continue
-        if code and code in self._translations:
-            self._current_language = code
+            for lang_code in self._known_languages():
+                if self._display_name(lang_code) == lang_identifier:
+                    code = lang_code
+                    break
+        if code and self._ensure_loaded(code):
+            self._activate(code)
             self._notify_observers()
             return True
         return False
     
+    def _known_languages(self):
+        codes = list(self._language_files.keys())
+        codes.extend(c for c in self._translations.keys() if c not in self._language_files)
+        return codes
+    
     def get_available_languages(self) -> dict:
         """
         Returns available languages in format:
         {"it-IT": "Italiano", "en-US": "English", "fr-FR": "Français", "np-NP": "Nepali" ...}
+        Codes come from the file names; a table is only loaded once its language is selected.
         """
-        languages = {}
-        for lang_code in self._translations.keys():
-            try:
-                languages[lang_code] = self._translations[lang_code]["settings"]["language"]["languages"][lang_code]
-            except KeyError:
-                languages[lang_code] = lang_code
-        return languages
+        return {lang_code: self._display_name(lang_code) for lang_code in self._known_languages()}
     
     def get_language_name(self, lang_code: str = None) -> str:
         """
@@ -132,10 +187,7 @@ class LanguageManager:
         """
         if lang_code is None:
             lang_code = self._current_language
-        try:
-            return self._translations[self._current_language]["settings"]["language"]["languages"][lang_code]
-        except KeyError:
-            return lang_code
+        return self._active_table.get(f"settings.language.languages.{lang_code}", lang_code)
 
     def add_observer(self, callback):
         """Add observer for language changes"""
@@ -161,12 +213,6 @@ class LanguageManager:
 
     def reload_languages(self):
         """Reload language files from disk and keep current selection if possible."""
-        current = self._current_language
+        # _load_translations riattiva la lingua corrente se esiste ancora, altrimenti en-US
         self._load_translations()
-        # Restore current language if still available; otherwise fallback to first available
-        if current in self._translations:
-            self._current_language = current
-        else:
-            # Pick English if present, else any available
-            self._current_language = "en-US" if "en-US" in self._translations else next(iter(self._translations.keys()))
-        self._notify_observers()
\ No newline at end of file
+        self._notify_observers()
@@ -0,0 +1,79 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Optional
+
+
+class SessionCache:
+    """Last known user + guild list per token, for stale-while-revalidate start up.
+
+    Entries are keyed by a SHA-256 of the token: the token itself is never
+    written to disk. Only the few most recently used tokens are kept.
+    """
+
+    _instance = None
+    _cache_file = os.path.join("src", "interface", "config", "session_cache.json")
+    MAX_ENTRIES = 5
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._entries = {}
+            cls._instance._lock = threading.Lock()
+            cls._instance._load()
+        return cls._instance
+
+    @staticmethod
+    def token_key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def _load(self):
+        try:
+            if os.path.exists(self._cache_file):
+                with open(self._cache_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._entries = data
+        except Exception as e:
+            print(f"Error loading session cache: {e}")
+
+    def _save(self):
+        with self._lock:
+            data = json.dumps(self._entries)
+        tmp_path = self._cache_file + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self._cache_file), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self._cache_file)
+        except Exception as e:
+            print(f"Error saving session cache: {e}")
+
+    def get(self, token: str) -> Optional[dict]:
+        """Return {"username", "guilds", "fetched_at"} or None"""
+        with self._lock:
+            entry = self._entries.get(self.token_key(token))
+            return dict(entry) if entry else None
+
+    def put(self, token: str, username: str, guilds: list) -> bool:
+        """Store a fresh result; returns True if it differs from what was cached"""
+        key = self.token_key(token)
+        with self._lock:
+            previous = self._entries.get(key)
+            changed = previous is None or previous.get("username") != username or previous.get("guilds") != guilds
+            self._entries[key] = {"username": username, "guilds": guilds, "fetched_at": time.time()}
+            # Teniamo solo i token usati più di recente
+            if len(self._entries) > self.MAX_ENTRIES:
+                oldest = sorted(self._entries, key=lambda k: self._entries[k].get("fetched_at", 0))
+                for stale in oldest[:len(self._entries) - self.MAX_ENTRIES]:
+                    del self._entries[stale]
+        self._save()
+        return changed
+
+    def invalidate(self, token: str):
+        with self._lock:
+            removed = self._entries.pop(self.token_key(token), None)
+        if removed is not None:
+            self._save()
@@ -1,5 +1,8 @@
 import json
 import os
+import copy
+import atexit
+import threading
 from typing import Dict, Any
 
 class SettingsManager:
@@ -22,11 +25,22 @@ class SettingsManager:
         }
     }
     _settings_file = os.path.join("src", "interface", "config", "user_settings.json")
+    SAVE_DELAY = 0.5  # seconds: changes made within this window are written once
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            cls._instance._lock = threading.RLock()
+            # Solo I/O: get/set dal thread Tk non aspettano mai il disco
+            cls._instance._write_lock = threading.Lock()
+            cls._instance._generation = 0
+            cls._instance._saved_generation = 0
+            cls._instance._save_timer = None
+            cls._instance._dirty = False
+            cls._instance._last_written = None
             cls._instance._load_settings()
+            # Make sure a pending debounced write is not lost on exit
+            atexit.register(cls._instance.flush)
         return cls._instance
     
     def _load_settings(self):
@@ -37,22 +51,71 @@ class SettingsManager:
             
             if os.path.exists(self._settings_file):
                 with open(self._settings_file, 'r', encoding='utf-8') as f:
-                    saved_settings = json.load(f)
+                    raw = f.read()
+                    saved_settings = json.loads(raw)
+                    self._last_written = raw
                     # Update settings keeping default values for missing keys
                     self._update_nested_dict(self._settings, saved_settings)
         except Exception as e:
             print(f"Error loading settings: {e}")
     
+    def _schedule_save(self):
+        """Mark settings dirty and (re)start the debounce timer"""
+        with self._lock:
+            self._dirty = True
+            self._generation += 1
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.SAVE_DELAY, self._save_settings)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def flush(self):
+        """Write pending changes immediately (called on exit)"""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+        self._save_settings()
+    
     def _save_settings(self):
-        """Save settings to file"""
-        try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(self._settings_file), exist_ok=True)
-            
-            with open(self._settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self._settings, f, indent=4)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
+        """Save settings to file (timer thread): temp file + atomic rename"""
+        # Sotto _lock solo la copia serializzata e la sua generazione; il disco sotto _write_lock,
+        # così timer e flush di chiusura non si sovrappongono sullo stesso .tmp
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._save_timer = None
+            data = json.dumps(self._settings, indent=4)
+            generation = self._generation
+        with self._write_lock:
+            # Una scrittura in ritardo non sostituisce una più recente
+            if generation <= self._saved_generation:
+                return
+            # Il contenuto può essere tornato identico a quello su disco (es. toggle avanti e indietro)
+            if data == self._last_written:
+                self._saved_generation = generation
+                return
+            tmp_path = self._settings_file + ".tmp"
+            try:
+                # Create directory if it doesn't exist
+                os.makedirs(os.path.dirname(self._settings_file), exist_ok=True)
+                
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self._settings_file)
+                self._last_written = data
+                self._saved_generation = generation
+            except Exception as e:
+                print(f"Error saving settings: {e}")
+                try:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                except OSError:
+                    pass
     
     def _update_nested_dict(self, d1: dict, d2: dict):
         """Update a nested dictionary maintaining original structure"""
@@ -84,19 +147,25 @@ class SettingsManager:
             return False
             
         *keys, value = keys_and_value
-        current = self._settings
-        
-        # Navigate through dictionary
-        for key in keys[:-1]:
-            if key not in current or not isinstance(current[key], dict):
-                current[key] = {}
-            current = current[key]
+        with self._lock:
+            current = self._settings
             
-        # Set value
-        current[keys[-1]] = value
-        self._save_settings()
+            # Navigate through dictionary
+            for key in keys[:-1]:
+                if key not in current or not isinstance(current[key], dict):
+                    current[key] = {}
+                current = current[key]
+            
+            # Unchanged values never trigger a write
+            if keys[-1] in current and current[keys[-1]] == value:
+                return True
+            
+            # Set value
+            current[keys[-1]] = value
+        self._schedule_save()
         return True
     
     def get_all_settings(self) -> Dict[str, Any]:
         """Returns all settings"""
-        return self._settings.copy()
\ No newline at end of file
+        with self._lock:
+            return copy.deepcopy(self._settings)
\ No newline at end of file
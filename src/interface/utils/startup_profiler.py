@@ -0,0 +1,118 @@
+import sys
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class _TimedLoader:
+    """Loader proxy that measures how long a module body takes to execute"""
+
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(module.__name__)
+            # Hand the real loader back so nothing downstream ever sees the proxy
+            if getattr(module, "__loader__", None) is self:
+                module.__loader__ = self._loader
+            spec = getattr(module, "__spec__", None)
+            if spec is not None and spec.loader is self:
+                spec.loader = self._loader
+
+    def __getattr__(self, item):
+        return getattr(self._loader, item)
+
+
+class _TimingFinder:
+    """Meta path finder that wraps every other finder's loader with _TimedLoader"""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self._profiler)
+            return spec
+        return None
+
+
+class StartupProfiler:
+    """Import-time and time-to-first-window profiler used by `main.py --profile-startup`.
+
+    Records the inclusive and self execution time of every module imported
+    after install(), plus named milestones relative to process start.
+    """
+
+    def __init__(self, start: Optional[float] = None):
+        self.start = start if start is not None else time.perf_counter()
+        self.imports: Dict[str, Tuple[float, float]] = {}  # module -> (inclusive, self)
+        self.marks: List[Tuple[str, float]] = []
+        self._stack: List[list] = []
+        self._finder = None
+
+    def install(self):
+        if self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        if self._finder is not None and self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    def mark(self, label: str):
+        """Record a milestone (seconds since process start)"""
+        self.marks.append((label, time.perf_counter() - self.start))
+
+    def _enter(self, name):
+        # [name, started_at, time spent in nested imports]
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _leave(self, name):
+        if not self._stack:
+            return
+        entry_name, started, children = self._stack.pop()
+        inclusive = time.perf_counter() - started
+        self.imports[entry_name] = (inclusive, inclusive - children)
+        if self._stack:
+            self._stack[-1][2] += inclusive
+
+    def to_dict(self, top: int = 25) -> dict:
+        slowest = sorted(self.imports.items(), key=lambda kv: kv[1][0], reverse=True)[:top]
+        return {
+            "marks": {label: round(t, 4) for label, t in self.marks},
+            "modules_imported": len(self.imports),
+            "slowest_imports": [
+                {"module": name, "inclusive": round(inc, 4), "self": round(own, 4)}
+                for name, (inc, own) in slowest
+            ],
+        }
+
+    def report(self, stream=None, top: int = 25):
+        """Print a human readable summary"""
+        stream = stream or sys.stderr
+        print("=== Startup profile ===", file=stream)
+        for label, t in self.marks:
+            print(f"  {label:<28} {t * 1000:9.1f} ms", file=stream)
+        print(f"  modules imported: {len(self.imports)}", file=stream)
+        print(f"  {'inclusive':>10} {'self':>10}  module", file=stream)
+        for item in self.to_dict(top)["slowest_imports"]:
+            print(f"  {item['inclusive'] * 1000:8.1f}ms {item['self'] * 1000:8.1f}ms  {item['module']}", file=stream)
+
+    def save(self, path: str, top: int = 25):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(top), f, indent=4)
@@ -1,4 +1,3 @@
-import asyncio
 import aiohttp
 from typing import Optional
 
@@ -54,10 +53,20 @@ async def fetch_latest_version(session: Optional[aiohttp.ClientSession] = None)
             await sess.close()
 
 
+async def latest_version(timeout: float = 6.0) -> Optional[str]:
+    """fetch_latest_version over the shared AsyncRuntime connection pool (run it on the runtime)"""
+    from src.operation_file.async_runtime import AsyncRuntime
+    try:
+        async with AsyncRuntime().session(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            return await fetch_latest_version(session)
+    except Exception:
+        return None
+
+
 def get_latest_version_sync(timeout: float = 6.0) -> Optional[str]:
-    async def runner():
-        return await fetch_latest_version()
+    """Blocking variant for worker threads (never call it from the Tk thread)"""
+    from src.operation_file.async_runtime import AsyncRuntime
     try:
-        return asyncio.run(asyncio.wait_for(runner(), timeout=timeout))
+        return AsyncRuntime().run_sync(latest_version(timeout), timeout=timeout + 1)
     except Exception:
         return None
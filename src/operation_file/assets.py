@@ -0,0 +1,159 @@
+import io
+import os
+import base64
+import asyncio
+import hashlib
+from typing import Dict, Optional
+
+import aiohttp
+
+# Gli asset della CDN Discord sono immutabili (l'URL contiene ID o hash): si possono tenere su disco
+ASSET_CACHE_DIR = os.path.join("src", "interface", "config", "asset_cache")
+MAX_DISK_BYTES = 200 * 1024 * 1024
+
+# Discord upload limits
+EMOJI_MAX_BYTES = 256 * 1024
+EMOJI_MAX_SIDE = 128
+STICKER_MAX_BYTES = 512 * 1024
+STICKER_MAX_SIDE = 320
+
+
+class AssetCache:
+    """Downloaded CDN assets (icons, emojis, stickers) shared by concurrent clones.
+
+    Concurrent requests for the same URL share one download: the first caller
+    fetches it, the others await the same future. With a cache_dir, assets are
+    also kept on disk and reused by later runs. Failed downloads are not
+    cached, so a later clone can try again.
+    """
+
+    _pruned = False
+
+    def __init__(self, cache_dir: Optional[str] = ASSET_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._data: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.downloads = 0
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest())
+
+    def _read_disk(self, url: str) -> Optional[bytes]:
+        try:
+            with open(self._path(url), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, url: str, data: bytes):
+        path = self._path(url)
+        tmp_path = path + ".tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            if not AssetCache._pruned:
+                AssetCache._pruned = True
+                self._prune()
+        except OSError as e:
+            print(f"Error saving asset cache: {e}")
+
+    def _prune(self):
+        """Drop the least recently written files once the directory exceeds MAX_DISK_BYTES"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            stat = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _mtime, size, _name in entries)
+        for _mtime, size, name in sorted(entries):
+            if total <= MAX_DISK_BYTES:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+    async def get(self, session: aiohttp.ClientSession, url: str) -> Optional[bytes]:
+        """Return the bytes at url (None if it cannot be downloaded)"""
+        future = self._data.get(url)
+        if future is not None:
+            self.hits += 1
+            return await asyncio.shield(future)
+
+        future = self._data[url] = asyncio.get_running_loop().create_future()
+        data = None
+        try:
+            if self.cache_dir:
+                data = await asyncio.to_thread(self._read_disk, url)
+            if data is not None:
+                self.disk_hits += 1
+            else:
+                self.downloads += 1
+                async with session.get(url) as resp:
+                    if resp.status == 200:
+                        data = await resp.read()
+                if data is not None and self.cache_dir:
+                    await asyncio.to_thread(self._write_disk, url, data)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            data = None
+        finally:
+            if data is None:
+                self._data.pop(url, None)
+            future.set_result(data)
+        return data
+
+    def get_stats(self) -> dict:
+        return {"cached": len(self._data), "hits": self.hits, "disk_hits": self.disk_hits,
+                "downloads": self.downloads}
+
+
+def fit_image(data: bytes, max_bytes: int, max_side: int, fmt: str = "PNG") -> Optional[bytes]:
+    """Downscale an image (animated ones frame by frame) until it fits Discord's limits.
+
+    Returns the original bytes when they already fit, None when the image
+    cannot be made small enough. CPU bound: run it in the worker pool.
+    """
+    try:
+        from PIL import Image, ImageSequence
+    except ImportError:
+        return data if len(data) <= max_bytes else None
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            if len(data) <= max_bytes and max(img.size) <= max_side:
+                return data
+            animated = getattr(img, "is_animated", False)
+            frames = [frame.convert("RGBA") for frame in ImageSequence.Iterator(img)] if animated else [img.convert("RGBA")]
+            duration = img.info.get("duration", 100)
+            width, height = img.size
+    except Exception:
+        return None
+
+    side = min(max_side, max(width, height))
+    # Riduciamo il lato del 25% a ogni tentativo finché il file non rientra nel limite
+    for _ in range(6):
+        scale = side / max(width, height)
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        resized = [frame.resize(size, Image.LANCZOS) for frame in frames]
+        out = io.BytesIO()
+        save_kwargs = {"format": fmt, "optimize": True}
+        if animated:
+            save_kwargs.update(save_all=True, append_images=resized[1:], duration=duration, loop=0)
+        resized[0].save(out, **save_kwargs)
+        if out.tell() <= max_bytes:
+            return out.getvalue()
+        side = int(side * 0.75)
+    return None
+
+
+def encode_data_uri(data: bytes, mime: str = "image/png") -> str:
+    """data: URI accepted by Discord for icons and emojis (run it in the worker pool)"""
+    return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+
+def fit_image_data_uri(data: bytes, max_bytes: int, max_side: int, fmt: str = "PNG") -> Optional[str]:
+    """fit_image + encode_data_uri in one worker round trip"""
+    image = fit_image(data, max_bytes, max_side, fmt)
+    if image is None:
+        return None
+    return encode_data_uri(image, "image/gif" if fmt == "GIF" else "image/png")
@@ -0,0 +1,154 @@
+import queue
+import atexit
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+import aiohttp
+
+from src.operation_file.codec import dumps
+from src.operation_file.ratelimit import RateLimiter
+
+
+class AsyncRuntime:
+    """The single background asyncio loop used by the GUI and the clone queue.
+
+    Coroutines are handed over with `submit()` from any thread; their results
+    come back through a queue that the Tk thread drains on a timer
+    (`attach()`), so callbacks may touch widgets directly. `post()` uses the
+    same queue for updates sent while a coroutine is still running. Sessions
+    created with `session()` share one connection pool and one RateLimiter.
+    """
+
+    _instance = None
+    POLL_MS = 50
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._loop = None
+            cls._instance._thread = None
+            cls._instance._connector = None
+            cls._instance._limiter = None
+            cls._instance._tk_root = None
+            cls._instance._results = queue.SimpleQueue()
+            cls._instance._lock = threading.Lock()
+        return cls._instance
+
+    def start(self):
+        """Start the loop thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(self._loop)
+                self._loop.call_soon(ready.set)
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name="async-runtime", daemon=True)
+            self._thread.start()
+            ready.wait()
+            atexit.register(self.stop)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop
+
+    def attach(self, root):
+        """Deliver submit() callbacks on the Tk thread of root"""
+        self._tk_root = root
+        root.after(self.POLL_MS, self._poll)
+
+    def submit(self, coro, on_done: Optional[Callable] = None, on_error: Optional[Callable] = None) -> Future:
+        """Run coro on the runtime loop; thread safe.
+
+        on_done(result) / on_error(exception) run on the Tk thread once attached
+        (on the loop thread before that). The returned Future can be cancelled,
+        which cancels the coroutine.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if on_done or on_error:
+            future.add_done_callback(lambda f: self.post(lambda: self._deliver(f, on_done, on_error)))
+        return future
+
+    def post(self, callback: Callable[[], None]):
+        """Run callback on the Tk thread once attached (right away before that); thread safe"""
+        if self._tk_root is not None:
+            self._results.put(callback)
+        else:
+            callback()
+
+    def run_sync(self, coro, timeout: Optional[float] = None):
+        """Block the calling thread (never the loop thread) until coro completes"""
+        return self.submit(coro).result(timeout)
+
+    def session(self, **kwargs) -> aiohttp.ClientSession:
+        """ClientSession on the shared connection pool and rate limits (call it from a runtime coroutine)"""
+        kwargs.setdefault("json_serialize", dumps)
+        kwargs.setdefault("trace_configs", [self.limiter.trace_config()])
+        return aiohttp.ClientSession(connector=self.connector, connector_owner=False, **kwargs)
+
+    @property
+    def limiter(self) -> RateLimiter:
+        """Bucket state learned by every GUI request, clone queue included"""
+        if self._limiter is None:
+            self._limiter = RateLimiter()
+        return self._limiter
+
+    @property
+    def connector(self) -> aiohttp.TCPConnector:
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(limit=30, ttl_dns_cache=300)
+        return self._connector
+
+    def _deliver(self, future, on_done, on_error):
+        if future.cancelled():
+            return
+        try:
+            error = future.exception()
+            if error is None:
+                if on_done:
+                    on_done(future.result())
+            elif on_error:
+                on_error(error)
+            else:
+                print(f"Background task failed: {error}")
+        except Exception as e:
+            print(f"Error in background task callback: {e}")
+
+    def _poll(self):
+        while True:
+            try:
+                callback = self._results.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in UI callback: {e}")
+        try:
+            self._tk_root.after(self.POLL_MS, self._poll)
+        except Exception:
+            # La finestra è stata distrutta
+            self._tk_root = None
+
+    def stop(self):
+        """Close the shared connection pool and stop the loop"""
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            return
+
+        async def close():
+            if self._connector is not None:
+                await self._connector.close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(close(), loop).result(2)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
@@ -0,0 +1,41 @@
+import json
+from typing import Any, Callable, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonCodec:
+    """The JSON encoder/decoder used for Discord payloads, archives and the local index.
+
+    Uses orjson when it is installed (several times faster on large guild
+    payloads and message pages), the standard json module otherwise. Both
+    produce compact UTF-8 text, so data written by one is read by the other.
+    Another backend can be plugged in with `use()`.
+    """
+
+    def __init__(self):
+        if orjson is not None:
+            self.use("orjson", orjson.loads, lambda obj: orjson.dumps(obj).decode("utf-8"))
+        else:
+            self.use("json", json.loads, lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":")))
+
+    def use(self, name: str, loads: Callable[[Union[str, bytes]], Any], dumps: Callable[[Any], str]):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+
+codec = JsonCodec()
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON text or bytes; usable as aiohttp's resp.json(loads=...)"""
+    return codec.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """Compact JSON text; usable as aiohttp's ClientSession(json_serialize=...)"""
+    return codec.dumps(obj)
@@ -0,0 +1,256 @@
+import os
+import gzip
+import json
+import asyncio
+from typing import Callable, Iterator, List, Optional
+
+import aiohttp
+
+from src.operation_file.codec import dumps, loads
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+API_BASE = "https://discord.com/api/v10"
+EXPORT_DIR = "exports"
+PAGE_SIZE = 100          # massimo consentito da GET /channels/{id}/messages
+FRAME_MESSAGES = 1000    # messaggi per frame compresso: limita la memoria usata per canale
+MAX_ATTEMPTS = 5
+
+CODEC_ZSTD = "zstd"
+CODEC_GZIP = "gzip"
+_EXTENSIONS = {CODEC_ZSTD: ".jsonl.zst", CODEC_GZIP: ".jsonl.gz"}
+
+
+class ExportError(Exception):
+    """Raised when a channel archive cannot be opened or written"""
+    pass
+
+
+def default_codec() -> str:
+    return CODEC_ZSTD if zstandard is not None else CODEC_GZIP
+
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class ChannelArchive:
+    """Append-only, compressed JSON Lines history of one channel.
+
+    Messages are stored oldest first in independent compressed frames appended
+    to <channel_id>.jsonl.zst (.jsonl.gz without zstandard), so the whole file
+    also decompresses with the stock zstd/zcat tools. <channel_id>.index.json
+    records the offset, size and ID range of every frame: readers seek straight
+    to the frames they need and an interrupted export resumes after last_id.
+    The index is only replaced once its frame is on disk; bytes past the last
+    indexed frame (a crash mid-write) are dropped by the next append.
+    """
+
+    def __init__(self, directory: str, channel_id, codec: Optional[str] = None):
+        self.directory = directory
+        self.channel_id = str(channel_id)
+        self.index_path = os.path.join(directory, f"{self.channel_id}.index.json")
+        self.index = self._load_index()
+        if self.index is None:
+            codec = codec or default_codec()
+            self.index = {"channel_id": self.channel_id, "codec": codec, "count": 0,
+                          "first_id": None, "last_id": None, "size": 0, "frames": []}
+        self.codec = self.index["codec"]
+        if self.codec == CODEC_ZSTD and zstandard is None:
+            raise ExportError(f"{self.index_path}: archive is zstd compressed, install zstandard to use it")
+        self.data_path = os.path.join(directory, self.channel_id + _EXTENSIONS[self.codec])
+
+    def _load_index(self) -> Optional[dict]:
+        if not os.path.exists(self.index_path):
+            return None
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise ExportError(f"cannot read {self.index_path}: {e}")
+
+    def _save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+    @property
+    def last_id(self) -> Optional[str]:
+        return self.index["last_id"]
+
+    @property
+    def count(self) -> int:
+        return self.index["count"]
+
+    def append(self, messages: List[dict]):
+        """Write messages (oldest first, all newer than last_id) as one frame"""
+        if not messages:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        payload = "".join(dumps(m) + "\n" for m in messages)
+        frame = _compress(self.codec, payload.encode("utf-8"))
+
+        offset = self.index["size"]
+        with open(self.data_path, "ab") as f:
+            # Un export interrotto può aver lasciato un frame parziale non indicizzato
+            if f.tell() != offset:
+                f.truncate(offset)
+            f.write(frame)
+            f.flush()
+            os.fsync(f.fileno())
+
+        first_id, last_id = str(messages[0]["id"]), str(messages[-1]["id"])
+        self.index["frames"].append([offset, len(frame), first_id, last_id, len(messages)])
+        self.index["size"] = offset + len(frame)
+        self.index["count"] += len(messages)
+        self.index["first_id"] = self.index["first_id"] or first_id
+        self.index["last_id"] = last_id
+        self._save_index()
+
+    def iter_messages(self, after=None, before=None) -> Iterator[dict]:
+        """Yield stored messages oldest first, optionally only IDs in (after, before)"""
+        after = int(after) if after is not None else None
+        before = int(before) if before is not None else None
+        if not os.path.exists(self.data_path):
+            return
+        with open(self.data_path, "rb") as f:
+            for offset, length, first_id, last_id, _count in self.index["frames"]:
+                # L'indice permette di saltare i frame fuori intervallo senza decomprimerli
+                if after is not None and int(last_id) <= after:
+                    continue
+                if before is not None and int(first_id) >= before:
+                    break
+                f.seek(offset)
+                for line in _decompress(self.codec, f.read(length)).splitlines():
+                    message = loads(line)
+                    message_id = int(message["id"])
+                    if (after is None or message_id > after) and (before is None or message_id < before):
+                        yield message
+
+
+class HistoryExporter:
+    """Exports the message history of several channels into ChannelArchives.
+
+    Each channel is paginated forward from its last exported message (or from
+    the beginning) PAGE_SIZE messages at a time and flushed every
+    FRAME_MESSAGES, so memory stays bounded whatever the history length.
+    Up to `concurrency` channels run at once; requests go through the given
+    session, whose RateLimiter (see CloneEngine) keeps them within Discord's
+    buckets.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, directory: str = EXPORT_DIR, concurrency: int = 4,
+                 codec: Optional[str] = None, progress_callback: Optional[Callable[[str, int], None]] = None,
+                 index=None):
+        self.session = session
+        self.directory = directory
+        self.concurrency = max(1, concurrency)
+        self.codec = codec
+        self.progress_callback = progress_callback
+        # LocalIndex opzionale: i messaggi esportati diventano cercabili anche nella GUI
+        self.index = index
+
+    async def export(self, channel_ids) -> List[dict]:
+        """Export every channel; returns one result dict per channel, in order"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(channel_id):
+            async with semaphore:
+                return await self.export_channel(channel_id)
+
+        return await asyncio.gather(*(run(str(c)) for c in channel_ids))
+
+    async def export_channel(self, channel_id: str) -> dict:
+        """Append the messages newer than the archive's last_id.
+
+        Returns {"channel_id", "status", "exported", "total", "last_id", "error"}
+        where status is "done" or "failed"; what was exported before a failure
+        stays in the archive and the next run continues from there.
+        """
+        result = {"channel_id": channel_id, "status": "failed", "exported": 0, "total": 0,
+                  "last_id": None, "error": None}
+        try:
+            archive = await asyncio.to_thread(ChannelArchive, self.directory, channel_id, self.codec)
+        except ExportError as e:
+            result["error"] = str(e)
+            return result
+
+        pending: List[dict] = []
+        after = archive.last_id or "0"
+        try:
+            while True:
+                page = await self._fetch_page(channel_id, after)
+                if not page:
+                    break
+                # Con "after" Discord restituisce comunque i più recenti per primi
+                page.sort(key=lambda m: int(m["id"]))
+                pending.extend(page)
+                if self.index is not None:
+                    await asyncio.to_thread(self.index.put_messages, channel_id, page)
+                after = page[-1]["id"]
+                if len(pending) >= FRAME_MESSAGES:
+                    await asyncio.to_thread(archive.append, pending)
+                    result["exported"] += len(pending)
+                    pending = []
+                if self.progress_callback:
+                    self.progress_callback(channel_id, result["exported"] + len(pending))
+                if len(page) < PAGE_SIZE:
+                    break
+            result["status"] = "done"
+        except ExportError as e:
+            result["error"] = str(e)
+        except OSError as e:
+            result["error"] = f"cannot write archive: {e}"
+        finally:
+            if pending:
+                try:
+                    await asyncio.to_thread(archive.append, pending)
+                    result["exported"] += len(pending)
+                except OSError as e:
+                    result["status"], result["error"] = "failed", f"cannot write archive: {e}"
+        result["total"] = archive.count
+        result["last_id"] = archive.last_id
+        return result
+
+    async def _fetch_page(self, channel_id: str, after: str) -> List[dict]:
+        """One page of messages after `after`, retrying 429s, 5xx and network errors"""
+        url = f"{API_BASE}/channels/{channel_id}/messages"
+        params = {"limit": PAGE_SIZE, "after": after}
+        error = None
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            retry_after = None
+            try:
+                async with self.session.get(url, params=params) as resp:
+                    if resp.status == 200:
+                        return await resp.json(loads=loads)
+                    try:
+                        body = await resp.json(content_type=None, loads=loads)
+                    except ValueError:
+                        body = {}
+                    body = body if isinstance(body, dict) else {}
+                    if resp.status == 429:
+                        retry_after = float(body.get("retry_after") or resp.headers.get("Retry-After", 1.0))
+                        error = "rate limited"
+                    elif resp.status >= 500:
+                        error = f"HTTP {resp.status}"
+                    else:
+                        # 403/404: canale non leggibile, inutile riprovare
+                        raise ExportError(f"HTTP {resp.status}: {body.get('message', '')}".rstrip(": "))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = str(e) or type(e).__name__
+            if retry_after is None:
+                retry_after = min(2 ** attempt * 0.5, 8.0)
+            await asyncio.sleep(retry_after)
+        raise ExportError(f"giving up after {MAX_ATTEMPTS} attempts: {error}")
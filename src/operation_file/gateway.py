@@ -0,0 +1,146 @@
+import os
+import asyncio
+import platform
+from typing import Dict, Iterable, Optional
+
+import aiohttp
+
+from src.operation_file.codec import loads
+
+DEFAULT_GATEWAY_URL = "wss://gateway.discord.gg/?v=10&encoding=json"
+
+# Gateway opcodes used here
+OP_DISPATCH = 0
+OP_HEARTBEAT = 1
+OP_IDENTIFY = 2
+OP_HELLO = 10
+OP_HEARTBEAT_ACK = 11
+
+INTENT_GUILDS = 1 << 0
+
+
+class GatewayError(Exception):
+    """Raised when the gateway snapshot cannot be obtained"""
+    pass
+
+
+def snapshot_from_payload(guild: dict) -> dict:
+    """Turn a GUILD_CREATE (or READY guild) payload into the structures Clone uses.
+
+    Returns {"guild": <REST-like guild object>, "roles": [...], "channels": [...],
+    "emojis": [...], "stickers": [...], "members": [...]}; members are only
+    present in gateway payloads (and only partially for large guilds).
+    """
+    guild = dict(guild)
+    roles = guild.get("roles") or []
+    channels = guild.pop("channels", None) or []
+    guild_id = str(guild.get("id"))
+    # GUILD_CREATE omits guild_id on nested channels, REST includes it
+    channels = [dict(c, guild_id=c.get("guild_id", guild_id)) for c in channels]
+    members = guild.get("members") or []
+    # Il resto dei campi pesanti del gateway non serve al cloner
+    for key in ("members", "presences", "voice_states", "threads", "guild_scheduled_events", "stage_instances"):
+        guild.pop(key, None)
+    return {
+        "guild": guild,
+        "roles": roles,
+        "channels": channels,
+        "emojis": guild.get("emojis") or [],
+        "stickers": guild.get("stickers") or [],
+        "members": members,
+    }
+
+
+class GatewaySnapshotLoader:
+    """Loads guild structure (roles, channels, emojis, ...) from one gateway session.
+
+    One IDENTIFY returns every guild the account is in, so fetching source
+    and destination costs a single connection instead of several REST calls.
+    The URL is configurable (or DISCORD_GATEWAY_URL) so a local WebSocket
+    stand-in can replace Discord.
+    """
+
+    def __init__(self, token: str, gateway_url: Optional[str] = None, timeout: float = 20.0):
+        self.token = token
+        self.gateway_url = gateway_url or os.environ.get("DISCORD_GATEWAY_URL") or DEFAULT_GATEWAY_URL
+        self.timeout = timeout
+
+    async def load(self, guild_ids: Iterable, session: Optional[aiohttp.ClientSession] = None) -> Dict[str, dict]:
+        """Return {guild_id: snapshot} for the requested guilds"""
+        wanted = {str(g) for g in guild_ids}
+        own_session = session is None
+        if own_session:
+            session = aiohttp.ClientSession()
+        try:
+            return await asyncio.wait_for(self._collect(session, wanted), self.timeout)
+        except asyncio.TimeoutError:
+            raise GatewayError(f"timed out waiting for guilds {sorted(wanted)}")
+        except aiohttp.ClientError as e:
+            raise GatewayError(f"gateway connection failed: {e}")
+        except ValueError as e:
+            # Frame non JSON: come una connessione fallita, il chiamante ripiega su REST
+            raise GatewayError(f"malformed gateway frame: {e}")
+        finally:
+            if own_session:
+                await session.close()
+
+    async def _collect(self, session, wanted) -> Dict[str, dict]:
+        snapshots = {}
+        heartbeat_task = None
+        sequence = {"s": None}
+        async with session.ws_connect(self.gateway_url, max_msg_size=0) as ws:
+            try:
+                async for msg in ws:
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                            break
+                        continue
+                    # I GUILD_CREATE di guild grandi sono il JSON più pesante che riceviamo
+                    payload = loads(msg.data)
+                    op = payload.get("op")
+                    if payload.get("s") is not None:
+                        sequence["s"] = payload["s"]
+
+                    if op == OP_HELLO:
+                        interval = payload["d"]["heartbeat_interval"] / 1000
+                        heartbeat_task = asyncio.create_task(self._heartbeat(ws, interval, sequence))
+                        await ws.send_json(self._identify_payload())
+                    elif op == OP_DISPATCH:
+                        event, data = payload.get("t"), payload.get("d") or {}
+                        if event == "READY":
+                            # Gli account utente ricevono le guild complete già nel READY
+                            for guild in data.get("guilds", []):
+                                if str(guild.get("id")) in wanted and "channels" in guild:
+                                    snapshots[str(guild["id"])] = snapshot_from_payload(guild)
+                            known = {str(g.get("id")) for g in data.get("guilds", [])}
+                            missing = wanted - known
+                            if missing:
+                                raise GatewayError(f"account is not in guilds {sorted(missing)}")
+                        elif event == "GUILD_CREATE" and str(data.get("id")) in wanted:
+                            snapshots[str(data["id"])] = snapshot_from_payload(data)
+                        if wanted.issubset(snapshots):
+                            break
+            finally:
+                if heartbeat_task:
+                    heartbeat_task.cancel()
+        if not wanted.issubset(snapshots):
+            raise GatewayError(f"gateway closed before guilds {sorted(wanted - set(snapshots))} arrived")
+        return snapshots
+
+    def _identify_payload(self) -> dict:
+        return {
+            "op": OP_IDENTIFY,
+            "d": {
+                "token": self.token,
+                "intents": INTENT_GUILDS,
+                "properties": {"os": platform.system().lower(), "browser": "Discord Server Cloner", "device": "Discord Server Cloner"},
+            },
+        }
+
+    async def _heartbeat(self, ws, interval, sequence):
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await ws.send_json({"op": OP_HEARTBEAT, "d": sequence["s"]})
+        except (asyncio.CancelledError, ConnectionResetError):
+            pass
@@ -0,0 +1,122 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional
+
+# Corrispondenze sorgente -> destinazione di ogni clonazione, per coppia di guild
+ID_MAP_FILE = os.path.join("src", "interface", "config", "id_map.db")
+
+KIND_ROLE = "role"
+KIND_CATEGORY = "category"
+KIND_CHANNEL = "channel"
+KIND_MESSAGE = "message"
+KINDS = (KIND_ROLE, KIND_CATEGORY, KIND_CHANNEL, KIND_MESSAGE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS id_map (
+    source_guild INTEGER NOT NULL, dest_guild INTEGER NOT NULL, kind TEXT NOT NULL,
+    source_id INTEGER NOT NULL, dest_id INTEGER NOT NULL, updated_at REAL,
+    PRIMARY KEY (source_guild, dest_guild, kind, source_id)
+) WITHOUT ROWID;
+"""
+
+
+class IdMapStore:
+    """SQLite store of the source -> destination IDs created by each clone.
+
+    Roles, categories, channels and replayed messages are recorded per
+    (source guild, destination guild) pair, so a later run against the same
+    pair starts from the known mappings and addresses destination objects by
+    ID instead of matching names across the whole destination. Maps are
+    plain {source_id: dest_id} dicts of strings, as used by Clone.
+    """
+
+    _instance = None
+    _db_file = ID_MAP_FILE
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._lock = threading.Lock()
+            cls._instance._conn = None
+        return cls._instance
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self._db_file) or ".", exist_ok=True)
+            conn = sqlite3.connect(self._db_file, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def load(self, source_guild, dest_guild, kinds: Iterable[str] = KINDS) -> Dict[str, Dict[str, str]]:
+        """{kind: {source_id: dest_id}} for the pair; kinds never saved map to {}"""
+        kinds = tuple(kinds)
+        maps = {kind: {} for kind in kinds}
+        with self._lock:
+            try:
+                rows = self._connect().execute(
+                    f"SELECT kind, source_id, dest_id FROM id_map WHERE source_guild = ? AND dest_guild = ? "
+                    f"AND kind IN ({','.join('?' * len(kinds))})",
+                    (int(source_guild), int(dest_guild), *kinds),
+                ).fetchall()
+            except sqlite3.Error as e:
+                print(f"Error reading ID map: {e}")
+                return maps
+        for kind, source_id, dest_id in rows:
+            maps[kind][str(source_id)] = str(dest_id)
+        return maps
+
+    def save(self, source_guild, dest_guild, maps: Dict[str, Dict], replace: bool = True):
+        """Store {kind: {source_id: dest_id}} in one transaction.
+
+        With replace the given kinds are rewritten entirely (the destination
+        objects were recreated), otherwise entries are added or updated.
+        """
+        pair = (int(source_guild), int(dest_guild))
+        now = time.time()
+        with self._lock:
+            try:
+                with self._connect() as conn:
+                    for kind, mapping in maps.items():
+                        if replace:
+                            conn.execute("DELETE FROM id_map WHERE source_guild = ? AND dest_guild = ? AND kind = ?",
+                                         (*pair, kind))
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO id_map (source_guild, dest_guild, kind, source_id, dest_id, "
+                            "updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                            [(*pair, kind, int(s), int(d), now) for s, d in mapping.items() if s and d],
+                        )
+            except (sqlite3.Error, ValueError) as e:
+                print(f"Error writing ID map: {e}")
+
+    def forget(self, source_guild, dest_guild, kinds: Optional[Iterable[str]] = None):
+        """Drop the stored mappings of the pair (all kinds by default)"""
+        kinds = tuple(kinds or KINDS)
+        with self._lock:
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        f"DELETE FROM id_map WHERE source_guild = ? AND dest_guild = ? "
+                        f"AND kind IN ({','.join('?' * len(kinds))})",
+                        (int(source_guild), int(dest_guild), *kinds),
+                    )
+            except sqlite3.Error as e:
+                print(f"Error writing ID map: {e}")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            try:
+                rows = self._connect().execute("SELECT kind, COUNT(*) FROM id_map GROUP BY kind").fetchall()
+            except sqlite3.Error:
+                rows = []
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,450 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import threading
+from typing import Callable, List, Optional
+
+import aiohttp
+
+from src.operation_file.serverclone import Clone, GuildAccessError
+from src.operation_file.ratelimit import RateLimiter
+from src.operation_file.gateway import GatewayError, GatewaySnapshotLoader
+from src.operation_file.assets import AssetCache
+from src.operation_file.export import EXPORT_DIR, HistoryExporter
+from src.operation_file.localindex import LocalIndex
+from src.operation_file.codec import dumps
+from src.operation_file.async_runtime import AsyncRuntime
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+
+class CloneEngine:
+    """Runs clones over one aiohttp session and one shared RateLimiter.
+
+    Consecutive clones reuse the same keep-alive connections and the bucket
+    state learned by previous ones instead of rediscovering it through 429s.
+    With use_gateway the source/destination structure comes from a single
+    gateway session (falling back to REST if that fails). fan_out() clones
+    one source into several destinations concurrently.
+    """
+
+    def __init__(self, token: str, limiter: Optional[RateLimiter] = None, use_gateway=False, gateway_url=None,
+                 connector: Optional[aiohttp.BaseConnector] = None):
+        self.token = token
+        # Connection pool esterno (es. quello del runtime della GUI): non lo chiudiamo noi
+        self.connector = connector
+        self.limiter = limiter or RateLimiter()
+        self.use_gateway = use_gateway
+        self.gateway_url = gateway_url
+        self.session = None
+        self.assets = AssetCache()
+        # Latenze storiche per route: servono alle stime del dry run
+        if not self.limiter.route_stats:
+            self.limiter.load_route_stats()
+
+    async def __aenter__(self):
+        headers = {"Authorization": self.token, "Content-Type": "application/json"}
+        self.session = aiohttp.ClientSession(
+            headers=headers,
+            connector=self.connector or aiohttp.TCPConnector(limit=20),
+            connector_owner=self.connector is None,
+            trace_configs=[self.limiter.trace_config()],
+            json_serialize=dumps,
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        self.limiter.save_route_stats()
+
+    async def run(self, source_id, dest_id, options=None, debug_callback=None, progress_callback=None) -> dict:
+        """Clone source_id into dest_id and return {"success", "stats", "elapsed", "rate_limit", "teardown"}"""
+        started = time.perf_counter()
+        limiter_before = self.limiter.get_stats()
+
+        guild_from, guild_to, source_snapshot, dest_snapshot = await self._load_guilds(source_id, dest_id, debug_callback)
+
+        cloner = Clone(debug_callback, asset_cache=self.assets)
+        if progress_callback:
+            cloner.set_progress_callback(progress_callback)
+        success = await cloner.start_clone(
+            guild_from, guild_to, self.session, options=options,
+            source_snapshot=source_snapshot, dest_snapshot=dest_snapshot
+        )
+
+        return {
+            "success": bool(success),
+            "stats": cloner.get_stats(),
+            "elapsed": round(time.perf_counter() - started, 3),
+            "rate_limit": self._limiter_delta(limiter_before),
+            "teardown": cloner.teardown_report,
+        }
+
+    async def fan_out(self, source_id, dest_ids, options=None, debug_callback=None, progress_callback=None) -> dict:
+        """Clone one source into several destinations concurrently.
+
+        The source is read once and its snapshot shared by every destination;
+        each destination gets its own Clone (and ID maps) while requests go
+        through the shared session, RateLimiter and asset cache. With
+        options["dry_run"] each destination only builds its plan.
+
+        Returns {"success", "elapsed", "rate_limit", "destinations": {dest_id: {...}}};
+        a destination that cannot be read fails alone, an unreadable source
+        raises GuildAccessError.
+        """
+        started = time.perf_counter()
+        limiter_before = self.limiter.get_stats()
+        dest_ids = [str(d) for d in dest_ids]
+        snapshots = await self._load_snapshots([source_id] + dest_ids, debug_callback)
+        source_snapshot = snapshots[str(source_id)]
+        if isinstance(source_snapshot, GuildAccessError):
+            raise source_snapshot
+
+        progress = {dest_id: 0.0 for dest_id in dest_ids}
+
+        async def clone_one(dest_id):
+            dest_snapshot = snapshots[dest_id]
+            if isinstance(dest_snapshot, GuildAccessError):
+                return {"success": False, "error": str(dest_snapshot), "status": dest_snapshot.status}
+
+            def log(message, level="INFO"):
+                if debug_callback:
+                    debug_callback(f"[{dest_id}] {message}", level)
+
+            def on_progress(value):
+                progress[dest_id] = value
+                if progress_callback:
+                    progress_callback(sum(progress.values()) / len(progress))
+
+            cloner = Clone(log, asset_cache=self.assets)
+            cloner.set_progress_callback(on_progress)
+            success = await cloner.start_clone(
+                source_snapshot["guild"], dest_snapshot["guild"], self.session, options=options,
+                source_snapshot=source_snapshot, dest_snapshot=dest_snapshot
+            )
+            result = {"success": bool(success), "stats": cloner.get_stats(), "teardown": cloner.teardown_report}
+            if cloner.last_plan is not None:
+                result["plan"] = cloner.last_plan
+            return result
+
+        results = await asyncio.gather(*(clone_one(dest_id) for dest_id in dest_ids))
+        destinations = dict(zip(dest_ids, results))
+        return {
+            "success": all(r["success"] for r in results),
+            "elapsed": round(time.perf_counter() - started, 3),
+            "rate_limit": self._limiter_delta(limiter_before),
+            "assets": self.assets.get_stats(),
+            "destinations": destinations,
+        }
+
+    def _limiter_delta(self, before: dict) -> dict:
+        after = self.limiter.get_stats()
+        return {
+            "waits": after["waits"] - before["waits"],
+            "wait_time": round(after["wait_time"] - before["wait_time"], 3),
+            "rate_limited": after["rate_limited"] - before["rate_limited"],
+        }
+
+    async def plan(self, source_id, dest_id, options=None, debug_callback=None):
+        """Dry run: return the ClonePlan for this clone without modifying anything"""
+        guild_from, guild_to, source_snapshot, dest_snapshot = await self._load_guilds(source_id, dest_id, debug_callback)
+        cloner = Clone(debug_callback)
+        return await cloner.plan_clone(guild_from, guild_to, self.session, options or {}, source_snapshot, dest_snapshot)
+
+    async def export(self, channel_ids, directory=EXPORT_DIR, concurrency=4, progress_callback=None) -> dict:
+        """Export the history of channel_ids into compressed archives under directory.
+
+        Channels already exported continue from their last message. Returns
+        {"success", "elapsed", "rate_limit", "channels": [per-channel result]}.
+        """
+        started = time.perf_counter()
+        limiter_before = self.limiter.get_stats()
+        exporter = HistoryExporter(self.session, directory, concurrency, progress_callback=progress_callback,
+                                   index=LocalIndex())
+        channels = await exporter.export(channel_ids)
+        return {
+            "success": all(c["status"] == "done" for c in channels),
+            "elapsed": round(time.perf_counter() - started, 3),
+            "rate_limit": self._limiter_delta(limiter_before),
+            "channels": channels,
+        }
+
+    async def _load_guilds(self, source_id, dest_id, debug_callback=None):
+        """Return (guild_from, guild_to, source_snapshot, dest_snapshot)"""
+        snapshots = await self._load_snapshots([source_id, dest_id], debug_callback)
+        source_snapshot = snapshots[str(source_id)]
+        dest_snapshot = snapshots[str(dest_id)]
+        for snapshot in (source_snapshot, dest_snapshot):
+            if isinstance(snapshot, GuildAccessError):
+                raise snapshot
+        return source_snapshot["guild"], dest_snapshot["guild"], source_snapshot, dest_snapshot
+
+    async def _load_snapshots(self, guild_ids, debug_callback=None) -> dict:
+        """{guild_id: snapshot or GuildAccessError}, from the gateway when enabled"""
+        snapshots = {}
+        if self.use_gateway:
+            try:
+                loader = GatewaySnapshotLoader(self.token, self.gateway_url)
+                snapshots = await loader.load(guild_ids)
+                for snapshot in snapshots.values():
+                    await asyncio.to_thread(LocalIndex().put_snapshot, snapshot)
+            except GatewayError as e:
+                if debug_callback:
+                    debug_callback(f"Gateway snapshot unavailable, using REST: {e}", "WARNING")
+
+        # Quello che il gateway non ha fornito arriva dal prefetch REST concorrente
+        missing = [str(g) for g in guild_ids if str(g) not in snapshots]
+        if missing:
+            snapshots.update(await Clone().prefetch_many(self.session, missing))
+        return snapshots
+
+
+def job_metrics(result: dict) -> dict:
+    """The counters of a CloneEngine.run() result worth keeping in clone_jobs.json.
+
+    Per-object lists (teardown results, per-channel replay rates) are reduced
+    to counts so the jobs file stays small however big the guild is.
+    """
+    stats = result.get("stats") or {}
+    teardown = {}
+    for item in result.get("teardown") or []:
+        teardown[item["status"]] = teardown.get(item["status"], 0) + 1
+    return {
+        "success": result.get("success"),
+        "elapsed": result.get("elapsed"),
+        "rate_limit": result.get("rate_limit", {}),
+        "stats": {key: value for key, value in stats.items() if isinstance(value, (int, float))},
+        "teardown": teardown,
+    }
+
+
+class CloneJob:
+    """A queued source -> destination clone with its status and metrics"""
+
+    def __init__(self, source_id, dest_id, options=None, priority=0, job_id=None):
+        self.id = job_id or uuid.uuid4().hex[:12]
+        self.source_id = str(source_id)
+        self.dest_id = str(dest_id)
+        self.options = dict(options or {})
+        self.priority = int(priority)
+        self.status = STATUS_QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.progress = 0.0
+        self.metrics = {}
+        self.error = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "source_id": self.source_id,
+            "dest_id": self.dest_id,
+            "options": self.options,
+            "priority": self.priority,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress,
+            "metrics": self.metrics,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CloneJob":
+        job = cls(data["source_id"], data["dest_id"], data.get("options"), data.get("priority", 0), data.get("id"))
+        for key in ("status", "created_at", "started_at", "finished_at", "progress", "metrics", "error"):
+            if key in data:
+                setattr(job, key, data[key])
+        return job
+
+
+class CloneJobQueue:
+    """Persistent, prioritised queue of clone jobs drained by a single CloneEngine.
+
+    The queue is drained on the shared AsyncRuntime loop, through its
+    connection pool and RateLimiter, like every other network action of the
+    GUI. The job list (never the token) is saved to clone_jobs.json, so queued
+    jobs survive a restart; jobs interrupted while running are queued again.
+    Higher priority runs first, ties run in insertion order.
+    """
+
+    _instance = None
+    _jobs_file = os.path.join("src", "interface", "config", "clone_jobs.json")
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._jobs = {}  # job id -> CloneJob
+            cls._instance._lock = threading.RLock()
+            # Worker e thread Tk salvano entrambi: un solo .tmp alla volta
+            cls._instance._write_lock = threading.Lock()
+            cls._instance._observers = []
+            cls._instance._token = None
+            cls._instance._drain_future = None
+            cls._instance._current_task = None
+            cls._instance._current_job_id = None
+            cls._instance._load_jobs()
+        return cls._instance
+
+    # ---- persistence ----
+
+    def _load_jobs(self):
+        try:
+            if os.path.exists(self._jobs_file):
+                with open(self._jobs_file, "r", encoding="utf-8") as f:
+                    for data in json.load(f):
+                        job = CloneJob.from_dict(data)
+                        if job.status == STATUS_RUNNING:
+                            job.status = STATUS_QUEUED  # interrotto da una chiusura dell'app
+                            job.progress = 0.0
+                        self._jobs[job.id] = job
+        except Exception as e:
+            print(f"Error loading clone jobs: {e}")
+
+    def _save_jobs(self):
+        # La copia si prende dopo il write lock: l'ultimo a scrivere ha sempre lo stato più recente
+        with self._write_lock:
+            with self._lock:
+                data = json.dumps([job.to_dict() for job in self._jobs.values()], indent=4)
+            tmp_path = self._jobs_file + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(self._jobs_file), exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(tmp_path, self._jobs_file)
+            except Exception as e:
+                print(f"Error saving clone jobs: {e}")
+
+    # ---- observers ----
+
+    def add_observer(self, callback: Callable[[CloneJob], None]):
+        """callback(job) is called from the worker thread on every status change"""
+        if callback not in self._observers:
+            self._observers.append(callback)
+
+    def remove_observer(self, callback):
+        if callback in self._observers:
+            self._observers.remove(callback)
+
+    def _notify(self, job: CloneJob):
+        for callback in list(self._observers):
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"Error notifying job observer: {e}")
+
+    # ---- public API ----
+
+    def add(self, source_id, dest_id, options=None, priority=0) -> CloneJob:
+        job = CloneJob(source_id, dest_id, options, priority)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._save_jobs()
+        self._notify(job)
+        return job
+
+    def list_jobs(self) -> List[CloneJob]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.created_at)
+
+    def get(self, job_id) -> Optional[CloneJob]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id) -> bool:
+        """Cancel a queued job, or the running one"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in (STATUS_QUEUED, STATUS_RUNNING):
+                return False
+            if job.status == STATUS_QUEUED:
+                job.status = STATUS_CANCELLED
+                job.finished_at = time.time()
+            elif self._current_job_id == job_id and self._current_task:
+                AsyncRuntime().loop.call_soon_threadsafe(self._current_task.cancel)
+        self._save_jobs()
+        self._notify(job)
+        return True
+
+    def clear_finished(self):
+        with self._lock:
+            for job_id in [j.id for j in self._jobs.values() if j.status in (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)]:
+                del self._jobs[job_id]
+        self._save_jobs()
+
+    def is_running(self) -> bool:
+        return self._drain_future is not None and not self._drain_future.done()
+
+    def start(self, token: str, debug_callback=None):
+        """Drain the queue on the shared runtime loop (no-op if already draining)"""
+        with self._lock:
+            self._token = token
+            if self.is_running():
+                return
+            self._drain_future = AsyncRuntime().submit(
+                self._drain(debug_callback), on_error=lambda e: print(f"Clone queue error: {e}")
+            )
+
+    # ---- worker ----
+
+    def _next_job(self) -> Optional[CloneJob]:
+        with self._lock:
+            queued = [j for j in self._jobs.values() if j.status == STATUS_QUEUED]
+            if not queued:
+                return None
+            return min(queued, key=lambda j: (-j.priority, j.created_at))
+
+    async def _drain(self, debug_callback):
+        runtime = AsyncRuntime()
+        async with CloneEngine(self._token, runtime.limiter, connector=runtime.connector) as engine:
+            while True:
+                with self._lock:
+                    job = self._next_job()
+                    if job is None:
+                        # Sotto lock: uno start() concorrente vedrà la coda come ferma e ne avvierà un'altra
+                        self._drain_future = None
+                        return
+                await self._run_job(engine, job, debug_callback)
+
+    async def _run_job(self, engine: CloneEngine, job: CloneJob, debug_callback):
+        with self._lock:
+            job.status = STATUS_RUNNING
+            job.started_at = time.time()
+            job.error = None
+            self._current_job_id = job.id
+        self._save_jobs()
+        self._notify(job)
+
+        def on_progress(value):
+            job.progress = value
+
+        try:
+            self._current_task = asyncio.ensure_future(
+                engine.run(job.source_id, job.dest_id, job.options, debug_callback, on_progress)
+            )
+            result = await self._current_task
+            job.metrics = job_metrics(result)
+            job.status = STATUS_DONE if result["success"] else STATUS_FAILED
+        except asyncio.CancelledError:
+            job.status = STATUS_CANCELLED
+        except GuildAccessError as e:
+            job.status = STATUS_FAILED
+            job.error = str(e)
+        except Exception as e:
+            job.status = STATUS_FAILED
+            job.error = f"{type(e).__name__}: {e}"
+        finally:
+            job.finished_at = time.time()
+            self._current_task = None
+            self._current_job_id = None
+        self._save_jobs()
+        self._notify(job)
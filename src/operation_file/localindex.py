@@ -0,0 +1,278 @@
+import os
+import time
+import sqlite3
+import threading
+from types import SimpleNamespace
+from typing import Iterable, List, Optional
+
+from src.operation_file.codec import dumps as _dumps, loads
+
+# Tutto ciò che l'app scarica (struttura delle guild, membri, messaggi) finisce qui
+INDEX_FILE = os.path.join("src", "interface", "config", "local_index.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS guilds (
+    id INTEGER PRIMARY KEY, name TEXT, data TEXT NOT NULL, fetched_at REAL
+);
+CREATE TABLE IF NOT EXISTS channels (
+    id INTEGER PRIMARY KEY, guild_id INTEGER NOT NULL, name TEXT, type INTEGER,
+    position INTEGER, parent_id INTEGER, data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS channels_guild ON channels (guild_id);
+CREATE TABLE IF NOT EXISTS roles (
+    id INTEGER PRIMARY KEY, guild_id INTEGER NOT NULL, name TEXT, position INTEGER, data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS roles_guild ON roles (guild_id);
+CREATE TABLE IF NOT EXISTS members (
+    guild_id INTEGER NOT NULL, user_id INTEGER NOT NULL, name TEXT, display_name TEXT, data TEXT NOT NULL,
+    PRIMARY KEY (guild_id, user_id)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY, channel_id INTEGER NOT NULL, author TEXT, timestamp TEXT,
+    content TEXT, data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_channel ON messages (channel_id, id);
+"""
+
+# Indice full-text "external content": il testo sta solo in messages, i trigger lo tengono allineato
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content, author, content='messages', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, content, author) VALUES (new.id, new.content, new.author);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content, author) VALUES ('delete', old.id, old.content, old.author);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content, author) VALUES ('delete', old.id, old.content, old.author);
+    INSERT INTO messages_fts (rowid, content, author) VALUES (new.id, new.content, new.author);
+END;
+"""
+
+
+def _int(value) -> Optional[int]:
+    return int(value) if value not in (None, "") else None
+
+
+def _fts_query(text: str) -> str:
+    """User input -> FTS5 query: every word must match, the last one as a prefix"""
+    words = [w.replace('"', '""') for w in text.split()]
+    if not words:
+        return ""
+    return " ".join(f'"{w}"' for w in words) + "*"
+
+
+def _like(text: str) -> str:
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+class LocalIndex:
+    """SQLite copy of everything the app fetches, with full-text search on messages.
+
+    Guild structure (channels, roles, members from gateway payloads) and every
+    page of messages read by the viewer or the exporter are written here as
+    they arrive, so the explorer and the viewer can show the last known state
+    before the network answers. Message content and authors are indexed with
+    FTS5 (LIKE scans when the SQLite build lacks it). One connection in WAL
+    mode is shared by the Tk thread and the network loop behind a lock.
+    """
+
+    _instance = None
+    _db_file = INDEX_FILE
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._lock = threading.Lock()
+            cls._instance._conn = None
+            cls._instance.fts = False
+        return cls._instance
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self._db_file) or ".", exist_ok=True)
+            conn = sqlite3.connect(self._db_file, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            try:
+                conn.executescript(_FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError:
+                self.fts = False
+            self._conn = conn
+        return self._conn
+
+    def _write(self, statements):
+        """Run [(sql, rows)] with executemany in one transaction"""
+        with self._lock:
+            try:
+                with self._connect() as conn:
+                    for sql, rows in statements:
+                        conn.executemany(sql, rows)
+            except sqlite3.Error as e:
+                print(f"Error writing local index: {e}")
+
+    def _read(self, sql: str, params=()) -> list:
+        with self._lock:
+            try:
+                return self._connect().execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                print(f"Error reading local index: {e}")
+                return []
+
+    # --- Scrittura -----------------------------------------------------------
+
+    def put_guild(self, guild: dict):
+        self._write([("INSERT OR REPLACE INTO guilds (id, name, data, fetched_at) VALUES (?, ?, ?, ?)",
+                      [(int(guild["id"]), guild.get("name"), _dumps(guild), time.time())])])
+
+    def put_channels(self, guild_id, channels: Iterable[dict]):
+        """Replace the known channel list of a guild"""
+        guild_id = int(guild_id)
+        rows = [(int(c["id"]), guild_id, c.get("name"), c.get("type"), c.get("position"), _int(c.get("parent_id")),
+                 _dumps(c)) for c in channels]
+        self._write([
+            ("DELETE FROM channels WHERE guild_id = ?", [(guild_id,)]),
+            ("INSERT OR REPLACE INTO channels (id, guild_id, name, type, position, parent_id, data) "
+             "VALUES (?, ?, ?, ?, ?, ?, ?)", rows),
+        ])
+
+    def put_roles(self, guild_id, roles: Iterable[dict]):
+        """Replace the known role list of a guild"""
+        guild_id = int(guild_id)
+        rows = [(int(r["id"]), guild_id, r.get("name"), r.get("position"), _dumps(r)) for r in roles]
+        self._write([
+            ("DELETE FROM roles WHERE guild_id = ?", [(guild_id,)]),
+            ("INSERT OR REPLACE INTO roles (id, guild_id, name, position, data) VALUES (?, ?, ?, ?, ?)", rows),
+        ])
+
+    def put_members(self, guild_id, members: Iterable[dict]):
+        """Add or update guild members (Discord member objects, with "user")"""
+        guild_id = int(guild_id)
+        rows = []
+        for m in members:
+            user = m.get("user") or {}
+            if "id" not in user:
+                continue
+            name = user.get("username")
+            display = m.get("nick") or user.get("global_name") or name
+            rows.append((guild_id, int(user["id"]), name, display, _dumps(m)))
+        self._write([("INSERT OR REPLACE INTO members (guild_id, user_id, name, display_name, data) "
+                      "VALUES (?, ?, ?, ?, ?)", rows)])
+
+    def put_snapshot(self, snapshot: dict):
+        """Store a guild snapshot (see gateway.snapshot_from_payload)"""
+        guild = snapshot["guild"]
+        self.put_guild(guild)
+        self.put_channels(guild["id"], snapshot.get("channels") or [])
+        self.put_roles(guild["id"], snapshot.get("roles") or [])
+        if snapshot.get("members"):
+            self.put_members(guild["id"], snapshot["members"])
+
+    def put_messages(self, channel_id, messages: Iterable[dict]):
+        """Add or update messages; unchanged ones are not rewritten (nor reindexed)"""
+        channel_id = int(channel_id)
+        rows = [(int(m["id"]), channel_id, (m.get("author") or {}).get("username"), m.get("timestamp"),
+                 m.get("content") or "", _dumps(m)) for m in messages]
+        self._write([(
+            "INSERT INTO messages (id, channel_id, author, timestamp, content, data) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET author = excluded.author, content = excluded.content, "
+            "data = excluded.data WHERE messages.data != excluded.data", rows)])
+
+    # --- Lettura -------------------------------------------------------------
+
+    def get_channels(self, guild_id) -> Optional[List[dict]]:
+        """Last known channels of a guild, or None if it was never fetched"""
+        rows = self._read("SELECT data FROM channels WHERE guild_id = ?", (int(guild_id),))
+        return [loads(data) for (data,) in rows] or None
+
+    def get_roles(self, guild_id) -> List[dict]:
+        rows = self._read("SELECT data FROM roles WHERE guild_id = ? ORDER BY position DESC", (int(guild_id),))
+        return [loads(data) for (data,) in rows]
+
+    def get_members(self, guild_id, limit: int = 100) -> List[SimpleNamespace]:
+        """Members as objects with name / display_name / status / activity, like the explorer expects"""
+        rows = self._read("SELECT name, display_name FROM members WHERE guild_id = ? ORDER BY display_name LIMIT ?",
+                          (int(guild_id), limit))
+        # Lo stato di presenza non viene salvato: sarebbe vecchio appena letto
+        return [SimpleNamespace(name=name or "", display_name=display or name or "", status="offline", activity=None)
+                for name, display in rows]
+
+    def get_messages(self, channel_id, limit: int = 50, before=None) -> List[dict]:
+        """Cached messages newest first, like GET /channels/{id}/messages"""
+        if before is None:
+            rows = self._read("SELECT data FROM messages WHERE channel_id = ? ORDER BY id DESC LIMIT ?",
+                              (int(channel_id), limit))
+        else:
+            rows = self._read("SELECT data FROM messages WHERE channel_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+                              (int(channel_id), int(before), limit))
+        return [loads(data) for (data,) in rows]
+
+    def search_messages(self, text: str, guild_id=None, channel_id=None, limit: int = 50) -> List[dict]:
+        """Messages matching every word of text, newest first.
+
+        Each result is {"message", "channel_id", "channel_name", "snippet"};
+        the snippet marks the matching words with [ ].
+        """
+        text = text.strip()
+        if not text:
+            return []
+        where, params = [], []
+        # self.fts è noto solo dopo l'apertura del database
+        self._connect_locked()
+        if self.fts:
+            sql = ("SELECT m.data, m.channel_id, c.name, snippet(messages_fts, 0, '[', ']', '…', 12) "
+                   "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+                   "LEFT JOIN channels c ON c.id = m.channel_id WHERE messages_fts MATCH ?")
+            params.append(_fts_query(text))
+            # In ordine di rowid FTS5 si ferma al LIMIT invece di valutare tutte le corrispondenze
+            order = "ORDER BY messages_fts.rowid DESC"
+        else:
+            sql = ("SELECT m.data, m.channel_id, c.name, m.content FROM messages m "
+                   "LEFT JOIN channels c ON c.id = m.channel_id WHERE m.content LIKE ? ESCAPE '\\'")
+            params.append(_like(text))
+            order = "ORDER BY m.id DESC"
+        if guild_id is not None:
+            where.append("c.guild_id = ?")
+            params.append(int(guild_id))
+        if channel_id is not None:
+            where.append("m.channel_id = ?")
+            params.append(int(channel_id))
+        sql = " AND ".join([sql] + where) + f" {order} LIMIT ?"
+        params.append(limit)
+        return [{"message": loads(data), "channel_id": str(cid), "channel_name": name, "snippet": snippet[:160]}
+                for data, cid, name, snippet in self._read(sql, params)]
+
+    def search_channels(self, text: str, guild_id=None, limit: int = 50) -> List[dict]:
+        """Channels whose name contains text"""
+        text = text.strip()
+        if not text:
+            return []
+        sql = "SELECT data FROM channels WHERE name LIKE ? ESCAPE '\\'"
+        params = [_like(text)]
+        if guild_id is not None:
+            sql += " AND guild_id = ?"
+            params.append(int(guild_id))
+        rows = self._read(sql + " ORDER BY guild_id, position LIMIT ?", params + [limit])
+        return [loads(data) for (data,) in rows]
+
+    def _connect_locked(self):
+        with self._lock:
+            self._connect()
+
+    def get_stats(self) -> dict:
+        counts = {}
+        for table in ("guilds", "channels", "roles", "members", "messages"):
+            rows = self._read(f"SELECT COUNT(*) FROM {table}")
+            counts[table] = rows[0][0] if rows else 0
+        counts["fts"] = self.fts
+        return counts
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
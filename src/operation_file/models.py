@@ -0,0 +1,112 @@
+from typing import Iterable, List, Optional, Tuple
+
+CHANNEL_TEXT = 0
+CHANNEL_VOICE = 2
+CHANNEL_CATEGORY = 4
+
+OVERWRITE_ROLE = 0
+OVERWRITE_MEMBER = 1
+
+
+class Overwrite:
+    """A permission overwrite of a channel (role or member)"""
+
+    __slots__ = ("id", "type", "allow", "deny")
+
+    def __init__(self, id: str, type: int, allow: str = "0", deny: str = "0"):
+        self.id = id
+        self.type = type
+        self.allow = allow
+        self.deny = deny
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Overwrite":
+        return cls(str(data["id"]), int(data.get("type", OVERWRITE_ROLE)),
+                   str(data.get("allow", "0")), str(data.get("deny", "0")))
+
+    def to_payload(self, target_id: str) -> dict:
+        return {"id": target_id, "type": self.type, "allow": self.allow, "deny": self.deny}
+
+
+class Role:
+    """The fields of a role that a clone copies"""
+
+    __slots__ = ("id", "name", "permissions", "color", "hoist", "mentionable", "position", "managed")
+
+    def __init__(self, id: str, name: str, permissions: str = "0", color: int = 0, hoist: bool = False,
+                 mentionable: bool = False, position: int = 0, managed: bool = False):
+        self.id = id
+        self.name = name
+        self.permissions = permissions
+        self.color = color
+        self.hoist = hoist
+        self.mentionable = mentionable
+        self.position = position
+        self.managed = managed
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Role":
+        return cls(str(data["id"]), data.get("name", ""), data.get("permissions", "0"), data.get("color", 0),
+                   data.get("hoist", False), data.get("mentionable", False), data.get("position", 0),
+                   data.get("managed", False))
+
+    def to_payload(self) -> dict:
+        return {"name": self.name, "permissions": self.permissions, "color": self.color,
+                "hoist": self.hoist, "mentionable": self.mentionable}
+
+
+class Channel:
+    """The fields of a category, text or voice channel that a clone copies"""
+
+    __slots__ = ("id", "type", "name", "position", "parent_id", "topic", "nsfw", "rate_limit_per_user",
+                 "bitrate", "user_limit", "overwrites")
+
+    def __init__(self, id: str, type: int, name: str, position: int = 0, parent_id: Optional[str] = None,
+                 topic: Optional[str] = None, nsfw: bool = False, rate_limit_per_user: int = 0,
+                 bitrate: int = 64000, user_limit: int = 0, overwrites: Tuple[Overwrite, ...] = ()):
+        self.id = id
+        self.type = type
+        self.name = name
+        self.position = position
+        self.parent_id = parent_id
+        self.topic = topic
+        self.nsfw = nsfw
+        self.rate_limit_per_user = rate_limit_per_user
+        self.bitrate = bitrate
+        self.user_limit = user_limit
+        self.overwrites = overwrites
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Channel":
+        # category_id / slowmode_delay: nomi usati da discord.py, REST usa parent_id / rate_limit_per_user
+        parent_id = data.get("parent_id") or data.get("category_id")
+        return cls(
+            str(data["id"]), data.get("type", CHANNEL_TEXT), data.get("name", ""), data.get("position") or 0,
+            str(parent_id) if parent_id else None, data.get("topic"), data.get("nsfw", False),
+            data.get("rate_limit_per_user", data.get("slowmode_delay", 0)) or 0,
+            data.get("bitrate") or 64000, data.get("user_limit") or 0,
+            tuple(Overwrite.from_dict(o) for o in data.get("permission_overwrites") or ()),
+        )
+
+
+def parse_roles(roles: Iterable[dict]) -> List[Role]:
+    """Roles to clone (without @everyone), in their original order"""
+    return [Role.from_dict(r) for r in roles if r.get("name") != "@everyone"]
+
+
+def parse_channels(channels: Iterable[dict]) -> Tuple[List[Channel], List[Channel], List[Channel], int]:
+    """Split a channel list in one pass: (categories, text, voice, count of other types).
+
+    Each list is sorted by position, the order in which channels are created.
+    """
+    buckets = {CHANNEL_CATEGORY: [], CHANNEL_TEXT: [], CHANNEL_VOICE: []}
+    skipped = 0
+    for data in channels:
+        bucket = buckets.get(data.get("type"))
+        if bucket is None:
+            skipped += 1
+        else:
+            bucket.append(Channel.from_dict(data))
+    for bucket in buckets.values():
+        bucket.sort(key=lambda c: c.position)
+    return buckets[CHANNEL_CATEGORY], buckets[CHANNEL_TEXT], buckets[CHANNEL_VOICE], skipped
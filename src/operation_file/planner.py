@@ -0,0 +1,251 @@
+import math
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from src.operation_file.serverclone import Clone
+from src.operation_file.models import parse_channels
+
+DEFAULT_LATENCY = 0.25  # seconds, used for routes never observed before
+# Stage -> requests in flight at once (0: all together, as Clone.prefetch does)
+STAGE_CONCURRENCY = {
+    "fetch": 0,
+    "delete_roles": Clone.TEARDOWN_CONCURRENCY,
+    "delete_channels": Clone.TEARDOWN_CONCURRENCY,
+    "create_emojis": Clone.TEARDOWN_CONCURRENCY,
+    "create_stickers": Clone.TEARDOWN_CONCURRENCY,
+}
+# DELETE /channels/:id ha come major il canale stesso: ogni canale ha il suo bucket
+PER_OBJECT_BUCKETS = {"delete_channels"}
+# Replay dei messaggi: stage -> canali in parallelo (0: tutti); dentro un canale le richieste
+# sono sequenziali (pagine lette con before=, invii in ordine)
+PER_CHANNEL_STAGES = {
+    "fetch_messages": 0,
+    "copy_messages": Clone.REPLAY_WINDOW,
+}
+# Bucket documentato di POST /channels/:id/messages, usato finché la route non è stata osservata
+DEFAULT_MESSAGE_BUCKET = {"limit": 5, "window": 5.0}
+
+# Stage -> (method, generic route, Clone.PACING key)
+_STAGE_ROUTES = OrderedDict([
+    ("fetch", ("GET", None, None)),
+    ("edit_guild", ("PATCH", "/guilds/:id", None)),
+    ("delete_roles", ("DELETE", "/guilds/:id/roles/:id", None)),
+    ("create_roles", ("POST", "/guilds/:id/roles", "create_role")),
+    ("delete_channels", ("DELETE", "/channels/:id", None)),
+    ("create_categories", ("POST", "/guilds/:id/channels", "create_category")),
+    ("create_channels", ("POST", "/guilds/:id/channels", "create_channel")),
+    ("create_emojis", ("POST", "/guilds/:id/emojis", None)),
+    ("create_stickers", ("POST", "/guilds/:id/stickers", None)),
+    ("fetch_messages", ("GET", "/channels/:id/messages", None)),
+    ("copy_messages", ("POST", "/channels/:id/messages", None)),
+])
+
+
+class ClonePlan:
+    """The operations a clone would perform, with request count and wall-time estimate"""
+
+    def __init__(self, source: dict, dest: dict, options: dict):
+        self.source = {"id": source.get("id"), "name": source.get("name")}
+        self.dest = {"id": dest.get("id"), "name": dest.get("name")}
+        self.options = dict(options)
+        self.operations: List[tuple] = []  # (stage, method, route, label, channel)
+        self.notes: List[str] = []
+
+    def add(self, stage: str, label: str, method: str = None, route: str = None, channel: str = None):
+        """channel: source channel of a message replay request (see PER_CHANNEL_STAGES)"""
+        default_method, default_route, _pacing = _STAGE_ROUTES[stage]
+        self.operations.append((stage, method or default_method, route or default_route, label, channel))
+
+    @property
+    def request_count(self) -> int:
+        return len(self.operations)
+
+    def per_route(self) -> Dict[str, int]:
+        counts: Dict[str, int] = OrderedDict()
+        for _stage, method, route, *_rest in self.operations:
+            key = f"{method} {route}"
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def per_stage(self) -> Dict[str, int]:
+        counts: Dict[str, int] = OrderedDict()
+        for stage, *_rest in self.operations:
+            counts[stage] = counts.get(stage, 0) + 1
+        return counts
+
+    def estimate(self, route_stats: Optional[dict] = None) -> Dict[str, float]:
+        """Estimated seconds per stage (and "total").
+
+        Create stages run sequentially, so they cost latency + fixed pacing
+        per request. Stages in STAGE_CONCURRENCY keep several requests in
+        flight (prefetch reads cost a single round trip). Either way a stage
+        never takes less than what the route's bucket allows (limit requests
+        per window). Message replay stages are costed per channel, see
+        _estimate_per_channel.
+        """
+        route_stats = route_stats or {}
+        stages: Dict[str, float] = OrderedDict()
+        for stage, *_rest in self.operations:
+            stages.setdefault(stage, 0.0)
+
+        for stage in stages:
+            ops = [op for op in self.operations if op[0] == stage]
+            if stage in PER_CHANNEL_STAGES:
+                stages[stage] = self._estimate_per_channel(stage, ops, route_stats)
+                continue
+            pacing_key = _STAGE_ROUTES[stage][2]
+            pacing = Clone.PACING.get(pacing_key, 0.0) if pacing_key else 0.0
+            by_route: Dict[str, int] = {}
+            sequential = 0.0
+            for _stage, method, route, *_rest in ops:
+                stats = route_stats.get(f"{method} {route}") or {}
+                sequential += stats.get("latency", DEFAULT_LATENCY) + pacing
+                by_route[f"{method} {route}"] = by_route.get(f"{method} {route}", 0) + 1
+            floor = 0.0
+            if stage not in PER_OBJECT_BUCKETS:
+                for key, count in by_route.items():
+                    stats = route_stats.get(key) or {}
+                    if stats.get("limit") and stats.get("window"):
+                        floor = max(floor, (math.ceil(count / stats["limit"]) - 1) * stats["window"])
+            if stage in STAGE_CONCURRENCY:
+                in_flight = STAGE_CONCURRENCY[stage] or len(ops)
+                sequential = math.ceil(len(ops) / in_flight) * sequential / len(ops)
+            stages[stage] = max(sequential, floor)
+
+        stages["total"] = sum(stages.values())
+        return stages
+
+    @staticmethod
+    def _estimate_per_channel(stage: str, ops: list, route_stats: dict) -> float:
+        """Seconds of a message replay stage.
+
+        Within a channel requests run one after another; a send costs at least
+        the AIMD starting pace (1 / Clone.REPLAY_RATE) and what the channel's
+        bucket allows (window / limit). Only channels overlap, at most
+        PER_CHANNEL_STAGES[stage] at a time.
+        """
+        per_channel: Dict[str, float] = OrderedDict()
+        for _stage, method, route, _label, channel in ops:
+            stats = route_stats.get(f"{method} {route}") or {}
+            cost = stats.get("latency", DEFAULT_LATENCY)
+            if stage == "copy_messages":
+                bucket = stats if stats.get("limit") and stats.get("window") else DEFAULT_MESSAGE_BUCKET
+                cost = max(cost, 1.0 / Clone.REPLAY_RATE, bucket["window"] / bucket["limit"])
+            per_channel[channel] = per_channel.get(channel, 0.0) + cost
+        in_flight = PER_CHANNEL_STAGES[stage] or len(per_channel)
+        return max(max(per_channel.values()), sum(per_channel.values()) / in_flight)
+
+    def to_dict(self, route_stats: Optional[dict] = None) -> dict:
+        estimate = self.estimate(route_stats)
+        return {
+            "source": self.source,
+            "dest": self.dest,
+            "options": self.options,
+            "request_count": self.request_count,
+            "per_route": self.per_route(),
+            "per_stage": self.per_stage(),
+            "estimated_seconds": {k: round(v, 1) for k, v in estimate.items()},
+            "notes": self.notes,
+        }
+
+    def format_text(self, route_stats: Optional[dict] = None) -> str:
+        """Multi-line human readable summary (GUI dialog, CLI text output)"""
+        estimate = self.estimate(route_stats)
+        lines = [
+            f"{self.source['name']} ({self.source['id']}) -> {self.dest['name']} ({self.dest['id']})",
+            f"Requests: {self.request_count}",
+            f"Estimated time: {format_duration(estimate['total'])}",
+            "",
+        ]
+        stage_counts = self.per_stage()
+        for stage, seconds in estimate.items():
+            if stage == "total":
+                continue
+            lines.append(f"  {stage:<18} {stage_counts.get(stage, 0):>5} req  ~{format_duration(seconds)}")
+        lines.append("")
+        for route, count in self.per_route().items():
+            lines.append(f"  {count:>5} x {route}")
+        for note in self.notes:
+            lines.append(f"Note: {note}")
+        return "\n".join(lines)
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
+
+
+def build_plan(guild_from: dict, guild_to: dict, source_roles: list, source_channels: list,
+               dest_roles: list, dest_channels: list, options: Optional[dict] = None,
+               fetch_requests: int = 0, assets: Optional[list] = None) -> ClonePlan:
+    """Mirror the sequence of Clone.start_clone without touching anything
+
+    assets: (kind, object) pairs of the emojis/stickers that would be uploaded
+    """
+    options = options or {}
+    plan = ClonePlan(guild_from, guild_to, options)
+
+    for _ in range(fetch_requests):
+        plan.add("fetch", "prefetch guild structure", route="/guilds/:id")
+
+    if options.get("clone_name_icon", False):
+        plan.add("edit_guild", f"rename to {guild_from.get('name')}")
+        if guild_from.get("icon"):
+            plan.notes.append("the source icon is downloaded from the CDN (not rate limited)")
+
+    roles = [r for r in source_roles if r.get("name") != "@everyone"]
+    if options.get("clone_roles", True) and roles:
+        for role in dest_roles:
+            if role.get("name") == "@everyone" or role.get("id") == guild_to.get("id"):
+                continue
+            if role.get("managed"):
+                plan.notes.append(f"managed role {role.get('name')} cannot be deleted and is kept")
+            else:
+                plan.add("delete_roles", f"delete role {role.get('name')}")
+        for role in roles:
+            plan.add("create_roles", f"create role {role.get('name')}")
+
+    categories, text_channels, voice_channels, skipped = parse_channels(source_channels)
+
+    wants_categories = options.get("clone_categories", True)
+    wants_text = options.get("clone_text_channels", True)
+    wants_voice = options.get("clone_voice_channels", True)
+
+    if wants_categories or wants_text or wants_voice:
+        for channel in dest_channels:
+            plan.add("delete_channels", f"delete channel {channel.get('name')}")
+    if wants_categories:
+        for category in categories:
+            plan.add("create_categories", f"create category {category.name}")
+    if wants_text:
+        for channel in text_channels:
+            plan.add("create_channels", f"create text channel {channel.name}")
+    if wants_voice:
+        for channel in voice_channels:
+            plan.add("create_channels", f"create voice channel {channel.name}")
+
+    for kind, obj in assets or []:
+        plan.add(f"create_{kind}s", f"create {kind} {obj.get('name')}")
+    if assets:
+        plan.notes.append("emoji and sticker images are downloaded from the CDN (not rate limited)")
+
+    if skipped:
+        plan.notes.append(f"{skipped} channels of other types (forum, stage, ...) are not cloned")
+    limit = options.get("messages_limit", 0)
+    if wants_text and options.get("clone_messages", False) and limit > 0:
+        pages = math.ceil(limit / Clone.REPLAY_PAGE_SIZE)
+        for channel in text_channels:
+            for _ in range(pages):
+                plan.add("fetch_messages", f"read messages of {channel.name}", channel=channel.id)
+            for _ in range(limit):
+                plan.add("copy_messages", f"copy a message to {channel.name}", channel=channel.id)
+        if text_channels:
+            plan.notes.append(f"up to {limit} messages per text channel: channels with fewer messages need "
+                              "fewer requests, and the send pace adapts to Discord's answers")
+    return plan
@@ -0,0 +1,337 @@
+import asyncio
+import contextlib
+import json
+import os
+import re
+import time
+from typing import Dict, Optional
+
+import aiohttp
+
+# Discord keys rate limits on the route plus its "major" parameter
+_MAJOR_PARAMS = re.compile(r"^/(guilds|channels|webhooks)/(\d+)")
+_SNOWFLAKE = re.compile(r"/\d{15,}")
+
+# Latenze e limiti osservati, riusati dal planner per stimare la durata
+ROUTE_STATS_FILE = os.path.join("src", "interface", "config", "route_stats.json")
+LATENCY_SMOOTHING = 0.2  # peso del nuovo campione nella media mobile
+
+
+def _split_route(method: str, url):
+    path = url.path if hasattr(url, "path") else str(url)
+    path = path.split("/api/v10", 1)[-1]
+    major = ""
+    match = _MAJOR_PARAMS.match(path)
+    if match:
+        major = match.group(0)
+        path = path[len(major):]
+    # Gli ID non "major" non cambiano il bucket
+    return f"{method.upper()} {major}{_SNOWFLAKE.sub('/:id', path)}", major
+
+
+def route_key(method: str, url) -> str:
+    """Collapse a request into the key Discord uses for bucket assignment"""
+    return _split_route(method, url)[0]
+
+
+class _Bucket:
+    __slots__ = ("remaining", "limit", "reset_at", "lock")
+
+    def __init__(self):
+        self.remaining = 1
+        self.limit = None
+        self.reset_at = 0.0
+        self.lock = asyncio.Lock()
+
+
+class RateLimiter:
+    """Shared Discord REST rate-limit state.
+
+    Learns bucket ids from the X-RateLimit-* headers and makes callers wait
+    before a request that would exceed its bucket or the global limit, instead
+    of discovering the limit through a 429. Attach it to a session with
+    `trace_config()` so every request made through that session is covered.
+    """
+
+    def __init__(self):
+        self._route_buckets: Dict[str, str] = {}  # route key -> bucket hash + major parameter
+        self._buckets: Dict[str, _Bucket] = {}
+        self._global_reset_at = 0.0
+        # Generic route key (guild ids stripped) -> {"latency", "samples", "limit", "window"}
+        self.route_stats: Dict[str, dict] = {}
+        self.waits = 0
+        self.wait_time = 0.0
+        self.rate_limited = 0
+
+    def _bucket_for(self, key: str) -> _Bucket:
+        bucket_id = self._route_buckets.get(key, key)
+        bucket = self._buckets.get(bucket_id)
+        if bucket is None:
+            bucket = self._buckets[bucket_id] = _Bucket()
+        return bucket
+
+    async def _sleep(self, delay: float):
+        self.waits += 1
+        self.wait_time += delay
+        await asyncio.sleep(delay)
+
+    async def acquire(self, method: str, url):
+        """Wait until a request on this route is allowed"""
+        now = time.monotonic()
+        if self._global_reset_at > now:
+            await self._sleep(self._global_reset_at - now)
+
+        bucket = self._bucket_for(route_key(method, url))
+        async with bucket.lock:
+            now = time.monotonic()
+            if bucket.remaining <= 0 and bucket.reset_at > now:
+                await self._sleep(bucket.reset_at - now)
+            if bucket.reset_at <= time.monotonic() and bucket.limit is not None:
+                bucket.remaining = bucket.limit
+            # Riserviamo lo slot subito, le risposte correggono poi il conteggio
+            bucket.remaining -= 1
+
+    def update(self, method: str, url, status: int, headers) -> Optional[float]:
+        """Record rate-limit headers from a response; returns retry_after for 429s"""
+        key, major = _split_route(method, url)
+        bucket_id = headers.get("X-RateLimit-Bucket")
+        if bucket_id:
+            # Stesso hash con un major diverso (es. DELETE su due canali) è un limite separato
+            bucket_id = f"{bucket_id}:{major}"
+            known = self._route_buckets.get(key)
+            if known != bucket_id:
+                self._route_buckets[key] = bucket_id
+                # Il bucket provvisorio (chiave di route) viene sostituito da quello reale
+                self._buckets.pop(key, None)
+        bucket = self._bucket_for(key)
+
+        try:
+            if "X-RateLimit-Limit" in headers:
+                bucket.limit = int(headers["X-RateLimit-Limit"])
+            if "X-RateLimit-Remaining" in headers:
+                bucket.remaining = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset-After" in headers:
+                bucket.reset_at = time.monotonic() + float(headers["X-RateLimit-Reset-After"])
+        except ValueError:
+            pass
+
+        if status != 429:
+            return None
+
+        self.rate_limited += 1
+        try:
+            retry_after = float(headers.get("Retry-After", 1))
+        except ValueError:
+            retry_after = 1.0
+        if headers.get("X-RateLimit-Global", "").lower() == "true" or headers.get("X-RateLimit-Scope") == "global":
+            self._global_reset_at = time.monotonic() + retry_after
+        else:
+            bucket.remaining = 0
+            bucket.reset_at = max(bucket.reset_at, time.monotonic() + retry_after)
+        return retry_after
+
+    def record(self, method: str, url, latency: float, headers):
+        """Fold a response's latency and bucket size into the per-route statistics"""
+        key = _SNOWFLAKE.sub("/:id", route_key(method, url))
+        stats = self.route_stats.setdefault(key, {"latency": latency, "samples": 0, "limit": None, "window": None})
+        stats["latency"] += (latency - stats["latency"]) * (1.0 if stats["samples"] == 0 else LATENCY_SMOOTHING)
+        stats["samples"] += 1
+        try:
+            if "X-RateLimit-Limit" in headers:
+                stats["limit"] = int(headers["X-RateLimit-Limit"])
+                # Con il bucket pieno, Reset-After è la durata dell'intera finestra
+                if headers.get("X-RateLimit-Remaining") == str(stats["limit"] - 1):
+                    stats["window"] = float(headers["X-RateLimit-Reset-After"])
+        except (KeyError, ValueError):
+            pass
+
+    def load_route_stats(self, path: str = ROUTE_STATS_FILE):
+        try:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    self.route_stats.update(json.load(f))
+        except Exception as e:
+            print(f"Error loading route stats: {e}")
+
+    def save_route_stats(self, path: str = ROUTE_STATS_FILE):
+        tmp_path = path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.route_stats, f, indent=4)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error saving route stats: {e}")
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """TraceConfig that routes every request of a session through this limiter"""
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            if params.url.host == "discord.com":
+                await self.acquire(params.method, params.url)
+                ctx.started_at = time.monotonic()
+
+        async def on_request_end(session, ctx, params):
+            if params.url.host == "discord.com":
+                self.update(params.method, params.url, params.response.status, params.response.headers)
+                if params.response.status < 400 and hasattr(ctx, "started_at"):
+                    self.record(params.method, params.url, time.monotonic() - ctx.started_at, params.response.headers)
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        return trace
+
+    def get_stats(self) -> dict:
+        return {
+            "known_buckets": len(self._buckets),
+            "waits": self.waits,
+            "wait_time": round(self.wait_time, 3),
+            "rate_limited": self.rate_limited,
+        }
+
+
+class _KeyPace:
+    __slots__ = ("rate", "ceiling", "next_at", "paused_until")
+
+    def __init__(self, rate: float):
+        self.rate = rate            # invii al secondo consentiti su questa chiave (canale)
+        self.ceiling = None         # limite / finestra del bucket, quando gli header lo rivelano
+        self.next_at = 0.0
+        self.paused_until = 0.0
+
+
+class AimdController:
+    """Additive-increase / multiplicative-decrease control of message sends.
+
+    Two levels, each adapting to what Discord reports:
+    - globally, a window of sends in flight across all channels grows by one
+      per window of successful sends and halves on a global 429;
+    - per key (a channel, whose sends stay sequential to keep message order),
+      a send rate grows additively on success and halves on a 429 for that
+      bucket, never above limit / reset window learned from the
+      X-RateLimit-* headers. An exhausted bucket (Remaining: 0) pauses the
+      key until Reset-After instead of provoking a 429.
+
+    Wrap each send in `async with controller.slot(key)` and report its outcome
+    with success() / rate_limited() / failed(); get_stats() exposes the
+    current window and per-key rates.
+    """
+
+    def __init__(self, initial_window: float = 2.0, min_window: float = 1.0, max_window: float = 10.0,
+                 initial_rate: float = 1.4, min_rate: float = 0.2, max_rate: float = 5.0,
+                 increase: float = 0.1, decrease: float = 0.5):
+        self.window = initial_window
+        self.min_window = min_window
+        self.max_window = max_window
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self._keys: Dict[str, _KeyPace] = {}
+        self._global_paused_until = 0.0
+        self._saturated = False
+        self._cond = asyncio.Condition()
+        self.sent = 0
+        self.rate_limited_count = 0
+        self.global_rate_limited = 0
+        self.errors = 0
+
+    def _pace(self, key) -> _KeyPace:
+        pace = self._keys.get(key)
+        if pace is None:
+            pace = self._keys[key] = _KeyPace(self.initial_rate)
+        return pace
+
+    async def acquire(self, key):
+        """Wait for a free slot in the global window, then for key's pacing"""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < max(1, int(self.window)))
+            self.in_flight += 1
+            # La finestra cresce solo se è lei a limitare, non il ritmo dei canali
+            self._saturated = self.in_flight >= int(self.window)
+        try:
+            pace = self._pace(key)
+            while True:
+                now = time.monotonic()
+                ready_at = max(pace.next_at, pace.paused_until, self._global_paused_until)
+                if ready_at <= now:
+                    break
+                await asyncio.sleep(ready_at - now)
+            pace.next_at = time.monotonic() + 1.0 / pace.rate
+        except BaseException:
+            await self.release()
+            raise
+
+    async def release(self):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, key):
+        await self.acquire(key)
+        try:
+            yield
+        finally:
+            await self.release()
+
+    def _learn(self, pace: _KeyPace, headers):
+        """Use the bucket headers of a response: exact capacity and exhaustion"""
+        if not headers:
+            return
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"]) if "X-RateLimit-Remaining" in headers else None
+            reset_after = float(headers["X-RateLimit-Reset-After"]) if "X-RateLimit-Reset-After" in headers else None
+            limit = int(headers["X-RateLimit-Limit"]) if "X-RateLimit-Limit" in headers else None
+        except ValueError:
+            return
+        if reset_after is None:
+            return
+        # Con il bucket appena riempito Reset-After è la durata dell'intera finestra
+        if limit and remaining == limit - 1 and reset_after > 0:
+            pace.ceiling = limit / reset_after
+            pace.rate = min(pace.rate, pace.ceiling)
+        if remaining == 0:
+            pace.paused_until = max(pace.paused_until, time.monotonic() + reset_after)
+
+    def success(self, key, headers=None):
+        self.sent += 1
+        pace = self._pace(key)
+        self._learn(pace, headers)
+        pace.rate = min(pace.ceiling or self.max_rate, self.max_rate, pace.rate + self.increase)
+        # Come la congestion avoidance TCP: +1 ogni finestra intera di invii riusciti
+        if self._saturated:
+            self.window = min(self.max_window, self.window + 1.0 / self.window)
+
+    def rate_limited(self, key, retry_after: float, headers=None):
+        self.rate_limited_count += 1
+        pace = self._pace(key)
+        self._learn(pace, headers)
+        until = time.monotonic() + retry_after
+        headers = headers or {}
+        if headers.get("X-RateLimit-Global", "").lower() == "true" or headers.get("X-RateLimit-Scope") == "global":
+            self.global_rate_limited += 1
+            self._global_paused_until = max(self._global_paused_until, until)
+            self.window = max(self.min_window, self.window * self.decrease)
+        else:
+            pace.paused_until = max(pace.paused_until, until)
+        pace.rate = max(self.min_rate, pace.rate * self.decrease)
+
+    def failed(self, key, headers=None):
+        """A non rate-limit error: not a congestion signal, only the headers are used"""
+        self.errors += 1
+        self._learn(self._pace(key), headers)
+
+    def get_stats(self) -> dict:
+        return {
+            "window": round(self.window, 2),
+            "in_flight": self.in_flight,
+            "sent": self.sent,
+            "rate_limited": self.rate_limited_count,
+            "global_rate_limited": self.global_rate_limited,
+            "errors": self.errors,
+            "rates": {str(key): round(pace.rate, 2) for key, pace in self._keys.items()},
+        }
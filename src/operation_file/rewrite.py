@@ -0,0 +1,59 @@
+import re
+from typing import Dict, Optional
+
+# Un solo pattern per tutti i riferimenti: <#canale>, <@&ruolo> e i jump link
+# (discord.com, discordapp.com, ptb./canary.) verso un canale o un messaggio
+REFERENCE_PATTERN = re.compile(
+    r"<#(\d+)>"
+    r"|<@&(\d+)>"
+    r"|https://(?:(?:ptb|canary)\.)?discord(?:app)?\.com/channels/(\d+)/(\d+)(?:/(\d+))?"
+)
+# Controllo preliminare in C: la gran parte dei messaggi non contiene riferimenti
+_MARKERS = ("<#", "<@&", "/channels/")
+
+
+class ReferenceRewriter:
+    """Rewrites channel, role and jump-link references of cloned message content.
+
+    The source -> destination maps are turned once into lookup tables of
+    ready-made replacement strings; rewrite() then makes a single pass of
+    REFERENCE_PATTERN over each message, whatever the size of the maps.
+    References to channels or roles that were not cloned, and links into
+    other guilds, are left untouched. A jump link to a message that is not in
+    messages_map (not replayed, or not yet) points at its cloned channel.
+    messages_map is read live, so it can be filled while messages are replayed.
+    """
+
+    def __init__(self, guild_from_id, guild_to_id, channels_map: Dict, roles_map: Dict,
+                 messages_map: Optional[Dict] = None):
+        self.guild_from_id = str(guild_from_id)
+        self.guild_to_id = str(guild_to_id)
+        self.messages_map = messages_map if messages_map is not None else {}
+        self._channels = {}
+        self._roles = {}
+        self._links = {}
+        for source_id, dest_id in channels_map.items():
+            if dest_id:
+                self._channels[str(source_id)] = f"<#{dest_id}>"
+                self._links[str(source_id)] = f"https://discord.com/channels/{self.guild_to_id}/{dest_id}"
+        for source_id, dest_id in roles_map.items():
+            if dest_id:
+                self._roles[str(source_id)] = f"<@&{dest_id}>"
+
+    def _replace(self, match) -> str:
+        channel_id, role_id, guild_id, link_channel_id, message_id = match.groups()
+        if channel_id is not None:
+            return self._channels.get(channel_id, match.group(0))
+        if role_id is not None:
+            return self._roles.get(role_id, match.group(0))
+        link = self._links.get(link_channel_id) if guild_id == self.guild_from_id else None
+        if link is None:
+            return match.group(0)
+        if message_id is not None and message_id in self.messages_map:
+            return f"{link}/{self.messages_map[message_id]}"
+        return link
+
+    def rewrite(self, content: str) -> str:
+        if not content or not any(marker in content for marker in _MARKERS):
+            return content
+        return REFERENCE_PATTERN.sub(self._replace, content)
@@ -1,15 +1,24 @@
-import discord
 from src.operation_file.logger import Logger
-from typing import Optional, Callable
+from src.operation_file.gateway import snapshot_from_payload
+from src.operation_file.assets import (
+    AssetCache, fit_image, fit_image_data_uri, encode_data_uri,
+    EMOJI_MAX_BYTES, EMOJI_MAX_SIDE, STICKER_MAX_BYTES, STICKER_MAX_SIDE
+)
+from src.operation_file.workers import run_in_pool
+from src.operation_file.localindex import LocalIndex
+from src.operation_file.idmap import IdMapStore, KIND_CATEGORY, KIND_CHANNEL, KIND_MESSAGE, KIND_ROLE
+from src.operation_file.models import (
+    CHANNEL_CATEGORY, CHANNEL_TEXT, CHANNEL_VOICE, OVERWRITE_ROLE, Channel, Role, parse_channels, parse_roles
+)
+from src.operation_file.codec import loads
+from src.operation_file.ratelimit import AimdController
+from src.operation_file.rewrite import ReferenceRewriter
+from datetime import datetime
+from typing import Callable, List
 import asyncio
 import time
-import io
 import aiohttp
-from concurrent.futures import ThreadPoolExecutor
 import json
-import re
-from datetime import datetime
-import base64
 import os
 
 
@@ -39,9 +48,42 @@ def load_or_create_config(file_path="config.json"):
             config[key] = value
 
     return config
+class GuildAccessError(Exception):
+    """Raised when a guild (or its channel list) cannot be fetched"""
+
+    def __init__(self, guild_id, status):
+        super().__init__(f"cannot access guild {guild_id} (HTTP {status})")
+        self.guild_id = guild_id
+        self.status = status
+
+
+STICKER_FORMAT_GIF = 4
+STICKER_FORMAT_LOTTIE = 3
+# Tipi di messaggio replicabili (gli altri sono eventi di sistema)
+MESSAGE_DEFAULT = 0
+MESSAGE_REPLY = 19
+
+
 class Clone:
-    def __init__(self, debug_callback=None):
+    # Pausa fissa dopo ogni richiesta riuscita, per tipo di operazione (usata anche dal planner)
+    PACING = {
+        "create_role": 0.5,
+        "create_category": 1.5,
+        "create_channel": 1.5,
+    }
+    # Teardown: DELETE in parallelo, i limiti reali li applica il RateLimiter della sessione
+    TEARDOWN_CONCURRENCY = 8
+    TEARDOWN_MAX_ATTEMPTS = 5
+    # Replay dei messaggi: tentativi per messaggio dopo un 429 (il ritmo lo decide AimdController)
+    REPLAY_MAX_ATTEMPTS = 3
+    REPLAY_WINDOW = 2  # invii in volo all'avvio, poi la finestra si adatta
+    REPLAY_RATE = 1.4  # invii al secondo per canale all'avvio
+    REPLAY_PAGE_SIZE = 100  # massimo di GET /channels/{id}/messages
+
+    def __init__(self, debug_callback=None, asset_cache=None):
         self.logger = Logger(debug_callback)
+        # Cache degli asset CDN condivisa tra cloni concorrenti (fan-out)
+        self.asset_cache = asset_cache or AssetCache()
         self.total_roles = 0
         self.total_channels = 0
         self.total_messages = 0
@@ -51,13 +93,14 @@ class Clone:
         self.errors = 0
         self.start_time = None
         self.channel_map = {}  # Map to track old->new channels
-        self.executor = ThreadPoolExecutor(max_workers=3)  # For async file operations
         self.progress_callback = None  # Callback per l'aggiornamento della barra di progresso
         self.stats = {
             "roles_created": 0,
             "categories_created": 0,
             "text_channels_created": 0,
             "voice_channels_created": 0,
+            "emojis_created": 0,
+            "stickers_created": 0,
             "messages_cloned": 0,
             "errors": 0,
             "start_time": None,
@@ -68,6 +111,13 @@ class Clone:
         self.roles_map = {}
         self.categories_map = {}
         self.channels_map = {}
+        self.last_plan = None  # ClonePlan dell'ultimo dry run
+        self.teardown_report = []  # esito di ogni DELETE dell'ultima clonazione
+        self.replay = AimdController()  # finestra e ritmi dell'ultimo replay dei messaggi
+        self.messages_map = {}  # ID messaggio sorgente -> ID del messaggio replicato
+        self.rewriter = None
+        # Le mappe sopravvivono alla sessione: la prossima esecuzione sulla stessa coppia riparte da qui
+        self.id_map = IdMapStore()
 
 
 
@@ -84,7 +134,7 @@ class Clone:
             progress = max(0.0, min(1.0, progress))
             self.progress_callback(progress)
 
-    async def start_clone(self, guild_from, guild_to, session, options=None) -> bool:
+    async def start_clone(self, guild_from, guild_to, session, options=None, source_snapshot=None, dest_snapshot=None) -> bool:
         """Start the cloning process with options using REST API
         
         Args:
@@ -99,7 +149,16 @@ class Clone:
                 - clone_messages: Whether to clone messages
                 - messages_limit: Maximum number of messages to clone per channel
                 - clone_name_icon: clones the name and icon of the destined server
+                - clone_emojis / clone_stickers: copy custom emojis / stickers (names already present are kept)
+                - dry_run: only build the operation plan (see plan_clone), nothing is modified
+            source_snapshot / dest_snapshot: structures from prefetch() or a gateway snapshot;
+                whatever is missing is fetched by prefetch() before the first mutation
         """
+        if options and options.get("dry_run"):
+            self.last_plan = await self.plan_clone(guild_from, guild_to, session, options, source_snapshot, dest_snapshot)
+            return self.last_plan is not None
+
+        maps_pair = None
         try:
             self.start_time = time.time()
             
@@ -109,6 +168,8 @@ class Clone:
                 "categories_created": 0,
                 "text_channels_created": 0,
                 "voice_channels_created": 0,
+                "emojis_created": 0,
+                "stickers_created": 0,
                 "messages_cloned": 0,
                 "errors": 0,
                 "start_time": time.time(),
@@ -116,9 +177,11 @@ class Clone:
             }
             
             # Reset entity maps
+            self.teardown_report = []
             self.roles_map = {}
             self.categories_map = {}
             self.channels_map = {}
+            self.messages_map = {}
             
             # Default options if none provided
             if options is None:
@@ -140,55 +203,48 @@ class Clone:
             dest_id = guild_to.get("id")
             
             self._safe_log(f"Starting cloning process from {guild_from.get('name')} to {guild_to.get('name')}")
-            # Ensure env is loaded/created
 
+            # Prefetch: tutte le letture indipendenti partono insieme prima della prima scrittura
+            if source_snapshot is None or dest_snapshot is None:
+                try:
+                    fetched_source, fetched_dest, _requests = await self.prefetch(
+                        session, source_id, dest_id, guild_from=guild_from, guild_to=guild_to,
+                        need_source=source_snapshot is None, need_dest=dest_snapshot is None
+                    )
+                except GuildAccessError as e:
+                    self._safe_log(f"Error fetching guild structure: {e}", "ERROR")
+                    self.errors += 1
+                    return False
+                source_snapshot = source_snapshot or fetched_source
+                dest_snapshot = dest_snapshot or fetched_dest
             
-            # Fetch all data from the source server
-            
-            # Roles
-            roles_url = f"https://discord.com/api/v10/guilds/{source_id}/roles"
+            # Mappe delle esecuzioni precedenti verso questa destinazione
+            stored_maps = await asyncio.to_thread(self.id_map.load, source_id, dest_id)
+            self._restore_maps(stored_maps, dest_snapshot)
+            maps_pair = (source_id, dest_id)
+
+            # Roles (il ruolo everyone non si può clonare)
             roles_data = []
-            
             if options.get("clone_roles", True):
-                async with session.get(roles_url) as roles_response:
-                    if roles_response.status == 200:
-                        roles_data = await roles_response.json()
-                        # Filtriamo il ruolo everyone che non possiamo clonare
-                        roles_data = [r for r in roles_data if r.get("name") != "@everyone"]
-                        self.total_roles = len(roles_data)
-                        self._safe_log(f"Found {self.total_roles} roles to clone")
-                    else:
-                        self._safe_log(f"Error fetching roles: {roles_response.status}", "ERROR")
-                        self.errors += 1
+                roles_data = parse_roles(source_snapshot["roles"])
+                self.total_roles = len(roles_data)
+                self._safe_log(f"Found {self.total_roles} roles to clone")
+            # @everyone ha l'ID della guild: i suoi overwrite vanno sull'@everyone della destinazione
+            self.roles_map[str(source_id)] = str(dest_id)
+
+            # Dividiamo i canali per tipo in un solo passaggio, tenendo solo i campi che servono
+            categories_data, text_channels_data, voice_channels_data, _skipped = parse_channels(source_snapshot["channels"])
             
-            # Canali
-            channels_url = f"https://discord.com/api/v10/guilds/{source_id}/channels"
-            categories_data = []
-            text_channels_data = []
-            voice_channels_data = []
+            total_channels = 0
+            if options.get("clone_categories", True):
+                total_channels += len(categories_data)
+            if options.get("clone_text_channels", True):
+                total_channels += len(text_channels_data)
+            if options.get("clone_voice_channels", True):
+                total_channels += len(voice_channels_data)
             
-            async with session.get(channels_url) as channels_response:
-                if channels_response.status == 200:
-                    all_channels = await channels_response.json()
-                    
-                    # Dividiamo i canali per tipo
-                    categories_data = [c for c in all_channels if c.get("type") == 4]
-                    text_channels_data = [c for c in all_channels if c.get("type") == 0]
-                    voice_channels_data = [c for c in all_channels if c.get("type") == 2]
-                    
-                    total_channels = 0
-                    if options.get("clone_categories", True):
-                        total_channels += len(categories_data)
-                    if options.get("clone_text_channels", True):
-                        total_channels += len(text_channels_data)
-                    if options.get("clone_voice_channels", True):
-                        total_channels += len(voice_channels_data)
-                    
-                    self.total_channels = total_channels
-                    self._safe_log(f"Found {self.total_channels} channels to clone")
-                else:
-                    self._safe_log(f"Error fetching channels: {channels_response.status}", "ERROR")
-                    self.errors += 1
+            self.total_channels = total_channels
+            self._safe_log(f"Found {self.total_channels} channels to clone")
             
             # Inizializziamo il progresso
             self._update_progress(0.0)
@@ -224,7 +280,12 @@ class Clone:
                 progress_steps.append(("create_channels", current_progress + channel_progress))
                 current_progress += channel_progress
             
-            if options.get("clone_messages", True):
+            if options.get("clone_emojis", False) or options.get("clone_stickers", False):
+                progress_steps.append(("create_emojis", current_progress + 0.10))
+                current_progress += 0.10
+
+            replay_messages = options.get("clone_messages", False) and options.get("messages_limit", 0) > 0
+            if replay_messages:
                 progress_steps.append(("copy_messages", 1.0))  # Messages always go to 100%
             else:
                 # If we don't clone messages, we need to ensure we reach 100%
@@ -241,8 +302,10 @@ class Clone:
             self._update_progress(self.progress_steps.get("edit_guild", 0.05))
 
             if options.get("clone_roles", True) and roles_data:
-                await self._delete_existing_roles_rest(guild_to, session)
+                await self._delete_existing_roles_rest(guild_to, session, existing_roles=dest_snapshot["roles"])
                 self._update_progress(self.progress_steps.get("delete_roles", 0.15))
+                # I ruoli ricreati sostituiscono quelli mappati dalle esecuzioni precedenti
+                self.roles_map = {str(source_id): str(dest_id)}
                 
                 await self._create_roles_rest(guild_to, roles_data, session)
                 self._update_progress(self.progress_steps.get("create_roles", 0.30))
@@ -257,8 +320,10 @@ class Clone:
                 channel_types_to_clone.append("voice")
             
             if channel_types_to_clone:
-                await self._delete_existing_channels_rest(guild_to, session)
+                await self._delete_existing_channels_rest(guild_to, session, existing_channels=dest_snapshot["channels"])
                 self._update_progress(self.progress_steps.get("delete_channels", 0.40))
+                # Con i canali se ne vanno anche i messaggi replicati
+                self.categories_map, self.channels_map, self.messages_map = {}, {}, {}
             
             # Use the combined create function
             if (options.get("clone_categories", True) and categories_data) or \
@@ -275,10 +340,18 @@ class Clone:
                 # Update progress in one go (or split if you want finer progress tracking)
                 self._update_progress(self.progress_steps.get("create_channels", 0.70))
 
-            
-            # We skip messages for now as they would need a completely different approach with the REST API
-            # You would need to fetch messages from each channel and then post them to the destination
-            # This can be added as a separate feature later
+            # Emoji e sticker dopo i ruoli: le emoji riservate usano la mappa dei ruoli
+            if options.get("clone_emojis", False) or options.get("clone_stickers", False):
+                await self._clone_emojis_and_stickers_rest(guild_to, source_snapshot, dest_snapshot, session, options)
+                self._update_progress(self.progress_steps.get("create_emojis", 0.80))
+
+            # Messaggi: letti via REST dai canali sorgente e inviati ai canali clonati
+            if replay_messages:
+                await self._copy_messages_rest(source_id, dest_id, text_channels_data, session,
+                                               options["messages_limit"])
+                self._update_progress(1.0)
+
+            await asyncio.to_thread(self.id_map.save, source_id, dest_id, self._id_maps())
 
             elapsed = time.time() - self.start_time
             self.logger.add(f"Cloning completed in {elapsed:.2f} seconds")
@@ -286,8 +359,107 @@ class Clone:
 
         except Exception as e:
             self.logger.error(f"Critical error during cloning: {str(e)}")
+            # Quanto creato prima dell'errore resta valido per la prossima esecuzione
+            if maps_pair is not None:
+                await asyncio.to_thread(self.id_map.save, *maps_pair, self._id_maps())
             return False
 
+    def _restore_maps(self, stored: dict, dest_snapshot: dict):
+        """Take the stored mappings whose destination role or channel still exists (checked by ID)"""
+        role_ids = {str(r["id"]) for r in dest_snapshot.get("roles") or ()}
+        channel_ids = {str(c["id"]) for c in dest_snapshot.get("channels") or ()}
+        self.roles_map.update((s, d) for s, d in stored[KIND_ROLE].items() if d in role_ids)
+        self.categories_map.update((s, d) for s, d in stored[KIND_CATEGORY].items() if d in channel_ids)
+        self.channels_map.update((s, d) for s, d in stored[KIND_CHANNEL].items() if d in channel_ids)
+        self.messages_map.update(stored[KIND_MESSAGE])
+        if stored[KIND_ROLE] or stored[KIND_CHANNEL]:
+            self._safe_log(f"Restored {len(self.roles_map)} roles, {len(self.categories_map)} categories and "
+                           f"{len(self.channels_map)} channels mapped by previous runs")
+
+    def _id_maps(self) -> dict:
+        return {KIND_ROLE: self.roles_map, KIND_CATEGORY: self.categories_map,
+                KIND_CHANNEL: self.channels_map, KIND_MESSAGE: self.messages_map}
+
+    async def prefetch(self, session, source_id, dest_id, guild_from=None, guild_to=None,
+                       need_source=True, need_dest=True):
+        """Issue every independent read of the clone concurrently.
+
+        Returns (source_snapshot, dest_snapshot, requests) with the snapshots
+        shaped like gateway snapshots and the number of GET requests issued;
+        guild objects already at hand are reused (the REST guild object
+        includes roles, emojis and stickers, so only channels are extra).
+        Raises GuildAccessError if anything cannot be read.
+        """
+        async def skip():
+            return None
+
+        source, dest = await asyncio.gather(
+            self._load_snapshot(session, source_id, guild_from) if need_source else skip(),
+            self._load_snapshot(session, dest_id, guild_to) if need_dest else skip(),
+        )
+        requests = ((self._snapshot_requests(guild_from) if need_source else 0)
+                    + (self._snapshot_requests(guild_to) if need_dest else 0))
+        return source, dest, requests
+
+    async def prefetch_many(self, session, guild_ids):
+        """Snapshots of several guilds read concurrently: {guild_id: snapshot or GuildAccessError}"""
+        results = await asyncio.gather(
+            *(self._load_snapshot(session, guild_id) for guild_id in guild_ids), return_exceptions=True
+        )
+        for result in results:
+            # Solo gli errori di accesso sono per-guild, il resto (rete) si propaga
+            if isinstance(result, BaseException) and not isinstance(result, GuildAccessError):
+                raise result
+        return {str(guild_id): result for guild_id, result in zip(guild_ids, results)}
+
+    @staticmethod
+    def _snapshot_requests(known_guild=None) -> int:
+        """GET requests _load_snapshot needs: channels only when the guild object already has its roles"""
+        return 1 if known_guild is not None and "roles" in known_guild else 2
+
+    async def _load_snapshot(self, session, guild_id, known_guild=None):
+        async def get_json(suffix=""):
+            async with session.get(f"https://discord.com/api/v10/guilds/{guild_id}{suffix}") as resp:
+                if resp.status != 200:
+                    raise GuildAccessError(guild_id, resp.status)
+                return await resp.json(loads=loads)
+
+        if self._snapshot_requests(known_guild) == 1:
+            channels = await get_json("/channels")
+            guild = known_guild
+        else:
+            guild, channels = await asyncio.gather(get_json(), get_json("/channels"))
+        snapshot = snapshot_from_payload(dict(guild, channels=channels))
+        await asyncio.to_thread(LocalIndex().put_snapshot, snapshot)
+        return snapshot
+
+    async def plan_clone(self, guild_from, guild_to, session, options=None, source_snapshot=None, dest_snapshot=None):
+        """Build the ClonePlan for this clone using only read requests (dry run)"""
+        from src.operation_file.planner import build_plan
+
+        fetches = 0
+        if source_snapshot is None or dest_snapshot is None:
+            try:
+                fetched_source, fetched_dest, fetches = await self.prefetch(
+                    session, guild_from.get("id"), guild_to.get("id"), guild_from=guild_from, guild_to=guild_to,
+                    need_source=source_snapshot is None, need_dest=dest_snapshot is None
+                )
+            except GuildAccessError as e:
+                self._safe_log(f"Error fetching guild structure: {e}", "ERROR")
+                return None
+            source_snapshot = source_snapshot or fetched_source
+            dest_snapshot = dest_snapshot or fetched_dest
+
+        plan = build_plan(
+            guild_from, guild_to,
+            source_snapshot["roles"], source_snapshot["channels"],
+            dest_snapshot["roles"], dest_snapshot["channels"],
+            options, fetch_requests=fetches,
+            assets=[(kind, obj) for kind, obj, *_rest in self._asset_jobs(source_snapshot, dest_snapshot, options or {})]
+        )
+        self._safe_log(f"Dry run: {plan.request_count} requests planned")
+        return plan
+
     async def _edit_guild_rest(self, guild_to, guild_from, session, options=None):
         try:
             if options is not None:
@@ -303,10 +475,9 @@ class Clone:
             icon_hash = guild_from.get("icon")
             if icon_hash:
                 icon_url = f"https://cdn.discordapp.com/icons/{guild_from.get('id')}/{icon_hash}.png"
-                async with session.get(icon_url) as resp:
-                    if resp.status == 200:
-                        icon_bytes = await resp.read()
-                        payload["icon"] = f"data:image/png;base64,{base64.b64encode(icon_bytes).decode()}"
+                icon_bytes = await self.asset_cache.get(session, icon_url)
+                if icon_bytes:
+                    payload["icon"] = await run_in_pool(encode_data_uri, icon_bytes, "image/png")
 
             async with session.patch(f"https://discord.com/api/v10/guilds/{guild_to.get('id')}", json=payload) as resp:
                 if resp.status in [200, 201]:
@@ -317,93 +488,255 @@ class Clone:
         except Exception as e:
             self._safe_log(f"Error updating guild: {str(e)}", "ERROR")
 
-    async def _delete_existing_roles_rest(self, guild_to, session):
-        """Delete all existing roles except @everyone using REST API"""
+    async def _send_with_retry(self, session, method, url, result, make_kwargs=None):
+        """Issue one REST call, retrying 429s, 5xx and network errors.
+
+        make_kwargs builds the request arguments for every attempt (a FormData
+        body cannot be sent twice). Updates result["attempts"] / result["error"]
+        and returns (status, json body) of the final response, or (None, None)
+        once TEARDOWN_MAX_ATTEMPTS are exhausted.
+        """
+        while result["attempts"] < self.TEARDOWN_MAX_ATTEMPTS:
+            result["attempts"] += 1
+            retry_after = None
+            try:
+                kwargs = make_kwargs() if make_kwargs else {}
+                async with session.request(method, url, **kwargs) as resp:
+                    try:
+                        body = await resp.json(content_type=None, loads=loads) if resp.status != 204 else {}
+                    except Exception:
+                        body = {}
+                    body = body if isinstance(body, dict) else {}
+                    if resp.status == 429:
+                        retry_after = float(body.get("retry_after") or resp.headers.get("Retry-After", 1.0))
+                        result["error"] = "rate limited"
+                    elif resp.status >= 500:
+                        result["error"] = f"HTTP {resp.status}"
+                    else:
+                        if resp.status >= 400:
+                            # 403, 400 (es. canale regole di una community): inutile riprovare
+                            result["error"] = f"HTTP {resp.status}: {body.get('message', '')}".rstrip(": ")
+                        return resp.status, body
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                result["error"] = str(e) or type(e).__name__
+            # Dopo l'ultimo tentativo non c'è nulla da aspettare
+            if result["attempts"] >= self.TEARDOWN_MAX_ATTEMPTS:
+                break
+            if retry_after is None:
+                retry_after = min(2 ** result["attempts"] * 0.5, 8.0)
+            await asyncio.sleep(retry_after)
+        return None, None
+
+    async def _delete_object(self, session, url, kind, obj, semaphore):
+        """DELETE one object, retrying 429s and transient failures.
+
+        Returns {"kind", "id", "name", "status", "attempts", "error"} where
+        status is "deleted", "missing" (already gone) or "failed".
+        """
+        result = {"kind": kind, "id": obj.get("id"), "name": obj.get("name", "Unknown"),
+                  "status": "failed", "attempts": 0, "error": None}
+        async with semaphore:
+            status, _body = await self._send_with_retry(session, "DELETE", url, result)
+        if status in (200, 204):
+            result["status"] = "deleted"
+        elif status == 404:
+            result["status"] = "missing"
+        return result
+
+    async def _delete_wave(self, session, kind, objects, url_for):
+        """Delete a wave of independent objects, as many in flight as TEARDOWN_CONCURRENCY allows"""
+        if not objects:
+            return []
+        semaphore = asyncio.Semaphore(self.TEARDOWN_CONCURRENCY)
+        results = await asyncio.gather(*(
+            self._delete_object(session, url_for(obj), kind, obj, semaphore) for obj in objects
+        ))
+        for result in results:
+            if result["status"] == "failed":
+                self.errors += 1
+                self._safe_log(f"Error deleting {kind} {result['name']}: {result['error']} "
+                               f"(after {result['attempts']} attempts)", "ERROR")
+        self.teardown_report.extend(results)
+        return results
+
+    def _log_teardown_summary(self, kind, results):
+        counts = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+        self._safe_log(f"Teardown {kind}s: {summary or 'nothing to delete'}")
+
+    async def _delete_existing_roles_rest(self, guild_to, session, existing_roles=None):
+        """Delete all existing roles except @everyone using REST API
+        
+        existing_roles: role list already known (e.g. gateway snapshot); fetched via REST when None.
+        Managed roles (bots, boosts, integrations) cannot be deleted and are reported as skipped.
+        """
         self._safe_log("Deleting existing roles...")
         try:
             roles_url = f"https://discord.com/api/v10/guilds/{guild_to.get('id')}/roles"
-            async with session.get(roles_url) as resp:
-                if resp.status == 200:
-                    roles_data = await resp.json()
-                    for role in roles_data:
-                        if role.get("name") == "@everyone":
-                            continue
-                        try:
-                            async with session.delete(f"{roles_url}/{role.get('id')}") as del_resp:
-                                if del_resp.status in (200, 204):
-                                    self._safe_log(f"Deleted role: {role.get('name')}")
-                                elif del_resp.status == 429:
-                                    rate_limit_data = await del_resp.json()
-                                    retry_after = rate_limit_data.get("retry_after", 5)
-                                    self._safe_log(f"Rate limit hit deleting role {role.get('name')}, waiting {retry_after}s", "ERROR")
-                                    await asyncio.sleep(retry_after)
-                                    continue
-                                else:
-                                    self.errors += 1
-                                    self._safe_log(f"Error deleting role {role.get('name')}: {del_resp.status}", "ERROR")
-                            await asyncio.sleep(1.0)
-                        except Exception as e:
-                            self.errors += 1
-                            self._safe_log(f"Exception deleting role {role.get('name')}: {str(e)}", "ERROR")
-                            await asyncio.sleep(2.0)
+            roles_data = existing_roles
+            if roles_data is None:
+                async with session.get(roles_url) as resp:
+                    if resp.status != 200:
+                        self.errors += 1
+                        self._safe_log(f"Failed to fetch roles for deletion: {resp.status}", "ERROR")
+                        return
+                    roles_data = await resp.json(loads=loads)
+
+            deletable = []
+            skipped = []
+            for role in roles_data:
+                # @everyone ha lo stesso ID della guild
+                if role.get("name") == "@everyone" or role.get("id") == guild_to.get("id"):
+                    continue
+                if role.get("managed"):
+                    skipped.append({"kind": "role", "id": role.get("id"), "name": role.get("name", "Unknown"),
+                                    "status": "skipped", "attempts": 0, "error": "managed role"})
                 else:
-                    self.errors += 1
-                    self._safe_log(f"Failed to fetch roles for deletion: {resp.status}", "ERROR")
+                    deletable.append(role)
+            self.teardown_report.extend(skipped)
+
+            results = await self._delete_wave(session, "role", deletable, lambda r: f"{roles_url}/{r.get('id')}")
+            self._log_teardown_summary("role", results + skipped)
         except Exception as e:
             self.errors += 1
             self._safe_log(f"Critical error deleting roles: {str(e)}", "ERROR")
 
 
-    async def _delete_existing_channels_rest(self, guild_to, session):
-        """Delete all existing channels using REST API (properly by ID)"""
+    async def _delete_existing_channels_rest(self, guild_to, session, existing_channels=None):
+        """Delete all existing channels using REST API (properly by ID)
+        
+        existing_channels: channel list already known (e.g. gateway snapshot); fetched via REST when None.
+        Deletes run in dependency-safe waves: child channels first, then their categories.
+        """
         self._safe_log("Deleting existing channels...")
 
         try:
-            # Fetch all channels from the target guild
-            async with session.get(f"https://discord.com/api/v10/guilds/{guild_to.get('id')}/channels") as resp:
-                if resp.status != 200:
-                    self.errors += 1
-                    self._safe_log(f"Failed to fetch channels for deletion: {resp.status}", "ERROR")
-                    return
-                
-                channels = await resp.json()
+            channels = existing_channels
+            if channels is None:
+                # Fetch all channels from the target guild
+                async with session.get(f"https://discord.com/api/v10/guilds/{guild_to.get('id')}/channels") as resp:
+                    if resp.status != 200:
+                        self.errors += 1
+                        self._safe_log(f"Failed to fetch channels for deletion: {resp.status}", "ERROR")
+                        return
+                    
+                    channels = await resp.json(loads=loads)
 
-            # Sort categories first, then other channels
-            # This ensures that text/voice channels under categories get deleted properly
             categories = [c for c in channels if c.get("type") == 4]
             other_channels = [c for c in channels if c.get("type") != 4]
 
-            all_channels_sorted = other_channels + categories  # Delete child channels first, then categories
-
-            for channel in all_channels_sorted:
-                channel_id = channel.get("id")
-                channel_name = channel.get("name", "Unknown")
+            def channel_url(channel):
+                return f"https://discord.com/api/v10/channels/{channel.get('id')}"
 
-                try:
-                    async with session.delete(f"https://discord.com/api/v10/channels/{channel_id}") as del_resp:
-                        if del_resp.status in (200, 204):
-                            self._safe_log(f"Deleted channel: {channel_name}")
-                        elif del_resp.status == 429:  # Rate limit
-                            rate_limit_data = await del_resp.json()
-                            retry_after = rate_limit_data.get("retry_after", 5)
-                            self._safe_log(f"Rate limit hit deleting channel {channel_name}, waiting {retry_after}s", "ERROR")
-                            await asyncio.sleep(retry_after)
-                            # Retry deletion
-                            continue
-                        else:
-                            self.errors += 1
-                            self._safe_log(f"Error deleting channel {channel_name}: {del_resp.status}", "ERROR")
-                except Exception as e:
-                    self.errors += 1
-                    self._safe_log(f"Exception deleting channel {channel_name}: {str(e)}", "ERROR")
-                
-                # Small delay to avoid hitting rate limits
-                await asyncio.sleep(1.0)
+            results = []
+            for wave in (other_channels, categories):
+                results += await self._delete_wave(session, "channel", wave, channel_url)
+            self._log_teardown_summary("channel", results)
         
         except Exception as e:
             self.errors += 1
             self._safe_log(f"Critical error deleting channels: {str(e)}", "ERROR")
 
+    async def _clone_emojis_and_stickers_rest(self, guild_to, source_snapshot, dest_snapshot, session, options):
+        """Copy custom emojis and stickers: concurrent downloads, downscaling and encoding in the
+        worker pool, uploads through the session's RateLimiter. Names already present in the destination are skipped.
+        """
+        guild_id = guild_to.get("id")
+        jobs = self._asset_jobs(source_snapshot, dest_snapshot, options)
+
+        if not jobs:
+            return
+        self._safe_log(f"Cloning {len(jobs)} emojis and stickers...")
+
+        # Download tutti insieme (la CDN non ha i limiti della REST API)
+        downloads = await asyncio.gather(*(self.asset_cache.get(session, url) for _k, _o, url, *_rest in jobs))
+        # Ridimensionamento (e base64 per le emoji) nei processi worker, così il loop resta libero
+        fitted = await asyncio.gather(*(
+            run_in_pool(fit_image_data_uri if kind == "emoji" else fit_image, data, max_bytes, max_side, fmt)
+            if data else self._none()
+            for data, (kind, _o, _u, max_bytes, max_side, fmt) in zip(downloads, jobs)
+        ))
+
+        semaphore = asyncio.Semaphore(self.TEARDOWN_CONCURRENCY)
+
+        async def upload(kind, obj, image, fmt):
+            result = {"kind": kind, "id": obj.get("id"), "name": obj.get("name", "Unknown"),
+                      "status": "failed", "attempts": 0, "error": None}
+            if image is None:
+                result["error"] = "download failed or image too large"
+                return result
+            if kind == "emoji":
+                payload = {
+                    "name": obj.get("name"),
+                    "image": image,
+                    "roles": [self.roles_map[r] for r in obj.get("roles") or [] if r in self.roles_map],
+                }
+                url = f"https://discord.com/api/v10/guilds/{guild_id}/emojis"
+                make_kwargs = lambda: {"json": payload}
+            else:
+                url = f"https://discord.com/api/v10/guilds/{guild_id}/stickers"
+
+                def make_kwargs():
+                    form = aiohttp.FormData()
+                    form.add_field("name", obj.get("name"))
+                    form.add_field("description", obj.get("description") or "")
+                    form.add_field("tags", obj.get("tags") or obj.get("name"))
+                    form.add_field("file", image, filename=f"{obj.get('id')}.{fmt.lower()}",
+                                   content_type=f"image/{fmt.lower()}")
+                    body = form()
+                    # La sessione manda application/json di default: serve il boundary del multipart
+                    return {"data": body, "headers": {"Content-Type": body.content_type}}
+
+            async with semaphore:
+                status, _body = await self._send_with_retry(session, "POST", url, result, make_kwargs)
+            if status in (200, 201):
+                result["status"] = "created"
+            return result
+
+        results = await asyncio.gather(*(
+            upload(kind, obj, image, fmt) for image, (kind, obj, _u, _b, _s, fmt) in zip(fitted, jobs)
+        ))
+        for result in results:
+            if result["status"] == "created":
+                self.stats[f"{result['kind']}s_created"] = self.stats.get(f"{result['kind']}s_created", 0) + 1
+            else:
+                self.errors += 1
+                self._safe_log(f"Error creating {result['kind']} {result['name']}: {result['error']}", "ERROR")
+        self._safe_log(f"Emojis created: {self.stats.get('emojis_created', 0)}, "
+                       f"stickers created: {self.stats.get('stickers_created', 0)}")
+
+    def _asset_jobs(self, source_snapshot, dest_snapshot, options):
+        """Emojis/stickers to upload: [(kind, source object, CDN url, max bytes, max side, format)]"""
+        jobs = []
+        if options.get("clone_emojis", False):
+            existing = {e.get("name") for e in dest_snapshot.get("emojis") or []}
+            for emoji in source_snapshot.get("emojis") or []:
+                # Le emoji gestite da integrazioni (Twitch, ...) non si possono caricare
+                if emoji.get("managed") or emoji.get("name") in existing:
+                    continue
+                ext = "gif" if emoji.get("animated") else "png"
+                jobs.append(("emoji", emoji, f"https://cdn.discordapp.com/emojis/{emoji.get('id')}.{ext}",
+                             EMOJI_MAX_BYTES, EMOJI_MAX_SIDE, ext.upper()))
+
+        if options.get("clone_stickers", False):
+            existing = {s.get("name") for s in dest_snapshot.get("stickers") or []}
+            for sticker in source_snapshot.get("stickers") or []:
+                if sticker.get("name") in existing:
+                    continue
+                if sticker.get("format_type") == STICKER_FORMAT_LOTTIE:
+                    self._safe_log(f"Skipping sticker {sticker.get('name')}: Lottie stickers cannot be uploaded")
+                    continue
+                ext = "gif" if sticker.get("format_type") == STICKER_FORMAT_GIF else "png"
+                jobs.append(("sticker", sticker, f"https://media.discordapp.net/stickers/{sticker.get('id')}.{ext}",
+                             STICKER_MAX_BYTES, STICKER_MAX_SIDE, ext.upper()))
+        return jobs
+
+    @staticmethod
+    async def _none():
+        return None
+
     def _safe_log(self, message: str, level: str = "INFO"):
         """Thread-safe logging wrapper"""
         try:
@@ -414,67 +747,70 @@ class Clone:
         except Exception:
             pass
 
-    async def _create_roles_rest(self, guild_to, roles_data, session):
+    async def _create_roles_rest(self, guild_to, roles_data: List[Role], session):
         """Create new roles using REST API (POST, aggiorna mappa ID)"""
         self._safe_log("Creating new roles...")
         for role in roles_data:
             try:
-                payload = {
-                    "name": role.get('name'),
-                    "permissions": role.get('permissions'),
-                    "color": role.get('color'),
-                    "hoist": role.get('hoist'),
-                    "mentionable": role.get('mentionable')
-                }
+                payload = role.to_payload()
                 async with session.post(f"https://discord.com/api/v10/guilds/{guild_to.get('id')}/roles", json=payload) as resp:
                     if resp.status == 200 or resp.status == 201:
-                        created = await resp.json()
-                        self.roles_map[role.get('id')] = created.get('id')
+                        created = await resp.json(loads=loads)
+                        self.roles_map[role.id] = created.get('id')
                         self.roles_created += 1
-                        self._safe_log(f"Role created ({self.roles_created}/{self.total_roles}): {role.get('name')}")
+                        self._safe_log(f"Role created ({self.roles_created}/{self.total_roles}): {role.name}")
                     elif resp.status == 429:  # Rate limit
                         # Estraiamo le informazioni sul rate limit
-                        rate_limit_data = await resp.json()
+                        rate_limit_data = await resp.json(loads=loads)
                         retry_after = rate_limit_data.get('retry_after', 5)  # Default 5 secondi
-                        self._safe_log(f"Rate limit hit when creating role {role.get('name')}. Waiting {retry_after} seconds...", "ERROR")
+                        self._safe_log(f"Rate limit hit when creating role {role.name}. Waiting {retry_after} seconds...", "ERROR")
                         await asyncio.sleep(retry_after)
                         # Riprova la creazione del ruolo (decrementiamo l'indice del loop)
                         continue
                     else:
                         self.errors += 1
-                        self._safe_log(f"Error creating role {role.get('name')}: {resp.status}", "ERROR")
+                        self._safe_log(f"Error creating role {role.name}: {resp.status}", "ERROR")
                 
                 # Aggiungiamo un piccolo delay per evitare rate limits
-                await asyncio.sleep(0.5)
+                await asyncio.sleep(self.PACING["create_role"])
             except Exception as e:
                 self.errors += 1
-                self._safe_log(f"Error creating role {role.get('name')}: {str(e)}", "ERROR")
+                self._safe_log(f"Error creating role {role.name}: {str(e)}", "ERROR")
                 # In caso di errore, aspettiamo un po' di più
                 await asyncio.sleep(1.0)
                 
-    async def _create_categories_and_channels_rest(self, guild_to, categories_data, text_channels_data, voice_channels_data, session):
-        """Create categories and channels preserving their layout and parent relationships"""
+    def _overwrites_payload(self, channel: Channel) -> list:
+        """Role overwrites of channel with role IDs translated to the destination.
+
+        Overwrites of roles that were not cloned, and member overwrites (the
+        member may not be in the destination, which makes Discord reject the
+        whole channel), are left out.
+        """
+        payload = []
+        for overwrite in channel.overwrites:
+            target_id = self.roles_map.get(overwrite.id) if overwrite.type == OVERWRITE_ROLE else None
+            if target_id is not None:
+                payload.append(overwrite.to_payload(str(target_id)))
+        return payload
+
+    async def _create_categories_and_channels_rest(self, guild_to, categories_data: List[Channel],
+                                                   text_channels_data: List[Channel],
+                                                   voice_channels_data: List[Channel], session):
+        """Create categories and channels preserving their layout and parent relationships
+
+        The lists come from parse_channels, already sorted by position.
+        """
         
         # ---------------- CREATE CATEGORIES ----------------
         self._safe_log("Creating categories...")
-        categories_data = sorted(categories_data, key=lambda c: c.get("position", 0))
         
         for category in categories_data:
             try:
-                overwrites_to = []
-                for role_id, perms in category.get("overwrites", {}).items():
-                    overwrites_to.append({
-                        "id": str(role_id),
-                        "type": 0,  # role overwrite
-                        "allow": perms.get("allow", "0"),
-                        "deny": perms.get("deny", "0")
-                    })
-
                 payload = {
-                    "name": category.get("name"),
-                    "type": 4,  # 4 = category
-                    "permission_overwrites": overwrites_to,
-                    "position": category.get("position", 0)
+                    "name": category.name,
+                    "type": CHANNEL_CATEGORY,
+                    "permission_overwrites": self._overwrites_payload(category),
+                    "position": category.position
                 }
 
                 async with session.post(
@@ -482,267 +818,214 @@ class Clone:
                     json=payload
                 ) as response:
                     if response.status in (200, 201):
-                        created = await response.json()
-                        self.categories_map[category.get("id")] = created.get("id")
-                        self._safe_log(f"Category created: {category.get('name')}")
+                        created = await response.json(loads=loads)
+                        self.categories_map[category.id] = created.get("id")
+                        self._safe_log(f"Category created: {category.name}")
                     elif response.status == 429:
-                        rate_limit_data = await response.json()
+                        rate_limit_data = await response.json(loads=loads)
                         retry_after = rate_limit_data.get("retry_after", 5)
-                        self._safe_log(f"Rate limit hit creating category {category.get('name')}, waiting {retry_after}s", "ERROR")
+                        self._safe_log(f"Rate limit hit creating category {category.name}, waiting {retry_after}s", "ERROR")
                         await asyncio.sleep(retry_after)
                         continue
                     else:
                         self.errors += 1
-                        self._safe_log(f"Error creating category {category.get('name')}: {response.status}", "ERROR")
+                        self._safe_log(f"Error creating category {category.name}: {response.status}", "ERROR")
 
-                await asyncio.sleep(1.5)
+                await asyncio.sleep(self.PACING["create_category"])
 
             except Exception as e:
                 self.errors += 1
-                self._safe_log(f"Exception creating category {category.get('name')}: {str(e)}", "ERROR")
+                self._safe_log(f"Exception creating category {category.name}: {str(e)}", "ERROR")
                 await asyncio.sleep(3.0)
 
-        # ---------------- CREATE TEXT CHANNELS ----------------
-        self._safe_log("Creating text channels...")
-        text_channels_data = sorted(text_channels_data, key=lambda c: c.get("position", 0))
-        
-        for channel in text_channels_data:
-            try:
-                payload = {
-                    "name": channel.get("name"),
-                    "type": 0,  # text
-                    "topic": channel.get("topic"),
-                    "position": channel.get("position", 0),
-                    "nsfw": channel.get("nsfw", False),
-                    "rate_limit_per_user": channel.get("slowmode_delay", 0)
-                }
+        # ---------------- CREATE TEXT AND VOICE CHANNELS ----------------
+        for kind, channels in (("text", text_channels_data), ("voice", voice_channels_data)):
+            self._safe_log(f"Creating {kind} channels...")
+            for channel in channels:
+                await self._create_channel_rest(guild_to, channel, kind, session)
 
-                # Map parent category
-                old_cat_id = channel.get("category_id") or channel.get("parent_id")
-                if old_cat_id and old_cat_id in self.categories_map:
-                    payload["parent_id"] = str(self.categories_map[old_cat_id])
-
-                # Permission overwrites
-                overwrites_to = []
-                for role_id, perms in channel.get("overwrites", {}).items():
-                    overwrites_to.append({
-                        "id": str(role_id),
-                        "type": 0,
-                        "allow": perms.get("allow", "0"),
-                        "deny": perms.get("deny", "0")
-                    })
-                if overwrites_to:
-                    payload["permission_overwrites"] = overwrites_to
-
-                self._safe_log(f"Creating text channel {channel.get('name')} under category {payload.get('parent_id')}")
-                
-                async with session.post(
-                    f"https://discord.com/api/v10/guilds/{guild_to.get('id')}/channels",
-                    json=payload
-                ) as resp:
-                    if resp.status in (200, 201):
-                        created = await resp.json()
-                        self.channels_map[channel.get("id")] = created.get("id")
-                        self._safe_log(f"Text channel created: {channel.get('name')}")
-                    elif resp.status == 429:
-                        rate_limit_data = await resp.json()
-                        retry_after = rate_limit_data.get("retry_after", 5)
-                        self._safe_log(f"Rate limit hit creating text channel {channel.get('name')}, waiting {retry_after}s", "ERROR")
-                        await asyncio.sleep(retry_after)
-                        continue
-                    else:
-                        self.errors += 1
-                        self._safe_log(f"Error creating text channel {channel.get('name')}: {resp.status}", "ERROR")
+    async def _create_channel_rest(self, guild_to, channel: Channel, kind: str, session):
+        try:
+            payload = {"name": channel.name, "type": channel.type, "position": channel.position}
+            if channel.type == CHANNEL_TEXT:
+                payload.update(topic=channel.topic, nsfw=channel.nsfw, rate_limit_per_user=channel.rate_limit_per_user)
+            elif channel.type == CHANNEL_VOICE:
+                payload.update(bitrate=channel.bitrate, user_limit=channel.user_limit)
 
-                await asyncio.sleep(1.5)
+            # Map parent category
+            if channel.parent_id and channel.parent_id in self.categories_map:
+                payload["parent_id"] = str(self.categories_map[channel.parent_id])
 
-            except Exception as e:
-                self.errors += 1
-                self._safe_log(f"Exception creating text channel {channel.get('name')}: {str(e)}", "ERROR")
-                await asyncio.sleep(3.0)
+            overwrites_to = self._overwrites_payload(channel)
+            if overwrites_to:
+                payload["permission_overwrites"] = overwrites_to
 
-        # ---------------- CREATE VOICE CHANNELS ----------------
-        self._safe_log("Creating voice channels...")
-        voice_channels_data = sorted(voice_channels_data, key=lambda c: c.get("position", 0))
-        
-        for channel in voice_channels_data:
-            try:
-                payload = {
-                    "name": channel.get("name"),
-                    "type": 2,  # voice
-                    "position": channel.get("position", 0),
-                    "bitrate": channel.get("bitrate", 64000),
-                    "user_limit": channel.get("user_limit", 0)
-                }
+            self._safe_log(f"Creating {kind} channel {channel.name} under category {payload.get('parent_id')}")
 
-                old_cat_id = channel.get("category_id") or channel.get("parent_id")
-                if old_cat_id and old_cat_id in self.categories_map:
-                    payload["parent_id"] = str(self.categories_map[old_cat_id])
-
-                overwrites_to = []
-                for role_id, perms in channel.get("overwrites", {}).items():
-                    overwrites_to.append({
-                        "id": str(role_id),
-                        "type": 0,
-                        "allow": perms.get("allow", "0"),
-                        "deny": perms.get("deny", "0")
-                    })
-                if overwrites_to:
-                    payload["permission_overwrites"] = overwrites_to
-
-                self._safe_log(f"Creating voice channel {channel.get('name')} under category {payload.get('parent_id')}")
-                
-                async with session.post(
-                    f"https://discord.com/api/v10/guilds/{guild_to.get('id')}/channels",
-                    json=payload
-                ) as resp:
-                    if resp.status in (200, 201):
-                        created = await resp.json()
-                        self.channels_map[channel.get("id")] = created.get("id")
-                        self._safe_log(f"Voice channel created: {channel.get('name')}")
-                    elif resp.status == 429:
-                        rate_limit_data = await resp.json()
-                        retry_after = rate_limit_data.get("retry_after", 5)
-                        self._safe_log(f"Rate limit hit creating voice channel {channel.get('name')}, waiting {retry_after}s", "ERROR")
-                        await asyncio.sleep(retry_after)
-                        continue
-                    else:
-                        self.errors += 1
-                        self._safe_log(f"Error creating voice channel {channel.get('name')}: {resp.status}", "ERROR")
+            async with session.post(
+                f"https://discord.com/api/v10/guilds/{guild_to.get('id')}/channels",
+                json=payload
+            ) as resp:
+                if resp.status in (200, 201):
+                    created = await resp.json(loads=loads)
+                    self.channels_map[channel.id] = created.get("id")
+                    self._safe_log(f"{kind.capitalize()} channel created: {channel.name}")
+                elif resp.status == 429:
+                    rate_limit_data = await resp.json(loads=loads)
+                    retry_after = rate_limit_data.get("retry_after", 5)
+                    self._safe_log(f"Rate limit hit creating {kind} channel {channel.name}, waiting {retry_after}s", "ERROR")
+                    await asyncio.sleep(retry_after)
+                    return
+                else:
+                    self.errors += 1
+                    self._safe_log(f"Error creating {kind} channel {channel.name}: {resp.status}", "ERROR")
 
-                await asyncio.sleep(1.5)
+            await asyncio.sleep(self.PACING["create_channel"])
 
-            except Exception as e:
-                self.errors += 1
-                self._safe_log(f"Exception creating voice channel {channel.get('name')}: {str(e)}", "ERROR")
-                await asyncio.sleep(3.0)
+        except Exception as e:
+            self.errors += 1
+            self._safe_log(f"Exception creating {kind} channel {channel.name}: {str(e)}", "ERROR")
+            await asyncio.sleep(3.0)
 
 
            
-    async def _copy_messages(self, guild_from: discord.Guild, guild_to: discord.Guild, message_limit=100):
-        """Copy messages from source server channels with a limit"""
-        self._safe_log("Starting message copy...")
-        
-        # Conteggio totale dei messaggi da copiare (approssimativo)
-        # Per ogni canale di testo, utilizziamo il limite specificato
-        self.total_messages = len(guild_from.text_channels) * message_limit
-        
-        copy_tasks = []
-        for channel_from in guild_from.text_channels:
-            channel_to = discord.utils.get(guild_to.text_channels, name=channel_from.name)
-            if channel_to:
-                copy_tasks.append(self._copy_channel_messages(channel_from, channel_to, message_limit))
-        
-        # Execute message copying concurrently in batches, using smaller batches
-        batch_size = 2  # Ridotto da 3 a 2 per evitare rate limit
-        for i in range(0, len(copy_tasks), batch_size):
-            batch = copy_tasks[i:i + batch_size]
-            await asyncio.gather(*batch, return_exceptions=True)
-            
-            # Aspettiamo un po' tra i batch per evitare rate limit
-            await asyncio.sleep(1.0)
+    async def _copy_messages_rest(self, source_id, dest_id, text_channels: List[Channel], session, message_limit: int):
+        """Replay the last message_limit messages of every cloned text channel
 
-    async def _copy_channel_messages(self, channel_from, channel_to, message_limit=100):
-        """Helper method for copying messages from one channel with a limit"""
-        try:
-            # Iniziamo con un piccolo delay tra i messaggi per evitare rate limit
-            rate_limit_delay = 0.7
-            consecutive_errors = 0
-            message_count = 0
-            
-            # Recuperiamo i messaggi in ordine cronologico inverso (dal più recente)
-            messages = []
-            async for message in channel_from.history(limit=message_limit):
-                messages.append(message)
-            
-            # Invertiamo per inviarli in ordine cronologico (dal più vecchio)
-            messages.reverse()
-            
-            for message in messages:
-                # Se abbiamo troppi errori consecutivi, aumentiamo molto il delay
-                if consecutive_errors >= 3:
-                    rate_limit_delay = min(5.0, rate_limit_delay * 1.5)
-                    consecutive_errors = 0
-                
-                try:
-                    # Prepariamo il contenuto del messaggio
-                    author_name = message.author.display_name
-                    timestamp = message.created_at.strftime("%d/%m/%Y %H:%M")
-                    
-                    # Gestione degli embed e del contenuto
-                    content = f"**{author_name}** *{timestamp}*"
-                    if message.content:
-                        content += f"\n{message.content}"
-                    
-                    # Formattiamo il contenuto
-                    if len(content) > 2000:
-                        # Se il messaggio è troppo lungo, lo tronchiamo
-                        content = content[:1997] + "..."
-                    
-                    # Inviamo il messaggio
-                    if content and content != f"**{author_name}**:":
-                        await channel_to.send(content=content)
-                        self.messages_copied += 1
-                        message_count += 1
-                        
-                    # Gestione degli allegati
-                    if message.attachments:
-                        files = []
-                        
-                        # Utilizziamo una sessione sicura per scaricare gli allegati
-                        connector = aiohttp.TCPConnector(force_close=True)
-                        async with aiohttp.ClientSession(connector=connector) as session:
-                            for attachment in message.attachments:
-                                try:
-                                    # Scarichiamo direttamente dall'URL dell'allegato
-                                    async with session.get(attachment.url) as response:
-                                        if response.status == 200:
-                                            file_data = await response.read()
-                                            files.append(discord.File(io.BytesIO(file_data), filename=attachment.filename))
-                                except Exception:
-                                    continue
-                        
-                        # Se abbiamo scaricato file, li inviamo
-                        if files:
-                            # Inviamo il messaggio con gli allegati, includendo il nome dell'autore se non già inviato
-                            if not content or content == f"**{author_name}**:":
-                                await channel_to.send(content=f"**{author_name}** *{timestamp}*", files=files)
-                            else:
-                                await channel_to.send(files=files)
-                            
-                            self.messages_copied += 1
-                            message_count += 1
-                    
-                    # Aspettiamo tra un messaggio e l'altro per evitare rate limit
-                    await asyncio.sleep(rate_limit_delay)
-                    
-                    # Se tutto va bene, riduciamo gradualmente il delay
-                    rate_limit_delay = max(0.5, rate_limit_delay * 0.95)
-                    # Reset del contatore errori in caso di successo
-                    consecutive_errors = 0
-                except discord.errors.HTTPException as e:
-                    if e.status == 429:  # Rate limit
-                        consecutive_errors += 1
-                        self._safe_log(f"Rate limit reached, waiting longer ({round(rate_limit_delay, 1)}s)")
-                        await asyncio.sleep(rate_limit_delay)
-                    else:
-                        consecutive_errors += 1
-                        self._safe_log(f"HTTP error while sending message: {e}")
-                        await asyncio.sleep(rate_limit_delay)
-                except Exception as e:
-                    consecutive_errors += 1
-                    self._safe_log(f"Error copying message: {str(e)}")
-                    await asyncio.sleep(rate_limit_delay)
-            
-            self._safe_log(f"Copied {message_count} messages to {channel_to.name}")
-            return message_count
-        except Exception as e:
-            self._safe_log(f"Error during message copying: {str(e)}")
+        Channels are replayed together; AimdController decides how many sends
+        stay in flight and the pace of each channel from the responses.
+        Channel, role and jump-link references are rewritten to the clone.
+        """
+        pairs = [(channel, self.channels_map[channel.id]) for channel in text_channels
+                 if self.channels_map.get(channel.id)]
+        self.total_messages = len(pairs) * message_limit
+        self.replay = AimdController(initial_window=self.REPLAY_WINDOW, initial_rate=self.REPLAY_RATE)
+        # messages_map si riempie durante il replay: i jump link verso messaggi già inviati puntano alla copia
+        self.rewriter = ReferenceRewriter(source_id, dest_id, {**self.categories_map, **self.channels_map},
+                                          self.roles_map, self.messages_map)
+        self._safe_log(f"Copying up to {message_limit} messages in {len(pairs)} channels...")
+
+        start = max((v for k, v in self.progress_steps.items() if k != "copy_messages"), default=0.0)
+        done = 0
+
+        async def copy(channel, dest_id):
+            nonlocal done
+            count = await self._copy_channel_messages_rest(channel, dest_id, session, message_limit)
+            done += 1
+            self._update_progress(start + (1.0 - start) * done / len(pairs))
+            return count
+
+        counts = await asyncio.gather(*(copy(channel, dest_id) for channel, dest_id in pairs))
+        self._safe_log(f"Copied {sum(counts)} messages")
+
+    async def _copy_channel_messages_rest(self, channel: Channel, dest_id, session, message_limit: int) -> int:
+        """Replay one channel oldest first; its sends stay sequential to keep the order"""
+        messages = await self._fetch_history(channel.id, session, message_limit)
+        if messages is None:
+            self.errors += 1
             return 0
+        count = 0
+        for message in messages:
+            # Già replicato da un'esecuzione precedente verso lo stesso canale
+            if str(message["id"]) in self.messages_map:
+                continue
+            content = self._format_message(message)
+            if content is None:
+                continue
+            # Le menzioni replicate non notificano nessuno nel server di destinazione
+            sent = await self._send_paced(session, dest_id, {"content": content, "allowed_mentions": {"parse": []}})
+            if sent is not None:
+                if sent.get("id"):
+                    self.messages_map[str(message["id"])] = str(sent["id"])
+                count += 1
+                self.messages_copied += 1
+                self.stats["messages_cloned"] += 1
+        self._safe_log(f"Copied {count} messages to {channel.name}")
+        return count
+
+    async def _fetch_history(self, channel_id, session, limit: int) -> List[dict]:
+        """Last `limit` messages of a channel, oldest first; None if the channel cannot be read"""
+        url = f"https://discord.com/api/v10/channels/{channel_id}/messages"
+        messages = []
+        before = None
+        while len(messages) < limit:
+            params = {"limit": min(self.REPLAY_PAGE_SIZE, limit - len(messages))}
+            if before:
+                params["before"] = before
+            async with session.get(url, params=params) as resp:
+                if resp.status != 200:
+                    self._safe_log(f"Cannot read messages of channel {channel_id}: HTTP {resp.status}", "ERROR")
+                    return None
+                page = await resp.json(loads=loads)
+            messages.extend(page)
+            if len(page) < params["limit"]:
+                break
+            before = page[-1]["id"]
+        messages.reverse()
+        return messages
+
+    def _format_message(self, message: dict):
+        """Author and time header, content and attachment links; None for messages with nothing to replay"""
+        # Solo messaggi normali e risposte: join, pin, boost... non si possono ricreare
+        if message.get("type", 0) not in (MESSAGE_DEFAULT, MESSAGE_REPLY):
+            return None
+        parts = []
+        if message.get("content"):
+            parts.append(self.rewriter.rewrite(message["content"]) if self.rewriter else message["content"])
+        parts.extend(a["url"] for a in message.get("attachments") or () if a.get("url"))
+        if not parts:
+            return None
+        author = message.get("author") or {}
+        name = author.get("global_name") or author.get("username") or "Unknown"
+        try:
+            timestamp = datetime.fromisoformat(message["timestamp"]).strftime("%d/%m/%Y %H:%M")
+        except (KeyError, TypeError, ValueError):
+            timestamp = ""
+        content = "\n".join([f"**{name}** *{timestamp}*"] + parts)
+        if len(content) > 2000:
+            content = content[:1997] + "..."
+        return content
+
+    async def _send_paced(self, session, channel_id, payload: dict):
+        """POST one message through the AIMD controller, retrying it after a 429.
+
+        Returns the created message, None if it could not be sent.
+        """
+        url = f"https://discord.com/api/v10/channels/{channel_id}/messages"
+        for _ in range(self.REPLAY_MAX_ATTEMPTS):
+            try:
+                async with self.replay.slot(channel_id):
+                    async with session.post(url, json=payload) as resp:
+                        status, headers = resp.status, resp.headers
+                        try:
+                            body = await resp.json(content_type=None, loads=loads)
+                        except ValueError:
+                            body = {}
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.replay.failed(channel_id)
+                self._safe_log(f"Error sending message: {str(e) or type(e).__name__}", "ERROR")
+                return None
+            body = body if isinstance(body, dict) else {}
+            if status in (200, 201):
+                self.replay.success(channel_id, headers)
+                return body
+            if status != 429:
+                self.replay.failed(channel_id, headers)
+                self.errors += 1
+                self._safe_log(f"Error sending message: HTTP {status}", "ERROR")
+                return None
+            retry_after = float(body.get("retry_after") or headers.get("Retry-After", 1.0))
+            if body.get("global"):
+                headers = {**headers, "X-RateLimit-Global": "true"}
+            self.replay.rate_limited(channel_id, retry_after, headers)
+            self._safe_log(f"Rate limited sending to channel {channel_id}, retrying in {round(retry_after, 1)}s")
+        return None
 
     def get_stats(self) -> dict:
         """Return cloning statistics"""
         # Update elapsed time if started
         if self.stats["start_time"]:
             self.stats["elapsed_time"] = time.time() - self.stats["start_time"]
+        # Finestra AIMD corrente del replay dei messaggi
+        self.stats["replay"] = self.replay.get_stats()
         return self.stats
\ No newline at end of file
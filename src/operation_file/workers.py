@@ -0,0 +1,74 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+# Numero di processi per le trasformazioni CPU-bound (Pillow, base64); 0 = solo thread
+WORKERS_ENV = "CLONER_WORKERS"
+
+_lock = threading.Lock()
+_pool: Optional[Executor] = None
+_max_workers: Optional[int] = None
+
+
+def configure(max_workers: Optional[int] = None):
+    """Set the pool size (None: one process per core, 0: threads instead of processes).
+
+    Takes effect the next time the pool is created; call before the first clone.
+    """
+    global _max_workers
+    with _lock:
+        _max_workers = max_workers
+
+
+def _configured_workers() -> Optional[int]:
+    if _max_workers is not None:
+        return _max_workers
+    value = os.environ.get(WORKERS_ENV, "").strip()
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def get_pool() -> Executor:
+    """The shared worker pool, created on first use (never during start-up)"""
+    global _pool
+    with _lock:
+        if _pool is None:
+            workers = _configured_workers()
+            if workers == 0:
+                _pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="clone-worker")
+            else:
+                try:
+                    _pool = ProcessPoolExecutor(max_workers=workers)
+                except (OSError, NotImplementedError, ValueError) as e:
+                    # Ambienti senza multiprocessing (sandbox, alcuni build congelati)
+                    print(f"Process pool unavailable, using threads: {e}")
+                    _pool = ThreadPoolExecutor(max_workers=workers or 2, thread_name_prefix="clone-worker")
+        return _pool
+
+
+async def run_in_pool(func, *args):
+    """Run a picklable top-level function in the worker pool without blocking the event loop"""
+    global _pool
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    try:
+        return await loop.run_in_executor(pool, func, *args)
+    except BrokenProcessPool:
+        # Un worker è morto: ripieghiamo sui thread per il resto della sessione
+        with _lock:
+            if _pool is pool:
+                _pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="clone-worker")
+        return await loop.run_in_executor(get_pool(), func, *args)
+
+
+def shutdown():
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
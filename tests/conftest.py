@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# I test importano i moduli come fa l'app: dalla radice del repository (src.…)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def isolated_stores(tmp_path, monkeypatch):
+    """Keep the SQLite stores of the engine out of src/interface/config"""
+    from src.operation_file.idmap import IdMapStore
+    from src.operation_file.localindex import LocalIndex
+
+    for store, name in ((LocalIndex, "local_index.db"), (IdMapStore, "id_map.db")):
+        monkeypatch.setattr(store, "_instance", None)
+        monkeypatch.setattr(store, "_db_file", str(tmp_path / name))
+    yield
+    for store in (LocalIndex, IdMapStore):
+        if store._instance is not None:
+            store._instance.close()
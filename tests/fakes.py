@@ -0,0 +1,57 @@
+import json
+import re
+
+
+class FakeResponse:
+    def __init__(self, status=200, body=None, headers=None):
+        self.status = status
+        self._body = body if body is not None else {}
+        self.headers = headers or {}
+
+    async def json(self, content_type=None, loads=json.loads):
+        return loads(json.dumps(self._body))
+
+    async def read(self):
+        return json.dumps(self._body).encode("utf-8")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """aiohttp.ClientSession stand-in answering from a list of (method, url regex, handler) routes.
+
+    A handler is a FakeResponse, a list of them (consumed one per call) or a
+    callable(method, url, kwargs) returning one. Every call is kept in
+    `requests` as (method, url, kwargs).
+    """
+
+    def __init__(self, routes=()):
+        self.routes = [(method, re.compile(pattern), handler) for method, pattern, handler in routes]
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        for route_method, pattern, handler in self.routes:
+            if route_method == method and pattern.search(str(url)):
+                if isinstance(handler, list):
+                    return handler.pop(0) if len(handler) > 1 else handler[0]
+                if callable(handler):
+                    return handler(method, url, kwargs)
+                return handler
+        return FakeResponse(404, {"message": "Unknown"})
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
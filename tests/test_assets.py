@@ -0,0 +1,14 @@
+from src.operation_file.serverclone import STICKER_FORMAT_LOTTIE, Clone
+
+
+def test_asset_jobs_skip_existing_managed_and_lottie():
+    source = {
+        "emojis": [{"id": "1", "name": "wave", "animated": True}, {"id": "2", "name": "twitch", "managed": True},
+                   {"id": "3", "name": "taken"}],
+        "stickers": [{"id": "4", "name": "cat", "format_type": 1},
+                     {"id": "5", "name": "lottie", "format_type": STICKER_FORMAT_LOTTIE}],
+    }
+    dest = {"emojis": [{"name": "taken"}], "stickers": []}
+    jobs = Clone()._asset_jobs(source, dest, {"clone_emojis": True, "clone_stickers": True})
+    assert [(kind, obj["name"], url.rsplit(".", 1)[1]) for kind, obj, url, *_rest in jobs] == [
+        ("emoji", "wave", "gif"), ("sticker", "cat", "png")]
@@ -0,0 +1,106 @@
+import io
+import json
+
+import aiohttp
+import pytest
+
+import cli
+from src.operation_file.jobqueue import GuildAccessError
+
+
+class FakeLimiter:
+    route_stats = {}
+
+    def get_stats(self):
+        return {}
+
+
+class FakeEngine:
+    """CloneEngine stand-in: each run() returns or raises the next scripted outcome"""
+
+    outcomes = []
+
+    def __init__(self, token, **kwargs):
+        self.limiter = FakeLimiter()
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, source_id, dest_id, options, **kwargs):
+        outcome = FakeEngine.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return dict(outcome)
+
+
+def events(stream):
+    return [json.loads(line)["event"] for line in stream.getvalue().splitlines()]
+
+
+def run_main(monkeypatch, argv, outcomes=()):
+    FakeEngine.outcomes = list(outcomes)
+    monkeypatch.setattr(cli, "CloneEngine", FakeEngine)
+    monkeypatch.setenv("DISCORD_TOKEN", "token")
+    stream = io.StringIO()
+    monkeypatch.setattr(cli.sys, "stdout", stream)
+    return cli.main(argv), stream
+
+
+def test_missing_token_is_usage_error(monkeypatch):
+    monkeypatch.delenv("DISCORD_TOKEN", raising=False)
+    monkeypatch.setattr(cli.sys, "stdout", io.StringIO())
+    assert cli.main(["--source", "1", "--dest", "2"]) == cli.EXIT_USAGE
+
+
+def test_missing_target_exits_with_usage(monkeypatch):
+    with pytest.raises(SystemExit) as exc:
+        cli.parse_args([])
+    assert exc.value.code == cli.EXIT_USAGE
+
+
+def test_bad_batch_file_is_usage_error(monkeypatch, tmp_path):
+    batch = tmp_path / "jobs.jsonl"
+    batch.write_text('{"source": "1"}\n', encoding="utf-8")
+    code, stream = run_main(monkeypatch, ["--batch", str(batch)])
+    assert code == cli.EXIT_USAGE
+    assert events(stream) == ["error"]
+
+
+def test_same_source_and_dest_is_usage_error(monkeypatch):
+    code, _stream = run_main(monkeypatch, ["--source", "1", "--dest", "1"])
+    assert code == cli.EXIT_USAGE
+
+
+def test_successful_clone(monkeypatch):
+    code, stream = run_main(monkeypatch, ["--source", "1", "--dest", "2"], [{"success": True}])
+    assert code == cli.EXIT_OK
+    assert events(stream) == ["job_start", "job_done", "rate_limit", "finished"]
+
+
+def test_failed_clone(monkeypatch):
+    code, _stream = run_main(monkeypatch, ["--source", "1", "--dest", "2"], [{"success": False}])
+    assert code == cli.EXIT_CLONE_FAILED
+
+
+def test_access_and_network_errors(monkeypatch):
+    code, _stream = run_main(monkeypatch, ["--source", "1", "--dest", "2"], [GuildAccessError("1", 403)])
+    assert code == cli.EXIT_ACCESS
+    code, _stream = run_main(monkeypatch, ["--source", "1", "--dest", "2"], [aiohttp.ClientError("down")])
+    assert code == cli.EXIT_NETWORK
+
+
+def test_batch_stops_at_first_failure_unless_asked(monkeypatch, tmp_path):
+    batch = tmp_path / "jobs.jsonl"
+    batch.write_text('{"source": "1", "dest": "2"}\n{"source": "3", "dest": "4"}\n', encoding="utf-8")
+    code, stream = run_main(monkeypatch, ["--batch", str(batch)], [{"success": False}, {"success": True}])
+    assert code == cli.EXIT_CLONE_FAILED
+    assert events(stream).count("job_start") == 1
+
+    code, stream = run_main(monkeypatch, ["--batch", str(batch), "--continue-on-error"],
+                            [{"success": False}, {"success": True}])
+    assert code == cli.EXIT_CLONE_FAILED
+    assert events(stream).count("job_start") == 2
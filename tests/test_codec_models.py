@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from src.operation_file import codec as codec_module
+from src.operation_file.codec import JsonCodec
+from src.operation_file.models import (
+    CHANNEL_CATEGORY, CHANNEL_TEXT, CHANNEL_VOICE, OVERWRITE_MEMBER, Overwrite, Role, parse_channels, parse_roles,
+)
+
+PAYLOAD = {"id": "123456789012345678", "name": "café ☕", "nested": [1, 2.5, None, True, {"k": "v"}], "empty": {}}
+
+
+@pytest.fixture(params=["default", "json"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(codec_module, "orjson", None)
+    return JsonCodec()
+
+
+def test_round_trip(backend):
+    text = backend.dumps(PAYLOAD)
+    assert isinstance(text, str)
+    assert backend.loads(text) == PAYLOAD
+    assert backend.loads(text.encode("utf-8")) == PAYLOAD
+
+
+def test_output_is_compact_utf8(backend):
+    text = backend.dumps(PAYLOAD)
+    assert ", " not in text and ": " not in text
+    assert "café ☕" in text
+
+
+def test_backends_read_each_other(monkeypatch):
+    default = JsonCodec()
+    default_text = default.dumps(PAYLOAD)
+    backend_module = codec_module.orjson
+    monkeypatch.setattr(codec_module, "orjson", None)
+    fallback = JsonCodec()
+    assert fallback.name == "json"
+    assert fallback.loads(default_text) == PAYLOAD
+    fallback_text = fallback.dumps(PAYLOAD)
+    monkeypatch.setattr(codec_module, "orjson", backend_module)
+    assert default.loads(fallback_text) == PAYLOAD
+
+
+def test_use_plugs_another_backend(monkeypatch):
+    custom = JsonCodec()
+    custom.use("sorted", json.loads, lambda obj: json.dumps(obj, sort_keys=True))
+    monkeypatch.setattr(codec_module, "codec", custom)
+    assert codec_module.dumps({"b": 1, "a": 2}) == '{"a": 2, "b": 1}'
+    assert codec_module.loads('{"a": 2}') == {"a": 2}
+
+
+def test_parse_channels_buckets_and_sorts():
+    channels = [
+        {"id": 3, "type": CHANNEL_TEXT, "name": "b", "position": 2, "parent_id": 1},
+        {"id": 1, "type": CHANNEL_CATEGORY, "name": "cat", "position": 0},
+        {"id": 2, "type": CHANNEL_TEXT, "name": "a", "position": 1, "category_id": 1, "slowmode_delay": 5},
+        {"id": 4, "type": CHANNEL_VOICE, "name": "voice", "position": None, "bitrate": None},
+        {"id": 5, "type": 15, "name": "forum"},
+    ]
+    categories, text, voice, skipped = parse_channels(channels)
+    assert [c.id for c in categories] == ["1"]
+    assert [c.name for c in text] == ["a", "b"]
+    assert [c.parent_id for c in text] == ["1", "1"]
+    assert text[0].rate_limit_per_user == 5
+    assert voice[0].position == 0 and voice[0].bitrate == 64000
+    assert skipped == 1
+
+
+def test_channel_overwrites():
+    _, text, _, _ = parse_channels([{
+        "id": "7", "type": CHANNEL_TEXT, "name": "t",
+        "permission_overwrites": [{"id": 9, "type": OVERWRITE_MEMBER, "allow": 1024}, {"id": "8"}],
+    }])
+    member, role = text[0].overwrites
+    assert (member.id, member.type, member.allow, member.deny) == ("9", OVERWRITE_MEMBER, "1024", "0")
+    assert role.to_payload("80") == {"id": "80", "type": 0, "allow": "0", "deny": "0"}
+    assert Overwrite.from_dict({"id": "1", "deny": 8}).deny == "8"
+
+
+def test_parse_roles_skips_everyone():
+    roles = parse_roles([
+        {"id": "1", "name": "@everyone", "permissions": "104324673"},
+        {"id": "2", "name": "mod", "permissions": "8", "color": 255, "hoist": True, "position": 3},
+    ])
+    assert [r.name for r in roles] == ["mod"]
+    assert roles[0].to_payload() == {"name": "mod", "permissions": "8", "color": 255, "hoist": True,
+                                     "mentionable": False}
+    assert Role.from_dict({"id": 5}).name == ""
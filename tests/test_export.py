@@ -0,0 +1,111 @@
+import asyncio
+import gzip
+import os
+
+import pytest
+
+from src.operation_file import export
+from src.operation_file.export import CODEC_GZIP, ChannelArchive, ExportError, HistoryExporter
+from tests.fakes import FakeResponse, FakeSession
+
+
+def message(message_id):
+    return {"id": str(message_id), "content": f"message {message_id}", "author": {"username": "alice"}}
+
+
+class History:
+    """GET /channels/{id}/messages over in-memory histories, newest first like Discord"""
+
+    def __init__(self, **channels):
+        self.channels = {channel_id: list(ids) for channel_id, ids in channels.items()}
+
+    def __call__(self, method, url, kwargs):
+        channel_id = str(url).rsplit("/", 2)[-2]
+        if channel_id not in self.channels:
+            return FakeResponse(403, {"message": "Missing Access", "code": 50001})
+        params = kwargs["params"]
+        newer = [i for i in self.channels[channel_id] if i > int(params["after"])][:params["limit"]]
+        return FakeResponse(200, [message(i) for i in reversed(newer)])
+
+
+def make_session(history):
+    return FakeSession([("GET", r"/channels/\d+/messages$", history)])
+
+
+def afters(session):
+    return [kwargs["params"]["after"] for _method, _url, kwargs in session.requests]
+
+
+def test_export_resumes_from_last_id(tmp_path):
+    history = History(**{"10": range(1, 151)})
+    session = make_session(history)
+    (result,) = asyncio.run(HistoryExporter(session, str(tmp_path)).export(["10"]))
+    assert (result["status"], result["exported"], result["total"], result["last_id"]) == ("done", 150, 150, "150")
+    assert afters(session) == ["0", "100"]
+
+    history.channels["10"].extend(range(151, 181))
+    again = make_session(history)
+    (result,) = asyncio.run(HistoryExporter(again, str(tmp_path)).export(["10"]))
+    assert afters(again) == ["150"]
+    assert (result["exported"], result["total"]) == (30, 180)
+    ids = [int(m["id"]) for m in ChannelArchive(str(tmp_path), "10").iter_messages()]
+    assert ids == list(range(1, 181))
+
+
+def test_partial_trailing_frame_is_dropped_on_next_append(tmp_path):
+    archive = ChannelArchive(str(tmp_path), "10")
+    archive.append([message(i) for i in range(1, 6)])
+    with open(archive.data_path, "ab") as f:
+        f.write(b"half a frame")  # export interrotto a metà scrittura
+
+    reopened = ChannelArchive(str(tmp_path), "10")
+    reopened.append([message(i) for i in range(6, 9)])
+    assert os.path.getsize(reopened.data_path) == reopened.index["size"]
+    assert [int(m["id"]) for m in reopened.iter_messages()] == list(range(1, 9))
+
+
+def test_iter_messages_seeks_through_the_index(tmp_path, monkeypatch):
+    archive = ChannelArchive(str(tmp_path), "10")
+    for start in range(1, 51, 10):
+        archive.append([message(i) for i in range(start, start + 10)])  # frame 1-10, 11-20, ...
+
+    decompressed = []
+    real_decompress = export._decompress
+    monkeypatch.setattr(export, "_decompress",
+                        lambda codec, data: decompressed.append(len(data)) or real_decompress(codec, data))
+
+    assert [int(m["id"]) for m in archive.iter_messages(after=15, before=25)] == list(range(16, 25))
+    assert len(decompressed) == 2  # solo i frame 11-20 e 21-30
+    decompressed.clear()
+    assert [int(m["id"]) for m in archive.iter_messages(after=40)] == list(range(41, 51))
+    assert len(decompressed) == 1
+
+
+def test_gzip_fallback_without_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "zstandard", None)
+    assert export.default_codec() == CODEC_GZIP
+    session = make_session(History(**{"10": range(1, 4)}))
+    (result,) = asyncio.run(HistoryExporter(session, str(tmp_path)).export(["10"]))
+    assert result["status"] == "done"
+
+    path = tmp_path / "10.jsonl.gz"
+    # Frame gzip indipendenti: il file si legge anche con zcat
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 3
+
+
+def test_zstd_archive_without_zstandard_is_an_export_error(tmp_path, monkeypatch):
+    (tmp_path / "10.index.json").write_text('{"codec": "zstd", "count": 0, "last_id": null, "frames": []}')
+    monkeypatch.setattr(export, "zstandard", None)
+    with pytest.raises(ExportError):
+        ChannelArchive(str(tmp_path), "10")
+
+
+def test_forbidden_channel_fails_alone(tmp_path):
+    session = make_session(History(**{"10": range(1, 4), "12": range(1, 6)}))
+    results = asyncio.run(HistoryExporter(session, str(tmp_path), concurrency=2).export(["10", "11", "12"]))
+
+    assert [(r["channel_id"], r["status"], r["total"]) for r in results] == [
+        ("10", "done", 3), ("11", "failed", 0), ("12", "done", 5)]
+    assert "403" in results[1]["error"]
+    assert not any(name.startswith("11.") for name in os.listdir(tmp_path))
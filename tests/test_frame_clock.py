@@ -0,0 +1,118 @@
+import pytest
+
+from src.interface.utils import animations
+from src.interface.utils.animations import FrameClock, Tween, linear
+
+
+class FakeRoot:
+    """Widget stand-in: after() only records the callback, the test fires it"""
+
+    def __init__(self):
+        self.pending = []
+        self.bindings = {}
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+        return len(self.pending)
+
+    def after_cancel(self, after_id):
+        self.pending.clear()
+
+    def bind(self, sequence, callback, add=None):
+        self.bindings[sequence] = callback
+
+
+class Event:
+    def __init__(self, widget):
+        self.widget = widget
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(animations.time, "perf_counter", lambda: now[0])
+    monkeypatch.setattr(FrameClock, "_instance", None)
+    clock = FrameClock()
+    clock.root = FakeRoot()
+    clock.attach(clock.root)
+
+    def step(ms):
+        now[0] += ms / 1000
+        callbacks, clock.root.pending[:] = list(clock.root.pending), []
+        for callback in callbacks:
+            callback()
+
+    clock.step = step
+    return clock
+
+
+def test_tween_reaches_end_after_duration():
+    values = []
+    tween = Tween("k", 0.0, 10.0, 100, values.append, linear, None, delay=0)
+    assert not tween.advance(50)
+    assert tween.value == 5.0
+    assert tween.advance(50) and tween.value == 10.0
+
+
+def test_one_timer_drives_every_tween(clock):
+    seen = {"a": [], "b": []}
+    done = []
+    first, second = object(), object()
+    clock.animate(first, "x", 1.0, 32, seen["a"].append, start=0.0, easing=linear, on_complete=lambda: done.append("a"))
+    clock.animate(second, "x", 2.0, 64, seen["b"].append, start=0.0, easing=linear)
+    assert len(clock.root.pending) == 1 and clock.active == 2
+
+    for _ in range(4):
+        clock.step(16)
+    assert seen["a"][-1] == 1.0 and seen["b"][-1] == 2.0
+    assert done == ["a"] and clock.active == 0
+    assert clock.root.pending == []  # niente timer senza animazioni
+
+
+def test_retarget_continues_from_current_value(clock):
+    widget = object()
+    values = []
+    clock.animate(widget, "alpha", 1.0, 100, values.append, start=0.0, easing=linear)
+    clock.step(16)
+    clock.step(34)
+    # Il primo frame vale sempre 1000 / FPS ms
+    reached = (1000 / FrameClock.FPS + 34) / 100
+    assert clock._tweens[(id(widget), "alpha")].value == pytest.approx(reached)
+
+    tween = clock.animate(widget, "alpha", 0.0, 100, values.append, start=1.0, easing=linear)
+    assert tween.start == pytest.approx(reached) and clock.active == 1
+
+    # Stessa destinazione: il tween in corso viene mantenuto
+    assert clock.animate(widget, "alpha", 0.0, 100, values.append, start=1.0, easing=linear) is tween
+    # restart=True riparte sempre da start
+    assert clock.animate(widget, "alpha", 0.0, 100, values.append, start=1.0, restart=True).start == 1.0
+
+
+def test_cancel_drops_without_completing(clock):
+    widget = object()
+    done = []
+    clock.animate(widget, "x", 1.0, 100, lambda v: None, start=0.0, on_complete=lambda: done.append(1))
+    clock.animate(widget, "y", 1.0, 100, lambda v: None, start=0.0)
+    clock.cancel(widget, "x")
+    assert clock.active == 1
+    clock.cancel(widget)
+    assert clock.active == 0 and done == []
+
+
+def test_pauses_while_unmapped(clock):
+    first, second = object(), object()
+    clock.animate(first, "x", 1.0, 100, lambda v: None, start=0.0)
+    clock.root.bindings["<Unmap>"](Event(clock.root))
+    assert clock.root.pending == []
+    clock.animate(second, "y", 1.0, 100, lambda v: None, start=0.0)
+    assert clock.root.pending == []
+    clock.root.bindings["<Map>"](Event(clock.root))
+    assert len(clock.root.pending) == 1
+
+
+def test_unchanged_value_is_not_reapplied(clock):
+    calls = []
+    clock.animate(object(), "blink", 1.0, 1000, calls.append, start=0.0, easing=lambda p: 0.0)
+    clock.step(16)
+    clock.step(16)
+    assert calls == [0.0]
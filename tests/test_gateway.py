@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.operation_file.gateway import (OP_DISPATCH, OP_HELLO, OP_IDENTIFY, GatewayError,
+                                        GatewaySnapshotLoader)
+from src.operation_file.jobqueue import CloneEngine
+from src.operation_file.localindex import LocalIndex
+from tests.fakes import FakeResponse, FakeSession
+
+SOURCE = {"id": "1", "name": "Source", "roles": [{"id": "1", "name": "@everyone"}], "emojis": [], "stickers": [],
+          "channels": [{"id": "10", "type": 0, "name": "general"}], "members": [{"user": {"id": "7"}}]}
+DEST = {"id": "2", "name": "Dest", "roles": [{"id": "2", "name": "@everyone"}], "emojis": [], "stickers": [],
+        "channels": []}
+
+
+def dispatch(event, data, sequence):
+    return {"op": OP_DISPATCH, "t": event, "s": sequence, "d": data}
+
+
+def ready(guilds):
+    # Account bot: READY elenca solo guild non disponibili, il contenuto arriva con GUILD_CREATE
+    return dispatch("READY", {"guilds": [{"id": g["id"], "unavailable": True} for g in guilds]}, 1)
+
+
+def run_gateway(frames, guild_ids, token="token"):
+    """Serve HELLO, wait for IDENTIFY, then send frames; return (loader result or error, identify)"""
+    received = {}
+
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"op": OP_HELLO, "d": {"heartbeat_interval": 45000}})
+        received["identify"] = json.loads((await ws.receive()).data)
+        for frame in frames:
+            await ws.send_str(frame if isinstance(frame, str) else json.dumps(frame))
+        await ws.close()
+        return ws
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/", handler)
+        async with TestServer(app) as server:
+            loader = GatewaySnapshotLoader(token, str(server.make_url("/")).replace("http", "ws", 1), timeout=5)
+            try:
+                return await loader.load(guild_ids)
+            except GatewayError as e:
+                return e
+
+    return asyncio.run(scenario()), received.get("identify")
+
+
+def test_identify_then_guild_create_snapshots():
+    frames = [ready([SOURCE, DEST]), dispatch("GUILD_CREATE", SOURCE, 2), dispatch("GUILD_CREATE", DEST, 3)]
+    snapshots, identify = run_gateway(frames, ["1", 2])
+
+    assert identify["op"] == OP_IDENTIFY and identify["d"]["token"] == "token"
+    assert set(snapshots) == {"1", "2"}
+    source = snapshots["1"]
+    assert source["channels"] == [{"id": "10", "type": 0, "name": "general", "guild_id": "1"}]
+    assert source["members"] == [{"user": {"id": "7"}}]
+    assert "channels" not in source["guild"] and "members" not in source["guild"]
+    assert snapshots["2"]["guild"]["name"] == "Dest"
+
+
+def test_user_account_ready_carries_full_guilds():
+    snapshots, _identify = run_gateway([dispatch("READY", {"guilds": [SOURCE, DEST]}, 1)], ["1"])
+    assert list(snapshots) == ["1"] and snapshots["1"]["guild"]["name"] == "Source"
+
+
+def test_guild_the_account_is_not_in_fails():
+    error, _identify = run_gateway([ready([SOURCE])], ["1", "2"])
+    assert isinstance(error, GatewayError) and "'2'" in str(error)
+
+
+def test_closed_before_guild_create_fails():
+    error, _identify = run_gateway([ready([SOURCE, DEST]), dispatch("GUILD_CREATE", SOURCE, 2)], ["1", "2"])
+    assert isinstance(error, GatewayError) and "closed" in str(error)
+
+
+def test_malformed_frame_is_a_gateway_error():
+    error, _identify = run_gateway(["{not json"], ["1"])
+    assert isinstance(error, GatewayError) and "malformed" in str(error)
+
+
+def test_engine_falls_back_to_rest_when_the_gateway_fails():
+    async def broken(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_str("{not json")
+        await ws.close()
+        return ws
+
+    session = FakeSession([
+        ("GET", r"/guilds/1/channels$", FakeResponse(200, [{"id": "10", "type": 0, "name": "general"}])),
+        ("GET", r"/guilds/2/channels$", FakeResponse(200, [])),
+        ("GET", r"/guilds/1$", FakeResponse(200, {k: v for k, v in SOURCE.items() if k != "channels"})),
+        ("GET", r"/guilds/2$", FakeResponse(403, {"message": "Missing Access"})),
+    ])
+    logs = []
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/", broken)
+        async with TestServer(app) as server:
+            engine = CloneEngine("token", use_gateway=True,
+                                 gateway_url=str(server.make_url("/")).replace("http", "ws", 1))
+            engine.session = session
+            return await engine._load_snapshots(["1", "2"], lambda message, level: logs.append((level, message)))
+
+    snapshots = asyncio.run(scenario())
+
+    assert snapshots["1"]["channels"][0]["name"] == "general"
+    assert snapshots["2"].status == 403  # GuildAccessError per la sola destinazione
+    assert [level for level, _message in logs] == ["WARNING"]
+    assert "malformed" in logs[0][1]
+    assert LocalIndex().get_channels("1")[0]["name"] == "general"
@@ -0,0 +1,75 @@
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+
+from src.interface.utils.icon_cache import GuildIconCache
+from tests.fakes import FakeSession
+
+
+class PngResponse:
+    def __init__(self, data):
+        self.status = 200
+        self._data = data
+
+    async def read(self):
+        return self._data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(GuildIconCache, "_instance", None)
+    monkeypatch.setattr(GuildIconCache, "_cache_dir", str(tmp_path / "icon_cache"))
+    return GuildIconCache()
+
+
+def png(size=128):
+    buffer = io.BytesIO()
+    Image.new("RGBA", (size, size), (255, 0, 0, 255)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_memory_cache_is_bounded_lru(cache, monkeypatch):
+    monkeypatch.setattr(GuildIconCache, "MAX_IMAGES", 2)
+    image = Image.new("RGBA", (1, 1))
+    cache._remember(("1", "a"), image)
+    cache._remember(("2", "b"), image)
+    assert cache.get("1", "a") is image  # 1 diventa il più recente
+    cache._remember(("3", "c"), image)
+    assert cache.get("2", "b") is None
+    assert cache.get("1", "a") is image and cache.get("3", "c") is image
+
+
+def test_download_is_downscaled_and_stored_on_disk(cache):
+    session = FakeSession([("GET", r"/icons/1/abc", PngResponse(png()))])
+    image = asyncio.run(cache._load_one(session, "1", "abc"))
+    assert image.size == (GuildIconCache.ICON_SIZE, GuildIconCache.ICON_SIZE)
+
+    # Secondo avvio: l'icona arriva dal disco, senza rete
+    offline = FakeSession()
+    again = asyncio.run(cache._load_one(offline, "1", "abc"))
+    assert again.size == image.size and offline.requests == []
+
+
+def test_undecodable_icon_is_skipped(cache):
+    session = FakeSession([("GET", r"/icons/1/bad", PngResponse(b"not an image"))])
+    assert asyncio.run(cache._load_one(session, "1", "bad")) is None
+
+
+def test_icons_never_start_the_process_pool(cache, monkeypatch):
+    from src.operation_file import workers
+
+    def no_pool():
+        raise AssertionError("icons must not use the process pool")
+
+    monkeypatch.setattr(workers, "get_pool", no_pool)
+    session = FakeSession([("GET", r"/icons/1/abc", PngResponse(png()))])
+    assert asyncio.run(cache._load_one(session, "1", "abc")) is not None
+    assert asyncio.run(cache._load_one(FakeSession(), "1", "abc")) is not None
@@ -0,0 +1,40 @@
+from src.operation_file.idmap import KIND_CHANNEL, KIND_MESSAGE, KIND_ROLE, KINDS, IdMapStore
+
+
+def test_round_trip_per_guild_pair():
+    store = IdMapStore()
+    store.save(1, 2, {KIND_ROLE: {"10": "20"}, KIND_CHANNEL: {"11": "21", "12": None}})
+    maps = store.load("1", "2")
+    assert set(maps) == set(KINDS)
+    assert maps[KIND_ROLE] == {"10": "20"}
+    # Le voci senza destinazione non vengono salvate
+    assert maps[KIND_CHANNEL] == {"11": "21"}
+    assert store.load(1, 3)[KIND_ROLE] == {}
+    assert store.load(1, 2, kinds=[KIND_MESSAGE]) == {KIND_MESSAGE: {}}
+
+
+def test_replace_rewrites_a_kind_and_merge_keeps_it():
+    store = IdMapStore()
+    store.save(1, 2, {KIND_CHANNEL: {"11": "21", "12": "22"}})
+    store.save(1, 2, {KIND_CHANNEL: {"13": "23"}}, replace=False)
+    assert store.load(1, 2)[KIND_CHANNEL] == {"11": "21", "12": "22", "13": "23"}
+    store.save(1, 2, {KIND_CHANNEL: {"12": "32"}})
+    assert store.load(1, 2)[KIND_CHANNEL] == {"12": "32"}
+
+
+def test_forget_and_stats():
+    store = IdMapStore()
+    store.save(1, 2, {KIND_ROLE: {"10": "20"}, KIND_MESSAGE: {"5": "6", "7": "8"}})
+    store.save(1, 3, {KIND_ROLE: {"10": "30"}})
+    assert store.get_stats() == {KIND_ROLE: 2, KIND_MESSAGE: 2}
+    store.forget(1, 2, [KIND_MESSAGE])
+    assert store.load(1, 2)[KIND_ROLE] == {"10": "20"} and store.load(1, 2)[KIND_MESSAGE] == {}
+    store.forget(1, 2)
+    assert store.load(1, 2)[KIND_ROLE] == {} and store.load(1, 3)[KIND_ROLE] == {"10": "30"}
+
+
+def test_invalid_ids_are_reported_not_raised(capsys):
+    store = IdMapStore()
+    store.save(1, 2, {KIND_ROLE: {"not-an-id": "20"}})
+    assert "Error writing ID map" in capsys.readouterr().out
+    assert store.load(1, 2)[KIND_ROLE] == {}
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from src.operation_file.async_runtime import AsyncRuntime
+from src.operation_file import jobqueue
+from src.operation_file.jobqueue import (STATUS_CANCELLED, STATUS_DONE, STATUS_QUEUED, CloneEngine, CloneJob,
+                                        CloneJobQueue, job_metrics)
+from src.operation_file.serverclone import Clone, GuildAccessError
+from tests.fakes import FakeResponse, FakeSession
+
+
+class FakeEngine:
+    instances = []
+
+    def __init__(self, token, limiter=None, connector=None, **kwargs):
+        self.limiter = limiter
+        self.connector = connector
+        self.threads = []
+        FakeEngine.instances.append(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, source_id, dest_id, options, debug_callback=None, progress_callback=None):
+        self.threads.append(threading.current_thread().name)
+        progress_callback(1.0)
+        return {"success": True}
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(CloneJobQueue, "_instance", None)
+    monkeypatch.setattr(CloneJobQueue, "_jobs_file", str(tmp_path / "clone_jobs.json"))
+    monkeypatch.setattr(jobqueue, "CloneEngine", FakeEngine)
+    FakeEngine.instances = []
+    return CloneJobQueue()
+
+
+def wait_idle(queue, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while queue.is_running() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not queue.is_running()
+
+
+def test_queue_drains_on_the_shared_runtime(queue):
+    first = queue.add("1", "2")
+    second = queue.add("1", "3", priority=5)
+    queue.start("token")
+    wait_idle(queue)
+
+    assert first.status == STATUS_DONE and second.status == STATUS_DONE
+    assert second.started_at <= first.started_at  # priorità più alta prima
+    (engine,) = FakeEngine.instances
+    runtime = AsyncRuntime()
+    assert engine.threads == ["async-runtime", "async-runtime"]
+    assert engine.connector is runtime.connector and engine.limiter is runtime.limiter
+
+
+def test_queue_restarts_after_draining(queue):
+    queue.add("1", "2")
+    queue.start("token")
+    wait_idle(queue)
+    job = queue.add("1", "4")
+    queue.start("token")
+    wait_idle(queue)
+    assert job.status == STATUS_DONE and len(FakeEngine.instances) == 2
+
+
+def test_jobs_survive_restart_and_running_ones_are_requeued(queue, monkeypatch):
+    job = queue.add("1", "2")
+    cancelled = queue.add("1", "3")
+    assert queue.cancel(cancelled.id)
+    job.status = "running"
+    queue._save_jobs()
+
+    monkeypatch.setattr(CloneJobQueue, "_instance", None)
+    reloaded = CloneJobQueue()
+    assert reloaded.get(job.id).status == STATUS_QUEUED
+    assert reloaded.get(cancelled.id).status == STATUS_CANCELLED
+
+
+def test_job_round_trip():
+    job = CloneJob("1", "2", {"clone_roles": False}, priority=3)
+    assert CloneJob.from_dict(job.to_dict()).to_dict() == job.to_dict()
+
+
+def test_metrics_keep_counters_not_lists():
+    result = {
+        "success": True, "elapsed": 1.5, "rate_limit": {"waits": 2, "wait_time": 0.4, "rate_limited": 1},
+        "stats": {"roles_created": 3, "errors": 0, "start_time": 10.0, "replay": {"rates": {"1": 1.4}}},
+        "teardown": [{"kind": "role", "id": str(i), "status": "deleted"} for i in range(40)]
+                    + [{"kind": "role", "id": "x", "status": "failed"}],
+    }
+    metrics = job_metrics(result)
+    assert metrics["stats"] == {"roles_created": 3, "errors": 0, "start_time": 10.0}
+    assert metrics["teardown"] == {"deleted": 40, "failed": 1}
+    assert metrics["rate_limit"] == result["rate_limit"] and metrics["elapsed"] == 1.5
+
+
+def test_concurrent_saves_leave_a_valid_file(queue):
+    for n in range(20):
+        queue.add("1", str(n))
+
+    def save():
+        for _ in range(20):
+            queue._save_jobs()
+
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with open(CloneJobQueue._jobs_file, encoding="utf-8") as f:
+        assert len(json.load(f)) == 20
+
+
+SOURCE = {"id": "1", "name": "Source", "roles": [{"id": "1", "name": "@everyone"}, {"id": "10", "name": "mod"}]}
+ROLES_ONLY = {"clone_roles": True, "clone_categories": False, "clone_text_channels": False,
+              "clone_voice_channels": False}
+
+
+def fan_out_session():
+    def dest(method, url, kwargs):
+        guild_id = str(url).rsplit("/", 1)[1]
+        return FakeResponse(200, {"id": guild_id, "name": f"Dest {guild_id}",
+                                  "roles": [{"id": guild_id, "name": "@everyone"}, {"id": f"{guild_id}0", "name": "old"}]})
+
+    return FakeSession([
+        ("GET", r"/guilds/\d+/channels$", FakeResponse(200, [])),
+        ("GET", r"/guilds/1$", FakeResponse(200, SOURCE)),
+        ("GET", r"/guilds/3$", FakeResponse(403, {"message": "Missing Access"})),
+        ("GET", r"/guilds/\d+$", dest),
+        ("DELETE", r"/roles/", FakeResponse(204)),
+        ("POST", r"/roles$", FakeResponse(200, {"id": "99", "name": "mod"})),
+    ])
+
+
+def fan_out(session, dest_ids, **kwargs):
+    engine = CloneEngine("token")
+    engine.session = session
+    return asyncio.run(engine.fan_out("1", dest_ids, ROLES_ONLY, **kwargs))
+
+
+def test_fan_out_aggregates_every_destination(monkeypatch):
+    monkeypatch.setattr(Clone, "PACING", dict(Clone.PACING, create_role=0))
+    session = fan_out_session()
+    logs, progress = [], []
+    result = fan_out(session, ["2", 3, "4"], debug_callback=lambda message, level: logs.append(message),
+                     progress_callback=progress.append)
+
+    assert not result["success"]  # la 3 non è leggibile
+    assert list(result["destinations"]) == ["2", "3", "4"]
+    assert result["destinations"]["3"] == {"success": False, "error": str(GuildAccessError("3", 403)), "status": 403}
+    for dest_id in ("2", "4"):
+        destination = result["destinations"][dest_id]
+        assert destination["success"] and destination["stats"]["errors"] == 0
+        assert [(r["id"], r["status"]) for r in destination["teardown"]] == [(f"{dest_id}0", "deleted")]
+    assert set(result["rate_limit"]) == {"waits", "wait_time", "rate_limited"}
+    # La sorgente si legge una volta sola, per tutte le destinazioni
+    assert sum(1 for _m, url, _k in session.requests if url.endswith("/guilds/1")) == 1
+    assert any(message.startswith("[2] ") for message in logs) and any(message.startswith("[4] ") for message in logs)
+    # Media su tutte le destinazioni: quella fallita resta a zero
+    assert 0 < max(progress) <= 2 / 3 + 1e-9
+
+
+def test_fan_out_unreadable_source_raises():
+    session = FakeSession([("GET", r"/guilds/\d+", FakeResponse(403, {"message": "Missing Access"}))])
+    with pytest.raises(GuildAccessError):
+        fan_out(session, ["2"])
@@ -0,0 +1,62 @@
+import pytest
+
+from src.interface.utils.language_manager import LanguageManager
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(LanguageManager, "_instance", None)
+    monkeypatch.setattr(LanguageManager, "_observers", [])
+    manager = LanguageManager()
+    manager._store_table("en-US", {"app": {"title": "Cloner", "greeting": "Hello {name}"},
+                                   "only": {"english": "English only"}})
+    manager._store_table("xx-XX", {"app": {"title": "Clonatore", "greeting": "Ciao {name}"}})
+    manager._activate("en-US")
+    return manager
+
+
+def test_nested_keys_are_flattened(manager):
+    assert manager.get_text("app.title") == "Cloner"
+    assert "app.title" in manager._translations["en-US"]
+
+
+def test_missing_key_returns_key(manager):
+    assert manager.get_text("app.nope") == "app.nope"
+
+
+def test_other_language_falls_back_to_english(manager):
+    assert manager.set_language("xx-XX")
+    assert manager.get_text("app.title") == "Clonatore"
+    assert manager.get_text("only.english") == "English only"
+
+
+def test_placeholders_are_formatted(manager):
+    assert manager.get_text("app.greeting", name="Ada") == "Hello Ada"
+    # Senza segnaposto la stringa non passa da str.format
+    assert manager.get_text("app.title", name="Ada") == "Cloner"
+    assert "app.title" not in manager._formatted["en-US"]
+
+
+def test_bad_format_arguments_return_raw_text(manager):
+    assert manager.get_text("app.greeting", other="x") == "Hello {name}"
+
+
+def test_set_language_notifies_observers(manager):
+    calls = []
+    manager.add_observer(lambda: calls.append(manager.current_language))
+    assert manager.set_language("xx-XX")
+    assert calls == ["xx-XX"]
+    assert not manager.set_language("zz-ZZ")
+
+
+def test_available_languages_do_not_load_their_files(monkeypatch):
+    monkeypatch.setattr(LanguageManager, "_instance", None)
+    monkeypatch.setattr(LanguageManager, "_observers", [])
+    manager = LanguageManager()
+    languages = manager.get_available_languages()
+    assert languages["it-IT"] == "Italiano" and languages["en-US"] == "English"
+    assert set(manager._translations) == {"en-US"}
+
+    # Per nome visualizzato: solo ora il file italiano viene letto
+    assert manager.set_language("Italiano")
+    assert set(manager._translations) == {"en-US", "it-IT"}
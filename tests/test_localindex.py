@@ -0,0 +1,92 @@
+import pytest
+
+from src.operation_file import localindex
+from src.operation_file.localindex import LocalIndex
+
+GUILD = "100"
+CHANNELS = [
+    {"id": "10", "name": "general", "type": 0, "position": 0, "parent_id": None},
+    {"id": "11", "name": "random", "type": 0, "position": 1, "parent_id": None},
+]
+
+
+def message(message_id, content, author="alice"):
+    return {"id": str(message_id), "content": content, "author": {"username": author},
+            "timestamp": "2025-01-01T00:00:00+00:00"}
+
+
+@pytest.fixture(params=[True, False], ids=["fts", "like"])
+def index(request, monkeypatch):
+    if not request.param:
+        # Build SQLite senza FTS5: lo schema virtuale fallisce e si ripiega su LIKE
+        monkeypatch.setattr(localindex, "_FTS_SCHEMA", "CREATE VIRTUAL TABLE t USING no_such_module(a);")
+    idx = LocalIndex()
+    idx.put_channels(GUILD, CHANNELS)
+    idx.put_messages("10", [message(1, "hello world"), message(2, "Hello there, general Kenobi")])
+    idx.put_messages("11", [message(3, "nothing to see", author="bob"), message(4, "50% off_sale")])
+    return idx
+
+
+def test_fts_availability_follows_the_schema(index, request):
+    index._connect_locked()
+    assert index.fts == (request.node.callspec.id == "fts")
+
+
+def test_search_matches_every_word_newest_first(index):
+    results = index.search_messages("hello")
+    assert [r["message"]["id"] for r in results] == ["2", "1"]
+    assert results[0]["channel_id"] == "10"
+    assert results[0]["channel_name"] == "general"
+    assert [r["message"]["id"] for r in index.search_messages("hello world")] == ["1"]
+
+
+def test_search_filters_by_channel_and_guild(index):
+    assert [r["message"]["id"] for r in index.search_messages("hello", channel_id="11")] == []
+    assert [r["message"]["id"] for r in index.search_messages("nothing", guild_id=GUILD)] == ["3"]
+    assert index.search_messages("nothing", guild_id="999") == []
+
+
+def test_search_ignores_blank_text(index):
+    assert index.search_messages("   ") == []
+
+
+def test_fts_prefix_and_snippet(index):
+    if not index.fts:
+        pytest.skip("FTS5 only")
+    results = index.search_messages("Keno")
+    assert [r["message"]["id"] for r in results] == ["2"]
+    assert "[Kenobi]" in results[0]["snippet"]
+
+
+def test_like_escapes_wildcards(index):
+    if index.fts:
+        pytest.skip("LIKE fallback only")
+    assert [r["message"]["id"] for r in index.search_messages("50%")] == ["4"]
+    assert [r["message"]["id"] for r in index.search_messages("f_s")] == ["4"]
+    assert index.search_messages("o%f") == []
+
+
+def test_updated_message_is_reindexed(index):
+    index.put_messages("10", [message(1, "goodbye moon")])
+    assert [r["message"]["id"] for r in index.search_messages("world")] == []
+    assert [r["message"]["id"] for r in index.search_messages("moon")] == ["1"]
+
+
+def test_get_channels_and_messages():
+    idx = LocalIndex()
+    assert idx.get_channels(GUILD) is None
+    idx.put_channels(GUILD, CHANNELS)
+    assert [c["name"] for c in idx.get_channels(GUILD)] == ["general", "random"]
+    idx.put_channels(GUILD, CHANNELS[:1])
+    assert [c["name"] for c in idx.get_channels(GUILD)] == ["general"]
+
+    idx.put_messages("10", [message(i, f"m{i}") for i in range(1, 6)])
+    assert [m["id"] for m in idx.get_messages("10", limit=2)] == ["5", "4"]
+    assert [m["id"] for m in idx.get_messages("10", limit=10, before=3)] == ["2", "1"]
+
+
+def test_search_channels():
+    idx = LocalIndex()
+    idx.put_channels(GUILD, CHANNELS)
+    assert [c["id"] for c in idx.search_channels("ran")] == ["11"]
+    assert idx.search_channels("gen", guild_id="999") == []
@@ -0,0 +1,168 @@
+import asyncio
+import functools
+
+import pytest
+
+from src.operation_file import serverclone
+from src.operation_file.idmap import KIND_MESSAGE, IdMapStore
+from src.operation_file.models import Channel
+from src.operation_file.ratelimit import AimdController
+from src.operation_file.serverclone import Clone
+from tests.fakes import FakeResponse, FakeSession
+
+SOURCE = {"id": "1", "name": "Source"}
+DEST = {"id": "2", "name": "Dest"}
+
+
+def message(message_id, content="", type=0, attachments=()):
+    return {"id": str(message_id), "type": type, "content": content,
+            "author": {"username": "alice", "global_name": "Alice"},
+            "timestamp": "2025-03-04T05:06:07.123000+00:00",
+            "attachments": [{"url": url} for url in attachments]}
+
+
+@pytest.fixture(autouse=True)
+def fast_replay(monkeypatch):
+    # Ritmo per canale altissimo: i test non aspettano il pacing reale
+    monkeypatch.setattr(Clone, "REPLAY_RATE", 1000.0)
+    monkeypatch.setattr(serverclone, "AimdController", functools.partial(AimdController, max_rate=1000.0))
+    monkeypatch.setitem(Clone.PACING, "create_channel", 0)
+
+
+def posted(session):
+    return [(url, kwargs["json"]) for method, url, kwargs in session.requests if method == "POST"
+            and url.endswith("/messages")]
+
+
+def replay(session, limit=10, channels_map=None):
+    clone = Clone()
+    clone.channels_map = channels_map or {"10": "90"}
+    clone.progress_steps = {"create_channels": 0.5, "copy_messages": 1.0}
+    progress = []
+    clone.set_progress_callback(progress.append)
+    asyncio.run(clone._copy_messages_rest("1", "2", [Channel("10", 0, "general")], session, limit))
+    return clone, progress
+
+
+def test_replays_oldest_first_and_skips_system_messages():
+    history = [message(3, "third", attachments=["https://cdn.example/a.png"]), message(2, type=7),
+               message(1, "first")]
+    session = FakeSession([
+        ("GET", r"/channels/10/messages", FakeResponse(200, history)),
+        ("POST", r"/channels/90/messages", FakeResponse(200, {"id": "900"})),
+    ])
+    clone, progress = replay(session)
+    sent = posted(session)
+    assert [payload["content"] for _url, payload in sent] == [
+        "**Alice** *04/03/2025 05:06*\nfirst",
+        "**Alice** *04/03/2025 05:06*\nthird\nhttps://cdn.example/a.png",
+    ]
+    assert all(payload["allowed_mentions"] == {"parse": []} for _url, payload in sent)
+    assert clone.stats["messages_cloned"] == clone.messages_copied == 2
+    assert progress[-1] == 1.0
+
+
+def test_long_history_is_paged_with_before():
+    first_page = [message(i, f"m{i}") for i in range(300, 200, -1)]
+    pages = [FakeResponse(200, first_page), FakeResponse(200, [message(i, f"m{i}") for i in range(200, 150, -1)])]
+    session = FakeSession([
+        ("GET", r"/channels/10/messages", pages),
+        ("POST", r"/channels/90/messages", FakeResponse(200, {"id": "900"})),
+    ])
+    replay(session, limit=150)
+    reads = [kwargs["params"] for method, _url, kwargs in session.requests if method == "GET"]
+    assert reads == [{"limit": 100}, {"limit": 50, "before": "201"}]
+    contents = [payload["content"].split("\n")[1] for _url, payload in posted(session)]
+    assert contents[0] == "m151" and contents[-1] == "m300" and len(contents) == 150
+
+
+def test_rate_limited_send_is_retried_and_reported_to_the_controller():
+    session = FakeSession([
+        ("GET", r"/channels/10/messages", FakeResponse(200, [message(1, "hi")])),
+        ("POST", r"/channels/90/messages", [
+            FakeResponse(429, {"retry_after": 0.01}, {"X-RateLimit-Scope": "user"}),
+            FakeResponse(200, {"id": "900"}, {"X-RateLimit-Limit": "5", "X-RateLimit-Remaining": "4",
+                                              "X-RateLimit-Reset-After": "5"}),
+        ]),
+    ])
+    clone, _progress = replay(session)
+    assert len(posted(session)) == 2
+    stats = clone.get_stats()["replay"]
+    assert (stats["sent"], stats["rate_limited"], stats["errors"]) == (1, 1, 0)
+    # Capacità letta dagli header della risposta riuscita: 5 invii ogni 5 s
+    assert stats["rates"]["90"] == 1.0
+    assert clone.stats["messages_cloned"] == 1
+
+
+def test_unreadable_channel_and_rejected_sends_count_as_errors():
+    session = FakeSession([("GET", r"/channels/10/messages", FakeResponse(403, {"message": "Missing Access"}))])
+    clone, _progress = replay(session)
+    assert posted(session) == [] and clone.errors == 1
+
+    session = FakeSession([
+        ("GET", r"/channels/10/messages", FakeResponse(200, [message(1, "hi")])),
+        ("POST", r"/channels/90/messages", FakeResponse(403, {"message": "Missing Permissions"})),
+    ])
+    clone, _progress = replay(session)
+    assert len(posted(session)) == 1
+    assert clone.errors == 1 and clone.stats["messages_cloned"] == 0
+    assert clone.get_stats()["replay"]["rate_limited"] == 0
+
+
+def test_start_clone_replays_messages_into_created_channels():
+    session = FakeSession([
+        ("POST", r"/guilds/2/channels", FakeResponse(201, {"id": "90"})),
+        ("GET", r"/channels/10/messages", FakeResponse(200, [message(1, "hello")])),
+        ("POST", r"/channels/90/messages", FakeResponse(200, {"id": "900"})),
+    ])
+    source = {"roles": [], "channels": [{"id": "10", "type": 0, "name": "general", "position": 0}]}
+    dest = {"roles": [], "channels": []}
+    options = {"clone_roles": False, "clone_categories": False, "clone_text_channels": True,
+               "clone_voice_channels": False, "clone_messages": True, "messages_limit": 5}
+    clone = Clone()
+    assert asyncio.run(clone.start_clone(SOURCE, DEST, session, options, source, dest))
+    assert [url for url, _payload in posted(session)] == ["https://discord.com/api/v10/channels/90/messages"]
+    assert clone.stats["messages_cloned"] == 1
+
+
+def test_references_are_rewritten_to_the_clone():
+    link = "https://discord.com/channels/1/10"
+    history = [message(2, f"see <#10>, <#11> and <@&5>: {link}/1"), message(1, "first")]
+    sent_ids = iter(["901", "902"])
+    session = FakeSession([
+        ("GET", r"/channels/10/messages", FakeResponse(200, history)),
+        ("POST", r"/channels/90/messages", lambda *_args: FakeResponse(200, {"id": next(sent_ids)})),
+    ])
+    clone = Clone()
+    clone.channels_map = {"10": "90"}
+    clone.roles_map = {"5": "50"}
+    clone.progress_steps = {}
+    asyncio.run(clone._copy_messages_rest("1", "2", [Channel("10", 0, "general")], session, 10))
+    content = posted(session)[1][1]["content"].split("\n")[1]
+    # Il canale 11 non è stato clonato; il jump link punta alla copia del messaggio 1
+    assert content == "see <#90>, <#11> and <@&50>: https://discord.com/channels/2/90/901"
+    assert clone.messages_map == {"1": "901", "2": "902"}
+
+
+def test_later_run_skips_messages_already_replayed():
+    history = [FakeResponse(200, [message(1, "one")]), FakeResponse(200, [message(2, "two"), message(1, "one")])]
+    sent_ids = iter(["901", "902"])
+    session = FakeSession([
+        ("POST", r"/guilds/2/channels", FakeResponse(201, {"id": "90"})),
+        ("GET", r"/channels/10/messages", history),
+        ("POST", r"/channels/90/messages", lambda *_args: FakeResponse(200, {"id": next(sent_ids)})),
+    ])
+    source = {"roles": [], "channels": [{"id": "10", "type": 0, "name": "general", "position": 0}]}
+    options = {"clone_roles": False, "clone_categories": False, "clone_text_channels": True,
+               "clone_voice_channels": False, "clone_messages": True, "messages_limit": 5}
+    assert asyncio.run(Clone().start_clone(SOURCE, DEST, session, options, source, {"roles": [], "channels": []}))
+    assert IdMapStore().load("1", "2")[KIND_MESSAGE] == {"1": "901"}
+
+    # Seconda esecuzione solo messaggi: il canale clonato esiste ancora ed è ritrovato per ID
+    clone = Clone()
+    dest = {"roles": [], "channels": [{"id": "90", "type": 0, "name": "general"}]}
+    assert asyncio.run(clone.start_clone(SOURCE, DEST, session, dict(options, clone_text_channels=False),
+                                         source, dest))
+    contents = [payload["content"].split("\n")[1] for _url, payload in posted(session)]
+    assert contents == ["one", "two"]
+    assert IdMapStore().load("1", "2")[KIND_MESSAGE] == {"1": "901", "2": "902"}
@@ -0,0 +1,129 @@
+import pytest
+
+from src.operation_file.planner import DEFAULT_LATENCY, ClonePlan, build_plan, format_duration
+from src.operation_file.ratelimit import AimdController
+from src.operation_file.serverclone import Clone
+
+SOURCE = {"id": "1", "name": "Source", "icon": "abc"}
+DEST = {"id": "2", "name": "Dest"}
+ROLES = [{"id": "1", "name": "@everyone"}, {"id": "10", "name": "mod"}, {"id": "11", "name": "vip"}]
+CHANNELS = [
+    {"id": "20", "type": 4, "name": "cat", "position": 0},
+    {"id": "21", "type": 0, "name": "general", "position": 1, "parent_id": "20"},
+    {"id": "22", "type": 2, "name": "voice", "position": 2},
+    {"id": "23", "type": 15, "name": "forum"},
+]
+DEST_ROLES = [{"id": "2", "name": "@everyone"}, {"id": "30", "name": "old"},
+              {"id": "31", "name": "bot", "managed": True}]
+DEST_CHANNELS = [{"id": "40", "name": "old-general"}, {"id": "41", "name": "old-voice"}]
+
+
+def test_build_plan_mirrors_clone_sequence():
+    plan = build_plan(SOURCE, DEST, ROLES, CHANNELS, DEST_ROLES, DEST_CHANNELS,
+                      {"clone_name_icon": True}, fetch_requests=2)
+    assert plan.per_stage() == {"fetch": 2, "edit_guild": 1, "delete_roles": 1, "create_roles": 2,
+                                "delete_channels": 2, "create_categories": 1, "create_channels": 2}
+    assert plan.request_count == 11
+    notes = " ".join(plan.notes)
+    assert "managed role bot" in notes and "1 channels of other types" in notes
+
+
+def test_message_replay_is_planned_per_text_channel():
+    options = {"clone_messages": True, "messages_limit": Clone.REPLAY_PAGE_SIZE + 50}
+    plan = build_plan(SOURCE, DEST, ROLES, CHANNELS, DEST_ROLES, DEST_CHANNELS, options)
+    stages = plan.per_stage()
+    # Un solo canale di testo: due pagine di lettura e un invio per messaggio
+    assert stages["fetch_messages"] == 2
+    assert stages["copy_messages"] == Clone.REPLAY_PAGE_SIZE + 50
+    assert plan.per_route()["POST /channels/:id/messages"] == Clone.REPLAY_PAGE_SIZE + 50
+    assert any("up to 150 messages" in note for note in plan.notes)
+
+    for disabled in ({"clone_messages": True, "messages_limit": 0},
+                     {"clone_messages": True, "messages_limit": 10, "clone_text_channels": False}):
+        assert "copy_messages" not in build_plan(SOURCE, DEST, ROLES, CHANNELS, DEST_ROLES, DEST_CHANNELS,
+                                                 disabled).per_stage()
+
+
+def test_disabled_options_add_nothing():
+    options = {"clone_roles": False, "clone_categories": False,
+               "clone_text_channels": False, "clone_voice_channels": False}
+    plan = build_plan(SOURCE, DEST, ROLES, CHANNELS, DEST_ROLES, DEST_CHANNELS, options)
+    assert plan.request_count == 0
+    assert plan.estimate()["total"] == 0
+
+
+def test_estimate_sequential_stage_uses_latency_and_pacing():
+    plan = ClonePlan(SOURCE, DEST, {})
+    for i in range(3):
+        plan.add("create_roles", f"role {i}")
+    stats = {"POST /guilds/:id/roles": {"latency": 0.1}}
+    assert plan.estimate(stats)["create_roles"] == pytest.approx(3 * (0.1 + Clone.PACING["create_role"]))
+    assert plan.estimate()["create_roles"] == pytest.approx(3 * (DEFAULT_LATENCY + Clone.PACING["create_role"]))
+
+
+def test_estimate_concurrent_stage_and_prefetch():
+    plan = ClonePlan(SOURCE, DEST, {})
+    for i in range(4):
+        plan.add("fetch", "prefetch")
+    for i in range(Clone.TEARDOWN_CONCURRENCY + 1):
+        plan.add("delete_channels", f"channel {i}")
+    estimate = plan.estimate({"DELETE /channels/:id": {"latency": 0.2}})
+    # Il prefetch costa un solo round trip, il teardown due ondate
+    assert estimate["fetch"] == pytest.approx(DEFAULT_LATENCY)
+    assert estimate["delete_channels"] == pytest.approx(2 * 0.2)
+    assert estimate["total"] == pytest.approx(estimate["fetch"] + estimate["delete_channels"])
+
+
+def test_estimate_never_beats_the_bucket():
+    plan = ClonePlan(SOURCE, DEST, {})
+    for i in range(Clone.TEARDOWN_CONCURRENCY * 3):
+        plan.add("delete_roles", f"role {i}")
+    stats = {"DELETE /guilds/:id/roles/:id": {"latency": 0.05, "limit": 5, "window": 10.0}}
+    # 24 richieste con 5 per finestra da 10 s: almeno 4 finestre di attesa
+    assert plan.estimate(stats)["delete_roles"] == pytest.approx(40.0)
+
+
+def test_to_dict_and_text_summary():
+    plan = build_plan(SOURCE, DEST, ROLES, CHANNELS, [], [], {})
+    data = plan.to_dict()
+    assert data["request_count"] == plan.request_count
+    assert data["per_route"]["POST /guilds/:id/roles"] == 2
+    assert "Requests: 5" in plan.format_text()
+
+
+def test_format_duration():
+    assert format_duration(42.4) == "42s"
+    assert format_duration(125) == "2m 05s"
+    assert format_duration(3 * 3600 + 7 * 60) == "3h 07m"
+
+
+def message_plan(channels, limit):
+    source_channels = [{"id": str(100 + i), "type": 0, "name": f"text-{i}", "position": i} for i in range(channels)]
+    options = {"clone_roles": False, "clone_categories": False, "clone_voice_channels": False,
+               "clone_messages": True, "messages_limit": limit}
+    return build_plan(SOURCE, DEST, [], source_channels, [], [], options)
+
+
+def test_message_estimate_follows_aimd_pacing_and_bucket():
+    plan = message_plan(1, 500)
+    # Bucket di default 5 ogni 5 s: almeno un secondo per messaggio
+    assert plan.estimate()["copy_messages"] == pytest.approx(500.0)
+    assert plan.estimate({"POST /channels/:id/messages": {"limit": 5, "window": 5}})["copy_messages"] \
+        == pytest.approx(500.0)
+    # Bucket largo: comanda il ritmo iniziale del controller AIMD usato dal replay
+    assert Clone.REPLAY_RATE == AimdController().initial_rate
+    roomy = plan.estimate({"POST /channels/:id/messages": {"limit": 50, "window": 1, "latency": 0.1}})
+    assert roomy["copy_messages"] == pytest.approx(500 / Clone.REPLAY_RATE)
+    # Le pagine di un canale si leggono una dopo l'altra (before=)
+    assert plan.estimate({"GET /channels/:id/messages": {"latency": 0.3}})["fetch_messages"] \
+        == pytest.approx(5 * 0.3)
+
+
+def test_message_estimate_overlaps_only_channels():
+    one = message_plan(1, 100).estimate()
+    # Fino a REPLAY_WINDOW canali insieme, oltre si accodano
+    assert message_plan(Clone.REPLAY_WINDOW, 100).estimate()["copy_messages"] == pytest.approx(one["copy_messages"])
+    assert message_plan(2 * Clone.REPLAY_WINDOW, 100).estimate()["copy_messages"] \
+        == pytest.approx(2 * one["copy_messages"])
+    # Le letture partono per tutti i canali insieme
+    assert message_plan(6, 100).estimate()["fetch_messages"] == pytest.approx(one["fetch_messages"])
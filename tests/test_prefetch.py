@@ -0,0 +1,38 @@
+import asyncio
+
+from src.operation_file.serverclone import Clone
+from tests.fakes import FakeResponse, FakeSession
+
+GUILD = {"id": "1", "name": "Source", "icon": None,
+         "roles": [{"id": "1", "name": "@everyone"}, {"id": "10", "name": "mod"}], "emojis": [], "stickers": []}
+DEST = {"id": "2", "name": "Dest", "icon": None, "roles": [{"id": "2", "name": "@everyone"}], "emojis": [], "stickers": []}
+
+
+def make_session():
+    return FakeSession([
+        ("GET", r"/guilds/1/channels$", FakeResponse(200, [{"id": "20", "type": 0, "name": "general"}])),
+        ("GET", r"/guilds/2/channels$", FakeResponse(200, [])),
+        ("GET", r"/guilds/1$", FakeResponse(200, GUILD)),
+        ("GET", r"/guilds/2$", FakeResponse(200, DEST)),
+    ])
+
+
+def plan_fetches(guild_from, guild_to, **snapshots):
+    session = make_session()
+    plan = asyncio.run(Clone().plan_clone(guild_from, guild_to, session, {}, **snapshots))
+    return plan.per_stage().get("fetch", 0), len(session.requests)
+
+
+def test_plan_counts_the_requests_prefetch_issues():
+    # Solo gli ID: guild e canali per ciascun lato
+    assert plan_fetches({"id": "1"}, {"id": "2"}) == (4, 4)
+    # Guild REST già complete di ruoli: restano solo i canali
+    assert plan_fetches(GUILD, DEST) == (2, 2)
+    assert plan_fetches(GUILD, {"id": "2"}) == (3, 3)
+
+
+def test_plan_with_snapshots_issues_no_fetch():
+    source = asyncio.run(Clone().prefetch(make_session(), "1", "2", need_dest=False))[0]
+    dest = asyncio.run(Clone().prefetch(make_session(), "1", "2", need_source=False))[1]
+    assert plan_fetches(GUILD, DEST, source_snapshot=source, dest_snapshot=dest) == (0, 0)
+    assert plan_fetches(GUILD, {"id": "2"}, source_snapshot=source) == (2, 2)
@@ -0,0 +1,155 @@
+import asyncio
+import time
+
+from src.operation_file.ratelimit import AimdController, RateLimiter, route_key
+
+API = "https://discord.com/api/v10"
+
+
+def test_route_key_keeps_major_parameter_only():
+    assert route_key("post", f"{API}/guilds/123456789012345678/roles") == "POST /guilds/123456789012345678/roles"
+    assert (route_key("DELETE", f"{API}/channels/123456789012345678/messages/987654321098765432")
+            == "DELETE /channels/123456789012345678/messages/:id")
+
+
+def test_update_learns_bucket_from_headers():
+    limiter = RateLimiter()
+    url = f"{API}/guilds/123456789012345678/channels"
+    headers = {"X-RateLimit-Bucket": "abc", "X-RateLimit-Limit": "5", "X-RateLimit-Remaining": "0",
+               "X-RateLimit-Reset-After": "2.5"}
+    assert limiter.update("POST", url, 200, headers) is None
+    bucket = limiter._bucket_for(route_key("POST", url))
+    assert (bucket.limit, bucket.remaining) == (5, 0)
+    assert 2.0 < bucket.reset_at - time.monotonic() <= 2.5
+    # Stesso hash su un'altra guild: bucket distinto
+    other = limiter._bucket_for(route_key("POST", f"{API}/guilds/223456789012345678/channels"))
+    assert other is not bucket
+
+
+def test_update_bucket_429_blocks_only_that_bucket():
+    limiter = RateLimiter()
+    url = f"{API}/channels/123456789012345678/messages"
+    assert limiter.update("POST", url, 429, {"Retry-After": "3"}) == 3.0
+    bucket = limiter._bucket_for(route_key("POST", url))
+    assert bucket.remaining == 0 and bucket.reset_at > time.monotonic() + 2
+    assert limiter._global_reset_at == 0.0
+    assert limiter.get_stats()["rate_limited"] == 1
+
+
+def test_update_global_429_sets_global_reset():
+    limiter = RateLimiter()
+    retry = limiter.update("GET", f"{API}/users/@me", 429, {"Retry-After": "bad", "X-RateLimit-Global": "true"})
+    assert retry == 1.0
+    assert limiter._global_reset_at > time.monotonic()
+
+
+def test_acquire_waits_for_exhausted_bucket():
+    async def scenario():
+        limiter = RateLimiter()
+        url = f"{API}/guilds/123456789012345678/roles"
+        limiter.update("POST", url, 200, {"X-RateLimit-Limit": "1", "X-RateLimit-Remaining": "0",
+                                          "X-RateLimit-Reset-After": "0.1"})
+        started = time.monotonic()
+        await limiter.acquire("POST", url)
+        return time.monotonic() - started, limiter.waits
+
+    elapsed, waits = asyncio.run(scenario())
+    assert elapsed >= 0.08 and waits == 1
+
+
+def test_record_keeps_latency_average_and_window():
+    limiter = RateLimiter()
+    url = f"{API}/guilds/123456789012345678/roles"
+    full = {"X-RateLimit-Limit": "10", "X-RateLimit-Remaining": "9", "X-RateLimit-Reset-After": "10"}
+    limiter.record("POST", url, 0.1, full)
+    limiter.record("POST", url, 0.6, {})
+    (stats,) = limiter.route_stats.values()
+    assert stats["samples"] == 2
+    assert abs(stats["latency"] - 0.2) < 1e-9
+    assert (stats["limit"], stats["window"]) == (10, 10.0)
+
+
+def test_route_stats_round_trip(tmp_path):
+    limiter = RateLimiter()
+    limiter.record("GET", f"{API}/guilds/123456789012345678", 0.3, {})
+    path = str(tmp_path / "route_stats.json")
+    limiter.save_route_stats(path)
+    loaded = RateLimiter()
+    loaded.load_route_stats(path)
+    assert loaded.route_stats == limiter.route_stats
+
+
+def test_aimd_window_grows_only_while_saturated():
+    async def scenario():
+        controller = AimdController(initial_window=2.0)
+        # Un invio alla volta: è il ritmo del canale a limitare, non la finestra
+        async with controller.slot("a"):
+            pass
+        controller.success("a")
+        alone = controller.window
+        async with controller.slot("a"):
+            async with controller.slot("b"):
+                pass
+        controller.success("b")
+        return alone, controller.window
+
+    alone, saturated = asyncio.run(scenario())
+    assert alone == 2.0
+    assert saturated == 2.5
+
+
+def test_aimd_rate_converges_to_bucket_ceiling():
+    controller = AimdController(initial_rate=1.0, increase=0.5, max_rate=5.0)
+    # Bucket appena riempito: 5 richieste ogni 2.5 s
+    controller.success("c", {"X-RateLimit-Limit": "5", "X-RateLimit-Remaining": "4",
+                             "X-RateLimit-Reset-After": "2.5"})
+    for _ in range(10):
+        controller.success("c")
+    assert controller._keys["c"].rate == 2.0
+    controller.rate_limited("c", 1.0)
+    assert controller._keys["c"].rate == 1.0
+    for _ in range(20):
+        controller.rate_limited("c", 0.0)
+    assert controller._keys["c"].rate == controller.min_rate
+
+
+def test_aimd_bucket_429_pauses_only_its_key():
+    controller = AimdController(initial_window=4.0)
+    controller.rate_limited("a", 2.0, {"X-RateLimit-Scope": "user"})
+    assert controller._keys["a"].paused_until > time.monotonic() + 1.5
+    assert controller._global_paused_until == 0.0
+    assert controller.window == 4.0
+
+
+def test_aimd_global_429_halves_window_and_pauses_every_key():
+    controller = AimdController(initial_window=4.0, min_window=1.0)
+    controller.rate_limited("a", 2.0, {"X-RateLimit-Global": "true"})
+    assert controller.window == 2.0
+    assert controller._global_paused_until > time.monotonic() + 1.5
+    controller.rate_limited("a", 0.0, {"X-RateLimit-Scope": "global"})
+    controller.rate_limited("a", 0.0, {"X-RateLimit-Scope": "global"})
+    assert controller.window == 1.0
+    assert controller.get_stats()["global_rate_limited"] == 3
+
+
+def test_aimd_exhausted_bucket_pauses_key_and_errors_are_not_congestion():
+    controller = AimdController(initial_window=3.0, initial_rate=1.4)
+    controller.success("a", {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "1.5"})
+    assert controller._keys["a"].paused_until > time.monotonic() + 1.0
+    rate = controller._keys["a"].rate
+    controller.failed("a", {})
+    assert (controller.window, controller._keys["a"].rate) == (3.0, rate)
+    assert controller.get_stats()["errors"] == 1
+
+
+def test_aimd_key_sends_are_paced():
+    async def scenario():
+        controller = AimdController(initial_rate=20.0)
+        started = time.monotonic()
+        for _ in range(3):
+            async with controller.slot("a"):
+                pass
+        return time.monotonic() - started
+
+    # Tre invii a 20/s: il terzo parte dopo almeno 2 intervalli da 50 ms
+    assert asyncio.run(scenario()) >= 0.09
@@ -0,0 +1,40 @@
+from src.operation_file.rewrite import ReferenceRewriter
+
+SOURCE, DEST = "100", "900"
+
+
+def rewriter(messages_map=None):
+    return ReferenceRewriter(SOURCE, DEST, {"1": "11", "2": "22", "3": None}, {"5": "55"}, messages_map)
+
+
+def test_channel_and_role_mentions():
+    assert rewriter().rewrite("<#1> <#2> <@&5> <@5> <#3> <#4>") == "<#11> <#22> <@&55> <@5> <#3> <#4>"
+
+
+def test_jump_links_of_every_host():
+    r = rewriter()
+    for host in ("discord.com", "discordapp.com", "ptb.discord.com", "canary.discord.com"):
+        assert r.rewrite(f"https://{host}/channels/{SOURCE}/1") == f"https://discord.com/channels/{DEST}/11"
+
+
+def test_links_into_other_guilds_or_unmapped_channels_are_kept():
+    r = rewriter()
+    for text in ("https://discord.com/channels/555/1", f"https://discord.com/channels/{SOURCE}/4/7"):
+        assert r.rewrite(text) == text
+
+
+def test_message_links_follow_the_live_messages_map():
+    messages_map = {}
+    r = rewriter(messages_map)
+    link = f"https://discord.com/channels/{SOURCE}/1/70"
+    # Messaggio non (ancora) replicato: il link punta al canale clonato
+    assert r.rewrite(link) == f"https://discord.com/channels/{DEST}/11"
+    messages_map["70"] = "77"
+    assert r.rewrite(link) == f"https://discord.com/channels/{DEST}/11/77"
+
+
+def test_text_without_references_is_returned_as_is():
+    text = "nothing to see here, #general or @role"
+    assert rewriter().rewrite(text) is text
+    assert rewriter().rewrite("") == ""
+    assert rewriter().rewrite(None) is None
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from src.operation_file.serverclone import Clone
+from tests.fakes import FakeResponse, FakeSession
+
+URL = "https://discord.com/api/v10/guilds/2/roles/30"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+
+    async def fake_sleep(delay, *args, **kwargs):
+        delays.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def send(session):
+    result = {"attempts": 0, "error": None}
+    status, body = asyncio.run(Clone()._send_with_retry(session, "DELETE", URL, result))
+    return status, body, result
+
+
+def test_gives_up_without_sleeping_after_last_attempt(sleeps):
+    session = FakeSession([("DELETE", "/roles/", FakeResponse(502))])
+    status, body, result = send(session)
+    assert (status, body) == (None, None)
+    assert result == {"attempts": Clone.TEARDOWN_MAX_ATTEMPTS, "error": "HTTP 502"}
+    assert len(session.requests) == Clone.TEARDOWN_MAX_ATTEMPTS
+    assert len(sleeps) == Clone.TEARDOWN_MAX_ATTEMPTS - 1
+
+
+def test_waits_retry_after_on_429(sleeps):
+    session = FakeSession([("DELETE", "/roles/", [FakeResponse(429, {"retry_after": 1.5}), FakeResponse(204)])])
+    status, _body, result = send(session)
+    assert status == 204 and result["attempts"] == 2
+    assert sleeps == [1.5]
+
+
+def test_client_errors_are_not_retried(sleeps):
+    session = FakeSession([("DELETE", "/roles/", FakeResponse(403, {"message": "Missing Permissions"}))])
+    status, _body, result = send(session)
+    assert status == 403 and result["attempts"] == 1
+    assert result["error"] == "HTTP 403: Missing Permissions"
+    assert sleeps == []
+
@@ -0,0 +1,79 @@
+import json
+import threading
+
+import pytest
+
+from src.interface.utils import settings_manager
+from src.interface.utils.settings_manager import SettingsManager
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(SettingsManager, "_instance", None)
+    monkeypatch.setattr(SettingsManager, "_settings_file", str(tmp_path / "user_settings.json"))
+    monkeypatch.setattr(SettingsManager, "SAVE_DELAY", 60)
+    manager = SettingsManager()
+    yield manager
+    with manager._lock:
+        if manager._save_timer is not None:
+            manager._save_timer.cancel()
+
+
+def test_flush_writes_pending_change(settings, tmp_path):
+    settings.set_setting("appearance", "theme", "light")
+    settings.flush()
+    saved = json.loads((tmp_path / "user_settings.json").read_text(encoding="utf-8"))
+    assert saved["appearance"]["theme"] == "light"
+    assert not (tmp_path / "user_settings.json.tmp").exists()
+
+
+def test_concurrent_saves_keep_latest_value(settings, tmp_path):
+    def writer(index):
+        for i in range(50):
+            settings.set_setting("debug", "enabled", (index + i) % 2 == 0)
+            settings.set_setting("language", "current", f"lang-{index}-{i}")
+            settings.flush()
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    settings.flush()
+
+    saved = json.loads((tmp_path / "user_settings.json").read_text(encoding="utf-8"))
+    assert saved["language"]["current"] == settings.get_setting("language", "current")
+    assert saved["debug"]["enabled"] == settings.get_setting("debug", "enabled")
+
+
+def test_set_does_not_wait_for_a_slow_write(settings, monkeypatch):
+    writing, release = threading.Event(), threading.Event()
+    real_fsync = settings_manager.os.fsync
+
+    def slow_fsync(fd):
+        writing.set()
+        release.wait(5)
+        real_fsync(fd)
+
+    monkeypatch.setattr(settings_manager.os, "fsync", slow_fsync)
+    settings.set_setting("language", "current", "slow-write")
+    flusher = threading.Thread(target=settings.flush)
+    flusher.start()
+    assert writing.wait(5)
+    try:
+        # Il flush è fermo sul disco: set e get restano immediati
+        done = threading.Event()
+        threading.Thread(target=lambda: (settings.set_setting("language", "current", "next"), done.set())).start()
+        assert done.wait(1)
+        assert settings.get_setting("language", "current") == "next"
+    finally:
+        release.set()
+        flusher.join()
+    settings.flush()  # nulla resta in sospeso per il flush di uscita
+
+
+def test_older_snapshot_never_replaces_a_newer_write(settings, tmp_path):
+    settings.set_setting("language", "current", "stale")
+    settings._saved_generation = settings._generation + 1  # una scrittura più recente è già su disco
+    settings.flush()
+    assert not (tmp_path / "user_settings.json").exists()
@@ -0,0 +1,79 @@
+import asyncio
+
+from src.operation_file.serverclone import Clone
+from tests.fakes import FakeResponse, FakeSession
+
+GUILD = {"id": "2", "name": "Dest"}
+
+
+class SlowDeletes:
+    """DELETE handler that keeps each request in flight for a moment and records the order"""
+
+    def __init__(self, statuses=None):
+        self.statuses = statuses or {}
+        self.order = []
+        self.in_flight = 0
+        self.peak = 0
+
+    def __call__(self, method, url, kwargs):
+        handler = self
+        object_id = str(url).rsplit("/", 1)[1]
+
+        class Response(FakeResponse):
+            async def __aenter__(self):
+                handler.in_flight += 1
+                handler.peak = max(handler.peak, handler.in_flight)
+                await asyncio.sleep(0.01)
+                handler.in_flight -= 1
+                handler.order.append(object_id)
+                return self
+
+        status = self.statuses.get(object_id, 204)
+        return Response(status, {"message": "Missing Permissions"} if status == 403 else {})
+
+
+def channels(categories, children_per_category):
+    result = []
+    for c in range(categories):
+        result.append({"id": f"c{c}", "type": 4, "name": f"category-{c}"})
+        result += [{"id": f"t{c}-{n}", "type": 0, "name": f"text-{n}", "parent_id": f"c{c}"}
+                   for n in range(children_per_category)]
+    return result
+
+
+def teardown(existing, handler, logs=None):
+    logs = [] if logs is None else logs
+    clone = Clone(lambda message, level="INFO": logs.append((level, message)))
+    session = FakeSession([("DELETE", r"/channels/", handler)])
+    asyncio.run(clone._delete_existing_channels_rest(GUILD, session, existing_channels=existing))
+    return clone
+
+
+def test_children_wave_runs_before_the_categories_wave():
+    handler = SlowDeletes()
+    clone = teardown(channels(3, 4), handler)
+    children = [i for i in handler.order if i.startswith("t")]
+    assert handler.order[:len(children)] == children and len(children) == 12
+    assert sorted(handler.order[12:]) == ["c0", "c1", "c2"]
+    assert {r["status"] for r in clone.teardown_report} == {"deleted"}
+
+
+def test_teardown_concurrency_is_honored(monkeypatch):
+    monkeypatch.setattr(Clone, "TEARDOWN_CONCURRENCY", 3)
+    handler = SlowDeletes()
+    teardown(channels(1, 10), handler)
+    assert handler.peak == 3
+
+
+def test_failures_are_reported_without_stopping_the_wave():
+    handler = SlowDeletes({"t0-1": 403, "t0-2": 404})
+    logs = []
+    clone = teardown(channels(1, 3), handler, logs)
+
+    by_id = {r["id"]: r for r in clone.teardown_report}
+    assert by_id["t0-1"]["status"] == "failed" and by_id["t0-1"]["error"] == "HTTP 403: Missing Permissions"
+    assert by_id["t0-2"]["status"] == "missing"
+    assert by_id["t0-0"]["status"] == by_id["c0"]["status"] == "deleted"
+    assert clone.errors == 1
+    assert any(level == "ERROR" and "text-1" in message for level, message in logs)
+    assert ("INFO", "Teardown channels: 2 deleted, 1 failed, 1 missing") in logs
@@ -0,0 +1,29 @@
+import customtkinter as ctk
+
+from src.interface.styles.colors import Colors
+from src.interface.styles.hover import HoverDispatcher
+from src.interface.styles.themes import apply_ctk_defaults
+
+
+def test_palette_resolves_each_mode_once():
+    light, dark = Colors.palette("light"), Colors.palette("dark")
+    assert light.BORDER == Colors.BORDER["light"] and dark.BORDER == Colors.BORDER["dark"]
+    assert light.TEXT_ON_PRIMARY == Colors.TEXT_ON_PRIMARY
+    assert Colors.palette("light") is light
+
+
+def test_hover_style_follows_the_current_mode(monkeypatch):
+    monkeypatch.setattr(Colors, "_mode", "light")
+    assert HoverDispatcher()._hover_style(object()) == {"border_color": Colors.PRIMARY["light"]}
+    monkeypatch.setattr(Colors, "_mode", "dark")
+    assert HoverDispatcher()._hover_style(object()) == {"border_color": Colors.PRIMARY["dark"]}
+
+
+def test_ctk_defaults_use_light_and_dark_borders(monkeypatch):
+    theme = {"CTkFrame": {"corner_radius": 6}, "CTkButton": {}, "CTkEntry": {}}
+    monkeypatch.setattr(ctk.ThemeManager, "theme", theme)
+    apply_ctk_defaults()
+    expected = [Colors.BORDER["light"], Colors.BORDER["dark"]]
+    assert theme["CTkButton"]["border_color"] == expected
+    assert theme["CTkEntry"]["border_color"] == expected
+    assert theme["CTkFrame"]["corner_radius"] == 12